@@ -1,89 +1,214 @@
 # app/api/v1/endpoints/ai.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 
+import asyncio
 import json
 from uuid import uuid4
 
-from app.services.ai_service import ask_ai
-from app.services.ai_service import get_or_create_graph
-from app.schemas.ai import ChatRequest, ChatResponse
-from app.core.logging import get_logger
+from app.services.admission import AdmissionRejected, ClientDisconnected, Superseded, Ticket, get_admission
+from app.services.ai_service import ask_ai, repair_cancelled_run
+from app.services.batch import run_batch
+from app.services.sse import StreamStats, sse_events
+from app.services.ai_service import get_or_create_graph, user_message
+from app.services.recorder import finish_recording, record_callbacks, start_recording
+from app.services.graph_metrics import GRAPH_METRICS, trace_callbacks
+from app.schemas.ai import ChatBatchRequest, ChatRequest, ChatResponse
+from app.core.config import settings
+from app.core.logging import bind_log_context, get_logger
+from app.core.metrics import record_request
+from app.core.tracing import TIMING_HEADER, finish_trace, server_timing, start_trace, trace_scope
 
 # 로거 생성
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+SUPERSEDED_DETAIL = str(Superseded())
+CLIENT_CLOSED_REQUEST = 499    # nginx 관례: 응답 전에 클라이언트가 끊음
+
+
+async def admit(thread_id: str, endpoint: str) -> Ticket:
+    """입장 제어 통과. 거절되면 503/429(+Retry-After), 새 요청에 밀리면 409."""
+    try:
+        return await get_admission().enter(thread_id)
+    except AdmissionRejected as e:
+        record_request(endpoint, "overloaded" if e.status_code == 503 else "thread_busy")
+        raise HTTPException(
+            status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(int(e.retry_after))}
+        )
+    except Superseded:
+        record_request(endpoint, "superseded")
+        raise HTTPException(status_code=409, detail=SUPERSEDED_DETAIL)
+
+
+def wants_timing(request: Request) -> bool:
+    """X-Trace-Timing: 1 이면 이 요청은 항상 트레이스하고 시간 분해를 응답에 싣는다"""
+    return request.headers.get(TIMING_HEADER, "").lower() in ("1", "true", "yes")
+
+
+async def watch_disconnect(request: Request, ticket: Ticket) -> None:
+    """본문을 다 읽은 뒤의 receive()는 연결이 끊길 때(http.disconnect)까지 기다린다."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            ticket.cancel("disconnect")
+            return
+
+
 @router.post("/chatbot", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, request: Request, response: Response):
     """
     챗봇이 답변을 한번에 제공함.
     """
+    bind_log_context(thread_id=req.user_id)
     logger.info(f"챗봇 요청 - user_id: {req.user_id}")
+    timing = wants_timing(request)
+    trace = start_trace("chatbot", forced=timing, user_id=req.user_id)
+    outcome = "rejected"    # 입장 거절(503/429/409)은 admit에서 기록
 
     try:
-        answer = await ask_ai(req)
+        with trace_scope(trace):
+            ticket = await admit(req.user_id, "chatbot")
+            # 취소되면 체크포인트의 응답 없는 도구 호출 정리 (자리/락 반환 전에)
+            ticket.on_cancel = lambda: repair_cancelled_run(req.user_id)
+            watcher = asyncio.ensure_future(watch_disconnect(request, ticket))
+            try:
+                answer = await ticket.run(ask_ai(req))
+            finally:
+                watcher.cancel()
+                ticket.leave()
         logger.info(f"챗봇 응답 완료 - user_id: {req.user_id}")
+        outcome = "ok"
+        if timing and trace is not None:
+            response.headers["Server-Timing"] = server_timing(trace)
+            response.headers["X-Trace-Id"] = trace.trace_id
         return ChatResponse(ai_answer=answer)
+    except HTTPException:
+        raise
+    except Superseded:
+        logger.info(f"챗봇 요청 취소 (새 요청) - user_id: {req.user_id}")
+        outcome = "superseded"
+        raise HTTPException(status_code=409, detail=SUPERSEDED_DETAIL)
+    except ClientDisconnected:
+        logger.info(f"챗봇 요청 취소 (연결 끊김) - user_id: {req.user_id}")
+        outcome = "disconnect"
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(ClientDisconnected()))
     except ValueError as ve:
         logger.warning(f"잘못된 요청 - user_id: {req.user_id}, error: {ve}")
+        outcome = "bad_request"
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"챗봇 서버 오류 - user_id: {req.user_id}, error: {e}")
+        outcome = "error"
         raise HTTPException(status_code=500, detail=f"챗봇 오류가 발생했습니다: {e}")
+    finally:
+        if outcome != "rejected":
+            record_request("chatbot", outcome)
+        finish_trace(trace, outcome)
+
+@router.post("/chatbot/batch")
+async def chat_batch(req: ChatBatchRequest):
+    """
+    여러 요청을 한 번에 처리 (백엔드 작업용). 끝나는 순서대로 NDJSON으로 스트리밍.
+    - {"event": "start", "total": N, "concurrency": C}
+    - {"event": "item", "index": i, "user_id": .., "status": "ok" | "error", ...}
+    - {"event": "done", "total": N, "ok": .., "failed": .., "elapsed_sec": .., "tool_cache": {...}}
+    """
+    if len(req.items) > settings.CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"배치는 최대 {settings.CHAT_BATCH_MAX_ITEMS}건까지 가능합니다."
+        )
+    logger.info(f"배치 챗봇 요청 - {len(req.items)}건, concurrency: {req.concurrency}")
+
+    async def generate():
+        async for event in run_batch(req.items, req.concurrency):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 
 @router.post("/chat")
-async def answer(req: ChatRequest):
+async def answer(req: ChatRequest, request: Request):
     """
     챗봇이 답변을 stream으로 제공함.
     """
+    bind_log_context(thread_id=req.user_id)
     checkpoint_id = str(uuid4())
-    async def event_stream():
+    timing = wants_timing(request)
+    trace = start_trace("chat", forced=timing, user_id=req.user_id)
+    recorder = start_recording(req, "chat")
+    try:
+        ticket = await admit(req.user_id, "chat")
+    except HTTPException:
+        finish_trace(trace, "rejected")
+        raise
+    except ValueError as ve:
+        finish_trace(trace, "bad_request")
+        raise HTTPException(status_code=400, detail=str(ve))
+    # 스트림이 시작되기 전에 연결이 끊겨도 자리/락이 반환되도록 요청 태스크 종료 시에도 반환
+    asyncio.current_task().add_done_callback(lambda _: ticket.leave())
+    ticket.on_cancel = lambda: repair_cancelled_run(req.user_id)
+
+    stats = StreamStats(queue_ms=ticket.wait_ms)
+    if timing:
+        stats.trace = trace
+
+    async def tokens():
+        # 그래프 실행 태스크는 ticket.stream 안에서 시작되므로 그 전에 트레이스를 컨텍스트에 둔다
+        with trace_scope(trace):
+            async for content in graph_tokens():
+                yield content
+
+    async def graph_tokens():
         graph = await get_or_create_graph()
-        config = {"configurable": {"thread_id": req.user_id, "checkpoint_id": checkpoint_id}}
+        config = {
+            "configurable": {"thread_id": req.user_id, "checkpoint_id": checkpoint_id},
+            # 요청별 콜백을 주면 그래프 기본 콜백이 덮어써지므로 지표 콜백도 같이
+            "callbacks": [ticket.calls, GRAPH_METRICS, *trace_callbacks(), *record_callbacks(recorder)],
+        }
+        async for chunk in ticket.stream(graph.astream(
+            input={"messages": [user_message(req)]},
+            config=config,
+            stream_mode=["messages"]
+        )):
+            # ("messages", (AIMessageChunk, metadata))
+            kind, payload = chunk
+            if kind != "messages":
+                continue
+
+            msg_chunk, meta = payload
+            # 최종 노드만 통과
+            if meta.get("langgraph_node") != "chatbot":
+                continue
+            stats.add_usage(getattr(msg_chunk, "usage_metadata", None))
+
+            # 혹시 모를 중첩/예외 대비
+            content = getattr(msg_chunk, "content", "")
+            if not content:
+                continue
+
+            # (선택) : JSON/에러 문구 차단
+            if content.lstrip().startswith("{") or content.startswith("Error:"):
+                continue
+
+            yield content
+
+    async def event_stream():
+        # 토큰은 묶어서 보내고, 마지막은 항상 done 이벤트 (오류면 error 다음 done)
         try:
-            async for chunk in graph.astream(
-                input={
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": req.user_question,
-                            "additional_kwargs": {
-                                "user_lat": req.user_location.lat if req.user_location else None,
-                                "user_lon": req.user_location.lng if req.user_location else None
-                            }
-                        }
-                    ]
-                },
-                config=config,
-                stream_mode=["messages"]
-            ):
-                # ("messages", (AIMessageChunk, metadata))
-                kind, payload = chunk
-                if kind != "messages":
-                    continue
-
-                msg_chunk, meta = payload
-                # 최종 노드만 통과
-                if meta.get("langgraph_node") != "chatbot":
-                    continue
-
-                # 혹시 모를 중첩/예외 대비
-                content = getattr(msg_chunk, "content", "")
-                if not content:
-                    continue
-
-                # (선택) : JSON/에러 문구 차단
-                if content.lstrip().startswith("{") or content.startswith("Error:"):
-                    continue
-
-                data = {"type": "delta", "content": content}
-                # print(f"data: {data}")
-                yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-
-        except Exception as e:
-            yield f"data: {str(e)}\n\n"
+            async for frame in sse_events(tokens(), stats, error_codes={Superseded: "superseded"}):
+                yield frame
+        except (asyncio.CancelledError, GeneratorExit):
+            # 연결이 끊김: StreamingResponse가 스트림을 취소하거나(ASGI < 2.4) 닫는다(send 실패)
+            ticket.cancel("disconnect")
+            stats.status = "disconnect"
+            raise
+        finally:
+            record_request("chat", stats.status or "disconnect")
+            finish_trace(trace, stats.status or "disconnect")
+            finish_recording(recorder, stats.status or "disconnect")
+            ticket.leave()
 
     return StreamingResponse(
         event_stream(),
@@ -91,4 +216,12 @@ async def answer(req: ChatRequest):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
-        })
\ No newline at end of file
+        })
+
+
+@router.get("/chat/stats")
+async def chat_stats():
+    """
+    채팅 입장 제어 지표: 실행 중/대기 중 요청 수, 거절(503/429)/취소 수, 대기 시간 p50/p95
+    """
+    return get_admission().stats()
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Query
-from app.memory.locks import thread_lock, try_acquire_thread, release_thread
-from app.memory.store import delete_thread, has_thread, find_thread, list_threads
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.memory.locks import lock_stats, thread_lock, try_acquire_thread, release_thread
+from app.memory.store import delete_thread, delete_threads_bulk, has_thread, find_thread, list_threads
+from app.schemas.memory import BulkDeleteRequest
+from app.memory.manager import checkpointer_stats, ensure_checkpointer
+from app.memory import retention
+from app.core.config import settings
 from app.core.logging import get_logger
 
-from typing import List
+from typing import Literal, Optional
+import json
 
 # 로거 생성
 logger = get_logger(__name__)
@@ -36,6 +42,31 @@ async def delete_memory(
         return {"thread_id": thread_id, "error": "락 획득 실패", "forced":False, "complete": False}
     
 
+@router.post("/bulk-delete")
+async def bulk_delete_memory(request: BulkDeleteRequest):
+    """
+    thread_ids 목록 또는 inactive_since 기준으로 대량 삭제. 진행 상황을 NDJSON으로 스트리밍.
+    - {"event": "start", "total": N}
+    - {"event": "chunk", "chunk": i, "deleted_threads": .., "deleted_rows": .., "skipped": [..], "missing": [..], ...}
+    - {"event": "done", "deleted_threads": .., "deleted_rows": .., "skipped": [..], "missing": [..], "elapsed_sec": ..}
+    실행 중(락 점유)인 스레드는 삭제하지 않고 skipped로, 저장된 행이 없는 thread_id는 missing으로 보고한다.
+    """
+    logger.info(
+        f"POST /memory/bulk-delete API 호출: thread_ids={len(request.thread_ids or [])}개, "
+        f"inactive_since={request.inactive_since}, chunk_size={request.chunk_size}"
+    )
+
+    async def generate():
+        async for event in delete_threads_bulk(
+            thread_ids=request.thread_ids,
+            inactive_since=request.inactive_since,
+            chunk_size=request.chunk_size,
+        ):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/exists")
 async def thread_exists(thread_id: int):
     """
@@ -63,23 +94,65 @@ async def thread_locations(thread_id: int):
 @router.get("")
 async def find_all_threads(
     limit: int = Query(50, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    order: Literal["recent", "thread_id"] = Query("recent", description="recent: 최근 활동 순, thread_id: ID 순"),
 ):
     """
-    DB에 저장된 thread_id 목록 (페이지네이션)
+    DB에 저장된 스레드 목록 (keyset 페이지네이션)
     - limit: 1 ~ 500
-    - offset: 0부터
+    - cursor: 첫 페이지는 생략, 다음 페이지는 next_cursor 전달
+    - items: thread_id, created_at, last_active_at, checkpoint_count, byte_size
     """
-    logger.info(f"GET /memory API 호출: limit={limit}, offset={offset}")
-    items: List[str] = await list_threads(limit=limit, offset=offset)
-    has_more = len(items) == limit
-    next_offset = offset + limit if has_more else None
+    logger.info(f"GET /memory API 호출: limit={limit}, cursor={cursor}, order={order}")
+    try:
+        items, next_cursor = await list_threads(limit=limit, cursor=cursor, order=order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     logger.info(f"스레드 목록 반환: {len(items)}개")
     return {
         "items": items,
         "limit": limit,
-        "offset": offset,
+        "order": order,
         "count": len(items),
-        "has_more": has_more,
-        "next_offset": next_offset,
-    }
\ No newline at end of file
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/checkpointer/stats")
+async def get_checkpointer_stats():
+    """
+    체크포인터 지표: 쓰기 대기열 길이, 락 대기/커밋 지연(p50/p95), 읽기 전용 풀 상태
+    """
+    logger.info("GET /memory/checkpointer/stats API 호출")
+    return checkpointer_stats()
+
+
+@router.get("/locks/stats")
+async def get_lock_stats():
+    """
+    thread 락 지표: 살아 있는 락 수, 대기 시간 p50/p95, 경합이 많은 thread 목록 (sqlite 백엔드면 lease 상태 포함)
+    """
+    logger.info("GET /memory/locks/stats API 호출")
+    return await lock_stats()
+
+
+@router.get("/retention")
+async def get_retention_report():
+    """
+    마지막 보존 정책 실행 결과 (만료 스레드/정리된 체크포인트 수, DB 크기 전/후)
+    """
+    logger.info("GET /memory/retention API 호출")
+    return {"report": retention.last_report}
+
+
+@router.post("/retention")
+async def run_retention_now():
+    """
+    보존 정책을 즉시 1회 실행하고 보고서 반환
+    """
+    logger.info("POST /memory/retention API 호출")
+    if settings.MEMORY_DB == ":memory:":
+        raise HTTPException(status_code=400, detail="인메모리 DB는 보존 정책 대상이 아님")
+    saver = await ensure_checkpointer()
+    return {"report": await retention.run_retention_all(saver)}
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     # 로깅 설정
     LOG_LEVEL: str = "ERROR"
     LOG_FILE: str = "logs/app.log"
+    LOG_FORMAT: str = "text"                     # text | json (한 줄 JSON, request_id/thread_id 포함)
+    LOG_QUEUE_SIZE: int = 10000                  # 파일/콘솔 쓰기 대기 로그 수 (넘치면 버림)
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0           # 핫패스 디버그 로그 중 남길 비율 (락, 라우팅)
     
     # API 키
     OPENAI_API_KEY: Optional[str] = None
@@ -35,6 +38,9 @@ class Settings(BaseSettings):
     # URL
     KAKAO_URL: Optional[str] = None
     KAKAO_MAP_URL: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None        # 비우면 api.openai.com (부하 테스트: benchmarks.fake_upstreams)
+    TAVILY_URL: Optional[str] = None             # 비우면 api.tavily.com
+    OPENWEATHERMAP_URL: Optional[str] = None     # 비우면 api.openweathermap.org
 
     # DATA
     DB_PATH: Optional[str] = None
@@ -42,12 +48,85 @@ class Settings(BaseSettings):
     FAISS_DIR: Optional[str] = None
     MEMORY_DB: Optional[str] = None
 
+    # 체크포인트 DB 튜닝 (WAL + synchronous=NORMAL 고정)
+    MEMORY_DB_READERS: int = 4                   # 읽기 전용 연결 수 (0이면 writer로 읽기)
+    MEMORY_DB_MMAP_SIZE: int = 256 * 1024 * 1024 # bytes
+    MEMORY_DB_CACHE_KB: int = 16 * 1024          # 연결당 페이지 캐시
+    MEMORY_DB_BUSY_TIMEOUT_MS: int = 5000
+    MEMORY_SHARDS: int = 1                       # thread_id 해시 샤드 수 (바꿀 땐 app.memory.sharding reshard)
+
+    # 채팅 입장 제어 (/v1/chat, /v1/chatbot, 워커 프로세스당)
+    CHAT_MAX_CONCURRENCY: int = 32               # 동시에 실행하는 그래프 수
+    CHAT_MAX_QUEUE: int = 64                     # 자리 대기 요청 수 (넘치면 바로 503)
+    CHAT_QUEUE_TIMEOUT_SEC: float = 10.0         # 이 시간 안에 자리/thread 락을 못 얻으면 503/429
+    CHAT_THREAD_POLICY: str = "queue"            # 같은 thread_id 동시 요청: queue(대기) | cancel(이전 요청 취소)
+    CHAT_THREAD_MAX_PENDING: int = 4             # queue 정책에서 thread당 실행+대기 요청 수 (넘치면 429)
+    CHAT_BATCH_MAX_ITEMS: int = 200              # /v1/chatbot/batch 요청당 최대 건수
+    CHAT_BATCH_CONCURRENCY: int = 4              # 배치 하나가 동시에 실행하는 건수 (요청의 concurrency 상한)
+
+    # SSE 스트리밍 (/v1/chat)
+    SSE_FLUSH_MS: float = 50.0                   # 토큰을 모으는 최대 시간 (0이면 토큰마다 전송)
+    SSE_FLUSH_CHARS: int = 64                    # 이만큼 모이면 시간 전이라도 전송
+    SSE_HEARTBEAT_SEC: float = 15.0              # 보낼 게 없을 때 ": ping" 주석 프레임 주기 (0이면 끔)
+
+    # thread_id 락 백엔드: memory(단일 워커) | sqlite(워커 여러 개, 프로세스 간 lease)
+    LOCK_BACKEND: str = "memory"
+    LOCK_DB: Optional[str] = None                # 기본: {MEMORY_DB}.locks
+    LOCK_LEASE_SEC: float = 30.0                 # 연장 못하면 이 시간 뒤 다른 워커가 가져감
+    LOCK_POLL_MS: float = 50.0                   # 다른 워커가 잡고 있을 때 재시도 간격 (최대 500ms까지 증가)
+
+    # 체크포인트 압축 (zstandard 필요, 기존 비압축 행도 그대로 읽힘)
+    MEMORY_SERDE_COMPRESSION: bool = False
+    MEMORY_SERDE_DICT_PATH: Optional[str] = None # app.memory.serde train 결과, 쉼표로 여러 개(첫 번째로 압축)
+    MEMORY_SERDE_LEVEL: int = 3
+    MEMORY_SERDE_MIN_BYTES: int = 256            # 이보다 작은 값은 압축하지 않음
+
+    # 체크포인트 보존 정책
+    MEMORY_RETENTION_KEEP_CHECKPOINTS: int = 50  # 스레드별 최근 N개 유지 (0이면 무제한)
+    MEMORY_RETENTION_IDLE_DAYS: float = 30.0     # 이 기간 활동 없는 스레드 삭제 (0이면 끔)
+    MEMORY_RETENTION_INTERVAL_SEC: int = 3600    # 0이면 백그라운드 정리 안 함
+    MEMORY_RETENTION_BATCH: int = 500            # 한 번에 처리할 스레드/행 수
+    MEMORY_RETENTION_VACUUM_PAGES: int = 2000    # incremental_vacuum 1회 반환 페이지 수 (0이면 전부)
+
     # 임베딩 모델
     EMBEDDING_MODEL: Optional[str] = None
+    SPOT_INGEST_BATCH_SIZE: int = 64
+
+    # 위치 기반 관광지 검색
+    SPOT_GEO_RADIUS_KM: float = 3.0
+    SPOT_GEO_DISTANCE_WEIGHT: float = 0.3
+    SPOT_GEO_K: int = 3
+
+    # 임베딩/검색 실행 풀 (0이면 CPU 코어 수)
+    SPOT_EXECUTOR_WORKERS: int = 0
+    SPOT_BATCH_WINDOW_MS: float = 5.0
+    SPOT_MAX_BATCH: int = 32
+
+    # 시작 시 도구/LLM 클라이언트 미리 생성 (끄면 첫 요청 때 생성)
+    WARMUP_TOOLS: bool = True
 
     # user agent
     USER_AGENT: Optional[str] = None
 
+    # 외부 API 호출 (Kakao, 블로그 크롤링)
+    HTTP_TIMEOUT_SEC: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+
+    # 요청 트레이스 (app.core.tracing)
+    TRACE_SAMPLE_RATE: float = 0.0               # 기록할 요청 비율 0~1 (X-Trace-Timing 헤더 요청은 항상 기록)
+    TRACE_FILE: str = "logs/traces.jsonl"
+    TRACE_MAX_BYTES: int = 20 * 1024 * 1024      # 넘으면 traces.jsonl.1, .2 ...로 회전
+    TRACE_BACKUPS: int = 5
+    TRACE_MAX_SPANS: int = 1000                  # 트레이스당 스팬 상한 (넘으면 dropped_spans로만 셈)
+    TRACE_ARG_CHARS: int = 300                   # 도구 인자 기록 길이
+
+    # 대화 녹화 (app.services.recorder → python -m benchmarks.replay)
+    RECORD_SAMPLE_RATE: float = 0.0              # 녹화할 대화 비율 0~1 (thread_id 단위로 골라 대화 전체를 남김)
+    RECORD_FILE: str = "logs/recordings.jsonl"
+    RECORD_MAX_BYTES: int = 50 * 1024 * 1024     # 넘으면 recordings.jsonl.1, .2 ...로 회전
+    RECORD_BACKUPS: int = 5
+    RECORD_SALT: str = ""                        # thread_id 해시 솔트 (운영에서는 꼭 설정)
+
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,41 @@
+# 위경도 거리 계산 유틸리티
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    한 지점(lat, lon)에서 여러 지점(lats, lons)까지의 거리(km)를 한 번에 계산.
+    lats/lons는 도(degree) 단위 float 배열.
+    """
+    lat1 = math.radians(lat)
+    lon1 = math.radians(lon)
+    lat2 = np.radians(lats)
+    lon2 = np.radians(lons)
+
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """반경 radius_km를 덮는 (min_lat, max_lat, min_lon, max_lon). haversine 전 1차 필터용."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def parse_coordinates(lat, lon) -> Optional[Tuple[float, float]]:
+    """문자열/숫자 위경도를 검증해서 (lat, lon)으로 변환. 잘못된 값이면 None."""
+    try:
+        lat_f = float(lat)
+        lon_f = float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat_f <= 90.0 and -180.0 <= lon_f <= 180.0):
+        return None
+    return lat_f, lon_f
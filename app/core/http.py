@@ -0,0 +1,40 @@
+# app/core/http.py
+# 외부 API(Kakao 등) 호출용 httpx.AsyncClient 공유
+# - 동기 requests는 도구가 스레드 풀에서 돌아서 요청이 취소돼도 끝까지 실행된다.
+#   AsyncClient는 이벤트 루프 안에서 돌아서 그래프 실행이 취소되면 진행 중인 HTTP 요청도 같이 끊긴다.
+# - 연결 풀은 이벤트 루프에 묶여 있으므로 루프가 바뀌면(테스트의 asyncio.run 등) 새로 만든다.
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+HTTP_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global HTTP_CLIENT, HTTP_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if HTTP_CLIENT is None or HTTP_CLIENT.is_closed or HTTP_CLIENT_LOOP is not loop:
+        HTTP_CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SEC, connect=min(5.0, settings.HTTP_TIMEOUT_SEC)),
+            limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS),
+            headers={"User-Agent": settings.USER_AGENT} if settings.USER_AGENT else None,
+            follow_redirects=True,
+        )
+        HTTP_CLIENT_LOOP = loop
+    return HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    global HTTP_CLIENT, HTTP_CLIENT_LOOP
+    if HTTP_CLIENT is not None and not HTTP_CLIENT.is_closed:
+        await HTTP_CLIENT.aclose()
+    HTTP_CLIENT = None
+    HTTP_CLIENT_LOOP = None
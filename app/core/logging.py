@@ -1,42 +1,284 @@
+import atexit
+import copy
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import random
+import re
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import uuid4
+
 from app.core.config import settings
 
+# 로그 파일/콘솔 쓰기는 QueueListener 스레드가 한다.
+# 호출한 쪽(이벤트 루프)은 메시지 조립 + 요청 컨텍스트 복사 후 큐에 넣기만 한다.
+LISTENER: Optional[QueueListener] = None
+
+# 요청별 로그 필드 (request_id, thread_id). 값은 항상 새 dict로 바꿔 끼운다.
+LOG_CONTEXT: ContextVar[Dict[str, str]] = ContextVar("log_context", default={})
+CONTEXT_FIELDS = ("request_id", "thread_id")
+REQUEST_ID_HEADER = "x-request-id"
+REQUEST_ID_PATTERN = re.compile(r"^[\w\-.:]{1,64}$")
+
+
+class LogQueueHandler(QueueHandler):
+    """큐가 가득 차면(디스크가 밀리면) 기다리지 않고 버린다 (dropped로 셈)."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자/컨텍스트는 지금 값으로 고정 (리스너 스레드에는 contextvar가 없음)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.__dict__.update(LOG_CONTEXT.get())
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON: ts, level, logger, msg, (request_id, thread_id, exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
 def setup_logging():
-    """로깅 설정을 초기화합니다."""
-    
+    """로깅 설정을 초기화합니다. (두 번째 호출부터는 그대로 둔다)"""
+    global LISTENER
+    if LISTENER is not None:
+        return logging.getLogger(__name__)
+
     # 로그 디렉토리 생성
     log_dir = os.path.dirname(settings.LOG_FILE)
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
-    # 로그 포맷 설정
+
+    # 로그 포맷 설정 (LOG_FORMAT=json이면 한 줄 JSON)
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
-    
-    # 루트 로거 설정
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.FileHandler(settings.LOG_FILE, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-    
+    if settings.LOG_FORMAT == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(log_format, datefmt=date_format)
+
+    handlers = [
+        logging.FileHandler(settings.LOG_FILE, encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # 루트 로거 설정: 루트에는 큐 핸들러를 붙이고, 실제 쓰기는 리스너 스레드가 한다
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    root.addHandler(LogQueueHandler(log_queue))
+    LISTENER = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    LISTENER.start()
+    atexit.register(shutdown_logging)
+
     # 특정 라이브러리들의 로그 레벨 조정
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
-    
+
     # 로거 생성
     logger = logging.getLogger(__name__)
     logger.info("로깅 시스템이 초기화되었습니다.")
-    
+
     return logger
 
+
+def shutdown_logging() -> None:
+    """큐에 남은 로그를 모두 쓰고 리스너 스레드를 멈춘다."""
+    global LISTENER
+    if LISTENER is None:
+        return
+    LISTENER.stop()
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, LogQueueHandler)]:
+        root.removeHandler(handler)
+    for handler in LISTENER.handlers:
+        handler.close()
+    LISTENER = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """지정된 이름의 로거를 반환합니다."""
     return logging.getLogger(name)
 
+
+# ===============[JSONL 기록 파일]============================
+
+class JsonlSink:
+    """
+    한 줄 JSON 기록 파일 (트레이스, 대화 녹화). 크기 기준 회전 (path.1, .2 ...).
+    앱 로그와 같은 방식으로 파일 쓰기/회전은 전용 QueueListener 스레드가 하고,
+    호출한 쪽(이벤트 루프)은 JSON 직렬화 후 큐에 넣기만 한다. 큐가 가득 차면 버린다 (dropped).
+    파일과 스레드는 첫 write 때 만든다.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int, queue_size: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue_size = settings.LOG_QUEUE_SIZE if queue_size is None else queue_size
+        self.handler: Optional[LogQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.open_lock = threading.Lock()
+
+    def open(self) -> LogQueueHandler:
+        with self.open_lock:
+            if self.handler is None:
+                log_dir = os.path.dirname(self.path)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                file_handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+                )
+                file_handler.setFormatter(logging.Formatter("%(message)s"))
+                sink_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+                self.listener = QueueListener(sink_queue, file_handler)
+                self.listener.start()
+                self.handler = LogQueueHandler(sink_queue)
+            return self.handler
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """파일을 열지 못하면 OSError"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        self.open().handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO, "levelname": "INFO"}))
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped if self.handler is not None else 0
+
+    def close(self) -> None:
+        """큐에 남은 줄을 모두 쓰고 스레드를 멈춘다."""
+        with self.open_lock:
+            if self.listener is not None:
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.close()
+            self.handler = None
+            self.listener = None
+
+
+def jsonl_files(path: str) -> List[str]:
+    """회전된 파일(path.N, 오래된 것부터)과 현재 파일"""
+    rotated = []
+    for n in range(1, 1000):
+        if not os.path.exists(f"{path}.{n}"):
+            break
+        rotated.append(f"{path}.{n}")
+    current = [path] if os.path.exists(path) else []
+    return rotated[::-1] + current
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """회전된 파일까지 오래된 줄부터 읽는다 (쓰는 중에 잘린 줄은 건너뜀)"""
+    for file in jsonl_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+# ===============[요청 컨텍스트]============================
+
+def bind_log_context(**fields: str) -> None:
+    """현재 요청(태스크)의 로그에 필드 추가. 요청이 끝나면 LogContextMiddleware가 되돌린다."""
+    LOG_CONTEXT.set({**LOG_CONTEXT.get(), **fields})
+
+
+class LogContextMiddleware:
+    """
+    요청마다 request_id(X-Request-ID 헤더 값 또는 새로 만든 값)를 로그 컨텍스트에 두고 응답 헤더로 돌려준다.
+    스트리밍 응답/연결 끊김 처리에 끼어들지 않도록 순수 ASGI 미들웨어로 둔다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = next(
+            (v.decode("latin-1") for k, v in scope.get("headers", []) if k == REQUEST_ID_HEADER.encode()), ""
+        )
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid4().hex[:16]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(REQUEST_ID_HEADER.encode(), request_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = LOG_CONTEXT.set({"request_id": request_id})
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            LOG_CONTEXT.reset(token)
+
+
+# ===============[핫패스 로그]============================
+
+class Lazy:
+    """로그가 실제로 남을 때만 계산되는 인자: logger.debug("%s", Lazy(lambda: ...)). 핸들러가 여럿이어도 한 번만 계산."""
+
+    __slots__ = ("fn", "text")
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+        self.text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = str(self.fn())
+        return self.text
+
+
+def debug_sampled(logger: logging.Logger, msg: str, *args) -> None:
+    """
+    요청마다 여러 번 불리는 곳의 디버그 로그.
+    DEBUG가 꺼져 있으면 레벨 비교 한 번, 켜져 있으면 LOG_DEBUG_SAMPLE_RATE 비율만 남긴다.
+    msg는 %-형식 (f-string 금지: 남기지 않을 로그도 문자열을 만들게 된다).
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = settings.LOG_DEBUG_SAMPLE_RATE
+    if rate < 1 and random.random() >= rate:
+        return
+    logger.debug(msg, *args, stacklevel=2)
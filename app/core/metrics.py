@@ -0,0 +1,239 @@
+# app/core/metrics.py
+# Prometheus 텍스트 형식 지표 (GET /metrics)
+# - 외부 라이브러리 없이 카운터/히스토그램/게이지(수집 시 계산)만 구현
+# - 기록은 핫패스에서 불리므로 락 없이 숫자만 더한다: 라벨 자식은 미리 만들어 두고(labels() 결과를 모듈 상수로),
+#   히스토그램 버킷은 고정 길이 리스트. 이벤트 루프 스레드에서 기록하는 것을 전제로 한다
+#   (실행 풀 스레드에서 동시에 더하면 드물게 1씩 빠질 수 있음 - 지표 용도로는 허용).
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# 초 단위 지연 버킷 (5ms ~ 60s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)    # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """라벨 자식 (핫패스에서는 결과를 미리 받아 두고 쓴다)"""
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames}에 값 {key}")
+            child = self.children.setdefault(key, self.new_child())
+        return child
+
+    def prealloc(self, label_values: Iterable[Sequence[str]]) -> None:
+        for values in label_values:
+            self.labels(*values)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, child in list(self.children.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {format_value(child.value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, child in list(self.children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), list(child.counts)):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(Metric):
+    """수집할 때 함수로 값을 읽는 게이지 (현재 실행 수 같은 상태값)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        super().__init__(name, help)
+        self.read = read
+
+    def render(self) -> List[str]:
+        try:
+            value = float(self.read())
+        except Exception:
+            value = math.nan
+        return self.header() + [f"{self.name} {'NaN' if math.isnan(value) else format_value(value)}"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"이미 등록된 지표: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        """같은 이름을 다시 등록하면 읽는 함수만 바꾼다 (모듈 재로드/테스트)"""
+        existing = self.metrics.get(name)
+        if isinstance(existing, Gauge):
+            existing.read = read
+            return existing
+        return self.register(Gauge(name, help, read))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# ===============[지표 정의]============================
+# 기록하는 모듈은 여기 상수를 가져다 쓴다.
+
+GRAPH_NODE_SECONDS = REGISTRY.histogram("graph_node_seconds", "그래프 노드 실행 시간", ("node",))
+GRAPH_NODE_SECONDS.prealloc([("analyze",), ("chatbot",), ("tools",)])
+
+TOOL_SECONDS = REGISTRY.histogram("tool_seconds", "도구 실행 시간", ("tool",))
+TOOL_CALLS = REGISTRY.counter("tool_calls_total", "도구 호출 수 (outcome: ok, error, cancelled)", ("tool", "outcome"))
+
+LLM_SECONDS = REGISTRY.histogram("llm_seconds", "LLM 호출 시간")
+LLM_TTFT_SECONDS = REGISTRY.histogram("llm_ttft_seconds", "LLM 첫 토큰까지 시간 (스트리밍 호출만)")
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "LLM 토큰 수 (kind: prompt, completion)", ("kind",))
+LLM_PROMPT_TOKENS = LLM_TOKENS.labels("prompt")
+LLM_COMPLETION_TOKENS = LLM_TOKENS.labels("completion")
+LLM_CALLS = REGISTRY.counter("llm_calls_total", "LLM 호출 수 (outcome: ok, error, cancelled)", ("outcome",))
+LLM_CALLS.prealloc([("ok",), ("error",), ("cancelled",)])
+
+CHECKPOINT_SECONDS = REGISTRY.histogram(
+    "checkpoint_seconds", "체크포인터 읽기/쓰기 시간 (op: get, list, put, put_writes)", ("op",)
+)
+CHECKPOINT_GET = CHECKPOINT_SECONDS.labels("get")
+CHECKPOINT_LIST = CHECKPOINT_SECONDS.labels("list")
+CHECKPOINT_PUT = CHECKPOINT_SECONDS.labels("put")
+CHECKPOINT_PUT_WRITES = CHECKPOINT_SECONDS.labels("put_writes")
+
+LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "lock_wait_seconds", "thread 락 대기 시간",
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOCK_WAIT = LOCK_WAIT_SECONDS.labels()
+
+CHAT_REQUESTS = REGISTRY.counter(
+    "chat_requests_total",
+    "채팅 요청 결과 (endpoint: chatbot, chat, batch / outcome: ok, error, bad_request, overloaded, thread_busy, superseded, disconnect, cancelled)",
+    ("endpoint", "outcome"),
+)
+
+TOOL_CACHE_LOOKUPS = REGISTRY.counter(
+    "tool_cache_lookups_total", "배치 도구 캐시 조회 (result: hit, coalesced, miss, error)", ("result",)
+)
+TOOL_CACHE_HIT = TOOL_CACHE_LOOKUPS.labels("hit")
+TOOL_CACHE_COALESCED = TOOL_CACHE_LOOKUPS.labels("coalesced")
+TOOL_CACHE_MISS = TOOL_CACHE_LOOKUPS.labels("miss")
+TOOL_CACHE_ERROR = TOOL_CACHE_LOOKUPS.labels("error")
+
+
+def record_request(endpoint: str, outcome: str) -> None:
+    CHAT_REQUESTS.labels(endpoint, outcome).inc()
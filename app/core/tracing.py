@@ -0,0 +1,316 @@
+# app/core/tracing.py
+# 요청별 트레이스 (느린 답변 디버깅용)
+# - 요청 하나 = 트레이스 하나. 노드(analyze/chatbot/tools), LLM 호출, 도구 호출(인자 포함), 체크포인트 읽기/쓰기가 스팬
+#   노드/LLM/도구는 LangGraph 콜백(app.services.graph_metrics.TraceCallback), 체크포인트는 span()으로 기록
+# - TRACE_SAMPLE_RATE 비율의 요청만 기록 (기록하지 않는 요청은 컨텍스트 조회 한 번이 전부)
+#   X-Trace-Timing 헤더를 보낸 요청은 항상 기록하고 시간 분해를 응답(Server-Timing 헤더, done 이벤트)에 싣는다
+# - 끝난 트레이스는 한 줄씩 TRACE_FILE(JSONL, 크기 기준 회전)에 쓴다. 파일 쓰기는 리스너 스레드가 한다 (app.core.logging.JsonlSink)
+#
+# 느린 트레이스 보기:
+#   python -m app.core.tracing slowest --top 10
+#   python -m app.core.tracing flame [--name chatbot] [--folded]
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.logging import JsonlSink, get_logger, read_jsonl
+
+# 로거 생성
+logger = get_logger(__name__)
+
+TIMING_HEADER = "X-Trace-Timing"
+NULL_SPAN = nullcontext()
+
+
+def status_of(error: BaseException) -> str:
+    return "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+
+
+def truncate(value: Any, limit: Optional[int] = None) -> str:
+    limit = settings.TRACE_ARG_CHARS if limit is None else limit
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+class Span:
+    __slots__ = ("id", "parent", "name", "kind", "start", "end", "status", "attrs")
+
+    def __init__(self, id: int, parent: Optional[int], name: str, kind: str, attrs: Dict[str, Any]):
+        self.id = id
+        self.parent = parent
+        self.name = name
+        self.kind = kind    # node, llm, tool, checkpoint
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.attrs = attrs
+
+    def to_dict(self, t0: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round((self.start - t0) * 1000, 3),
+            "dur_ms": round(((self.end or self.start) - self.start) * 1000, 3),
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+
+class Trace:
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid4().hex
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.wall = time.time()
+        self.t0 = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.ended: Optional[float] = None
+        self.status: Optional[str] = None
+
+    def start_span(self, name: str, kind: str, parent: Optional[int] = None, attrs=None) -> Optional[Span]:
+        if len(self.spans) >= settings.TRACE_MAX_SPANS:
+            self.dropped += 1
+            return None
+        span = Span(len(self.spans), parent, name, kind, attrs or {})
+        self.spans.append(span)
+        return span
+
+    def end_span(self, span: Optional[Span], status: str = "ok", **attrs) -> None:
+        if span is None or span.end is not None:
+            return
+        span.end = time.perf_counter()
+        span.status = status
+        if attrs:
+            span.attrs.update(attrs)
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attrs) -> Iterator[Optional[Span]]:
+        span = self.start_span(name, kind, attrs=attrs)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, status_of(e))
+            raise
+        else:
+            self.end_span(span)
+
+    def elapsed_ms(self) -> float:
+        return ((self.ended or time.perf_counter()) - self.t0) * 1000
+
+    def breakdown(self) -> Dict[str, float]:
+        """노드는 이름별, 나머지는 종류별(llm, tool, checkpoint) 시간 합 (겹칠 수 있음: LLM 시간은 노드 시간 안에 포함)"""
+        totals: Dict[str, float] = defaultdict(float)
+        for span in self.spans:
+            if span.end is not None:
+                totals[span.name if span.kind == "node" else span.kind] += (span.end - span.start) * 1000
+        result = {key: round(value, 1) for key, value in totals.items()}
+        result["total"] = round(self.elapsed_ms(), 1)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        return {"trace_id": self.trace_id, "breakdown": self.breakdown()}
+
+    def finish(self, status: str) -> None:
+        """끝나지 않은 스팬(취소된 도구 호출 등)은 cancelled로 닫고 내보낸다. 두 번째 호출부터는 무시."""
+        if self.ended is not None:
+            return
+        self.ended = time.perf_counter()
+        self.status = status
+        for span in self.spans:
+            if span.end is None:
+                span.end = self.ended
+                span.status = "cancelled"
+        export(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "ts": datetime.fromtimestamp(self.wall, timezone.utc).isoformat(),
+            "status": self.status,
+            "duration_ms": round(self.elapsed_ms(), 3),
+            "attrs": self.attrs,
+            "dropped_spans": self.dropped,
+            "spans": [span.to_dict(self.t0) for span in self.spans],
+        }
+
+
+def server_timing(trace: Trace) -> str:
+    """Server-Timing 헤더 값 (브라우저 개발자 도구에 그대로 표시됨)"""
+    return ", ".join(f"{key};dur={value}" for key, value in trace.breakdown().items())
+
+
+# ===============[현재 트레이스]============================
+
+CURRENT_TRACE: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def start_trace(name: str, forced: bool = False, **attrs) -> Optional[Trace]:
+    """샘플링에 걸리면(또는 forced) 새 트레이스, 아니면 None"""
+    rate = settings.TRACE_SAMPLE_RATE
+    if not forced and (rate <= 0 or (rate < 1 and random.random() >= rate)):
+        return None
+    return Trace(name, attrs)
+
+
+def finish_trace(trace: Optional[Trace], status: str) -> None:
+    if trace is not None:
+        trace.finish(status)
+
+
+@contextmanager
+def trace_scope(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """이 안에서 시작한 태스크(그래프 실행, 체크포인트 호출)는 trace에 스팬을 남긴다."""
+    if trace is None:
+        yield None
+        return
+    token = CURRENT_TRACE.set(trace)
+    try:
+        yield trace
+    finally:
+        CURRENT_TRACE.reset(token)
+
+
+def span(name: str, kind: str):
+    """현재 트레이스에 스팬 기록. 트레이스가 없으면 아무것도 안 하는 컨텍스트."""
+    trace = CURRENT_TRACE.get()
+    if trace is None:
+        return NULL_SPAN
+    return trace.span(name, kind)
+
+
+# ===============[JSONL 내보내기]============================
+
+TRACE_SINK: Optional[JsonlSink] = None
+
+
+def get_trace_sink() -> JsonlSink:
+    """트레이스 전용 JSONL 파일 (앱 로그와 별도, 크기 기준 회전, 쓰기는 리스너 스레드)"""
+    global TRACE_SINK
+    if TRACE_SINK is None:
+        TRACE_SINK = JsonlSink(settings.TRACE_FILE, settings.TRACE_MAX_BYTES, settings.TRACE_BACKUPS)
+    return TRACE_SINK
+
+
+def close_trace_log() -> None:
+    global TRACE_SINK
+    if TRACE_SINK is not None:
+        TRACE_SINK.close()
+    TRACE_SINK = None
+
+
+def export(record: Dict[str, Any]) -> None:
+    try:
+        get_trace_sink().write(record)
+    except OSError as e:
+        logger.warning(f"트레이스 기록 실패: {e}")
+
+
+# ===============[CLI]============================
+
+def load_traces(path: str, name: Optional[str] = None) -> List[Dict[str, Any]]:
+    return [record for record in read_jsonl(path) if name is None or record.get("name") == name]
+
+
+def span_children(record: Dict[str, Any]) -> Dict[Optional[int], List[Dict[str, Any]]]:
+    children: Dict[Optional[int], List[Dict[str, Any]]] = defaultdict(list)
+    for s in record.get("spans", []):
+        children[s.get("parent")].append(s)
+    for items in children.values():
+        items.sort(key=lambda s: s["start_ms"])
+    return children
+
+
+def span_label(s: Dict[str, Any]) -> str:
+    attrs = s.get("attrs") or {}
+    extra = []
+    for key in ("model", "ttft_ms", "prompt_tokens", "completion_tokens", "args"):
+        if attrs.get(key) not in (None, ""):
+            extra.append(f"{key}={attrs[key]}")
+    status = "" if s.get("status") == "ok" else f" [{s.get('status')}]"
+    return f"{s['name']}{status}" + (f"  ({', '.join(extra)})" if extra else "")
+
+
+def format_trace(record: Dict[str, Any]) -> List[str]:
+    attrs = " ".join(f"{k}={v}" for k, v in (record.get("attrs") or {}).items())
+    lines = [
+        f"{record['duration_ms']:10.1f}ms  {record['name']}  {record.get('status')}  "
+        f"{record.get('ts')}  {record['trace_id']}  {attrs}"
+    ]
+    children = span_children(record)
+
+    def walk(parent: Optional[int], depth: int) -> None:
+        for s in children.get(parent, []):
+            lines.append(f"  +{s['start_ms']:9.1f}ms {s['dur_ms']:9.1f}ms  {'  ' * depth}{span_label(s)}")
+            walk(s["id"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+def folded_stacks(traces: List[Dict[str, Any]]) -> Dict[str, float]:
+    """스택 경로(트레이스;노드;...;스팬)별 자기 시간(ms) 합. flamegraph.pl/speedscope의 folded 형식"""
+    totals: Dict[str, float] = defaultdict(float)
+    for record in traces:
+        children = span_children(record)
+
+        def walk(parent: Optional[int], path: str, duration: float) -> None:
+            inner = 0.0
+            for s in children.get(parent, []):
+                inner += s["dur_ms"]
+                walk(s["id"], f"{path};{s['name']}", s["dur_ms"])
+            totals[path] += max(0.0, duration - inner)
+
+        walk(None, record["name"], record["duration_ms"])
+    return totals
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="요청 트레이스(JSONL) 요약")
+    sub = parser.add_subparsers(dest="command", required=True)
+    slowest = sub.add_parser("slowest", help="가장 느린 트레이스와 스팬 타임라인")
+    slowest.add_argument("--top", type=int, default=10)
+    flame = sub.add_parser("flame", help="스택 경로별 자기 시간 합 (flame 요약)")
+    flame.add_argument("--folded", action="store_true", help="flamegraph.pl/speedscope 입력 형식으로 출력")
+    for cmd in (slowest, flame):
+        cmd.add_argument("--file", default=settings.TRACE_FILE)
+        cmd.add_argument("--name", default=None, help="트레이스 이름 (chatbot, chat, batch)")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.file, args.name)
+    if not traces:
+        print(f"트레이스 없음: {args.file}")
+        return
+
+    if args.command == "slowest":
+        traces.sort(key=lambda r: r["duration_ms"], reverse=True)
+        for record in traces[: args.top]:
+            print("\n".join(format_trace(record)))
+            print()
+    elif args.command == "flame":
+        stacks = folded_stacks(traces)
+        if args.folded:
+            for path, ms in sorted(stacks.items()):
+                print(f"{path} {int(round(ms))}")
+            return
+        total = sum(stacks.values()) or 1.0
+        print(f"트레이스 {len(traces)}개, 자기 시간 합 {total:.1f}ms")
+        for path, ms in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+            share = ms / total
+            print(f"{ms:12.1f}ms {share * 100:5.1f}% {'█' * max(1, int(share * 40))} {path}")
+
+
+if __name__ == "__main__":
+    main()
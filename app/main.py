@@ -1,11 +1,20 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.http import close_http_client
+from app.memory.locks import close_leases
 from app.memory.manager import aclose_checkpointer, ensure_checkpointer
+from app.memory.retention import start_retention, stop_retention
+from app.services.graph_module import warmup_graph
+from app.services.recorder import close_record_log
+from app.services.restroom_module import get_restroom_index
+from app.services.tool_module import shutdown_spot_executor
 from app.api.v1.routers import api_v1_router
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import LogContextMiddleware, setup_logging, shutdown_logging
+from app.core.metrics import CONTENT_TYPE, render_metrics
+from app.core.tracing import close_trace_log
 
 from contextlib import asynccontextmanager
 
@@ -19,6 +28,13 @@ async def lifespan(app: FastAPI):
 
     try:
         await ensure_checkpointer()
+        # 오래된 체크포인트 정리 + 공간 회수 (백그라운드)
+        start_retention()
+        # 화장실 데이터는 시작 시 한 번만 읽는다. (prefork 마스터가 이미 읽었으면 그대로 공유)
+        get_restroom_index()
+        # 도구와 LLM 클라이언트는 임포트 때가 아니라 여기서 (첫 요청 지연 방지)
+        if settings.WARMUP_TOOLS:
+            warmup_graph()
         app.state.ready = True
         logger.info("애플리케이션이 준비되었습니다.")
         yield
@@ -27,7 +43,14 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         logger.info("애플리케이션이 종료됩니다.")
+        await stop_retention()
+        shutdown_spot_executor()
         await aclose_checkpointer()
+        await close_leases()
+        await close_http_client()
+        close_trace_log()
+        close_record_log()
+        shutdown_logging()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -38,6 +61,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 요청별 request_id를 로그 컨텍스트/응답 헤더(X-Request-ID)에
+app.add_middleware(LogContextMiddleware)
 
 @app.get("/health")
 def health():
@@ -47,4 +72,9 @@ def health():
 def ready():
     return {"status": "ready" if getattr(app.state, "ready", False) else "starting"}
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus 수집용 지표 (텍스트 형식)"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 app.include_router(api_v1_router, prefix=settings.API_V1_STR)
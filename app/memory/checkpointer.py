@@ -0,0 +1,170 @@
+# writer 1개 + 읽기 전용 연결 풀로 나눈 AsyncSqliteSaver
+# - 쓰기(aput/aput_writes/adelete_thread): 기존처럼 단일 writer 연결 + 락으로 직렬화
+# - 읽기(aget_tuple/alist): 풀에서 빌린 읽기 전용 연결로 처리해서 쓰기 대기열에 줄 서지 않음
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.core.metrics import CHECKPOINT_GET, CHECKPOINT_LIST, CHECKPOINT_PUT, CHECKPOINT_PUT_WRITES
+from app.core.tracing import span
+from app.memory.pool import ReaderPool
+
+# 지연 통계에 쓰는 최근 샘플 수
+STATS_WINDOW = 2048
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class TimedLock:
+    """
+    writer 락 래퍼.
+    락 대기 시간(=쓰기 대기열), 점유 시간(=execute + commit), 대기 중인 요청 수를 기록한다.
+    """
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.wait_ms = deque(maxlen=STATS_WINDOW)
+        self.hold_ms = deque(maxlen=STATS_WINDOW)
+        self.hold_started = 0.0
+
+    def locked(self) -> bool:
+        return self.lock.locked()
+
+    async def __aenter__(self):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        started = time.perf_counter()
+        try:
+            await self.lock.acquire()
+        finally:
+            self.waiting -= 1
+        self.hold_started = time.perf_counter()
+        self.wait_ms.append((self.hold_started - started) * 1000)
+        self.acquired += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.hold_ms.append((time.perf_counter() - self.hold_started) * 1000)
+        self.lock.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "writes": self.acquired,
+            "queue_depth": self.waiting,
+            "queue_depth_max": self.max_waiting,
+            "wait_ms_p50": round(percentile(self.wait_ms, 50), 3),
+            "wait_ms_p95": round(percentile(self.wait_ms, 95), 3),
+            "commit_ms_p50": round(percentile(self.hold_ms, 50), 3),
+            "commit_ms_p95": round(percentile(self.hold_ms, 95), 3),
+            "commit_ms_max": round(max(self.hold_ms) if self.hold_ms else 0.0, 3),
+        }
+
+
+class PooledSqliteSaver(AsyncSqliteSaver):
+    """
+    readers가 None이면(:memory: 등) 읽기도 writer 연결로 처리한다.
+    읽기 전용 연결마다 is_setup=True인 AsyncSqliteSaver를 붙여서 조회 로직은 그대로 재사용.
+    """
+
+    def __init__(
+        self, conn: aiosqlite.Connection, readers: Optional[ReaderPool] = None, *, db_path: str = "", serde=None
+    ):
+        super().__init__(conn, serde=serde)
+        self.db_path = db_path
+        self.lock = TimedLock(self.lock)
+        self.readers = readers
+        self.reader_savers: Dict[int, AsyncSqliteSaver] = {}
+        self.reads = 0
+
+    def attach_readers(self, readers: ReaderPool) -> None:
+        self.readers = readers
+        for conn in readers.connections:
+            saver = AsyncSqliteSaver(conn, serde=self.serde)
+            saver.is_setup = True    # 테이블은 writer가 만든다 (읽기 전용이라 DDL 불가)
+            self.reader_savers[id(conn)] = saver
+
+    async def setup(self) -> None:
+        # 원본은 매 쓰기마다 락을 잡고 is_setup을 확인하므로, 락 밖에서 먼저 거른다.
+        if self.is_setup:
+            return
+        await super().setup()
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        started = time.perf_counter()
+        try:
+            with span("checkpoint:get", "checkpoint"):
+                if self.readers is None:
+                    return await super().aget_tuple(config)
+                self.reads += 1
+                async with self.readers.acquire() as conn:
+                    return await self.reader_savers[id(conn)].aget_tuple(config)
+        finally:
+            CHECKPOINT_GET.observe(time.perf_counter() - started)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        started = time.perf_counter()
+        try:
+            if self.readers is None:
+                async for item in super().alist(config, filter=filter, before=before, limit=limit):
+                    yield item
+                return
+            self.reads += 1
+            async with self.readers.acquire() as conn:
+                reader = self.reader_savers[id(conn)]
+                async for item in reader.alist(config, filter=filter, before=before, limit=limit):
+                    yield item
+        finally:
+            CHECKPOINT_LIST.observe(time.perf_counter() - started)
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        started = time.perf_counter()
+        try:
+            with span("checkpoint:put", "checkpoint"):
+                return await super().aput(config, checkpoint, metadata, new_versions)
+        finally:
+            CHECKPOINT_PUT.observe(time.perf_counter() - started)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        started = time.perf_counter()
+        try:
+            with span("checkpoint:put_writes", "checkpoint"):
+                await super().aput_writes(config, writes, task_id, task_path)
+        finally:
+            CHECKPOINT_PUT_WRITES.observe(time.perf_counter() - started)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        from app.memory.registry import forget_threads  # registry -> sharding -> checkpointer 순환 임포트 회피
+
+        await super().adelete_thread(thread_id)
+        # 체크포인트 삭제 트리거는 레지스트리 행을 남기므로 여기서 지운다
+        async with self.lock:
+            await forget_threads(self.conn, [thread_id])
+            await self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        result = self.lock.snapshot()
+        result["reads"] = self.reads
+        result["readers"] = self.readers.size if self.readers else 0
+        result["reader_waiting"] = self.readers.waiting if self.readers else 0
+        return result
@@ -0,0 +1,207 @@
+# 프로세스 간 락 (SQLite lease)
+# uvicorn 워커가 여러 개일 때 같은 thread_id를 다른 프로세스가 동시에 실행하지 않도록
+# 공유 SQLite 파일의 행(key → owner, expires_at)으로 임대(lease)를 잡는다.
+# - 보유 중인 lease는 백그라운드에서 LOCK_LEASE_SEC/3 주기로 연장
+# - 만료된 lease(프로세스가 멈췄거나 연장 못함)는 다른 프로세스가 가져갈 수 있음
+# - 같은 호스트에서 소유 프로세스가 이미 죽었으면 만료를 기다리지 않고 바로 회수
+# 같은 프로세스 안의 대기/순서는 locks.py의 asyncio.Lock이 맡고, 여기서는 프로세스 간 배타만 보장한다.
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+LEASE_DDL = """CREATE TABLE IF NOT EXISTS thread_leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    acquired_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);"""
+
+MAX_POLL_SEC = 0.5
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LeaseStore:
+    """
+    lease 테이블 하나를 여러 프로세스가 공유한다.
+    sqlite3 호출은 모두 스레드로 넘긴다 (busy_timeout 동안 이벤트 루프가 멈추지 않게).
+    release는 동기 경로(release_key)에서 불리므로 DELETE를 백그라운드 태스크로 넘기고,
+    같은 key를 다시 acquire할 때 그 태스크가 끝나기를 기다린다 (늦게 도는 DELETE가 새 lease를 지우지 않게).
+    """
+
+    def __init__(self, db_path: str, lease_sec: float = 30.0, poll_ms: float = 50.0, busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.lease_sec = lease_sec
+        self.poll_sec = poll_ms / 1000.0
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        # pid 재사용에 대비해 실행마다 다른 토큰
+        self.owner = f"{self.host}:{self.pid}:{uuid.uuid4().hex[:8]}"
+        self.held: Set[str] = set()
+        self.recovered = 0
+        self.lost = 0
+        self.conn_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000.0, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute(LEASE_DDL)
+        self.renew_task: Optional[asyncio.Task] = None
+        # 진행 중인 release DELETE (key → 태스크)
+        self.releasing: Dict[str, asyncio.Task] = {}
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self.conn_lock:
+            return self.conn.execute(sql, params)
+
+    def try_take(self, key: str) -> bool:
+        """비어 있거나 만료된 lease면 가져온다. 죽은 프로세스 소유면 회수 후 한 번 더 시도."""
+        return self.upsert(key) or (self.recover_dead_owner(key) and self.upsert(key))
+
+    def upsert(self, key: str) -> bool:
+        """한 문장으로 원자적: 행이 없거나 만료됐을 때만 owner를 바꾼다."""
+        now = time.time()
+        cur = self.execute(
+            """INSERT INTO thread_leases (key, owner, host, pid, acquired_at, expires_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   owner = excluded.owner, host = excluded.host, pid = excluded.pid,
+                   acquired_at = excluded.acquired_at, expires_at = excluded.expires_at
+               WHERE thread_leases.expires_at < ?;""",
+            (key, self.owner, self.host, self.pid, now, now + self.lease_sec, now),
+        )
+        return cur.rowcount == 1
+
+    def recover_dead_owner(self, key: str) -> bool:
+        """같은 호스트의 소유 프로세스가 죽었으면 lease 삭제 (만료 대기 없이 회수)"""
+        row = self.execute("SELECT owner, host, pid FROM thread_leases WHERE key = ?;", (key,)).fetchone()
+        if row is None:
+            return True    # 그 사이 해제됨
+        owner, host, pid = row
+        if host != self.host or pid == self.pid or pid_alive(pid):
+            return False
+        cur = self.execute("DELETE FROM thread_leases WHERE key = ? AND owner = ?;", (key, owner))
+        if cur.rowcount:
+            self.recovered += 1
+            logger.warning(f"죽은 프로세스의 lease 회수: {key} (owner={owner})")
+        return True
+
+    async def acquire(self, key: str, timeout: Optional[float] = None) -> bool:
+        """
+        timeout None: 얻을 때까지 대기, 0: 한 번만 시도, > 0: 그 시간까지 재시도.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = self.releasing.get(key)
+        if pending is not None:
+            # 취소돼도 DELETE는 끝까지 돌도록 wait로 기다린다
+            await asyncio.wait({pending})
+        delay = self.poll_sec
+        while True:
+            if await asyncio.to_thread(self.try_take, key):
+                self.held.add(key)
+                self.ensure_renewal()
+                return True
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_SEC)
+
+    def delete(self, key: str) -> None:
+        self.execute("DELETE FROM thread_leases WHERE key = ? AND owner = ?;", (key, self.owner))
+
+    def release(self, key: str) -> None:
+        """lease 반환. DELETE는 스레드에서 돌리고 결과를 기다리지 않는다."""
+        self.held.discard(key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.delete(key)
+            return
+        task = loop.create_task(asyncio.to_thread(self.delete, key))
+        self.releasing[key] = task
+        task.add_done_callback(lambda t: self.release_done(key, t))
+
+    def release_done(self, key: str, task: asyncio.Task) -> None:
+        if self.releasing.get(key) is task:
+            del self.releasing[key]
+        if not task.cancelled() and task.exception() is not None:
+            # 행은 lease_sec 뒤에 만료되어 다른 프로세스가 가져갈 수 있다
+            logger.error(f"lease 반환 실패: {key} ({task.exception()})")
+
+    def renew(self) -> List[str]:
+        """보유 lease 연장. 그 사이 다른 프로세스에 넘어간(lost) key 목록 반환."""
+        keys = list(self.held)
+        if not keys:
+            return []
+        marks = ",".join("?" * len(keys))
+        self.execute(
+            f"UPDATE thread_leases SET expires_at = ? WHERE owner = ? AND key IN ({marks});",
+            [time.time() + self.lease_sec, self.owner, *keys],
+        )
+        owned = {
+            r[0]
+            for r in self.execute(
+                f"SELECT key FROM thread_leases WHERE owner = ? AND key IN ({marks});", [self.owner, *keys]
+            )
+        }
+        return [k for k in keys if k not in owned and k in self.held]
+
+    async def renew_loop(self) -> None:
+        while self.held:
+            await asyncio.sleep(self.lease_sec / 3)
+            try:
+                lost = await asyncio.to_thread(self.renew)
+            except sqlite3.Error as e:
+                logger.error(f"lease 연장 실패: {e}")
+                continue
+            for key in lost:
+                # 연장이 lease 시간보다 오래 막혔던 경우. 실행은 계속되지만 배타가 깨졌음을 알린다.
+                self.lost += 1
+                self.held.discard(key)
+                logger.error(f"lease를 잃음 (다른 프로세스가 가져감): {key}")
+        self.renew_task = None
+
+    def ensure_renewal(self) -> None:
+        if self.renew_task is None or self.renew_task.done():
+            self.renew_task = asyncio.create_task(self.renew_loop())
+
+    def count_active(self) -> int:
+        return self.execute("SELECT COUNT(*) FROM thread_leases WHERE expires_at >= ?;", (time.time(),)).fetchone()[0]
+
+    async def stats(self) -> Dict[str, int]:
+        total = await asyncio.to_thread(self.count_active)
+        return {"held": len(self.held), "active_leases": total, "recovered": self.recovered, "lost": self.lost}
+
+    async def close(self) -> None:
+        """종료 시 연장 중단 + 이 프로세스의 lease 반환"""
+        if self.renew_task is not None:
+            self.renew_task.cancel()
+            try:
+                await self.renew_task
+            except asyncio.CancelledError:
+                pass
+            self.renew_task = None
+        if self.releasing:
+            await asyncio.wait(list(self.releasing.values()))
+        await asyncio.to_thread(self.execute, "DELETE FROM thread_leases WHERE owner = ?;", (self.owner,))
+        self.held.clear()
+        self.conn.close()
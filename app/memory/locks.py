@@ -1,17 +1,148 @@
-# user_id/thread_id 별 asyncio.Lock 제공
+# user_id/thread_id 별 락 제공
 # 옵션 : 직렬화
+# - 프로세스 안: 키별 asyncio.Lock (대기 순서/취소 처리)
+# - 프로세스 간: LOCK_BACKEND=sqlite 이면 asyncio.Lock을 얻은 뒤 SQLite lease까지 잡는다 (uvicorn 워커 여러 개)
+# 키별 락은 보유/대기 중인 태스크 수(refs)를 세다가 0이 되면 바로 지운다 → 살아 있는 락 수 = 동시 사용 중인 스레드 수
 
 import asyncio
+import time
+from collections import OrderedDict, deque
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
-from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.logging import debug_sampled, get_logger
+from app.core.metrics import LOCK_WAIT, REGISTRY
+from app.memory.checkpointer import STATS_WINDOW, percentile
+from app.memory.lease import LeaseStore
 
 # 로거 생성
 logger = get_logger(__name__)
 
-# 단일 워커 (프로세스) 전제에서, 키별 asyncio.Lock을 보관하는 저장소
-lock_store: Dict[str, asyncio.Lock] = {}
+LOCK_BACKENDS = ("memory", "sqlite")
+
+# 지워진 뒤에도 대기 기록을 남겨 둘 경합 스레드 수
+HOT_KEYS = 256
+
+
+class LockEntry:
+    """키 하나의 asyncio.Lock + 참조 수 + 대기 기록"""
+
+    __slots__ = ("lock", "refs", "acquired", "contended", "wait_ms_total", "wait_ms_max")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.refs = 0
+        self.acquired = 0
+        self.contended = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class LockRegistry:
+    """
+    프로세스 안 키별 락 저장소.
+    - checkout: 락을 기다리거나 쥐기 전에 refs += 1
+    - checkin : 해제/타임아웃/취소 후 refs -= 1, 0이면 항목 삭제
+    경합이 있었던 키는 삭제될 때 기록을 hot(최대 HOT_KEYS개, LRU)으로 옮긴다.
+    """
+
+    def __init__(self, hot_keys: int = HOT_KEYS):
+        self.entries: Dict[str, LockEntry] = {}
+        self.hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hot_keys = hot_keys
+        self.wait_ms = deque(maxlen=STATS_WINDOW)
+        self.acquired = 0
+        self.contended = 0
+        self.timeouts = 0
+        self.evicted = 0
+        self.max_live = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Optional[LockEntry]:
+        return self.entries.get(key)
+
+    def checkout(self, key: str) -> LockEntry:
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = LockEntry()
+            self.max_live = max(self.max_live, len(self.entries))
+        entry.refs += 1
+        return entry
+
+    def checkin(self, key: str, entry: LockEntry) -> None:
+        entry.refs -= 1
+        if entry.refs > 0 or entry.lock.locked():
+            return
+        if self.entries.get(key) is entry:
+            del self.entries[key]
+            self.evicted += 1
+        if entry.contended:
+            self.remember(key, entry)
+
+    def remember(self, key: str, entry: LockEntry) -> None:
+        record = self.hot.pop(key, None) or {"acquired": 0, "contended": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+        record["acquired"] += entry.acquired
+        record["contended"] += entry.contended
+        record["wait_ms_total"] += entry.wait_ms_total
+        record["wait_ms_max"] = max(record["wait_ms_max"], entry.wait_ms_max)
+        self.hot[key] = record
+        while len(self.hot) > self.hot_keys:
+            self.hot.popitem(last=False)
+
+    def record(self, entry: LockEntry, wait_ms: float, contended: bool) -> None:
+        entry.acquired += 1
+        self.acquired += 1
+        self.wait_ms.append(wait_ms)
+        LOCK_WAIT.observe(wait_ms / 1000.0)
+        if contended:
+            entry.contended += 1
+            entry.wait_ms_total += wait_ms
+            entry.wait_ms_max = max(entry.wait_ms_max, wait_ms)
+            self.contended += 1
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        per_key: Dict[str, Dict[str, Any]] = {k: dict(v) for k, v in self.hot.items()}
+        for key, entry in self.entries.items():
+            if entry.contended:
+                record = per_key.setdefault(key, {"acquired": 0, "contended": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0})
+                record["acquired"] += entry.acquired
+                record["contended"] += entry.contended
+                record["wait_ms_total"] += entry.wait_ms_total
+                record["wait_ms_max"] = max(record["wait_ms_max"], entry.wait_ms_max)
+        hottest = sorted(per_key.items(), key=lambda kv: kv[1]["wait_ms_total"], reverse=True)[:top]
+        return {
+            "live_locks": len(self.entries),
+            "live_locks_max": self.max_live,
+            "held": sum(1 for e in self.entries.values() if e.lock.locked()),
+            "waiting": sum(e.refs - (1 if e.lock.locked() else 0) for e in self.entries.values()),
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+            "evicted": self.evicted,
+            "wait_ms_p50": round(percentile(self.wait_ms, 50), 3),
+            "wait_ms_p95": round(percentile(self.wait_ms, 95), 3),
+            "wait_ms_max": round(max(self.wait_ms) if self.wait_ms else 0.0, 3),
+            "top_contended": [
+                {
+                    "key": key,
+                    "acquired": r["acquired"],
+                    "contended": r["contended"],
+                    "wait_ms_total": round(r["wait_ms_total"], 3),
+                    "wait_ms_max": round(r["wait_ms_max"], 3),
+                }
+                for key, r in hottest
+            ],
+        }
+
+
+# 프로세스 안에서 키별 asyncio.Lock을 보관하는 저장소
+lock_registry = LockRegistry()
+REGISTRY.gauge("thread_locks_live", "살아 있는 thread 락 수 (보유 + 대기)", lambda: len(lock_registry))
+# 프로세스 간 lease 저장소 (LOCK_BACKEND=sqlite일 때만, 첫 사용 시 생성)
+LEASES: Optional[LeaseStore] = None
 
 def thread_key(thread_id: int) -> str:
     """내부 저장소에서 사용할 네임스페이스가 붙은 키"""
@@ -20,13 +151,112 @@ def thread_key(thread_id: int) -> str:
     return f"thread:{thread_id}"
 
 
-def get_lock(key: str) -> asyncio.Lock:
-    """키에 해당하는 락을 반환(없으면 생성)."""
-    lock = lock_store.get(key)
-    if lock is None:
-        lock = asyncio.Lock()
-        lock_store[key] = lock
-    return lock
+def lease_db_path() -> str:
+    if settings.LOCK_DB:
+        return settings.LOCK_DB
+    if settings.MEMORY_DB and settings.MEMORY_DB != ":memory:":
+        return f"{settings.MEMORY_DB}.locks"
+    return "locks.db"
+
+
+def get_leases() -> Optional[LeaseStore]:
+    """프로세스 간 lease 저장소. memory 백엔드면 None."""
+    global LEASES
+    if settings.LOCK_BACKEND == "memory":
+        return None
+    if settings.LOCK_BACKEND not in LOCK_BACKENDS:
+        raise ValueError(f"지원하지 않는 LOCK_BACKEND: {settings.LOCK_BACKEND} (가능: {', '.join(LOCK_BACKENDS)})")
+    if LEASES is None:
+        LEASES = LeaseStore(
+            lease_db_path(),
+            lease_sec=settings.LOCK_LEASE_SEC,
+            poll_ms=settings.LOCK_POLL_MS,
+            busy_timeout_ms=settings.MEMORY_DB_BUSY_TIMEOUT_MS,
+        )
+        logger.info(f"프로세스 간 락 사용: {LEASES.db_path} (lease {LEASES.lease_sec}초, owner={LEASES.owner})")
+    return LEASES
+
+
+async def close_leases() -> None:
+    """lifespan 종료 시 이 프로세스가 잡고 있던 lease 반환"""
+    global LEASES
+    if LEASES is not None:
+        await LEASES.close()
+        LEASES = None
+
+
+async def acquire_key(key: str, timeout: Optional[float] = None) -> bool:
+    """
+    키 락 획득. timeout None: 무한 대기, 0: 즉시 시도, > 0: 지정 시간까지 대기.
+    프로세스 안 락 → 프로세스 간 lease 순서로 잡고, lease를 못 얻으면 안쪽 락도 돌려준다.
+    """
+    entry = lock_registry.checkout(key)
+    lock = entry.lock
+    started = time.perf_counter()
+    contended = lock.locked()
+
+    try:
+        if timeout == 0:
+            if contended:
+                lock_registry.checkin(key, entry)
+                return False
+            await lock.acquire()
+        elif timeout is None:
+            await lock.acquire()
+        else:
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                lock_registry.timeouts += 1
+                lock_registry.checkin(key, entry)
+                return False
+    except BaseException:
+        # 대기 중 취소
+        lock_registry.checkin(key, entry)
+        raise
+
+    leases = get_leases()
+    if leases is not None:
+        lease_started = time.perf_counter()
+        remaining = None if timeout is None else max(0.0, timeout - (lease_started - started))
+        try:
+            acquired = await leases.acquire(key, remaining)
+        except BaseException:
+            lock.release()
+            lock_registry.checkin(key, entry)
+            raise
+        if not acquired:
+            lock.release()
+            if timeout != 0:
+                lock_registry.timeouts += 1
+            lock_registry.checkin(key, entry)
+            return False
+        # 다른 워커가 쥐고 있어서 기다렸으면 경합으로 센다
+        contended = contended or (time.perf_counter() - lease_started) > leases.poll_sec / 2
+
+    lock_registry.record(entry, (time.perf_counter() - started) * 1000, contended)
+    return True
+
+
+def release_key(key: str) -> bool:
+    """acquire_key로 얻은 락 해제. 잠겨 있지 않았으면 False."""
+    entry = lock_registry.get(key)
+    if not (entry and entry.lock.locked()):
+        return False
+    leases = get_leases()
+    if leases is not None:
+        leases.release(key)
+    entry.lock.release()
+    lock_registry.checkin(key, entry)
+    return True
+
+
+async def lock_stats() -> Dict[str, Any]:
+    """살아 있는 락 수, 대기 시간 p50/p95, 경합이 많은 thread 목록 (+ lease 상태)"""
+    result = {"backend": settings.LOCK_BACKEND, **lock_registry.stats()}
+    if LEASES is not None:
+        result["lease"] = await LEASES.stats()
+    return result
 
 
 @asynccontextmanager
@@ -37,19 +267,18 @@ async def thread_lock(thread_id: int) -> AsyncIterator[None]:
         async with thread_lock(thread_id):
             async for chunk in graph.astream(...):
     """
-    logger.debug(f"thread_lock 요청: {thread_id}")
+    # 요청마다 불리는 경로라 로그는 지연 포맷 + 샘플링
     key = thread_key(thread_id)
-    lock = get_lock(key)
 
-    logger.debug(f"락 획득 시도: {thread_id}")
-    await lock.acquire()
+    debug_sampled(logger, "락 획득 시도: %s", thread_id)
+    await acquire_key(key)
     try:
-        logger.info(f"락 획득 성공: {thread_id}")
+        debug_sampled(logger, "락 획득 성공: %s", thread_id)
         yield
     finally:
         # 소유 태스크만 release 하기
-        lock.release()
-        logger.debug(f"락 해제: {thread_id}")
+        release_key(key)
+        debug_sampled(logger, "락 해제: %s", thread_id)
 
 
 async def try_acquire_thread(thread_id: int, timeout: Optional[float] = None) -> bool:
@@ -59,39 +288,45 @@ async def try_acquire_thread(thread_id: int, timeout: Optional[float] = None) ->
     - timeout > 0 : 지정 시간만큼 대기해서 획득 시 True, 타임이웃이면 False.
     사용 후에는 반드시 release_thread(thread_id)로 해제해야 함.
     """
-    logger.debug(f"try_acquire_thread 호출: thread_id={thread_id}, timeout={timeout}")
     key = thread_key(thread_id)
-    lock = get_lock(key)
 
     if timeout in (None, 0):
-        if lock.locked():
-            logger.debug(f"락이 이미 점유됨 (즉시 시도): {thread_id}")
+        if not await acquire_key(key, timeout=0):
+            debug_sampled(logger, "락이 이미 점유됨 (즉시 시도): %s", thread_id)
             return False
-
-        await lock.acquire()
-        logger.info(f"락 획득 성공 (즉시 시도): {thread_id}")
+        debug_sampled(logger, "락 획득 성공 (즉시 시도): %s", thread_id)
         return True
-    
-    try:
-        await asyncio.wait_for(lock.acquire(), timeout=timeout)
-        logger.info(f"락 획득 성공 (타임아웃 {timeout}초): {thread_id}")
+
+    if await acquire_key(key, timeout=timeout):
+        debug_sampled(logger, "락 획득 성공 (타임아웃 %s초): %s", timeout, thread_id)
         return True
-    except asyncio.TimeoutError:
-        logger.warning(f"락 획득 타임아웃: {thread_id} (timeout={timeout}초)")
-        return False
-    
+    logger.warning(f"락 획득 타임아웃: {thread_id} (timeout={timeout}초)")
+    return False
+
 
 def release_thread(thread_id: int) -> None:
     """
     try_acquire_thread로 획득한 락을 해제.
     주의: 락의 소유 태스크에서만 호출해야 함.
     """
-    logger.debug(f"release_thread 호출: {thread_id}")
-    key = thread_key(thread_id)
-    lock = lock_store.get(key)
-
-    if lock and lock.locked():
-        lock.release()
-        logger.info(f"락 해제: {thread_id}")
+    if release_key(thread_key(thread_id)):
+        debug_sampled(logger, "락 해제: %s", thread_id)
     else:
-        logger.warning(f"해제할 락이 없거나 이미 해제됨: {thread_id}")
\ No newline at end of file
+        logger.warning(f"해제할 락이 없거나 이미 해제됨: {thread_id}")
+
+
+async def try_acquire_threads(thread_ids: Iterable) -> List:
+    """
+    여러 thread_id를 즉시 시도로 획득. 실행 중(이미 잠김)인 스레드는 건너뛴다.
+    반환: 획득한 thread_id 목록 (release_threads로 해제)
+    """
+    acquired = []
+    for thread_id in thread_ids:
+        if await try_acquire_thread(thread_id, timeout=0):
+            acquired.append(thread_id)
+    return acquired
+
+
+def release_threads(thread_ids: Iterable) -> None:
+    for thread_id in thread_ids:
+        release_thread(thread_id)
@@ -1,10 +1,18 @@
 # 체크포인터 생명주기
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Dict, Any, List, Optional
 import asyncio
 
+import aiosqlite
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.memory.checkpointer import PooledSqliteSaver
+from app.memory.pool import ReaderPool, open_writer
+from app.memory.registry import ensure_registry
+from app.memory.serde import make_serde
+from app.memory.sharding import ShardedSqliteSaver, shard_paths
 
 # 로거 생성
 logger = get_logger(__name__)
@@ -17,24 +25,70 @@ async_exit_stack = AsyncExitStack()
 CHECKPOINTER = None
 init_lock = asyncio.Lock()    # 체크 포인터 초기화 레이스 방지 락
 
-# 체크포인트 열기
-async def ensure_checkpointer():
-    logger.info("체크포인터 초기화 시작")
 
+async def open_checkpointer(
+    db_path: str, readers: int, serde: Optional[SerializerProtocol] = None
+) -> PooledSqliteSaver:
+    """writer 연결로 테이블(+스레드 레지스트리)을 만든 뒤 읽기 전용 연결 풀을 붙인다."""
+    conn = await open_writer(db_path)
+    saver = PooledSqliteSaver(conn, db_path=db_path, serde=serde)
+    await saver.setup()
+    await ensure_registry(conn)
+    # store가 manager를 import하므로 여기서 지연 import
+    from app.memory.store import ensure_thread_indexes
+    await ensure_thread_indexes(conn)
+    if db_path != ":memory:" and readers > 0:
+        saver.attach_readers(await ReaderPool(db_path, readers).open())
+    return saver
+
+
+async def close_checkpointer(saver: PooledSqliteSaver) -> None:
+    if saver.readers is not None:
+        await saver.readers.close()
+    await saver.conn.close()
+
+
+async def open_sharded_checkpointer(
+    db_path: str, shards: int, readers: int, serde: Optional[SerializerProtocol] = None
+) -> ShardedSqliteSaver:
+    """샤드 파일마다 PooledSqliteSaver를 열어서 묶는다. (shards=1이면 db_path 하나, serde는 공유)"""
+    opened: List[PooledSqliteSaver] = []
+    try:
+        for path in shard_paths(db_path, shards):
+            opened.append(await open_checkpointer(path, readers, serde))
+    except Exception:
+        for saver in opened:
+            await close_checkpointer(saver)
+        raise
+    return ShardedSqliteSaver(opened)
+
+
+async def close_sharded_checkpointer(saver: ShardedSqliteSaver) -> None:
+    for shard in saver.shards:
+        await close_checkpointer(shard)
+
+
+# 체크포인트 열기
+async def ensure_checkpointer() -> ShardedSqliteSaver:
     global CHECKPOINTER
 
     if CHECKPOINTER is not None:
         return CHECKPOINTER
 
+    logger.info("체크포인터 초기화 시작")
+
     async with init_lock:    # 초기화 레이스 방지
         if CHECKPOINTER is None:    # double-checked
             try:
-                # Async 컨텍스트 (체크포인터)를 열어서 스택에 등록
-                # db_path = to_sqlite_uri(MEMORY_DB)
-                CHECKPOINTER = await async_exit_stack.enter_async_context(
-                    AsyncSqliteSaver.from_conn_string(MEMORY_DB)
+                saver = await open_sharded_checkpointer(
+                    MEMORY_DB, settings.MEMORY_SHARDS, settings.MEMORY_DB_READERS, serde=make_serde()
+                )
+                async_exit_stack.push_async_callback(close_sharded_checkpointer, saver)
+                CHECKPOINTER = saver
+                logger.info(
+                    f"체크포인터 초기화 완료 (샤드 {len(saver.shards)}개, "
+                    f"샤드당 읽기 전용 연결 {settings.MEMORY_DB_READERS}개)"
                 )
-                logger.info("체크포인터 초기화 완료")
             except Exception as e:
                 logger.error(f"체크포인터 초기화 실패: {e}")
                 raise
@@ -44,4 +98,39 @@ async def ensure_checkpointer():
 
 # 체크포인트 닫기
 async def aclose_checkpointer():
-    await async_exit_stack.aclose()
\ No newline at end of file
+    global CHECKPOINTER
+    await async_exit_stack.aclose()
+    CHECKPOINTER = None
+
+
+async def get_shards() -> List[PooledSqliteSaver]:
+    """관리 작업(store/retention)에서 샤드별로 돌 때 사용"""
+    return (await ensure_checkpointer()).shards
+
+
+@asynccontextmanager
+async def read_connection(shard: PooledSqliteSaver) -> AsyncIterator[aiosqlite.Connection]:
+    """조회용 연결. 읽기 전용 풀이 있으면 빌려 쓰고, 없으면 writer 연결을 락 아래에서 사용."""
+    if shard.readers is not None:
+        async with shard.readers.acquire() as conn:
+            yield conn
+    else:
+        async with shard.lock:
+            yield shard.conn
+
+
+@asynccontextmanager
+async def write_connection(shard: PooledSqliteSaver) -> AsyncIterator[aiosqlite.Connection]:
+    """쓰기용 연결. 체크포인트 쓰기와 같은 writer 락으로 직렬화된다. commit은 호출 측 책임."""
+    async with shard.lock:
+        yield shard.conn
+
+
+def checkpointer_stats() -> Dict[str, Any]:
+    """커밋 지연/쓰기 대기열 길이 등 체크포인터 지표 (샤드 합계 + 샤드별)"""
+    if CHECKPOINTER is None:
+        return {"initialized": False}
+    result = {"initialized": True, **CHECKPOINTER.stats()}
+    if hasattr(CHECKPOINTER.serde, "stats"):
+        result["serde"] = CHECKPOINTER.serde.stats()
+    return result
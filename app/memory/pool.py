@@ -0,0 +1,89 @@
+# SQLite 연결 생성 및 읽기 전용 연결 풀
+# 쓰기는 체크포인터의 단일 writer 연결이 담당하고,
+# 조회는 WAL 덕분에 writer를 막지 않는 읽기 전용 연결들이 나눠서 처리한다.
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+import aiosqlite
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+def tuning_pragmas() -> List[str]:
+    """writer/reader 공통 성능 pragma"""
+    return [
+        f"PRAGMA busy_timeout={int(settings.MEMORY_DB_BUSY_TIMEOUT_MS)};",
+        f"PRAGMA mmap_size={int(settings.MEMORY_DB_MMAP_SIZE)};",
+        # 음수면 KiB 단위
+        f"PRAGMA cache_size=-{int(settings.MEMORY_DB_CACHE_KB)};",
+        "PRAGMA temp_store=MEMORY;",
+    ]
+
+
+async def open_writer(db_path: str) -> aiosqlite.Connection:
+    """
+    체크포인트 쓰기용 연결.
+    WAL + synchronous=NORMAL: 커밋마다 fsync 하지 않고 WAL 체크포인트 때만 동기화한다.
+    (전원 장애 시 마지막 몇 개 트랜잭션이 유실될 수 있지만 DB가 깨지지는 않음)
+    """
+    conn = await aiosqlite.connect(db_path)
+    # 새 DB에만 적용됨 (기존 DB는 retention --vacuum-full로 전환)
+    await conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+    if db_path != ":memory:":
+        await conn.execute("PRAGMA journal_mode=WAL;")
+    await conn.execute("PRAGMA synchronous=NORMAL;")
+    # INSERT OR REPLACE로 교체되는 행도 DELETE 트리거를 타도록 (thread_registry 집계)
+    await conn.execute("PRAGMA recursive_triggers=ON;")
+    for pragma in tuning_pragmas():
+        await conn.execute(pragma)
+    return conn
+
+
+async def open_reader(db_path: str) -> aiosqlite.Connection:
+    """읽기 전용 연결 (mode=ro + query_only)"""
+    conn = await aiosqlite.connect(f"file:{db_path}?mode=ro", uri=True)
+    await conn.execute("PRAGMA query_only=ON;")
+    for pragma in tuning_pragmas():
+        await conn.execute(pragma)
+    return conn
+
+
+class ReaderPool:
+    """고정 크기 읽기 전용 연결 풀"""
+
+    def __init__(self, db_path: str, size: int):
+        self.db_path = db_path
+        self.size = size
+        self.connections: List[aiosqlite.Connection] = []
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.waiting = 0    # 연결을 기다리는 요청 수
+
+    async def open(self) -> "ReaderPool":
+        for _ in range(self.size):
+            conn = await open_reader(self.db_path)
+            self.connections.append(conn)
+            self.idle.put_nowait(conn)
+        logger.info(f"읽기 전용 연결 풀 생성: {self.size}개 ({self.db_path})")
+        return self
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        self.waiting += 1
+        try:
+            conn = await self.idle.get()
+        finally:
+            self.waiting -= 1
+        try:
+            yield conn
+        finally:
+            self.idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        for conn in self.connections:
+            await conn.close()
+        self.connections.clear()
@@ -0,0 +1,268 @@
+# 스레드 레지스트리 (thread_registry)
+# checkpoints/writes 테이블 트리거로 스레드별 생성/최근 활동 시각, 체크포인트 수, 바이트 크기를 유지한다.
+# /memory 목록 조회는 전체 테이블 UNION 대신 이 테이블을 keyset 페이지네이션으로 읽는다.
+#
+# 기존 DB 채우기:
+#   python -m app.memory.registry backfill [--db-path memory.db]
+import argparse
+import asyncio
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.memory.sharding import shard_paths
+
+# 로거 생성
+logger = get_logger(__name__)
+
+REGISTRY_TABLE = "thread_registry"
+ORDERS = ("recent", "thread_id")
+
+# SQLite 쪽 현재 시각 (UTC, 밀리초까지). 백필 값과 같은 형식이라 문자열 비교로 정렬된다.
+NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+REGISTRY_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS {REGISTRY_TABLE} (
+        thread_id TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        last_active_at TEXT NOT NULL,
+        checkpoint_count INTEGER NOT NULL DEFAULT 0,
+        byte_size INTEGER NOT NULL DEFAULT 0
+    );""",
+    f"CREATE INDEX IF NOT EXISTS {REGISTRY_TABLE}_recent ON {REGISTRY_TABLE} (last_active_at, thread_id);",
+    f"""CREATE TRIGGER IF NOT EXISTS {REGISTRY_TABLE}_checkpoint_insert AFTER INSERT ON checkpoints
+    BEGIN
+        INSERT INTO {REGISTRY_TABLE} (thread_id, created_at, last_active_at, checkpoint_count, byte_size)
+        VALUES (NEW.thread_id, {NOW_SQL}, {NOW_SQL}, 1,
+                ifnull(length(NEW.checkpoint), 0) + ifnull(length(NEW.metadata), 0))
+        ON CONFLICT(thread_id) DO UPDATE SET
+            last_active_at = excluded.last_active_at,
+            checkpoint_count = checkpoint_count + 1,
+            byte_size = byte_size + excluded.byte_size;
+    END;""",
+    # 체크포인트 삭제는 집계만 줄이고 행은 남긴다. INSERT OR REPLACE가 스레드의 유일한 체크포인트를 교체할 때도
+    # (recursive_triggers로) 이 트리거가 먼저 돌기 때문에, 여기서 행을 지우면 created_at이 교체 시각으로 바뀐다.
+    # 스레드 행은 스레드 삭제 경로(forget_threads)에서만 지운다. 이전 버전 트리거(행 삭제 포함)는 교체.
+    f"DROP TRIGGER IF EXISTS {REGISTRY_TABLE}_checkpoint_delete;",
+    f"""CREATE TRIGGER IF NOT EXISTS {REGISTRY_TABLE}_checkpoint_delete_v2 AFTER DELETE ON checkpoints
+    BEGIN
+        UPDATE {REGISTRY_TABLE} SET
+            checkpoint_count = max(0, checkpoint_count - 1),
+            byte_size = max(0, byte_size - ifnull(length(OLD.checkpoint), 0) - ifnull(length(OLD.metadata), 0))
+        WHERE thread_id = OLD.thread_id;
+    END;""",
+    f"""CREATE TRIGGER IF NOT EXISTS {REGISTRY_TABLE}_write_insert AFTER INSERT ON writes
+    BEGIN
+        UPDATE {REGISTRY_TABLE} SET
+            last_active_at = {NOW_SQL},
+            byte_size = byte_size + ifnull(length(NEW.value), 0)
+        WHERE thread_id = NEW.thread_id;
+    END;""",
+    f"""CREATE TRIGGER IF NOT EXISTS {REGISTRY_TABLE}_write_delete AFTER DELETE ON writes
+    BEGIN
+        UPDATE {REGISTRY_TABLE} SET byte_size = max(0, byte_size - ifnull(length(OLD.value), 0))
+        WHERE thread_id = OLD.thread_id;
+    END;""",
+]
+
+
+def uuid6_to_iso(checkpoint_id: str) -> Optional[str]:
+    """LangGraph 체크포인트 ID(uuid6)에 들어있는 생성 시각을 꺼낸다."""
+    try:
+        value = uuid.UUID(checkpoint_id).int
+    except (TypeError, ValueError):
+        return None
+    ticks = ((value >> 96) << 28) | (((value >> 80) & 0xFFFF) << 12) | ((value >> 64) & 0xFFF)
+    seconds = (ticks - 0x01B21DD213814000) / 1e7    # 그레고리력 기준 100ns → unix
+    if seconds <= 0:
+        return None
+    return format_ts(datetime.fromtimestamp(seconds, tz=timezone.utc))
+
+
+def format_ts(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+async def ensure_registry(db: aiosqlite.Connection) -> None:
+    """
+    레지스트리 테이블/인덱스/트리거 생성. checkpoints/writes 테이블이 있어야 한다.
+    테이블이 새로 만들어졌으면 기존 체크포인트로 한 번 채운다.
+    """
+    async with db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;", (REGISTRY_TABLE,)
+    ) as cur:
+        existed = await cur.fetchone() is not None
+    for ddl in REGISTRY_DDL:
+        await db.execute(ddl)
+    await db.commit()
+    if not existed:
+        count = await backfill(db)
+        if count:
+            logger.info(f"스레드 레지스트리 초기 백필: {count}개 스레드")
+
+
+async def forget_threads(db: aiosqlite.Connection, thread_ids: List) -> None:
+    """스레드 삭제 후 레지스트리 행도 지운다 (커밋은 호출한 쪽에서). 레지스트리가 없는 DB면 아무것도 안 함."""
+    if not thread_ids:
+        return
+    async with db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;", (REGISTRY_TABLE,)
+    ) as cur:
+        if await cur.fetchone() is None:
+            return
+    placeholders = ",".join("?" * len(thread_ids))
+    await db.execute(f"DELETE FROM {REGISTRY_TABLE} WHERE thread_id IN ({placeholders});", [str(t) for t in thread_ids])
+
+
+async def backfill(db: aiosqlite.Connection) -> int:
+    """checkpoints/writes 전체를 집계해서 레지스트리를 다시 만든다."""
+    async with db.execute(
+        """SELECT thread_id, MIN(checkpoint_id), MAX(checkpoint_id), COUNT(*),
+                  SUM(ifnull(length(checkpoint), 0) + ifnull(length(metadata), 0))
+           FROM checkpoints GROUP BY thread_id;"""
+    ) as cur:
+        rows = await cur.fetchall()
+    async with db.execute(
+        "SELECT thread_id, SUM(ifnull(length(value), 0)) FROM writes GROUP BY thread_id;"
+    ) as cur:
+        write_bytes: Dict[str, int] = {r[0]: int(r[1] or 0) for r in await cur.fetchall()}
+
+    now = format_ts(datetime.now(timezone.utc))
+    records = []
+    for thread_id, first_id, last_id, count, size in rows:
+        records.append((
+            thread_id,
+            uuid6_to_iso(first_id) or now,
+            uuid6_to_iso(last_id) or now,
+            int(count),
+            int(size or 0) + write_bytes.get(thread_id, 0),
+        ))
+
+    await db.execute(f"DELETE FROM {REGISTRY_TABLE};")
+    await db.executemany(
+        f"""INSERT INTO {REGISTRY_TABLE} (thread_id, created_at, last_active_at, checkpoint_count, byte_size)
+            VALUES (?, ?, ?, ?, ?);""",
+        records,
+    )
+    await db.commit()
+    return len(records)
+
+
+def encode_cursor(values: List) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("잘못된 cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("잘못된 cursor")
+    return values
+
+
+async def list_registry(
+    db: aiosqlite.Connection,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    order: str = "recent",
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    keyset 페이지네이션. (items, next_cursor) 반환, 마지막 페이지면 next_cursor는 None.
+    - recent   : 최근 활동 순 (last_active_at DESC, thread_id DESC)
+    - thread_id: thread_id 오름차순
+    """
+    if order not in ORDERS:
+        raise ValueError(f"지원하지 않는 정렬: {order}")
+
+    params: list = []
+    if order == "recent":
+        where = ""
+        if cursor:
+            last_active_at, thread_id = decode_cursor(cursor)[:2]
+            where = "WHERE (last_active_at, thread_id) < (?, ?)"
+            params += [last_active_at, thread_id]
+        order_by = "last_active_at DESC, thread_id DESC"
+    else:
+        where = ""
+        if cursor:
+            where = "WHERE thread_id > ?"
+            params.append(decode_cursor(cursor)[0])
+        order_by = "thread_id"
+
+    # 한 개 더 읽어서 다음 페이지 유무 판단
+    params.append(limit + 1)
+    async with db.execute(
+        f"""SELECT thread_id, created_at, last_active_at, checkpoint_count, byte_size
+            FROM {REGISTRY_TABLE} {where}
+            ORDER BY {order_by}
+            LIMIT ?;""",
+        params,
+    ) as cur:
+        rows = await cur.fetchall()
+
+    items = [
+        {
+            "thread_id": r[0],
+            "created_at": r[1],
+            "last_active_at": r[2],
+            "checkpoint_count": r[3],
+            "byte_size": r[4],
+        }
+        for r in rows[:limit]
+    ]
+    next_cursor = page_cursor(items[-1], order) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def page_cursor(item: dict, order: str) -> str:
+    values = [item["last_active_at"], item["thread_id"]] if order == "recent" else [item["thread_id"]]
+    return encode_cursor(values)
+
+
+def merge_pages(pages: List[Tuple[List[dict], Optional[str]]], limit: int, order: str) -> Tuple[List[dict], Optional[str]]:
+    """
+    샤드별 list_registry 결과(같은 cursor로 조회)를 하나의 페이지로 합친다.
+    정렬 키가 샤드와 무관한 값이라 cursor도 그대로 공유된다.
+    """
+    items = [item for page, _ in pages for item in page]
+    if order == "recent":
+        items.sort(key=lambda r: (r["last_active_at"], r["thread_id"]), reverse=True)
+    else:
+        items.sort(key=lambda r: r["thread_id"])
+    has_more = len(items) > limit or any(next_cursor for _, next_cursor in pages)
+    items = items[:limit]
+    return items, (page_cursor(items[-1], order) if has_more and items else None)
+
+
+async def run_backfill(db_path: str) -> int:
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(f"PRAGMA busy_timeout={int(settings.MEMORY_DB_BUSY_TIMEOUT_MS)};")
+        for ddl in REGISTRY_DDL:
+            await db.execute(ddl)
+        return await backfill(db)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="스레드 레지스트리 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("backfill", help="checkpoints/writes로 레지스트리를 다시 계산")
+    cmd.add_argument("--db-path", default=settings.MEMORY_DB)
+    cmd.add_argument("--shards", type=int, default=settings.MEMORY_SHARDS)
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        for path in shard_paths(args.db_path, args.shards):
+            count = asyncio.run(run_backfill(path))
+            print(f"thread_registry 백필 완료: {count}개 스레드 ({path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# 체크포인트 보존 정책 / 정리 / 공간 회수
+# - 스레드별 최근 N개 체크포인트만 유지 (MEMORY_RETENTION_KEEP_CHECKPOINTS)
+# - D일 이상 활동 없는 스레드 삭제 (MEMORY_RETENTION_IDLE_DAYS)
+# - wal_checkpoint(TRUNCATE) + incremental_vacuum으로 파일 크기 실제 축소
+# 샤드(MEMORY_SHARDS)가 여러 개면 샤드 파일마다 순서대로 실행한다.
+# lifespan에서 백그라운드 태스크로 주기 실행하며, 한 번만 돌리려면:
+#   python -m app.memory.retention [--db-path memory.db] [--shards 4] [--keep 20] [--idle-days 30] [--vacuum-full]
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.memory.locks import acquire_key, release_key, release_threads, try_acquire_threads
+from app.memory.registry import REGISTRY_TABLE, format_ts
+
+# 로거 생성
+logger = get_logger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2
+# 워커가 여러 개일 때 한 워커만 정리하도록 잡는 락 키
+RETENTION_LOCK_KEY = "job:retention"
+
+retention_task: Optional[asyncio.Task] = None
+last_report: Optional[Dict[str, Any]] = None
+
+
+async def fetch_value(db, sql: str, params=()):
+    async with db.execute(sql, params) as cur:
+        row = await cur.fetchone()
+    return row[0] if row else None
+
+
+async def db_size(db, db_path: str) -> Dict[str, int]:
+    """DB 파일/WAL/빈 페이지 크기 (bytes)"""
+    page_size = await fetch_value(db, "PRAGMA page_size;") or 0
+    page_count = await fetch_value(db, "PRAGMA page_count;") or 0
+    freelist = await fetch_value(db, "PRAGMA freelist_count;") or 0
+    wal_path = f"{db_path}-wal"
+    return {
+        "db_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+    }
+
+
+async def prune_checkpoints(saver, keep: int, batch: int) -> int:
+    """
+    스레드(네임스페이스)별 최근 keep개를 남기고 오래된 체크포인트와 그 writes를 삭제.
+    writer 락은 batch 행 단위로만 잡고 놓는다.
+    """
+    if keep <= 0:
+        return 0
+    db = saver.conn
+    deleted = 0
+    last_thread = ""
+    while True:
+        async with saver.lock, db.execute(
+            f"""SELECT thread_id FROM {REGISTRY_TABLE}
+                WHERE checkpoint_count > ? AND thread_id > ?
+                ORDER BY thread_id LIMIT ?;""",
+            (keep, last_thread, batch),
+        ) as cur:
+            thread_ids = [r[0] for r in await cur.fetchall()]
+        if not thread_ids:
+            break
+        last_thread = thread_ids[-1]
+
+        locked = await try_acquire_threads(thread_ids)
+        try:
+            for thread_id in locked:
+                while True:
+                    async with saver.lock:
+                        cur = await db.execute(
+                            """DELETE FROM checkpoints WHERE rowid IN (
+                                   SELECT rowid FROM (
+                                       SELECT rowid, ROW_NUMBER() OVER (
+                                           PARTITION BY checkpoint_ns ORDER BY checkpoint_id DESC
+                                       ) AS rn
+                                       FROM checkpoints WHERE thread_id = ?
+                                   ) WHERE rn > ? LIMIT ?
+                               );""",
+                            (thread_id, keep, batch),
+                        )
+                        removed = int(cur.rowcount or 0)
+                        await db.execute(
+                            """DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS (
+                                   SELECT 1 FROM checkpoints c
+                                   WHERE c.thread_id = writes.thread_id
+                                     AND c.checkpoint_ns = writes.checkpoint_ns
+                                     AND c.checkpoint_id = writes.checkpoint_id
+                               );""",
+                            (thread_id,),
+                        )
+                        await db.commit()
+                    deleted += removed
+                    await asyncio.sleep(0)    # 배치 사이에 채팅 쓰기가 끼어들 수 있게
+                    if removed < batch:
+                        break
+        finally:
+            release_threads(locked)
+    return deleted
+
+
+async def expire_threads(saver, db_path: str, idle_days: float, batch: int) -> int:
+    """last_active_at이 idle_days보다 오래된 스레드를 batch개씩 삭제"""
+    if idle_days <= 0:
+        return 0
+    # store가 manager를 import하므로 지연 import
+    from app.memory.store import delete_threads_rows
+
+    cutoff = format_ts(datetime.now(timezone.utc) - timedelta(days=idle_days))
+    expired = 0
+    skipped: List[str] = []
+    while True:
+        params: list = [cutoff]
+        exclude = ""
+        if skipped:
+            exclude = f"AND thread_id NOT IN ({','.join('?' * len(skipped))})"
+            params += skipped
+        async with saver.lock, saver.conn.execute(
+            f"""SELECT thread_id FROM {REGISTRY_TABLE}
+                WHERE last_active_at < ? {exclude}
+                ORDER BY last_active_at LIMIT ?;""",
+            params + [batch],
+        ) as cur:
+            thread_ids = [r[0] for r in await cur.fetchall()]
+        if not thread_ids:
+            break
+
+        locked = await try_acquire_threads(thread_ids)
+        skipped += [t for t in thread_ids if t not in locked]
+        try:
+            async with saver.lock:
+                await delete_threads_rows(saver.conn, db_path, locked)
+        finally:
+            release_threads(locked)
+        expired += len(locked)
+        await asyncio.sleep(0)
+    return expired
+
+
+async def reclaim_space(saver, vacuum_pages: int) -> Dict[str, Any]:
+    """
+    빈 페이지를 파일 끝에서 반환한 뒤(incremental_vacuum), WAL을 본 파일에 반영하고 잘라낸다.
+    vacuum도 WAL에 기록되므로 체크포인트를 마지막에 해야 파일이 실제로 줄어든다.
+    """
+    db = saver.conn
+    async with saver.lock:
+        auto_vacuum = await fetch_value(db, "PRAGMA auto_vacuum;")
+        if auto_vacuum == AUTO_VACUUM_INCREMENTAL:
+            # execute()는 pragma를 한 step(페이지 1개)만 실행하므로 executescript로 끝까지 돌린다.
+            await db.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+        async with db.execute("PRAGMA wal_checkpoint(TRUNCATE);") as cur:
+            busy, wal_frames, checkpointed = await cur.fetchone()
+    if auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+        logger.warning(
+            "MEMORY_DB auto_vacuum이 INCREMENTAL이 아님 - 빈 페이지가 반환되지 않음. "
+            "`python -m app.memory.retention --vacuum-full`을 한 번 실행하세요."
+        )
+    return {"wal_busy": bool(busy), "wal_frames": wal_frames, "auto_vacuum": auto_vacuum}
+
+
+async def run_retention(
+    saver,
+    db_path: str,
+    keep: Optional[int] = None,
+    idle_days: Optional[float] = None,
+    batch: Optional[int] = None,
+    vacuum_pages: Optional[int] = None,
+) -> Dict[str, Any]:
+    """정책 1회 실행 후 전/후 크기 보고서 반환"""
+    global last_report
+    keep = settings.MEMORY_RETENTION_KEEP_CHECKPOINTS if keep is None else keep
+    idle_days = settings.MEMORY_RETENTION_IDLE_DAYS if idle_days is None else idle_days
+    batch = batch or settings.MEMORY_RETENTION_BATCH
+    vacuum_pages = settings.MEMORY_RETENTION_VACUUM_PAGES if vacuum_pages is None else vacuum_pages
+
+    started = datetime.now(timezone.utc)
+    before = await db_size(saver.conn, db_path)
+    expired = await expire_threads(saver, db_path, idle_days, batch)
+    pruned = await prune_checkpoints(saver, keep, batch)
+    reclaim = await reclaim_space(saver, vacuum_pages)
+    after = await db_size(saver.conn, db_path)
+
+    report = {
+        "started_at": format_ts(started),
+        "elapsed_sec": round((datetime.now(timezone.utc) - started).total_seconds(), 3),
+        "policy": {"keep_checkpoints": keep, "idle_days": idle_days, "batch": batch},
+        "expired_threads": expired,
+        "pruned_checkpoints": pruned,
+        "before": before,
+        "after": after,
+        "reclaimed_bytes": (before["db_bytes"] + before["wal_bytes"]) - (after["db_bytes"] + after["wal_bytes"]),
+        **reclaim,
+    }
+    last_report = report
+    logger.info(
+        f"보존 정책 실행: 스레드 {expired}개 만료, 체크포인트 {pruned}개 정리, "
+        f"{report['reclaimed_bytes']} bytes 회수"
+    )
+    return report
+
+
+async def run_retention_all(sharded, **policy) -> Dict[str, Any]:
+    """
+    샤드마다 run_retention을 차례로 실행하고 합계를 붙인 보고서 반환.
+    동시에 돌리지 않는 건 디스크 I/O를 한꺼번에 몰지 않기 위해서.
+    """
+    global last_report
+    reports = [await run_retention(shard, shard.db_path, **policy) for shard in sharded.shards]
+    if len(reports) == 1:
+        last_report = reports[0]
+        return last_report
+
+    report = {
+        "started_at": reports[0]["started_at"],
+        "elapsed_sec": round(sum(r["elapsed_sec"] for r in reports), 3),
+        "policy": reports[0]["policy"],
+        "expired_threads": sum(r["expired_threads"] for r in reports),
+        "pruned_checkpoints": sum(r["pruned_checkpoints"] for r in reports),
+        "reclaimed_bytes": sum(r["reclaimed_bytes"] for r in reports),
+        "shards": [{"db_path": s.db_path, **r} for s, r in zip(sharded.shards, reports)],
+    }
+    last_report = report
+    return report
+
+
+async def retention_loop(interval_sec: float) -> None:
+    # 무거운 스캔은 시작 직후를 피해서 한 주기 뒤부터
+    from app.memory.manager import ensure_checkpointer
+
+    while True:
+        await asyncio.sleep(interval_sec)
+        if not await acquire_key(RETENTION_LOCK_KEY, timeout=0):
+            logger.info("다른 워커가 보존 정책 실행 중 - 이번 주기 건너뜀")
+            continue
+        try:
+            saver = await ensure_checkpointer()
+            await run_retention_all(saver)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"보존 정책 실행 실패: {e}")
+        finally:
+            release_key(RETENTION_LOCK_KEY)
+
+
+def start_retention() -> Optional[asyncio.Task]:
+    """lifespan에서 호출. 주기가 0 이하이거나 인메모리 DB면 시작하지 않음."""
+    global retention_task
+    interval = settings.MEMORY_RETENTION_INTERVAL_SEC
+    if interval <= 0 or settings.MEMORY_DB == ":memory:":
+        logger.info("체크포인트 보존 정책 비활성화")
+        return None
+    if retention_task is None or retention_task.done():
+        retention_task = asyncio.create_task(retention_loop(interval))
+        logger.info(f"체크포인트 보존 정책 시작 (주기 {interval}초)")
+    return retention_task
+
+
+async def stop_retention() -> None:
+    global retention_task
+    if retention_task is None:
+        return
+    retention_task.cancel()
+    try:
+        await retention_task
+    except asyncio.CancelledError:
+        pass
+    retention_task = None
+
+
+async def run_once(args) -> Dict[str, Any]:
+    from app.memory.manager import close_sharded_checkpointer, open_sharded_checkpointer
+
+    saver = await open_sharded_checkpointer(args.db_path, args.shards, readers=0)
+    try:
+        if args.vacuum_full:
+            # 기존 DB를 auto_vacuum=INCREMENTAL로 전환 (전체 재작성이라 서버 정지 중에 실행)
+            for shard in saver.shards:
+                async with shard.lock:
+                    await shard.conn.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL};")
+                    await shard.conn.execute("VACUUM;")
+        return await run_retention_all(saver, keep=args.keep, idle_days=args.idle_days, batch=args.batch)
+    finally:
+        await close_sharded_checkpointer(saver)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="체크포인트 보존 정책 1회 실행")
+    parser.add_argument("--db-path", default=settings.MEMORY_DB)
+    parser.add_argument("--shards", type=int, default=settings.MEMORY_SHARDS)
+    parser.add_argument("--keep", type=int, default=None, help="스레드별 유지할 체크포인트 수 (0이면 무제한)")
+    parser.add_argument("--idle-days", type=float, default=None, help="이 기간 활동 없는 스레드 삭제 (0이면 끔)")
+    parser.add_argument("--batch", type=int, default=None)
+    parser.add_argument("--vacuum-full", action="store_true", help="auto_vacuum=INCREMENTAL 전환 + VACUUM")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_once(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
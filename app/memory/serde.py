@@ -0,0 +1,218 @@
+# 체크포인트 압축 직렬화 (zstd + 학습된 사전)
+# LangGraph 기본 직렬화(JsonPlusSerializer, msgpack) 결과를 zstd로 압축해서 저장한다.
+# - 압축한 값은 type 컬럼에 "zstd+" 접두어를 붙여 구분 → 기존(비압축) 행은 그대로 읽힘
+# - 사전(dictionary)을 쓰면 짧은 한국어 대화 페이로드도 압축률이 크게 오른다
+# - 사전 ID가 프레임에 기록되므로 사전을 새로 학습해도 예전 사전을 같이 넣어 두면 옛 행을 읽을 수 있다
+#
+# 사전 학습 (기존 체크포인트 DB에서 샘플 추출):
+#   python -m app.memory.serde train --db-path memory.db --out memory.zdict [--size 112640]
+#
+# 압축을 꺼도(MEMORY_SERDE_COMPRESSION=False) 해제 전용으로 동작해서, 압축을 켰다가 되돌려도 "zstd+" 행을 읽을 수 있다.
+import argparse
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.memory.sharding import shard_paths
+
+# 로거 생성
+logger = get_logger(__name__)
+
+COMPRESSED_PREFIX = "zstd+"
+DEFAULT_DICT_SIZE = 110 * 1024
+
+
+def load_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd 압축 체크포인트를 쓰려면 `pip install zstandard`가 필요합니다.")
+    return zstandard
+
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    inner 직렬화 결과가 min_bytes 이상이면 zstd로 압축한다.
+    dictionaries: 압축에는 첫 번째 사전을 쓰고, 해제할 때는 프레임의 사전 ID로 고른다.
+    compress=False면 해제 전용: 새 값은 압축하지 않고 기존 "zstd+" 행만 풀어서 읽는다.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[SerializerProtocol] = None,
+        dictionaries: Optional[List[bytes]] = None,
+        level: int = 3,
+        min_bytes: int = 256,
+        compress: bool = True,
+    ):
+        self.zstd = load_zstd()
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self.min_bytes = min_bytes
+        self.compress = compress
+        self.dicts = [self.zstd.ZstdCompressionDict(d) for d in dictionaries or []]
+        self.dicts_by_id = {d.dict_id(): d for d in self.dicts}
+        if self.dicts and compress:
+            self.dicts[0].precompute_compress(level=level)
+        # ZstdCompressor/Decompressor는 스레드 간 공유 불가
+        self.local = threading.local()
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    @property
+    def dict_id(self) -> int:
+        return self.dicts[0].dict_id() if self.dicts else 0
+
+    def compressor(self):
+        c = getattr(self.local, "compressor", None)
+        if c is None:
+            c = self.zstd.ZstdCompressor(level=self.level, dict_data=self.dicts[0] if self.dicts else None)
+            self.local.compressor = c
+        return c
+
+    def decompressor(self, dict_id: int):
+        cache = getattr(self.local, "decompressors", None)
+        if cache is None:
+            cache = self.local.decompressors = {}
+        d = cache.get(dict_id)
+        if d is None:
+            if dict_id and dict_id not in self.dicts_by_id:
+                raise ValueError(f"zstd 사전 {dict_id}가 없어 체크포인트를 읽을 수 없음 (MEMORY_SERDE_DICT_PATH 확인)")
+            d = self.zstd.ZstdDecompressor(dict_data=self.dicts_by_id.get(dict_id))
+            cache[dict_id] = d
+        return d
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        self.raw_bytes += len(data)
+        if not self.compress or len(data) < self.min_bytes:
+            self.stored_bytes += len(data)
+            return type_, data
+        packed = self.compressor().compress(data)
+        if len(packed) >= len(data):
+            self.stored_bytes += len(data)
+            return type_, data
+        self.stored_bytes += len(packed)
+        return COMPRESSED_PREFIX + type_, packed
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if not type_.startswith(COMPRESSED_PREFIX):
+            return self.inner.loads_typed(data)
+        dict_id = self.zstd.get_frame_parameters(payload).dict_id
+        raw = self.decompressor(dict_id).decompress(payload)
+        return self.inner.loads_typed((type_[len(COMPRESSED_PREFIX):], raw))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dict_id": self.dict_id,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "ratio": round(self.raw_bytes / self.stored_bytes, 3) if self.stored_bytes else 0.0,
+        }
+
+
+def load_dictionaries(paths: str) -> List[bytes]:
+    """쉼표로 구분한 사전 파일 경로들 (첫 번째가 압축용, 나머지는 옛 행 해제용)"""
+    result = []
+    for path in [p.strip() for p in paths.split(",") if p.strip()]:
+        with open(path, "rb") as f:
+            result.append(f.read())
+    return result
+
+
+def make_serde() -> CompressedSerializer:
+    """
+    설정에 따른 체크포인터 serde.
+    압축을 꺼도 해제 전용 serde를 돌려준다 (압축을 켰다가 되돌려도 기존 "zstd+" 행을 읽도록).
+    """
+    serde = CompressedSerializer(
+        dictionaries=load_dictionaries(settings.MEMORY_SERDE_DICT_PATH or ""),
+        level=settings.MEMORY_SERDE_LEVEL,
+        min_bytes=settings.MEMORY_SERDE_MIN_BYTES,
+        compress=settings.MEMORY_SERDE_COMPRESSION,
+    )
+    if serde.compress:
+        logger.info(f"체크포인트 zstd 압축 사용 (level={serde.level}, dict_id={serde.dict_id})")
+    return serde
+
+
+# 사전 학습
+
+def sample_payloads(db_path: str, limit: int) -> List[bytes]:
+    """checkpoints/writes에서 최근 값 위주로 비압축 직렬화 바이트를 모은다 (압축된 행은 풀어서)."""
+    serde: Optional[CompressedSerializer] = None
+    samples: List[bytes] = []
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for table, column in (("checkpoints", "checkpoint"), ("writes", "value")):
+            rows = conn.execute(
+                f"SELECT type, {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY rowid DESC LIMIT ?;",
+                (limit,),
+            )
+            for type_, value in rows:
+                if type_ and type_.startswith(COMPRESSED_PREFIX):
+                    # 사전 없이 압축된 행만 풀 수 있음 (사전을 쓴 행은 이미 학습 대상이었다고 보고 건너뜀)
+                    serde = serde or CompressedSerializer()
+                    try:
+                        value = serde.decompressor(serde.zstd.get_frame_parameters(value).dict_id).decompress(value)
+                    except ValueError:
+                        continue
+                samples.append(bytes(value))
+    finally:
+        conn.close()
+    return samples
+
+
+def train_dictionary(samples: List[bytes], size: int = DEFAULT_DICT_SIZE, level: int = 3) -> bytes:
+    zstd = load_zstd()
+    if len(samples) < 8:
+        raise ValueError(f"사전 학습 샘플이 너무 적음: {len(samples)}개")
+    return zstd.train_dictionary(size, samples, level=level).as_bytes()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="체크포인트 압축 사전 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("train", help="체크포인트 DB 샘플로 zstd 사전 학습")
+    cmd.add_argument("--db-path", default=settings.MEMORY_DB)
+    cmd.add_argument("--shards", type=int, default=settings.MEMORY_SHARDS)
+    cmd.add_argument("--out", required=True, help="사전 파일 경로 (MEMORY_SERDE_DICT_PATH에 지정)")
+    cmd.add_argument("--size", type=int, default=DEFAULT_DICT_SIZE, help="사전 크기 (bytes)")
+    cmd.add_argument("--samples", type=int, default=5000, help="샤드/테이블당 최대 샘플 수")
+    cmd.add_argument("--level", type=int, default=settings.MEMORY_SERDE_LEVEL)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        samples: List[bytes] = []
+        for path in shard_paths(args.db_path, args.shards):
+            if os.path.exists(path):
+                samples += sample_payloads(path, args.samples)
+        dictionary = train_dictionary(samples, args.size, args.level)
+        with open(args.out, "wb") as f:
+            f.write(dictionary)
+
+        zstd = load_zstd()
+        dict_id = zstd.ZstdCompressionDict(dictionary).dict_id()
+        raw = sum(len(s) for s in samples)
+        plain = sum(len(zstd.ZstdCompressor(level=args.level).compress(s)) for s in samples)
+        serde = CompressedSerializer(dictionaries=[dictionary], level=args.level, min_bytes=0)
+        with_dict = sum(len(serde.compressor().compress(s)) for s in samples)
+        print(f"사전 학습 완료: {args.out} (dict_id={dict_id}, {len(dictionary)} bytes, 샘플 {len(samples)}개)")
+        print(f"  압축률(샘플 기준): 사전 없음 {raw / plain:.2f}x, 사전 사용 {raw / with_dict:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# thread_id 해시 샤딩 체크포인터
+# SQLite는 파일당 writer가 하나라서, 스레드를 N개 파일로 나눠 쓰기를 병렬화한다.
+# - MEMORY_SHARDS=1 이면 MEMORY_DB 파일 하나 (기존과 동일)
+# - N > 1 이면 memory.db → memory.shard0.db ... memory.shard{N-1}.db
+#
+# 샤드 수 변경 (서버 정지 후):
+#   python -m app.memory.sharding reshard --from 1 --to 4 [--db-path memory.db]
+import argparse
+import asyncio
+import hashlib
+import os
+import sqlite3
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.memory.checkpointer import PooledSqliteSaver
+
+# 로거 생성
+logger = get_logger(__name__)
+
+CHECKPOINT_TABLES = ["checkpoints", "writes"]
+
+
+def shard_paths(db_path: str, shards: int) -> List[str]:
+    """샤드 파일 경로 목록. 1개면 db_path 그대로."""
+    if shards <= 1 or db_path == ":memory:":
+        return [db_path] * max(shards, 1)
+    root, ext = os.path.splitext(db_path)
+    return [f"{root}.shard{i}{ext}" for i in range(shards)]
+
+
+def shard_index(thread_id, shards: int) -> int:
+    """프로세스/재시작과 무관하게 같은 값이 나오는 해시 (내장 hash()는 실행마다 달라짐)"""
+    if shards <= 1:
+        return 0
+    digest = hashlib.blake2b(str(thread_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class ShardedSqliteSaver(BaseCheckpointSaver[str]):
+    """
+    thread_id로 샤드를 골라 PooledSqliteSaver에 위임하는 체크포인터.
+    thread_id 없는 alist(전체 조회)만 모든 샤드를 모아서 checkpoint_id 역순으로 합친다.
+    """
+
+    def __init__(self, shards: List[PooledSqliteSaver]):
+        super().__init__(serde=shards[0].serde)
+        self.shards = shards
+
+    def shard_for(self, thread_id) -> PooledSqliteSaver:
+        return self.shards[shard_index(thread_id, len(self.shards))]
+
+    def route(self, config: RunnableConfig) -> PooledSqliteSaver:
+        return self.shard_for(config["configurable"]["thread_id"])
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self.route(config).aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config and config.get("configurable", {}).get("thread_id") is not None:
+            async for item in self.route(config).alist(config, filter=filter, before=before, limit=limit):
+                yield item
+            return
+
+        async def collect(shard: PooledSqliteSaver) -> List[CheckpointTuple]:
+            return [item async for item in shard.alist(config, filter=filter, before=before, limit=limit)]
+
+        merged = [item for items in await asyncio.gather(*(collect(s) for s in self.shards)) for item in items]
+        merged.sort(key=lambda t: t.config["configurable"]["checkpoint_id"], reverse=True)
+        for item in merged[:limit] if limit else merged:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return await self.route(config).aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id: str, task_path: str = "") -> None:
+        await self.route(config).aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.shard_for(thread_id).adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel) -> str:
+        return self.shards[0].get_next_version(current, channel)
+
+    def stats(self) -> Dict[str, Any]:
+        per_shard = [shard.stats() for shard in self.shards]
+        return {
+            "shards": len(self.shards),
+            "writes": sum(s["writes"] for s in per_shard),
+            "reads": sum(s["reads"] for s in per_shard),
+            "queue_depth": sum(s["queue_depth"] for s in per_shard),
+            "commit_ms_p95": max(s["commit_ms_p95"] for s in per_shard),
+            "wait_ms_p95": max(s["wait_ms_p95"] for s in per_shard),
+            "per_shard": per_shard,
+        }
+
+
+# 리샤딩
+
+def copy_rows(source: str, targets: List[str]) -> Dict[str, int]:
+    """source의 checkpoints/writes를 thread_id 해시에 따라 targets로 복사"""
+    copied = {table: 0 for table in CHECKPOINT_TABLES}
+    conn = sqlite3.connect(source)
+    conn.create_function("shard_of", 1, lambda t: shard_index(t, len(targets)), deterministic=True)
+    try:
+        for i, target in enumerate(targets):
+            conn.execute("ATTACH DATABASE ? AS target;", (target,))
+            for table in CHECKPOINT_TABLES:
+                cols = ", ".join(r[1] for r in conn.execute(f"PRAGMA main.table_info({table});"))
+                cur = conn.execute(
+                    f"INSERT OR IGNORE INTO target.{table} ({cols}) "
+                    f"SELECT {cols} FROM main.{table} WHERE shard_of(thread_id) = ?;",
+                    (i,),
+                )
+                copied[table] += cur.rowcount
+            conn.commit()
+            conn.execute("DETACH DATABASE target;")
+    finally:
+        conn.close()
+    return copied
+
+
+async def reshard(db_path: str, from_shards: int, to_shards: int) -> Dict[str, Any]:
+    """
+    from_shards개 파일을 to_shards개로 다시 나눈다. 서버가 멈춘 상태에서 실행해야 한다.
+    새 파일을 임시 이름으로 만든 뒤, 기존 파일은 .bak으로 옮기고 임시 파일을 제자리로 바꾼다.
+    """
+    # manager가 이 모듈을 import하므로 지연 import
+    from app.memory.manager import close_checkpointer, open_checkpointer
+    from app.memory.registry import run_backfill
+
+    if from_shards == to_shards:
+        raise ValueError("샤드 수가 같음")
+    sources = [p for p in shard_paths(db_path, from_shards) if os.path.exists(p)]
+    if not sources:
+        raise FileNotFoundError(f"원본 샤드 파일이 없음: {shard_paths(db_path, from_shards)}")
+    targets = shard_paths(db_path, to_shards)
+    temps = [f"{p}.reshard" for p in targets]
+
+    for temp in temps:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(temp + suffix):
+                os.remove(temp + suffix)
+        # 스키마/레지스트리 트리거는 실제 체크포인터로 생성
+        await close_checkpointer(await open_checkpointer(temp, readers=0))
+
+    totals = {table: 0 for table in CHECKPOINT_TABLES}
+    for source in sources:
+        for table, count in copy_rows(source, temps).items():
+            totals[table] += count
+    for temp in temps:
+        await run_backfill(temp)
+
+    backups = []
+    for source in sources:
+        os.replace(source, f"{source}.bak")
+        backups.append(f"{source}.bak")
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(source + suffix):
+                os.remove(source + suffix)
+    for temp, target in zip(temps, targets):
+        os.replace(temp, target)
+
+    per_shard = []
+    for target in targets:
+        conn = sqlite3.connect(target)
+        try:
+            per_shard.append(conn.execute("SELECT COUNT(*) FROM thread_registry;").fetchone()[0])
+        finally:
+            conn.close()
+    logger.info(f"리샤딩 완료: {from_shards} → {to_shards}, 스레드 분포 {per_shard}")
+    return {"copied": totals, "threads_per_shard": per_shard, "targets": targets, "backups": backups}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="체크포인트 DB 샤딩 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("reshard", help="샤드 수 변경 (서버 정지 후 실행)")
+    cmd.add_argument("--db-path", default=settings.MEMORY_DB)
+    cmd.add_argument("--from", dest="from_shards", type=int, default=settings.MEMORY_SHARDS)
+    cmd.add_argument("--to", dest="to_shards", type=int, required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "reshard":
+        result = asyncio.run(reshard(args.db_path, args.from_shards, args.to_shards))
+        print(f"리샤딩 완료: {args.from_shards} → {args.to_shards}")
+        print(f"  복사: {result['copied']}")
+        print(f"  샤드별 스레드 수: {result['threads_per_shard']}")
+        print(f"  기존 파일 백업: {result['backups']}")
+
+
+if __name__ == "__main__":
+    main()
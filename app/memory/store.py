@@ -1,11 +1,18 @@
 # thread_id 단위 삭제/조회/통계
 # aiosqlite 직접 접근
+import asyncio
 import os
-from typing import List, Tuple
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import aiosqlite
 from app.core.config import settings
-from app.memory.locks import thread_lock
+from app.memory.locks import release_threads, thread_lock, try_acquire_threads
+from app.memory.checkpointer import PooledSqliteSaver
+from app.memory.manager import get_shards, read_connection, write_connection
+from app.memory.registry import REGISTRY_TABLE, forget_threads, format_ts, list_registry, merge_pages
+from app.memory.sharding import shard_paths
 from app.core.logging import get_logger
 
 # 로거 생성
@@ -18,6 +25,10 @@ def is_db_exists(db_path: str) -> bool:
     """파일 기반 DB가 실제로 존재하는지 확인(:memory:는 True로 간주 안 함)."""
     return db_path != ":memory:" and os.path.exists(db_path)
 
+def is_memory_db_exists() -> bool:
+    """샤드 파일 중 하나라도 있으면 True"""
+    return any(is_db_exists(p) for p in shard_paths(MEMORY_DB, settings.MEMORY_SHARDS))
+
 async def fetchone(db: aiosqlite.Connection, sql: str, params=()):
     async with db.execute(sql, params) as cur:
         return await cur.fetchone()
@@ -32,12 +43,6 @@ async def list_tables(db: aiosqlite.Connection) -> List[str]:
     )
     return [r[0] for r in rows]
 
-# 테이블이 해당 컬럼을 가지고있는지
-async def table_has_column(db: aiosqlite.Connection, table: str, col: str) -> bool:
-    cols = await fetchall(db, f"PRAGMA table_info({table});")
-    return any(c[1] == col for c in cols)  # c[1] = column name
-
-
 async def tables_with_any_of(
     db: aiosqlite.Connection, colnames: List[str]
 ) -> List[Tuple[str, List[str]]]:
@@ -47,6 +52,8 @@ async def tables_with_any_of(
     hit: List[Tuple[str, List[str]]] = []
     tables = await list_tables(db)
     for t in tables:
+        if t == REGISTRY_TABLE:
+            continue    # 트리거로 관리되는 집계 테이블
         cols = await fetchall(db, f"PRAGMA table_info({t});")
         names = {c[1] for c in cols}
         hits = [c for c in colnames if c in names]
@@ -61,7 +68,138 @@ def is_safe_table_name(table_name: str) -> bool:
     return bool(re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name))
 
 
+# 스키마 캐시
+# DB 파일별 (schema_version, [(table, cols)]). 테이블/인덱스가 바뀌면 schema_version이 올라가서 다시 찾는다.
+schema_cache: Dict[str, Tuple[int, List[Tuple[str, List[str]]]]] = {}
+
+
+async def schema_version(db: aiosqlite.Connection) -> int:
+    row = await fetchone(db, "PRAGMA schema_version;")
+    return int(row[0]) if row else 0
+
+
+async def thread_targets(db: aiosqlite.Connection, db_path: str) -> List[Tuple[str, List[str]]]:
+    """thread 컬럼을 가진 (table, cols) 목록. PRAGMA schema_version이 같으면 캐시 사용."""
+    version = await schema_version(db)
+    cached = schema_cache.get(db_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    targets = [
+        (table, cols)
+        for table, cols in await tables_with_any_of(db, CANDIDATE_THREAD_COLS)
+        if is_safe_table_name(table)
+    ]
+    schema_cache[db_path] = (version, targets)
+    logger.debug(f"스키마 캐시 갱신: {db_path} (schema_version={version}) {targets}")
+    return targets
+
+
+async def ensure_thread_indexes(db: aiosqlite.Connection) -> List[str]:
+    """
+    thread 컬럼이 인덱스의 첫 컬럼이 아니면 인덱스를 만든다. (writer 연결에서 호출)
+    반환: 새로 만든 인덱스 이름 목록
+    """
+    created: List[str] = []
+    for table, cols in await tables_with_any_of(db, CANDIDATE_THREAD_COLS):
+        if not is_safe_table_name(table):
+            continue
+        leading = set()
+        for index in await fetchall(db, f"PRAGMA index_list({table});"):
+            info = await fetchall(db, f"PRAGMA index_info({index[1]});")
+            if info:
+                leading.add(info[0][2])    # seqno 0의 컬럼명
+        for col in cols:
+            if col in leading:
+                continue
+            name = f"ix_{table}_{col}"
+            await db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({col});")
+            created.append(name)
+    if created:
+        await db.commit()
+        logger.info(f"thread 컬럼 인덱스 생성: {created}")
+    return created
+
+
+def column_branches(cols: List[str]) -> List[str]:
+    """
+    테이블 하나에 대한 컬럼별 WHERE 절. OR 대신 컬럼마다 인덱스를 타도록 나누고,
+    앞 컬럼에서 이미 잡힌 행은 제외해서 중복 집계를 막는다.
+    """
+    return [
+        " AND ".join([f"{col} = ?"] + [f"{prev} IS NOT ?" for prev in cols[:i]])
+        for i, col in enumerate(cols)
+    ]
+
+
+async def thread_exists(db: aiosqlite.Connection, db_path: str, thread_id) -> Optional[str]:
+    """thread_id가 처음 발견된 테이블명 (없으면 None). UNION ALL + LIMIT 1 한 문장."""
+    parts, params = [], []
+    for table, cols in await thread_targets(db, db_path):
+        for where in column_branches(cols):
+            parts.append(f"SELECT '{table}' FROM {table} WHERE {where}")
+            params += [thread_id] * where.count("?")
+    if not parts:
+        return None
+    row = await fetchone(db, " UNION ALL ".join(parts) + " LIMIT 1;", params)
+    return row[0] if row else None
+
+
+async def thread_counts(db: aiosqlite.Connection, db_path: str, thread_id) -> List[Tuple[str, int]]:
+    """테이블별 thread_id 행 수. UNION ALL 한 문장으로 모든 테이블을 센다."""
+    parts, params = [], []
+    for table, cols in await thread_targets(db, db_path):
+        for where in column_branches(cols):
+            parts.append(f"SELECT '{table}', COUNT(*) FROM {table} WHERE {where}")
+            params += [thread_id] * where.count("?")
+    if not parts:
+        return []
+    counts: Dict[str, int] = {}
+    for table, count in await fetchall(db, " UNION ALL ".join(parts) + ";", params):
+        counts[table] = counts.get(table, 0) + int(count)
+    return [(table, count) for table, count in counts.items() if count > 0]
+
+
+async def delete_thread_rows(db: aiosqlite.Connection, db_path: str, thread_id) -> int:
+    """
+    테이블(+컬럼)마다 DELETE 한 문장씩, 하나의 트랜잭션으로 삭제.
+    SQLite는 여러 테이블을 한 DELETE로 지울 수 없어서 문장 수는 테이블 수만큼이다.
+    """
+    return await delete_threads_rows(db, db_path, [thread_id])
+
+
+async def existing_thread_ids(db: aiosqlite.Connection, db_path: str, thread_ids: List) -> Set[str]:
+    """thread_ids 중 어느 테이블에든 행이 있는 것 (삭제 전에 같은 트랜잭션에서 확인)"""
+    if not thread_ids:
+        return set()
+    placeholders = ",".join("?" * len(thread_ids))
+    found: Set[str] = set()
+    for table, cols in await thread_targets(db, db_path):
+        for col in cols:
+            rows = await fetchall(db, f"SELECT DISTINCT {col} FROM {table} WHERE {col} IN ({placeholders});", list(thread_ids))
+            found.update(str(r[0]) for r in rows)
+    return found
+
+
+async def delete_threads_rows(db: aiosqlite.Connection, db_path: str, thread_ids: List) -> int:
+    """여러 스레드를 한 트랜잭션으로 삭제 (테이블/컬럼마다 IN 절 DELETE 한 문장)"""
+    if not thread_ids:
+        return 0
+    placeholders = ",".join("?" * len(thread_ids))
+    deleted_total = 0
+    for table, cols in await thread_targets(db, db_path):
+        for col in cols:
+            cur = await db.execute(f"DELETE FROM {table} WHERE {col} IN ({placeholders});", list(thread_ids))
+            deleted_count = int(cur.rowcount or 0)
+            deleted_total += deleted_count
+            logger.debug(f"테이블 {table}에서 {deleted_count}행 삭제")
+    await forget_threads(db, thread_ids)
+    await db.commit()
+    return deleted_total
+
+
 # API 함수
+# 관리 함수는 모든 샤드에 동시에 실행한다 (리샤딩 중 남은 행까지 찾도록 라우팅하지 않음).
 
 async def delete_thread(thread_id: int) -> int:
     """
@@ -70,7 +208,8 @@ async def delete_thread(thread_id: int) -> int:
 
     주의:
     - 파일이 아예 없으면 새 DB를 만들지 않도록 0을 반환하고 종료.
-    - 삭제 후 WAL 체크포인트/ VACUUM로 공간 회수.
+    - 파일 크기는 바로 줄지 않음. 공간 회수(wal_checkpoint/incremental_vacuum)는
+      app.memory.retention 백그라운드 작업이 주기적으로 처리.
     """
 
     logger.debug(f"delete_thread: thread_id={thread_id}")
@@ -79,34 +218,20 @@ async def delete_thread(thread_id: int) -> int:
         # 인메모리 DB는 프로세스 종료 시 전체 소멸
         logger.debug("인메모리 DB 사용 중 - 삭제 건너뜀")
         return 0
-    if not is_db_exists(MEMORY_DB):
+    if not is_memory_db_exists():
         logger.debug(f"DB 파일 존재하지 않음: {MEMORY_DB}")
         return 0
-    
-    deleted_total = 0
+
+    async def delete_on(shard: PooledSqliteSaver) -> int:
+        # 체크포인트 쓰기와 같은 writer 연결을 사용 (쓰기 직렬화)
+        async with write_connection(shard) as db:
+            return await delete_thread_rows(db, shard.db_path, thread_id)
 
     # thread_id 단위 직렬화
     async with thread_lock(thread_id):
         logger.debug(f"thread_lock 획득: {thread_id}")
-        async with aiosqlite.connect(MEMORY_DB) as db:
-            await db.execute("PRAGMA foreign_keys=ON;")
-            
-            targets = await tables_with_any_of(db, CANDIDATE_THREAD_COLS)
-            logger.info(f"삭제 대상 테이블: {[table for table, _ in targets]}")
-            
-            for table, cols in targets:
-                if not is_safe_table_name(table):
-                    logger.warning(f"안전하지 않은 테이블명 건너뜀: {table}")
-                    continue    # 안전하지 않은 테이블명은 건너뛰기기
-                where = " OR ".join([f"{c} = ?" for c in cols])
-                params = [thread_id] * len(cols)
-                cur = await db.execute(f"DELETE FROM {table} WHERE {where};", params)
-                deleted_count = int(cur.rowcount or 0)
-                deleted_total += deleted_count
-                logger.debug(f"테이블 {table}에서 {deleted_count}행 삭제")
-            
-            await db.commit()
-            logger.info(f"총 {deleted_total}행 삭제 완료: thread_id={thread_id}")
+        deleted_total = sum(await asyncio.gather(*(delete_on(s) for s in await get_shards())))
+        logger.info(f"총 {deleted_total}행 삭제 완료: thread_id={thread_id}")
 
     return deleted_total
 
@@ -117,22 +242,18 @@ async def has_thread(thread_id: int) -> bool:
     """
     logger.debug(f"has_thread 호출: thread_id={thread_id}")
     
-    if MEMORY_DB == ":memory:" or not is_db_exists(MEMORY_DB):
+    if MEMORY_DB == ":memory:" or not is_memory_db_exists():
         logger.debug("DB가 없거나 인메모리 DB - False 반환")
         return False
 
-    async with aiosqlite.connect(MEMORY_DB) as db:
-        targets = await tables_with_any_of(db, CANDIDATE_THREAD_COLS)
-        for table, cols in targets:
-            where = " OR ".join([f"{c} = ?" for c in cols])
-            params = [thread_id] * len(cols)
-            row = await fetchone(
-                db, f"SELECT 1 FROM {table} WHERE {where} LIMIT 1;", params
-            )
-            if row is not None:
-                logger.info(f"thread_id {thread_id}가 테이블 {table}에서 발견됨")
-                return True
+    async def exists_on(shard: PooledSqliteSaver) -> Optional[str]:
+        async with read_connection(shard) as db:
+            return await thread_exists(db, shard.db_path, thread_id)
 
+    found = [t for t in await asyncio.gather(*(exists_on(s) for s in await get_shards())) if t]
+    if found:
+        logger.info(f"thread_id {thread_id}가 테이블 {found[0]}에서 발견됨")
+        return True
     logger.debug(f"thread_id {thread_id}를 찾을 수 없음")
     return False
 
@@ -144,22 +265,18 @@ async def find_thread(thread_id: int) -> List[Tuple[str, int]]:
     """
     logger.debug(f"find_thread 호출: thread_id={thread_id}")
     
-    if MEMORY_DB == ":memory:" or not is_db_exists(MEMORY_DB):
+    if MEMORY_DB == ":memory:" or not is_memory_db_exists():
         return []
 
-    results: List[Tuple[str, int]] = []
-    async with aiosqlite.connect(MEMORY_DB) as db:
-        targets = await tables_with_any_of(db, CANDIDATE_THREAD_COLS)
-        for table, cols in targets:
-            where = " OR ".join([f"{c} = ?" for c in cols])
-            params = [thread_id] * len(cols)
-            row = await fetchone(
-                db, f"SELECT COUNT(*) FROM {table} WHERE {where};", params
-            )
-            count = int(row[0]) if row else 0
-            if count > 0:
-                results.append((table, count))
-                logger.debug(f"테이블 {table}에서 {count}개 레코드 발견")
+    async def counts_on(shard: PooledSqliteSaver) -> List[Tuple[str, int]]:
+        async with read_connection(shard) as db:
+            return await thread_counts(db, shard.db_path, thread_id)
+
+    totals: Dict[str, int] = {}
+    for counts in await asyncio.gather(*(counts_on(s) for s in await get_shards())):
+        for table, count in counts:
+            totals[table] = totals.get(table, 0) + count
+    results = list(totals.items())
 
     # 테이블명 기준 정렬(원하면 count desc로 바꿔도 됨)
     results.sort(key=lambda x: x[0])
@@ -168,32 +285,141 @@ async def find_thread(thread_id: int) -> List[Tuple[str, int]]:
 
 
 # 스레드 목록 확인하기
-async def list_threads(limit: int = 100, offset: int = 0) -> List[str]:
-    logger.debug(f"list_threads 호출: limit={limit}, offset={offset}")
+async def list_threads(
+    limit: int = 100, cursor: Optional[str] = None, order: str = "recent"
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    thread_registry 기반 keyset 페이지네이션. 샤드별로 같은 cursor로 읽어서 합친다.
+    반환: (스레드 정보 목록, 다음 페이지 cursor 또는 None)
+    """
+    logger.debug(f"list_threads 호출: limit={limit}, cursor={cursor}, order={order}")
     
-    if MEMORY_DB == ":memory:" or not is_db_exists(MEMORY_DB):
+    if MEMORY_DB == ":memory:" or not is_memory_db_exists():
         logger.debug("DB가 없거나 인메모리 DB - 빈 리스트 반환")
-        return []
+        return [], None
 
-    async with aiosqlite.connect(MEMORY_DB) as db:
-        tables = await list_tables(db)
-        with_thread: List[str] = []
-        for t in tables:
-            if await table_has_column(db, t, "thread_id"):
-                with_thread.append(t)
-
-        if not with_thread:
-            logger.debug("thread_id 컬럼을 가진 테이블이 없음")
-            return []
-
-        unions = " UNION ".join([f"SELECT thread_id FROM {t}" for t in with_thread])
-        sql = f"""
-            SELECT DISTINCT thread_id
-            FROM ({unions})
-            ORDER BY thread_id
-            LIMIT ? OFFSET ?;
-        """
-        rows = await fetchall(db, sql, (limit, offset))
-        thread_list = [r[0] for r in rows]
-        logger.info(f"list_threads 결과: {len(thread_list)}개 스레드 반환")
-        return thread_list
\ No newline at end of file
+    async def page_on(shard: PooledSqliteSaver):
+        async with read_connection(shard) as db:
+            return await list_registry(db, limit=limit, cursor=cursor, order=order)
+
+    pages = await asyncio.gather(*(page_on(s) for s in await get_shards()))
+    items, next_cursor = merge_pages(list(pages), limit, order)
+    logger.info(f"list_threads 결과: {len(items)}개 스레드 반환")
+    return items, next_cursor
+
+
+async def inactive_thread_ids(shard: PooledSqliteSaver, cutoff: str, chunk_size: int) -> AsyncIterator[List[str]]:
+    """샤드에서 last_active_at < cutoff 인 thread_id를 chunk_size개씩 (thread_id 순 keyset)"""
+    last = ""
+    while True:
+        async with read_connection(shard) as db:
+            rows = await fetchall(
+                db,
+                f"""SELECT thread_id FROM {REGISTRY_TABLE}
+                    WHERE last_active_at < ? AND thread_id > ?
+                    ORDER BY thread_id LIMIT ?;""",
+                (cutoff, last, chunk_size),
+            )
+        if not rows:
+            return
+        chunk = [r[0] for r in rows]
+        last = chunk[-1]
+        yield chunk
+
+
+async def delete_threads_bulk(
+    thread_ids: Optional[List[str]] = None,
+    inactive_since: Optional[datetime] = None,
+    chunk_size: int = 200,
+) -> AsyncIterator[dict]:
+    """
+    thread_id 목록 또는 비활성 기준 시각으로 대량 삭제하며 진행 상황을 이벤트로 내보낸다.
+    - chunk 단위로 샤드마다 트랜잭션 1개 (샤드끼리는 동시에)
+    - 실행 중(락 점유)인 스레드는 삭제하지 않고 skipped로 보고
+    - 저장된 행이 없는 thread_id는 missing으로 보고 (deleted_threads에 넣지 않음)
+    이벤트: start → chunk* → done
+    """
+    started = time.perf_counter()
+    if MEMORY_DB == ":memory:" or not is_memory_db_exists():
+        yield {"event": "start", "total": 0}
+        yield {"event": "done", "deleted_threads": 0, "deleted_rows": 0, "skipped": [], "missing": [], "elapsed_sec": 0.0}
+        return
+
+    shards = await get_shards()
+    if thread_ids is not None:
+        unique = list(dict.fromkeys(str(t) for t in thread_ids))
+        total = len(unique)
+
+        async def chunks():
+            for i in range(0, len(unique), chunk_size):
+                yield unique[i:i + chunk_size]
+    else:
+        # tz 없는 시각은 UTC로 간주
+        cutoff = format_ts(inactive_since.astimezone(timezone.utc) if inactive_since.tzinfo else inactive_since)
+
+        async def count_on(shard: PooledSqliteSaver) -> int:
+            async with read_connection(shard) as db:
+                row = await fetchone(db, f"SELECT COUNT(*) FROM {REGISTRY_TABLE} WHERE last_active_at < ?;", (cutoff,))
+            return int(row[0]) if row else 0
+
+        total = sum(await asyncio.gather(*(count_on(s) for s in shards)))
+
+        async def chunks():
+            for shard in shards:
+                async for chunk in inactive_thread_ids(shard, cutoff, chunk_size):
+                    yield chunk
+
+    async def delete_on(shard: PooledSqliteSaver, ids: List[str]) -> Tuple[int, Set[str]]:
+        async with write_connection(shard) as db:
+            found = await existing_thread_ids(db, shard.db_path, ids)
+            return await delete_threads_rows(db, shard.db_path, ids), found
+
+    logger.info(f"대량 삭제 시작: 대상 {total}개 스레드 (chunk={chunk_size}, 샤드 {len(shards)}개)")
+    yield {"event": "start", "total": total}
+
+    deleted_threads, deleted_rows, skipped, missing = 0, 0, [], []
+    index = 0
+    async for chunk in chunks():
+        locked = await try_acquire_threads(chunk)
+        acquired = set(locked)
+        chunk_skipped = [t for t in chunk if t not in acquired]
+        rows, found = 0, set()
+        try:
+            if locked:
+                for shard_rows, shard_found in await asyncio.gather(*(delete_on(s, locked) for s in shards)):
+                    rows += shard_rows
+                    found |= shard_found
+        finally:
+            release_threads(locked)
+
+        # 행이 하나도 없던 스레드는 삭제 수에 넣지 않고 missing으로 보고
+        chunk_deleted = [t for t in locked if t in found]
+        chunk_missing = [t for t in locked if t not in found]
+        index += 1
+        deleted_threads += len(chunk_deleted)
+        deleted_rows += rows
+        skipped += chunk_skipped
+        missing += chunk_missing
+        yield {
+            "event": "chunk",
+            "chunk": index,
+            "deleted_threads": len(chunk_deleted),
+            "deleted_rows": rows,
+            "skipped": chunk_skipped,
+            "missing": chunk_missing,
+            "progress": deleted_threads + len(skipped) + len(missing),
+            "total": total,
+        }
+
+    elapsed = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"대량 삭제 완료: {deleted_threads}개 삭제, {len(skipped)}개 건너뜀, {len(missing)}개 없음 ({elapsed}초)"
+    )
+    yield {
+        "event": "done",
+        "deleted_threads": deleted_threads,
+        "deleted_rows": deleted_rows,
+        "skipped": skipped,
+        "missing": missing,
+        "elapsed_sec": elapsed,
+    }
@@ -0,0 +1,195 @@
+# app/prefork.py
+# 멀티 워커 실행 (pre-fork + preload)
+# 사용 예:
+#   LOCK_BACKEND=sqlite python -m app.prefork --workers 4 --port 8000
+#   python -m app.prefork --workers 4 --no-preload     # 비교용: 워커마다 따로 로드
+#
+# uvicorn --workers는 워커를 spawn으로 새로 띄우므로 임베딩 모델, 위치 인덱스 등을 워커마다 따로 올린다.
+# 여기서는 마스터가 읽기 전용 자원을 먼저 올리고 fork해서 워커들이 같은 페이지를 copy-on-write로 공유한다.
+# - 마스터에서 (preload): 앱 모듈 임포트(질문 분석 패턴 컴파일 포함), 임베딩 모델 가중치, spots 위치 인덱스,
+#   화장실 인덱스, 도구/LLM 클라이언트 객체. 끝나면 gc.freeze()로 이 객체들을 GC 대상에서 빼서
+#   워커의 GC가 객체 헤더를 건드려 페이지가 복사되는 것을 줄인다.
+# - 워커에서 (lifespan/첫 사용 때): 체크포인트 DB 연결, thread 락 lease, HTTP 연결 풀, 임베딩 실행 풀 스레드,
+#   Chroma 클라이언트(SQLite 연결), 로그 리스너 스레드. 연결/스레드는 fork를 건너면 안 되므로 마스터는 만들지 않는다.
+# - 마스터는 요청을 받지 않고 워커를 감시만 한다. 워커가 죽으면 다시 fork한다 (preload 상태 그대로).
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.core.logging import get_logger, setup_logging, shutdown_logging
+
+# 로거 생성
+logger = get_logger(__name__)
+
+# 시작 직후 이 시간 안에 죽은 워커는 다시 띄우지 않고 전체를 멈춘다 (설정 오류로 fork가 반복되지 않게)
+RESPAWN_MIN_SEC = 5.0
+
+
+def preload() -> Dict[str, object]:
+    """읽기 전용 자원을 올리고 단계별 소요 시간(ms)을 돌려준다. 실패한 단계는 건너뛴다 (워커가 처음 쓸 때 다시 시도)."""
+    import app.main  # 라우터/서비스 모듈 전체 (질문 분석 패턴도 여기서 컴파일)
+    from app.services import tool_module
+    from app.services.graph_module import warmup_graph
+    from app.services.restroom_module import load_restroom_index
+    from app.spots.geo_index import get_spot_geo_index
+
+    steps = [
+        ("restrooms", load_restroom_index),
+        ("tools", warmup_graph),
+    ]
+    if settings.EMBEDDING_MODEL:
+        # 가중치만 올린다 (마스터에서 encode하면 torch 스레드 풀이 생겨 fork 뒤에 문제가 될 수 있음)
+        steps.append(("embeddings", tool_module.get_embeddings))
+    if settings.DB_PATH:
+        steps.append(("spots", lambda: get_spot_geo_index(settings.DB_PATH)))
+
+    timings: Dict[str, object] = {}
+    for name, load in steps:
+        started = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            logger.warning(f"preload {name} 실패 - 워커에서 처음 쓸 때 로드: {e}")
+            timings[name] = "failed"
+            continue
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    release_fork_unsafe()
+    logger.info(f"preload 완료: {timings}")
+    return timings
+
+
+def release_fork_unsafe() -> None:
+    """preload 중에 열린 연결을 닫는다 (Chroma는 경로별 클라이언트와 SQLite 연결을 프로세스 전역에 캐시)"""
+    if "chromadb" in sys.modules:
+        from chromadb.api.client import SharedSystemClient
+
+        SharedSystemClient.clear_system_cache()
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, args) -> None:
+    """fork된 워커: (--no-preload면 여기서 로드) uvicorn으로 공유 소켓에서 요청을 받는다"""
+    import uvicorn
+
+    # 터미널 Ctrl-C는 마스터만 받고 워커에는 마스터가 SIGTERM 한 번만 보낸다 (두 번 받으면 uvicorn이 강제 종료)
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if not args.preload:
+        preload()
+
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=args.log_level, timeout_graceful_shutdown=args.graceful_sec))
+    server.run(sockets=[sock])
+
+
+def spawn(sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(sock, args)
+        except BaseException:
+            logger.exception("워커 종료 (오류)")
+            code = 1
+        finally:
+            # 마스터의 atexit/소켓 정리를 워커에서 돌리지 않도록
+            os._exit(code)
+    return pid
+
+
+def serve(args) -> int:
+    setup_logging()
+    if args.workers > 1 and settings.LOCK_BACKEND == "memory":
+        logger.warning("워커 여러 개에서 LOCK_BACKEND=memory면 같은 thread_id 요청이 동시에 실행될 수 있음 (sqlite 권장)")
+
+    if args.preload:
+        preload()
+    sock = bind_socket(args.host, args.port, args.backlog)
+
+    # 로그 리스너 스레드는 fork를 건너지 못하므로 멈추고 fork (워커는 lifespan에서 새로 만든다)
+    shutdown_logging()
+    if args.gc_freeze:
+        gc.collect()
+        gc.freeze()
+
+    workers: Dict[int, float] = {}
+    for _ in range(args.workers):
+        workers[spawn(sock, args)] = time.monotonic()
+    setup_logging()
+    logger.info(f"prefork 마스터 {os.getpid()}: 워커 {sorted(workers)} (preload={args.preload}, gc_freeze={args.gc_freeze})")
+
+    stopping = False
+    exit_code = 0
+
+    def stop(signum, frame):
+        nonlocal stopping
+        if not stopping:
+            stopping = True
+            logger.info(f"종료 신호 {signal.Signals(signum).name} - 워커 종료 대기")
+            for pid in workers:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started < RESPAWN_MIN_SEC:
+            logger.error(f"워커 {pid}가 시작 직후 종료 (code {code}) - 전체 종료")
+            exit_code = 1
+            stop(signal.SIGTERM, None)
+            continue
+        logger.warning(f"워커 {pid} 종료 (code {code}) - 다시 fork")
+        shutdown_logging()
+        workers[spawn(sock, args)] = time.monotonic()
+        setup_logging()
+
+    sock.close()
+    logger.info("prefork 마스터 종료")
+    shutdown_logging()
+    return exit_code
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="pre-fork 멀티 워커 실행 (마스터가 읽기 전용 자원을 올리고 fork)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="워커마다 fork 뒤에 로드 (비교용)")
+    parser.add_argument("--no-gc-freeze", dest="gc_freeze", action="store_false")
+    parser.add_argument("--graceful-sec", type=float, default=30.0, help="종료 시 진행 중인 요청을 기다리는 시간")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    sys.exit(serve(args))
+
+
+if __name__ == "__main__":
+    main()
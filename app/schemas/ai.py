@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class UserLocation(BaseModel):
     lat: Optional[float] = None
@@ -20,4 +20,9 @@ class ChatRequest(BaseModel):
     
 
 class ChatResponse(BaseModel):
-    ai_answer: str
\ No newline at end of file
+    ai_answer: str
+
+
+class ChatBatchRequest(BaseModel):
+    items: List[ChatRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1, description="동시 실행 건수 (기본/상한 CHAT_BATCH_CONCURRENCY)")
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class BulkDeleteRequest(BaseModel):
+    thread_ids: Optional[List[str]] = Field(None, description="삭제할 thread_id 목록")
+    inactive_since: Optional[datetime] = Field(
+        None, description="이 시각 이전부터 활동이 없는 스레드 전체 (tz 없으면 UTC)"
+    )
+    chunk_size: int = Field(200, ge=1, le=1000, description="트랜잭션 하나에 삭제할 스레드 수")
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.thread_ids is None) == (self.inactive_since is None):
+            raise ValueError("thread_ids와 inactive_since 중 정확히 하나를 지정해야 합니다.")
+        return self
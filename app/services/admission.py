@@ -0,0 +1,449 @@
+# app/services/admission.py
+# 채팅 요청 입장 제어 (/v1/chat, /v1/chatbot)
+# - 전역: 동시에 실행하는 그래프 수 CHAT_MAX_CONCURRENCY, 대기열 CHAT_MAX_QUEUE
+#         대기열이 차 있으면 바로 503, CHAT_QUEUE_TIMEOUT_SEC 안에 자리가 안 나도 503
+# - thread_id 별: 같은 대화는 한 번에 하나만 실행 (app.memory.locks thread 락)
+#         CHAT_THREAD_POLICY=queue  : 이전 요청이 끝날 때까지 대기 (대기 요청이 많으면 429)
+#         CHAT_THREAD_POLICY=cancel : 이전 요청(실행/대기 중)을 취소하고 새 요청 실행
+# 취소는 요청 태스크가 아니라 그래프를 돌리는 작업 태스크만 끊는다 (취소된 쪽은 Superseded를 받음).
+# 클라이언트 연결이 끊겨도(cancel("disconnect")) 같은 방식으로 작업 태스크를 끊는다 (ClientDisconnected).
+# 취소된 요청은 작업 태스크가 실제로 멈추고 on_cancel(체크포인트 정리)이 끝난 뒤에 자리/락을 반환한다.
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import REGISTRY
+from app.memory.checkpointer import STATS_WINDOW, percentile
+from app.memory.locks import acquire_key, release_key, thread_key
+
+# 로거 생성
+logger = get_logger(__name__)
+
+THREAD_POLICIES = ("queue", "cancel")
+
+# 스트림 작업 태스크 → 응답 사이 버퍼 (청크 수)
+STREAM_BUFFER = 64
+STREAM_END = object()
+
+
+class AdmissionRejected(Exception):
+    """입장 거절. status_code 503(전체 과부하) / 429(같은 대화 요청 과다)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Superseded(Exception):
+    """같은 thread_id의 새 요청으로 취소됨 (cancel 정책)"""
+
+    def __init__(self, message: str = "같은 대화의 새 요청으로 취소되었습니다."):
+        super().__init__(message)
+
+
+class ClientDisconnected(Exception):
+    """클라이언트 연결이 끊겨서 취소됨"""
+
+    def __init__(self, message: str = "클라이언트 연결이 끊겨 요청을 취소했습니다."):
+        super().__init__(message)
+
+
+class InflightCalls(BaseCallbackHandler):
+    """
+    그래프 실행 중 LLM/도구 호출 추적 (config["callbacks"]로 넘김).
+    취소로 끊긴 호출(CancelledError)은 진행 중으로 남겨서, 취소 후에 세도 끊긴 호출 수가 나온다.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.llm: Set[UUID] = set()
+        self.tool: Set[UUID] = set()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self.llm.add(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self.llm.add(run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        self.llm.discard(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        if not isinstance(error, asyncio.CancelledError):
+            self.llm.discard(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs) -> None:
+        self.tool.add(run_id)
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self.tool.discard(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        if not isinstance(error, asyncio.CancelledError):
+            self.tool.discard(run_id)
+
+
+class Ticket:
+    """요청 하나의 입장권. thread 락과 전역 자리를 쥐고 있다가 leave()로 반환한다."""
+
+    def __init__(self, controller: "AdmissionController", thread_id: str):
+        self.controller = controller
+        self.thread_id = thread_id
+        self.key = thread_key(thread_id)
+        self.created = time.perf_counter()
+        self.wait_ms = 0.0    # 입장까지 기다린 시간
+        self.started: Optional[float] = None    # 작업 태스크 시작
+        self.cancel_reason: Optional[str] = None    # superseded | disconnect
+        self.cancelled_at: Optional[float] = None
+        self.calls = InflightCalls()
+        self.on_cancel: Optional[Callable[[], Awaitable]] = None    # 취소 뒤 자리 반환 전에 실행 (체크포인트 정리)
+        self.has_thread = False
+        self.has_slot = False
+        self.left = False
+        self.waiter: Optional[asyncio.Task] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    @property
+    def superseded(self) -> bool:
+        return self.cancel_reason == "superseded"
+
+    def cancel(self, reason: str) -> None:
+        """대기/작업 태스크 취소. 처음 준 이유만 남는다."""
+        if self.cancel_reason is not None:
+            return
+        self.cancel_reason = reason
+        self.cancelled_at = time.perf_counter()
+        for task in (self.waiter, self.worker):
+            if task is not None and not task.done():
+                task.cancel()
+
+    def supersede(self) -> None:
+        self.cancel("superseded")
+
+    def cancel_error(self) -> Exception:
+        return Superseded() if self.superseded else ClientDisconnected()
+
+    def start(self, awaitable: Awaitable) -> asyncio.Task:
+        # run_callbacks()가 작업 태스크 안에서 이 입장권을 찾을 수 있도록 컨텍스트에 심어서 시작
+        token = CURRENT_TICKET.set(self)
+        try:
+            self.worker = asyncio.ensure_future(awaitable)
+        finally:
+            CURRENT_TICKET.reset(token)
+        self.started = time.perf_counter()
+        return self.worker
+
+    async def run(self, awaitable: Awaitable) -> Any:
+        """그래프 실행을 작업 태스크로 감싸서 cancel 정책/연결 끊김 때 이 작업만 끊을 수 있게 한다."""
+        if self.cancel_reason is not None:
+            close = getattr(awaitable, "close", None)
+            if close is not None:
+                close()    # 시작하지 않은 코루틴 경고 방지
+            raise self.cancel_error()
+        worker = self.start(awaitable)
+        try:
+            return await worker
+        except asyncio.CancelledError:
+            if self.cancel_reason is not None and not current_cancelling():
+                raise self.cancel_error()
+            raise
+
+    async def stream(self, source: AsyncIterator) -> AsyncIterator:
+        """
+        비동기 이터레이터를 작업 태스크(pump)가 읽고 큐로 넘긴다.
+        pump가 취소되면 source도 닫히고, 소비 쪽은 Superseded를 받는다.
+        """
+        if self.cancel_reason is not None:
+            raise self.cancel_error()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER)
+
+        async def pump():
+            try:
+                async for item in source:
+                    await queue.put(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await queue.put(e)
+                return
+            finally:
+                aclose = getattr(source, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            await queue.put(STREAM_END)
+
+        self.start(pump())
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, self.worker}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    # pump가 끝났는데 큐가 비었음 → 취소됐거나 STREAM_END를 이미 읽은 뒤
+                    if queue.empty():
+                        if self.worker.cancelled():
+                            raise self.cancel_error() if self.cancel_reason is not None else asyncio.CancelledError()
+                        return
+                    item = queue.get_nowait()
+                else:
+                    item = getter.result()
+                if item is STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not self.worker.done():
+                self.worker.cancel()
+                try:
+                    await self.worker
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    def leave(self) -> None:
+        """
+        여러 번 불러도 한 번만 반환 (응답 종료/요청 태스크 종료 양쪽에서 호출).
+        작업 태스크가 아직 멈추는 중이거나 정리할 게 있으면 끝난 뒤에 반환한다.
+        """
+        if self.left:
+            return
+        self.left = True
+        worker_running = self.worker is not None and not self.worker.done()
+        if worker_running and self.cancel_reason is None:
+            self.cancel("disconnect")    # 응답이 먼저 끝났는데 작업이 남아 있음 = 받을 쪽이 없음
+        if worker_running or (self.cancel_reason is not None and self.on_cancel is not None):
+            self.controller.finish_later(self)
+        else:
+            self.controller.leave(self)
+
+    async def finish(self) -> None:
+        try:
+            if self.worker is not None and not self.worker.done():
+                await asyncio.wait({self.worker})
+            if self.cancel_reason is not None and self.on_cancel is not None:
+                try:
+                    await self.on_cancel()
+                except Exception as e:
+                    logger.error(f"취소된 요청 정리 실패 - thread_id: {self.thread_id}, error: {e}")
+        finally:
+            self.controller.leave(self)
+
+
+CURRENT_TICKET: ContextVar[Optional[Ticket]] = ContextVar("current_ticket", default=None)
+
+
+def run_callbacks() -> List[BaseCallbackHandler]:
+    """작업 태스크 안에서 그래프 config["callbacks"]로 넘길 핸들러 (입장권 밖이면 빈 목록)"""
+    ticket = CURRENT_TICKET.get()
+    return [ticket.calls] if ticket is not None else []
+
+
+def current_cancelling() -> int:
+    task = asyncio.current_task()
+    return task.cancelling() if task is not None else 0
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_running: int,
+        max_queue: int,
+        queue_timeout: float,
+        thread_policy: str = "queue",
+        thread_max_pending: int = 4,
+    ):
+        if thread_policy not in THREAD_POLICIES:
+            raise ValueError(f"지원하지 않는 CHAT_THREAD_POLICY: {thread_policy} (가능: {', '.join(THREAD_POLICIES)})")
+        self.max_running = max_running
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.thread_policy = thread_policy
+        self.thread_max_pending = thread_max_pending
+        self.slots = asyncio.Semaphore(max_running)
+        self.running = 0
+        self.queued = 0    # 전역 자리 대기 중
+        self.threads: Dict[str, List[Ticket]] = {}
+        self.wait_ms = deque(maxlen=STATS_WINDOW)
+        self.admitted = 0
+        self.rejected_overload = 0
+        self.rejected_thread = 0
+        self.superseded = 0
+        self.max_queued = 0
+        self.finishing: Set[asyncio.Task] = set()
+        self.run_sec = deque(maxlen=STATS_WINDOW)    # 끝까지 실행된 요청의 실행 시간 (절약량 추정용)
+        self.cancelled: Dict[str, int] = {}
+        self.cancelled_llm_calls = 0
+        self.cancelled_tool_calls = 0
+        self.cancelled_run_sec = 0.0
+        self.saved_sec_est = 0.0
+
+    def overloaded(self) -> bool:
+        return self.running >= self.max_running and self.queued >= self.max_queue
+
+    def reject(self, status_code: int, detail: str) -> AdmissionRejected:
+        if status_code == 503:
+            self.rejected_overload += 1
+        else:
+            self.rejected_thread += 1
+        logger.warning(f"채팅 요청 거절 ({status_code}): {detail}")
+        return AdmissionRejected(status_code, detail, retry_after=max(1.0, self.queue_timeout / 2))
+
+    async def enter(self, thread_id: str) -> Ticket:
+        """
+        입장권 발급. thread 락 → 전역 자리 순서로 잡는다
+        (같은 대화 대기 요청이 전역 자리를 붙잡고 놀지 않도록).
+        """
+        if self.overloaded():
+            raise self.reject(503, "요청이 많아 잠시 후 다시 시도해주세요.")
+        pending = self.threads.setdefault(thread_id, [])
+        if self.thread_policy == "queue" and len(pending) >= self.thread_max_pending:
+            raise self.reject(429, "같은 대화의 이전 요청을 처리 중입니다.")
+
+        ticket = Ticket(self, thread_id)
+        if self.thread_policy == "cancel":
+            for old in pending:
+                if old.cancel_reason is None:
+                    old.supersede()
+                    self.superseded += 1
+        pending.append(ticket)
+
+        ticket.waiter = asyncio.ensure_future(self.acquire(ticket))
+        try:
+            await ticket.waiter
+        except asyncio.CancelledError:
+            ticket.leave()
+            if ticket.cancel_reason is not None and not current_cancelling():
+                raise ticket.cancel_error()
+            raise
+        except BaseException:
+            ticket.leave()
+            raise
+        if ticket.cancel_reason is not None:
+            # 자리를 얻는 순간 취소된 경우
+            ticket.leave()
+            raise ticket.cancel_error()
+
+        self.admitted += 1
+        ticket.wait_ms = (time.perf_counter() - ticket.created) * 1000
+        self.wait_ms.append(ticket.wait_ms)
+        return ticket
+
+    async def acquire(self, ticket: Ticket) -> None:
+        if not await acquire_key(ticket.key, timeout=self.queue_timeout):
+            raise self.reject(429, "같은 대화의 이전 요청이 끝나지 않았습니다.")
+        ticket.has_thread = True
+
+        if self.slots.locked() and self.queued >= self.max_queue:
+            raise self.reject(503, "요청이 많아 잠시 후 다시 시도해주세요.")
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self.reject(503, "대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        finally:
+            self.queued -= 1
+        ticket.has_slot = True
+        self.running += 1
+
+    def finish_later(self, ticket: Ticket) -> None:
+        task = asyncio.ensure_future(ticket.finish())
+        self.finishing.add(task)
+        task.add_done_callback(self.finishing.discard)
+
+    def record_run(self, ticket: Ticket) -> None:
+        """실행 시간/취소 지표. 취소는 끊긴 LLM/도구 호출 수와 남은 실행 시간 추정치(끝까지 간 요청의 p50 - 취소 시점)"""
+        if ticket.started is None:
+            return
+        if ticket.cancel_reason is None:
+            if not ticket.worker.cancelled():    # 요청 태스크 자체가 취소된 경우(서버 종료 등)는 빼고
+                self.run_sec.append(time.perf_counter() - ticket.started)
+            return
+        elapsed = (ticket.cancelled_at or time.perf_counter()) - ticket.started
+        self.cancelled[ticket.cancel_reason] = self.cancelled.get(ticket.cancel_reason, 0) + 1
+        self.cancelled_llm_calls += len(ticket.calls.llm)
+        self.cancelled_tool_calls += len(ticket.calls.tool)
+        self.cancelled_run_sec += elapsed
+        if self.run_sec:
+            self.saved_sec_est += max(0.0, percentile(self.run_sec, 50) - elapsed)
+        logger.info(
+            f"요청 취소 ({ticket.cancel_reason}) - thread_id: {ticket.thread_id}, {elapsed:.2f}초 실행, "
+            f"끊긴 호출 LLM {len(ticket.calls.llm)}개 / 도구 {len(ticket.calls.tool)}개"
+        )
+
+    def leave(self, ticket: Ticket) -> None:
+        self.record_run(ticket)
+        if ticket.has_slot:
+            ticket.has_slot = False
+            self.running -= 1
+            self.slots.release()
+        if ticket.has_thread:
+            ticket.has_thread = False
+            release_key(ticket.key)
+        pending = self.threads.get(ticket.thread_id)
+        if pending is not None:
+            if ticket in pending:
+                pending.remove(ticket)
+            if not pending:
+                del self.threads[ticket.thread_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "policy": self.thread_policy,
+            "max_running": self.max_running,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "queued_max": self.max_queued,
+            "threads_active": len(self.threads),
+            "threads_waiting": sum(max(0, len(p) - 1) for p in self.threads.values()),
+            "admitted": self.admitted,
+            "rejected_overload": self.rejected_overload,
+            "rejected_thread": self.rejected_thread,
+            "superseded": self.superseded,
+            "finishing": len(self.finishing),
+            "cancelled": dict(self.cancelled),
+            "cancelled_llm_calls": self.cancelled_llm_calls,
+            "cancelled_tool_calls": self.cancelled_tool_calls,
+            "cancelled_run_sec": round(self.cancelled_run_sec, 3),
+            "saved_sec_est": round(self.saved_sec_est, 3),
+            "run_sec_p50": round(percentile(self.run_sec, 50), 3),
+            "queue_wait_ms_p50": round(percentile(self.wait_ms, 50), 3),
+            "queue_wait_ms_p95": round(percentile(self.wait_ms, 95), 3),
+        }
+
+
+ADMISSION: Optional[AdmissionController] = None
+
+REGISTRY.gauge("chat_running", "실행 중인 채팅 그래프 수", lambda: ADMISSION.running if ADMISSION else 0)
+REGISTRY.gauge("chat_queued", "전역 자리 대기 중인 채팅 요청 수", lambda: ADMISSION.queued if ADMISSION else 0)
+REGISTRY.gauge(
+    "chat_finishing", "취소 후 정리 중인 채팅 요청 수", lambda: len(ADMISSION.finishing) if ADMISSION else 0
+)
+
+
+def get_admission() -> AdmissionController:
+    global ADMISSION
+    if ADMISSION is None:
+        ADMISSION = AdmissionController(
+            max_running=settings.CHAT_MAX_CONCURRENCY,
+            max_queue=settings.CHAT_MAX_QUEUE,
+            queue_timeout=settings.CHAT_QUEUE_TIMEOUT_SEC,
+            thread_policy=settings.CHAT_THREAD_POLICY,
+            thread_max_pending=settings.CHAT_THREAD_MAX_PENDING,
+        )
+        logger.info(
+            f"채팅 입장 제어: 동시 {ADMISSION.max_running}개, 대기열 {ADMISSION.max_queue}개, "
+            f"thread 정책 {ADMISSION.thread_policy}"
+        )
+    return ADMISSION
@@ -2,9 +2,12 @@
 import asyncio
 from datetime import datetime, timezone, timedelta
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 
+from app.services.admission import run_callbacks
+from app.services.graph_metrics import GRAPH_METRICS, trace_callbacks
 from app.services.graph_module import make_graph  # 내부 그래프 빌더
+from app.services.recorder import finish_recording, record_callbacks, start_recording
 from app.schemas.ai import ChatRequest
 from app.core.logging import get_logger
 
@@ -14,6 +17,8 @@ logger = get_logger(__name__)
 # 한국 시간
 KST = timezone(timedelta(hours=9))
 
+CANCELLED_TOOL_MESSAGE = "요청이 취소되어 도구 실행을 중단했습니다."
+
 _graph = None
 _graph_lock = asyncio.Lock()
 
@@ -26,59 +31,112 @@ async def get_or_create_graph():
     return _graph
 
 
+def user_message(req: ChatRequest) -> HumanMessage:
+    """사용자 질문 (GPS는 additional_kwargs로 analyze 노드에 전달)"""
+    return HumanMessage(
+        content=req.user_question,
+        additional_kwargs={
+            "user_lat": req.user_location.lat if req.user_location else None,
+            "user_lon": req.user_location.lng if req.user_location else None
+        }
+    )
+
+
+def system_message(req: ChatRequest) -> SystemMessage:
+    """현재 시간과 사용자 정보 (/v1/chatbot)"""
+    # 사용자 정보 받기
+    if req.user_info:
+        info_message = f"""
+        [사용자 정보]
+        사용자의 닉네임: {req.user_info.nickname}
+        성별: {req.user_info.gender}
+        나이대: {req.user_info.age_group}
+
+        사용자 정보를 참고해서 친근감있게 반말로 답변해주세요.
+        """
+    else:
+        info_message = "친근감있게 반말로 답변을 제공해주세요."
+
+    return SystemMessage(
+        content=f"""
+        오늘이나 현재 같은 표현 쓰면 아래의 현재 시간을 참고하세요.
+        - 현재 시간: {datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S')}
+
+        {info_message}
+        """
+    )
+
+
 async def ask_ai(req: ChatRequest) -> str:
     """
     마지막 AI 메시지를 content로 반환.
     """
     logger.info(f"AI 요청 시작 - user_id: {req.user_id}, question: {req.user_question[:50]}...")
+    recorder = start_recording(req, "chatbot")
+    status = "cancelled"
 
     try:
         graph = await get_or_create_graph()
         if not req.user_question or not req.user_id:
             raise ValueError("user_question, user_id 파라미터가 필요합니다.")
         
-        config = {"configurable": {"thread_id": req.user_id}}
-
-        new_message = HumanMessage(
-            content=req.user_question,
-            additional_kwargs={
-                "user_lat": req.user_location.lat if req.user_location else None,
-                "user_lon": req.user_location.lng if req.user_location else None
-            }
-        )
-
-        # 사용자 정보 받기
-        if req.user_info:
-            info_message = f"""
-            [사용자 정보]
-            사용자의 닉네임: {req.user_info.nickname}
-            성별: {req.user_info.gender}
-            나이대: {req.user_info.age_group}
-
-            사용자 정보를 참고해서 친근감있게 반말로 답변해주세요.
-            """
-        else:
-            info_message = "친근감있게 반말로 답변을 제공해주세요."
-
-        system_message = SystemMessage(
-            content=f"""
-            오늘이나 현재 같은 표현 쓰면 아래의 현재 시간을 참고하세요.
-            - 현재 시간: {datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S')}
-
-            {info_message}
-            """
-        )
+        config = {
+            "configurable": {"thread_id": req.user_id},
+            "callbacks": [*run_callbacks(), GRAPH_METRICS, *trace_callbacks(), *record_callbacks(recorder)],
+        }
 
         # 메시지에 GPS를 실어 보내고 싶다면 additional_kwargs를 활용하도록
         # 여기서는 최소: content만 전달
         result = await graph.ainvoke(
-            {"messages": [system_message, new_message]},
+            {"messages": [system_message(req), user_message(req)]},
             config=config
         )
 
         logger.info(f"AI 응답 완료 - user_id: {req.user_id}")
+        status = "ok"
         return result["messages"][-1].content
     
     except Exception as e:
+        status = "error"
         logger.error(f"AI 서비스 오류 - user_id: {req.user_id}, error: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        finish_recording(recorder, status)
+
+
+def dangling_tool_calls(messages: list) -> list:
+    """마지막 AIMessage의 tool_calls 중 ToolMessage 응답이 없는 것"""
+    answered = set()
+    for m in reversed(messages):
+        if isinstance(m, ToolMessage):
+            answered.add(m.tool_call_id)
+        elif isinstance(m, AIMessage):
+            return [c for c in (m.tool_calls or []) if c["id"] not in answered]
+        else:
+            return []
+    return []
+
+
+async def repair_cancelled_run(thread_id: str, graph=None) -> int:
+    """
+    도구 실행 중 취소된 대화는 tool_calls만 있고 응답이 없는 AIMessage가 마지막에 남는다.
+    그대로 두면 다음 요청에서 LLM이 거절하므로(tool_call_id 응답 누락) 취소 ToolMessage로 채운다.
+    """
+    graph = graph or await get_or_create_graph()
+    config = {"configurable": {"thread_id": thread_id}}
+    snapshot = await graph.aget_state(config)
+    calls = dangling_tool_calls((snapshot.values or {}).get("messages", []))
+    if not calls:
+        return 0
+    await graph.aupdate_state(
+        config,
+        {
+            "messages": [
+                ToolMessage(content=CANCELLED_TOOL_MESSAGE, tool_call_id=c["id"], name=c["name"], status="error")
+                for c in calls
+            ]
+        },
+        as_node="tools",
+    )
+    logger.info(f"취소된 도구 호출 {len(calls)}개 정리 - thread_id: {thread_id}")
+    return len(calls)
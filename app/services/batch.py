@@ -0,0 +1,115 @@
+# app/services/batch.py
+# 배치 채팅 (/v1/chatbot/batch): 백엔드 작업이 여러 사용자 요청을 한 번에 보낸다.
+# - 건별로 입장 제어(app.services.admission)를 거쳐 ask_ai 실행, 배치 안 동시 실행은 concurrency로 제한
+# - 같은 배치의 도구 결과는 공유 (app.services.tool_cache)
+# - 끝나는 순서대로 결과를 내보낸다 (index로 원래 순서 확인)
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import bind_log_context, get_logger
+from app.core.metrics import record_request
+from app.core.tracing import finish_trace, start_trace, trace_scope
+from app.schemas.ai import ChatRequest
+from app.services.admission import AdmissionRejected, ClientDisconnected, Superseded, get_admission
+from app.services.ai_service import ask_ai, repair_cancelled_run
+from app.services.tool_cache import ToolCache, tool_cache_scope
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+def batch_concurrency(requested: Optional[int]) -> int:
+    cap = max(1, settings.CHAT_BATCH_CONCURRENCY)
+    return min(requested, cap) if requested else cap
+
+
+async def run_item(index: int, req: ChatRequest, cache: ToolCache, slots: asyncio.Semaphore) -> Dict[str, Any]:
+    # 항목마다 태스크가 따로라 thread_id는 그 태스크 로그에만 붙는다
+    bind_log_context(thread_id=req.user_id)
+    trace = start_trace("batch", user_id=req.user_id, index=index)
+    with trace_scope(trace):
+        result = await run_item_once(index, req, cache, slots)
+    code = result.get("code")
+    outcome = "error" if code == "internal" else code or result["status"]
+    record_request("batch", outcome)
+    finish_trace(trace, outcome)
+    return result
+
+
+async def run_item_once(index: int, req: ChatRequest, cache: ToolCache, slots: asyncio.Semaphore) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"event": "item", "index": index, "user_id": req.user_id}
+    async with slots:
+        started = time.perf_counter()
+        with tool_cache_scope(cache):
+            try:
+                ticket = await get_admission().enter(req.user_id)
+            except AdmissionRejected as e:
+                return {**result, "status": "error", "code": "overloaded" if e.status_code == 503 else "thread_busy",
+                        "detail": e.detail}
+            except Superseded as e:
+                return {**result, "status": "error", "code": "superseded", "detail": str(e)}
+            ticket.on_cancel = lambda: repair_cancelled_run(req.user_id)
+            try:
+                answer = await ticket.run(ask_ai(req))
+                result.update(status="ok", ai_answer=answer)
+            except asyncio.CancelledError:
+                ticket.cancel("disconnect")
+                raise
+            except (Superseded, ClientDisconnected) as e:
+                result.update(status="error", code="superseded" if isinstance(e, Superseded) else "cancelled",
+                              detail=str(e))
+            except ValueError as ve:
+                result.update(status="error", code="bad_request", detail=str(ve))
+            except Exception as e:
+                logger.error(f"배치 항목 오류 - index: {index}, user_id: {req.user_id}, error: {e}")
+                result.update(status="error", code="internal", detail=f"챗봇 오류가 발생했습니다: {e}")
+            finally:
+                ticket.leave()
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def run_batch(items: List[ChatRequest], concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    - {"event": "start", "total": N, "concurrency": C}
+    - {"event": "item", "index": i, "user_id": .., "status": "ok", "ai_answer": .., "elapsed_ms": ..}
+      실패면 status "error"와 code(overloaded/thread_busy/superseded/cancelled/bad_request/internal), detail
+    - {"event": "done", "total": N, "ok": .., "failed": .., "elapsed_sec": .., "tool_cache": {...}}
+    받는 쪽이 끊기면 남은 항목은 취소한다.
+    """
+    limit = batch_concurrency(concurrency)
+    cache = ToolCache()
+    slots = asyncio.Semaphore(limit)
+    started = time.perf_counter()
+    logger.info(f"배치 채팅 시작 - {len(items)}건, 동시 {limit}")
+    yield {"event": "start", "total": len(items), "concurrency": limit}
+
+    tasks = [asyncio.ensure_future(run_item(i, req, cache, slots)) for i, req in enumerate(items)]
+    ok = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            ok += item["status"] == "ok"
+            yield item
+    finally:
+        pending = [t for t in tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info(f"배치 채팅 중단 - 남은 {len(pending)}건 취소")
+        # 항목이 모두 끝났거나 취소됐으면 남은 도구 호출을 기다릴 쪽이 없다
+        await cache.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"배치 채팅 완료 - {ok}/{len(items)}건 성공, {elapsed:.1f}초, 도구 캐시 {cache.stats()}")
+    yield {
+        "event": "done",
+        "total": len(items),
+        "ok": ok,
+        "failed": len(items) - ok,
+        "elapsed_sec": round(elapsed, 3),
+        "tool_cache": cache.stats(),
+    }
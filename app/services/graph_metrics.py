@@ -0,0 +1,234 @@
+# app/services/graph_metrics.py
+# 그래프 실행 지표 기록 (app.core.metrics)
+# - 노드 시간: make_graph에서 노드를 timed_node로 감싼다
+# - 도구/LLM: GRAPH_METRICS 콜백 (그래프 config["callbacks"]에 넣는다)
+#   요청별 콜백을 넘기면 그래프 기본 콜백은 덮어써지므로, 실행하는 쪽에서 같이 넘긴다.
+# - 트레이스(app.core.tracing): 샘플링된 요청에만 trace_callbacks()가 TraceCallback을 붙인다
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from app.core.metrics import (
+    GRAPH_NODE_SECONDS,
+    LLM_CALLS,
+    LLM_COMPLETION_TOKENS,
+    LLM_PROMPT_TOKENS,
+    LLM_SECONDS,
+    LLM_TTFT_SECONDS,
+    TOOL_CALLS,
+    TOOL_SECONDS,
+)
+from app.core.tracing import CURRENT_TRACE, Span, Trace, status_of, truncate
+
+# 도구가 취소되면(CancelledError) on_tool_error가 오지 않으므로 오래된 진행 중 기록은 취소로 정리
+STALE_SEC = 600.0
+PRUNE_OVER = 4096
+
+LLM_OK = LLM_CALLS.labels("ok")
+LLM_ERROR = LLM_CALLS.labels("error")
+LLM_CANCELLED = LLM_CALLS.labels("cancelled")
+
+
+def timed_node(name: str, node: Any) -> Callable:
+    """노드 실행 시간을 graph_node_seconds{node}에 기록 (함수 노드, Runnable 노드 모두)"""
+    histogram = GRAPH_NODE_SECONDS.labels(name)
+
+    if isinstance(node, Runnable):
+        async def run(state, config: RunnableConfig):
+            started = time.perf_counter()
+            try:
+                return await node.ainvoke(state, config)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+    else:
+        async def run(state):
+            started = time.perf_counter()
+            try:
+                return await node(state)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+    run.__name__ = name
+    return run
+
+
+def prealloc_tools(names) -> None:
+    TOOL_SECONDS.prealloc([(n,) for n in names])
+    TOOL_CALLS.prealloc([(n, outcome) for n in names for outcome in ("ok", "error", "cancelled")])
+
+
+class GraphMetricsCallback(BaseCallbackHandler):
+    """도구 시간/결과, LLM 시간/첫 토큰/토큰 수. 진행 중인 호출만 run_id로 잠깐 들고 있는다."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.tools: Dict[UUID, tuple] = {}
+        self.llms: Dict[UUID, float] = {}
+        self.waiting_first_token: Dict[UUID, float] = {}
+
+    # 도구
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        if len(self.tools) > PRUNE_OVER:
+            self.prune()
+        self.tools[run_id] = (name, time.perf_counter())
+
+    def prune(self) -> None:
+        cutoff = time.perf_counter() - STALE_SEC
+        for run_id in [r for r, (_, at) in self.tools.items() if at < cutoff]:
+            self.finish_tool(run_id, "cancelled")
+
+    def finish_tool(self, run_id: UUID, outcome: str) -> None:
+        started = self.tools.pop(run_id, None)
+        if started is None:
+            return
+        name, at = started
+        TOOL_SECONDS.labels(name).observe(time.perf_counter() - at)
+        TOOL_CALLS.labels(name, outcome).inc()
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self.finish_tool(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.finish_tool(run_id, status_of(error))
+
+    # LLM
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        now = time.perf_counter()
+        self.llms[run_id] = now
+        self.waiting_first_token[run_id] = now
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        started = self.waiting_first_token.pop(run_id, None)
+        if started is not None:
+            LLM_TTFT_SECONDS.observe(time.perf_counter() - started)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        self.waiting_first_token.pop(run_id, None)
+        started = self.llms.pop(run_id, None)
+        if started is not None:
+            LLM_SECONDS.observe(time.perf_counter() - started)
+        LLM_OK.inc()
+        prompt, completion = token_usage(response)
+        if prompt:
+            LLM_PROMPT_TOKENS.inc(prompt)
+        if completion:
+            LLM_COMPLETION_TOKENS.inc(completion)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.waiting_first_token.pop(run_id, None)
+        self.llms.pop(run_id, None)
+        (LLM_CANCELLED if isinstance(error, asyncio.CancelledError) else LLM_ERROR).inc()
+
+
+def token_usage(response) -> tuple:
+    """LLMResult → (prompt, completion). 메시지의 usage_metadata 우선, 없으면 llm_output.token_usage"""
+    prompt = completion = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage: Optional[dict] = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if not prompt and not completion:
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+GRAPH_METRICS = GraphMetricsCallback()
+
+
+class TraceCallback(BaseCallbackHandler):
+    """요청 하나의 트레이스에 노드/LLM/도구 스팬을 남긴다. 부모는 run_id 계보에서 가장 가까운 스팬."""
+
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.spans: Dict[UUID, Span] = {}
+        self.parents: Dict[UUID, Optional[UUID]] = {}
+
+    def parent_span(self, parent_run_id: Optional[UUID]) -> Optional[Span]:
+        while parent_run_id is not None:
+            span = self.spans.get(parent_run_id)
+            if span is not None:
+                return span
+            parent_run_id = self.parents.get(parent_run_id)
+        return None
+
+    def open(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str, attrs=None) -> None:
+        self.parents[run_id] = parent_run_id
+        parent = self.parent_span(parent_run_id)
+        span = self.trace.start_span(name, kind, parent.id if parent else None, attrs)
+        if span is not None:
+            self.spans[run_id] = span
+
+    def close(self, run_id: UUID, status: str = "ok", **attrs) -> None:
+        self.trace.end_span(self.spans.get(run_id), status, **attrs)
+
+    # 노드: LangGraph가 노드 실행마다 name == metadata["langgraph_node"]인 체인 실행을 만든다
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id=None, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if not node or kwargs.get("name") != node:
+            self.parents[run_id] = parent_run_id
+            return
+        parent = self.parent_span(parent_run_id)
+        if parent is not None and parent.kind == "node" and parent.name == node:
+            # Runnable 노드(ToolNode)는 안에서 같은 이름의 실행을 한 번 더 만든다
+            self.parents[run_id] = parent_run_id
+            return
+        self.open(run_id, parent_run_id, node, "node")
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        self.close(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.close(run_id, status_of(error))
+
+    # LLM
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id=None, metadata=None, **kwargs) -> None:
+        attrs = {"model": (metadata or {}).get("ls_model_name"), "messages": len(messages[0]) if messages else 0}
+        self.open(run_id, parent_run_id, "llm", "llm", attrs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, parent_run_id=None, metadata=None, **kwargs) -> None:
+        self.open(run_id, parent_run_id, "llm", "llm", {"model": (metadata or {}).get("ls_model_name")})
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        span = self.spans.get(run_id)
+        if span is not None and "ttft_ms" not in span.attrs:
+            span.attrs["ttft_ms"] = round((time.perf_counter() - span.start) * 1000, 1)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        prompt, completion = token_usage(response)
+        self.close(run_id, prompt_tokens=prompt, completion_tokens=completion)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.close(run_id, status_of(error))
+
+    # 도구 (취소되면 끝 콜백이 없으므로 트레이스가 끝날 때 cancelled로 닫힘)
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, parent_run_id=None, inputs=None, **kwargs) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        args = truncate(inputs if inputs is not None else input_str)
+        self.open(run_id, parent_run_id, f"tool:{name}", "tool", {"args": args})
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self.close(run_id, output_chars=len(str(getattr(output, "content", output))))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.close(run_id, status_of(error))
+
+
+def trace_callbacks() -> List[BaseCallbackHandler]:
+    """현재 요청이 트레이스 대상이면 [TraceCallback], 아니면 []"""
+    trace = CURRENT_TRACE.get()
+    return [] if trace is None else [TraceCallback(trace)]
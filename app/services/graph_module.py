@@ -1,14 +1,15 @@
 # 필요한 라이브러리 로드
-import os
+import re
+from functools import partial
 
 from app.core.config import settings
-from app.core.logging import get_logger
+from app.core.logging import Lazy, debug_sampled, get_logger
 from app.memory.manager import ensure_checkpointer
+from app.services.graph_metrics import prealloc_tools, timed_node
 from app.services.state import State
-from app.services.tool_module import *
+from app.services.tool_registry import TOOL_REGISTRY, get_tool
+from app.services import tool_module  # 도구 선언 등록 (@declare_tool)
 
-from langchain_openai import ChatOpenAI
-from langchain_upstage import ChatUpstage
 from langchain_core.messages import AIMessage, ToolMessage, HumanMessage, SystemMessage
 
 from langgraph.graph import StateGraph, START, END
@@ -17,51 +18,76 @@ from langgraph.prebuilt import ToolNode, tools_condition
 # 로거 설정
 logger = get_logger(__name__)
 
-# 환경 변수 설정
-os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
-os.environ["UPSTAGE_API_KEY"] = settings.UPSTAGE_API_KEY
-
 
 # LLM 정의 - 인천 토박이 친구 페르소나 설정
+# LLM 클라이언트 패키지는 처음 만들 때 임포트 (API 키는 os.environ 대신 직접 넘긴다)
 def get_llm(company_name):
     if company_name == "openai":
+        from langchain_openai import ChatOpenAI
+
         llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.3,
+            stream_usage=True,    # 스트리밍 done 이벤트에 토큰 사용량 포함
+            base_url=settings.OPENAI_BASE_URL,
+            **({"api_key": settings.OPENAI_API_KEY} if settings.OPENAI_API_KEY else {}),
         )
     
     elif company_name == "upstage":
+        from langchain_upstage import ChatUpstage
+
         llm = ChatUpstage(
             model="solar-pro",
             temperature=0.3,
+            **({"api_key": settings.UPSTAGE_API_KEY} if settings.UPSTAGE_API_KEY else {}),
         )
     return llm
 
 
-# 도구 목록
-TOOLS_RAW = [
-    search_spot_tool_in_db,
-    search_tool_in_web,
-    open_weather_map,
-    get_near_cafe_in_kakao,
-    get_near_restaurant_in_kakao,
-    search_blog,
-    get_detail_info,
-    ask_for_clarification,
-    parse_gps_coordinates,
-    search_restaurants_by_location,
-    search_cafes_by_location,
-    resolve_place,
-    build_kakaomap_route,
+# 도구 목록 (이름만, 도구 객체는 tool_registry에서 처음 쓸 때 생성)
+TOOL_NAMES = [
+    "vectordb_search",
+    "tavily_search",
+    "weather",
+    "get_near_cafe_in_kakao",
+    "get_near_restaurant_in_kakao",
+    "search_blog",
+    "get_detail_info",
+    "ask_for_clarification",
+    "parse_gps_coordinates",
+    "search_restaurants_by_location",
+    "search_cafes_by_location",
+    "resolve_place",
+    "build_kakaomap_route",
+    "find_nearest_restroom",
 ]
 
-TOOLS = [t for t in TOOLS_RAW if t is not None]
+prealloc_tools(TOOL_NAMES + ["analyze_user_question"])
 
 # 원하는 llm 선택
-selected_llm = get_llm("openai")
+SELECTED_LLM = "openai"
+
+# Lazy Singletone 설정
+llm_with_tools = None
+
+
+def get_tools() -> list:
+    return TOOL_REGISTRY.tools(TOOL_NAMES)
+
+
+def get_llm_with_tools():
+    """llm에 도구 바인딩 (첫 호출 때 한 번)"""
+    global llm_with_tools
+    if llm_with_tools is None:
+        llm_with_tools = get_llm(SELECTED_LLM).bind_tools(get_tools())
+    return llm_with_tools
+
 
-# llm에 TOOLS 바인딩
-llm_with_tools = selected_llm.bind_tools(TOOLS)
+def warmup_graph() -> dict:
+    """도구와 LLM 클라이언트를 미리 만든다 (lifespan에서 첫 요청 전에)"""
+    timings = TOOL_REGISTRY.warmup(TOOL_NAMES + ["analyze_user_question"])
+    get_llm_with_tools()
+    return timings
 
 # 질문 분석 노드
 async def analyze_question_node(state: State):
@@ -79,11 +105,12 @@ async def analyze_question_node(state: State):
             user_lon = last_message.additional_kwargs.get('user_lon')
         
         # 질문 분석 실행 (GPS 좌표 포함)
-        analysis_result = await analyze_user_question.ainvoke(
-            last_message.content,
-            user_lat=user_lat,
-            user_lon=user_lon
-        )
+        # 키워드 인자로 넘기면 tool 입력에 포함되지 않으므로 입력 dict에 함께 담는다.
+        analysis_result = await get_tool("analyze_user_question").ainvoke({
+            "user_question": last_message.content,
+            "user_lat": str(user_lat) if user_lat is not None else None,
+            "user_lon": str(user_lon) if user_lon is not None else None,
+        })
         
         return {
             "question_analysis": analysis_result,
@@ -152,12 +179,24 @@ def make_forced_tool_ai_message(state: State) -> AIMessage | None:
         question = question_analysis.get("original_question") or ""
         return AIMessage(content="", tool_calls=[custom_tool_call(tool, {"user_input": question})])
     
-    # 3) 길찾기는 기존 라우팅 사용함.
+    # 3) 화장실 찾기 -> 좌표가 있으면 바로 검색
+    if types.get("restroom") and info.get("has_coordinates"):
+        args = {"latitude": str(info.get("latitude")), "longitude": str(info.get("longitude"))}
+        return AIMessage(content="", tool_calls=[custom_tool_call("find_nearest_restroom", args)])
+
+    # 4) 길찾기는 기존 라우팅 사용함.
     return None
 
 
 # 챗봇 함수 정의 - 인천 토박이 친구 페르소나 적용
-async def chatbot(state: State):
+async def chatbot(state: State, llm=None):
+    # 사용자 GPS가 있으면 도구 인자로 쓸 수 있게 알려준다.
+    info = (state.get("question_analysis") or {}).get("extracted_info") or {}
+    if info.get("has_coordinates"):
+        location_hint = f"- 사용자 현재 위치: 위도 {info.get('latitude')}, 경도 {info.get('longitude')}"
+    else:
+        location_hint = "- 사용자 현재 위치: 알 수 없음"
+
     # 시스템 메시지에 페르소나 설정
     system_message = SystemMessage(
         content=f"""
@@ -172,6 +211,10 @@ async def chatbot(state: State):
         - 이동수단은 사용자 질문에서 추출한 transport_mode를 사용해 (car, foot, bicycle, publictransit)
         6. 위치 기반 검색(맛집/카페)에서 "근처", "주변"만 있으면 현재 위치 정보를 요청하고, 구체적 위치명이 있으면 해당 위치 기반으로 검색
         7. 질문이 명확하지 않으면 구체적으로 물어봐
+        8. "근처 볼거리"처럼 현재 위치 기준 관광지 질문이면 vectordb_search에 사용자 위도(latitude)/경도(longitude)를 같이 넘겨
+        9. 화장실 질문이면 find_nearest_restroom에 사용자 위도/경도를 넘겨 (지금 여는 곳은 open_now, 24시간은 open_24h, 장애인용은 accessible)
+
+        {location_hint}
         
         길찾기(route=True)는 최대 2번만 tool을 호출(먼저 resolve_place, 다음 build_kakaomap_route)하고 결과를 안내한 뒤 끝내.
 
@@ -190,7 +233,7 @@ async def chatbot(state: State):
     # 시스템 메시지 추가
     messages_with_system = [system_message] + state["messages"]
     
-    response = await llm_with_tools.ainvoke(messages_with_system)
+    response = await (llm or get_llm_with_tools()).ainvoke(messages_with_system)
 
     # # 디버깅
     # # print(f"[DEBUG] LLM 응답: {response}")
@@ -219,13 +262,20 @@ def called_tool(state: State, name: str) -> bool:
     return False
 
 
-def dump_tool_names(messages, last_n: int = 10):
+def recent_tool_names(messages, last_n: int = 10) -> list:
+    """뒤에서부터 최근 ToolMessage 이름 last_n개 (오래된 것부터)"""
     names = []
-    for message in messages:
+    for message in reversed(messages):
         if isinstance(message, ToolMessage):
             names.append(getattr(message, "name", None) or getattr(message, "tool_name", None))
-    # print(f"[DEBUG] ToolMessage names: {names[-last_n:]}")
-    logger.info(f"[DEBUG] ToolMessage names: {names[-last_n:]}")
+            if len(names) >= last_n:
+                break
+    return names[::-1]
+
+
+def dump_tool_names(messages, last_n: int = 10):
+    # 라우팅마다 불리므로 디버그 로그가 남을 때만 메시지를 훑는다
+    debug_sampled(logger, "ToolMessage names: %s", Lazy(lambda: recent_tool_names(messages, last_n)))
 
 
 # 조건부 논리 정의 함수
@@ -241,8 +291,7 @@ def select_next_node(state: State):
     qa_types = state["question_analysis"].get("question_types", {})
 
     # 디버깅
-    # print(f"[DEBUG] select_next_node - qa_types: {qa_types}")
-    logger.info(f"[DEBUG] select_next_node - qa_types: {qa_types}")
+    debug_sampled(logger, "select_next_node - qa_types: %s", qa_types)
 
     # 길찾기 인텐트(route=True)면 바로 tools 실행
     if qa_types.get("route"):
@@ -260,17 +309,18 @@ def after_tools_router(state):
 
 
 # 그래프 생성 함수
-async def make_graph():
+# llm/tools/checkpointer를 주면 운영 구성 대신 사용 (녹화 재생: benchmarks.replay)
+async def make_graph(llm=None, tools=None, checkpointer=None):
 
     graph_builder = StateGraph(State)
     
     # 도구 노드
-    tool_node = ToolNode(tools=TOOLS)
+    tool_node = ToolNode(tools=tools or get_tools())
 
-    # 노드 추가하기
-    graph_builder.add_node("analyze", analyze_question_node)  # 질문 분석 노드
-    graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", tool_node)
+    # 노드 추가하기 (노드별 실행 시간은 graph_node_seconds로)
+    graph_builder.add_node("analyze", timed_node("analyze", analyze_question_node))  # 질문 분석 노드
+    graph_builder.add_node("chatbot", timed_node("chatbot", partial(chatbot, llm=llm) if llm else chatbot))
+    graph_builder.add_node("tools", timed_node("tools", tool_node))
 
     # 조건부 엣지 추가
     graph_builder.add_conditional_edges(
@@ -298,7 +348,7 @@ async def make_graph():
     # memory = MemorySaver()
     # 체크포인터를 SQLite 파일로 -> EC2 디스크에 생성
     # 파일 경로를 환경/설정에 맞게 변경 가능함.
-    checkpointer = await ensure_checkpointer()
+    checkpointer = checkpointer or await ensure_checkpointer()
     
     # 컴파일
     graph = \
@@ -0,0 +1,224 @@
+# app/services/recorder.py
+# 실제 대화 녹화 (재생 벤치마크 benchmarks.replay 입력)
+# - RECORD_SAMPLE_RATE 비율의 thread_id만 녹화한다. thread 단위로 고르므로 녹화된 대화는 처음부터 끝까지 남는다
+# - 요청 하나 = 한 줄: 요청(질문, 위치, 사용자 정보), LLM 응답(내용, tool_calls, 토큰 사용량), tools 노드의 도구 결과
+# - 익명화: thread_id는 RECORD_SALT로 해시, 전화번호/이메일은 가림, 좌표는 소수 둘째 자리(약 1km)까지, 닉네임은 버림
+# - 한 줄씩 RECORD_FILE(JSONL, 크기 기준 회전)에 쓴다. 파일 쓰기는 리스너 스레드가 한다 (app.core.logging.JsonlSink)
+import hashlib
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.config import settings
+from app.core.logging import JsonlSink, get_logger, read_jsonl
+from app.schemas.ai import ChatRequest
+
+# 로거 생성
+logger = get_logger(__name__)
+
+RECORD_SINK: Optional[JsonlSink] = None
+RECORD_VERSION = 1
+
+PHONE_PATTERN = re.compile(r"(?<!\d)0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}(?!\d)")
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+COORD_PATTERN = re.compile(r"(?<![\d.])(\d{2,3}\.\d{2})\d+")
+COORD_KEYS = {"lat", "lng", "lon", "latitude", "longitude", "x", "y", "user_lat", "user_lon"}
+
+
+# ===============[익명화]============================
+
+def anonymize_thread(thread_id: str) -> str:
+    return hashlib.sha256(f"{settings.RECORD_SALT}:{thread_id}".encode()).hexdigest()[:16]
+
+
+def mask_text(text: str) -> str:
+    text = PHONE_PATTERN.sub("<phone>", text)
+    text = EMAIL_PATTERN.sub("<email>", text)
+    return COORD_PATTERN.sub(r"\1", text)
+
+
+def round_coord(value: Any) -> Any:
+    """소수 둘째 자리까지만 (본문 속 좌표와 같은 규칙: 버림)"""
+    text = COORD_PATTERN.sub(r"\1", str(value))
+    if isinstance(value, str):
+        return text
+    try:
+        return float(text)
+    except ValueError:
+        return value
+
+
+def mask_value(value: Any, key: Optional[str] = None) -> Any:
+    """dict/list 안의 문자열까지 가리고, 좌표 키의 값은 소수 둘째 자리까지"""
+    if key in COORD_KEYS and value is not None:
+        return round_coord(value)
+    if isinstance(value, str):
+        return mask_text(value)
+    if isinstance(value, dict):
+        return {k: mask_value(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [mask_value(v) for v in value]
+    return value
+
+
+def anonymize_request(req: ChatRequest) -> Dict[str, Any]:
+    location = req.user_location
+    info = req.user_info
+    return {
+        "user_question": mask_text(req.user_question),
+        "user_location": mask_value({"lat": location.lat, "lng": location.lng}) if location else None,
+        # 닉네임은 남기지 않는다 (시스템 메시지에만 쓰이고 재생에는 영향 없음)
+        "user_info": {"gender": info.gender, "age_group": info.age_group} if info else None,
+    }
+
+
+# ===============[녹화]============================
+
+def sampled(thread_id: str) -> bool:
+    """thread_id 해시로 고른다: 같은 대화는 항상 같은 결과"""
+    rate = settings.RECORD_SAMPLE_RATE
+    if rate <= 0:
+        return False
+    if rate >= 1:
+        return True
+    digest = hashlib.sha256(f"sample:{thread_id}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32 < rate
+
+
+class TurnRecorder(BaseCallbackHandler):
+    """요청 하나의 LLM 응답과 도구 결과를 모은다 (그래프 실행 콜백으로 붙인다)."""
+
+    run_inline = True
+
+    def __init__(self, req: ChatRequest, endpoint: str):
+        self.thread = anonymize_thread(req.user_id)
+        self.endpoint = endpoint
+        self.request = anonymize_request(req)
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        self.llm: List[Dict[str, Any]] = []
+        self.tools: List[Dict[str, Any]] = []
+        self.pending: Dict[UUID, Dict[str, Any]] = {}
+        self.finished = False
+
+    # LLM
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self.pending[run_id] = {"messages": len(messages[0]) if messages else 0, "at": time.perf_counter()}
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        entry = self.pending.pop(run_id, None) or {"messages": 0, "at": time.perf_counter()}
+        generations = getattr(response, "generations", None) or [[]]
+        message = getattr(generations[0][0], "message", None) if generations[0] else None
+        content = getattr(message, "content", "") if message is not None else ""
+        self.llm.append(
+            {
+                "content": mask_value(content),
+                "tool_calls": [
+                    {"name": c["name"], "args": mask_value(c["args"]), "id": c.get("id")}
+                    for c in getattr(message, "tool_calls", None) or []
+                ],
+                "usage": getattr(message, "usage_metadata", None) or {},
+                "messages": entry["messages"],
+                "ms": round((time.perf_counter() - entry["at"]) * 1000, 1),
+            }
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.pending.pop(run_id, None)
+
+    # 도구 (analyze 노드의 질문 분석은 재생 때 그대로 다시 돌므로 tools 노드 것만)
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, metadata=None, inputs=None, **kwargs) -> None:
+        if (metadata or {}).get("langgraph_node") != "tools":
+            return
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        args = inputs if isinstance(inputs, dict) else {"__arg1": input_str}
+        self.pending[run_id] = {"name": name, "args": mask_value(args), "at": time.perf_counter()}
+
+    def finish_tool(self, run_id: UUID, **result) -> None:
+        entry = self.pending.pop(run_id, None)
+        if entry is None:
+            return
+        at = entry.pop("at")
+        self.tools.append({**entry, **result, "ms": round((time.perf_counter() - at) * 1000, 1)})
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        content = getattr(output, "content", output)
+        self.finish_tool(run_id, output=mask_value(content if isinstance(content, (str, list)) else str(content)))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.finish_tool(run_id, error=mask_text(f"{type(error).__name__}: {error}"))
+
+    def finish(self, status: str) -> None:
+        """한 줄 기록. 두 번째 호출부터는 무시."""
+        if self.finished:
+            return
+        self.finished = True
+        export(
+            {
+                "v": RECORD_VERSION,
+                "thread": self.thread,
+                "ts": datetime.fromtimestamp(self.wall, timezone.utc).isoformat(),
+                "endpoint": self.endpoint,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "request": self.request,
+                "llm": self.llm,
+                "tools": self.tools,
+            }
+        )
+
+
+def start_recording(req: ChatRequest, endpoint: str) -> Optional[TurnRecorder]:
+    """녹화 대상 thread면 TurnRecorder (그래프 실행 콜백에 넣는다), 아니면 None"""
+    if not sampled(req.user_id):
+        return None
+    return TurnRecorder(req, endpoint)
+
+
+def record_callbacks(recorder: Optional[TurnRecorder]) -> List[BaseCallbackHandler]:
+    return [] if recorder is None else [recorder]
+
+
+def finish_recording(recorder: Optional[TurnRecorder], status: str) -> None:
+    if recorder is not None:
+        recorder.finish(status)
+
+
+def get_record_sink() -> JsonlSink:
+    """녹화 전용 JSONL 파일 (앱 로그와 별도, 크기 기준 회전, 쓰기는 리스너 스레드)"""
+    global RECORD_SINK
+    if RECORD_SINK is None:
+        RECORD_SINK = JsonlSink(settings.RECORD_FILE, settings.RECORD_MAX_BYTES, settings.RECORD_BACKUPS)
+    return RECORD_SINK
+
+
+def close_record_log() -> None:
+    global RECORD_SINK
+    if RECORD_SINK is not None:
+        RECORD_SINK.close()
+    RECORD_SINK = None
+
+
+def export(record: Dict[str, Any]) -> None:
+    try:
+        get_record_sink().write(record)
+    except OSError as e:
+        logger.warning(f"대화 녹화 기록 실패: {e}")
+
+
+# ===============[읽기]============================
+
+def load_sessions(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """thread별 요청 목록 (시간순). 회전된 파일까지 읽는다."""
+    sessions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for record in read_jsonl(path):
+        if record.get("v") == RECORD_VERSION:
+            sessions[record["thread"]].append(record)
+    for turns in sessions.values():
+        turns.sort(key=lambda r: r["ts"])
+    return dict(sessions)
@@ -0,0 +1,230 @@
+# 공중화장실 위치 검색
+# RESTROOM_CSV(공중화장실정보 표준데이터)를 시작 시 한 번 읽어서 컬럼별 NumPy 배열로 들고 있고,
+# 사용자 GPS 기준 nearest-k를 벡터 연산으로 계산한다.
+import csv
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.geo import bounding_box, haversine_km
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+# 표준데이터 컬럼명 (지자체별로 약간씩 달라서 후보를 순서대로 찾는다)
+NAME_COLS = ["화장실명"]
+ADDRESS_COLS = ["소재지도로명주소", "소재지지번주소"]
+LAT_COLS = ["WGS84위도", "위도"]
+LON_COLS = ["WGS84경도", "경도"]
+HOURS_COLS = ["개방시간상세", "개방시간"]
+PHONE_COLS = ["전화번호"]
+ACCESSIBLE_COLS = ["남성용-장애인용대변기수", "여성용-장애인용대변기수", "남성용-장애인용소변기수"]
+BELL_COLS = ["비상벨설치여부"]
+DIAPER_COLS = ["기저귀교환대유무"]
+
+HOURS_PATTERN = re.compile(r"(\d{1,2})\s*[:시]\s*(\d{2})?\s*분?\s*[~\-]\s*(\d{1,2})\s*[:시]\s*(\d{2})?")
+ALWAYS_OPEN_KEYWORDS = ["24시간", "상시", "연중무휴"]
+
+# 후보 검색 반경(km). None은 전체.
+SEARCH_RADII_KM = [1.0, 4.0, 16.0, None]
+
+
+def pick(row: dict, cols: List[str]) -> str:
+    for col in cols:
+        value = (row.get(col) or "").strip()
+        if value:
+            return value
+    return ""
+
+
+def to_int(value: str) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def is_yes(value: str) -> bool:
+    return value.strip().upper() in ("Y", "YES", "있음", "유", "O", "설치")
+
+
+def parse_hours(text: str):
+    """
+    개방시간 문자열을 (24시간 여부, 여는 분, 닫는 분)으로 변환.
+    알 수 없으면 분 값은 -1.
+    """
+    if any(keyword in text for keyword in ALWAYS_OPEN_KEYWORDS):
+        return True, 0, 24 * 60
+    match = HOURS_PATTERN.search(text)
+    if not match:
+        return False, -1, -1
+    open_min = int(match.group(1)) * 60 + int(match.group(2) or 0)
+    close_min = int(match.group(3)) * 60 + int(match.group(4) or 0)
+    if open_min == 0 and close_min in (0, 24 * 60):
+        return True, 0, 24 * 60
+    return False, open_min, close_min
+
+
+class RestroomIndex:
+    """화장실 데이터를 컬럼별 배열로 보관하는 인덱스"""
+
+    def __init__(self, rows: List[Dict]):
+        self.names = [r["name"] for r in rows]
+        self.addresses = [r["address"] for r in rows]
+        self.hours = [r["hours"] for r in rows]
+        self.phones = [r["phone"] for r in rows]
+        self.lats = np.array([r["lat"] for r in rows], dtype=np.float64)
+        self.lons = np.array([r["lon"] for r in rows], dtype=np.float64)
+        self.open_24h = np.array([r["open_24h"] for r in rows], dtype=bool)
+        self.open_min = np.array([r["open_min"] for r in rows], dtype=np.int16)
+        self.close_min = np.array([r["close_min"] for r in rows], dtype=np.int16)
+        self.accessible = np.array([r["accessible"] for r in rows], dtype=bool)
+        self.emergency_bell = np.array([r["emergency_bell"] for r in rows], dtype=bool)
+        self.diaper_table = np.array([r["diaper_table"] for r in rows], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "RestroomIndex":
+        # 공공데이터 CSV는 cp949인 경우가 많다.
+        for encoding in ("utf-8-sig", "cp949"):
+            try:
+                with open(path, "r", encoding=encoding, newline="") as f:
+                    rows = cls.parse_rows(csv.DictReader(f))
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError(f"CSV 인코딩을 알 수 없음: {path}")
+
+        logger.info(f"화장실 데이터 로드: {len(rows)}개 ({path})")
+        return cls(rows)
+
+    @staticmethod
+    def parse_rows(reader) -> List[Dict]:
+        rows = []
+        for row in reader:
+            try:
+                lat = float(pick(row, LAT_COLS))
+                lon = float(pick(row, LON_COLS))
+            except ValueError:
+                continue    # 좌표 없는 행은 검색 대상이 아님
+            hours = pick(row, HOURS_COLS)
+            open_24h, open_min, close_min = parse_hours(hours)
+            rows.append({
+                "name": pick(row, NAME_COLS),
+                "address": pick(row, ADDRESS_COLS),
+                "hours": hours,
+                "phone": pick(row, PHONE_COLS),
+                "lat": lat,
+                "lon": lon,
+                "open_24h": open_24h,
+                "open_min": open_min,
+                "close_min": close_min,
+                "accessible": any(to_int(row.get(col)) > 0 for col in ACCESSIBLE_COLS),
+                "emergency_bell": is_yes(pick(row, BELL_COLS)),
+                "diaper_table": is_yes(pick(row, DIAPER_COLS)),
+            })
+        return rows
+
+    def open_mask(self, minute: int) -> np.ndarray:
+        """지금(minute, 0~1439) 열려있는 화장실. 자정을 넘기는 시간대도 처리."""
+        known = self.open_min >= 0
+        same_day = (self.open_min <= self.close_min) & (self.open_min <= minute) & (minute < self.close_min)
+        overnight = (self.open_min > self.close_min) & ((minute >= self.open_min) | (minute < self.close_min))
+        return self.open_24h | (known & (same_day | overnight))
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 3,
+        open_now: bool = False,
+        open_24h: bool = False,
+        accessible: bool = False,
+        now: Optional[datetime] = None,
+    ) -> List[dict]:
+        if not self.names:
+            return []
+
+        mask = np.ones(len(self.names), dtype=bool)
+        if open_24h:
+            mask &= self.open_24h
+        if open_now:
+            now = now or datetime.now(KST)
+            mask &= self.open_mask(now.hour * 60 + now.minute)
+        if accessible:
+            mask &= self.accessible
+
+        # 가까운 박스부터 넓혀가며 후보를 좁혀서 haversine 계산량을 줄인다.
+        # 반경 안에 k개가 있어야 박스 밖에 더 가까운 곳이 없다고 보장된다.
+        for radius_km in SEARCH_RADII_KM:
+            if radius_km is None:
+                candidates = np.flatnonzero(mask)
+            else:
+                min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+                candidates = np.flatnonzero(
+                    mask & (self.lats >= min_lat) & (self.lats <= max_lat) & (self.lons >= min_lon) & (self.lons <= max_lon)
+                )
+            distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+            if radius_km is None or np.count_nonzero(distances <= radius_km) >= k:
+                break
+        if candidates.size == 0:
+            return []
+
+        k = min(k, candidates.size)
+        # 전체 정렬 대신 k개만 골라서 정렬
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+
+        results = []
+        for i in top:
+            idx = candidates[i]
+            results.append({
+                "name": self.names[idx],
+                "address": self.addresses[idx],
+                "distance_m": int(round(float(distances[i]) * 1000)),
+                "latitude": float(self.lats[idx]),
+                "longitude": float(self.lons[idx]),
+                "opening_hours": self.hours[idx] or "정보 없음",
+                "open_24h": bool(self.open_24h[idx]),
+                "accessible": bool(self.accessible[idx]),
+                "emergency_bell": bool(self.emergency_bell[idx]),
+                "diaper_table": bool(self.diaper_table[idx]),
+                "phone_number": self.phones[idx],
+            })
+        return results
+
+
+# 시작 시 한 번 로드
+restroom_index: Optional[RestroomIndex] = None
+restroom_loaded = False    # 로드 실패 시 요청마다 재시도하지 않도록
+
+
+def load_restroom_index(path: Optional[str] = None) -> Optional[RestroomIndex]:
+    """RESTROOM_CSV를 읽어서 전역 인덱스로 등록. 설정이 없거나 실패하면 None."""
+    global restroom_index, restroom_loaded
+    restroom_loaded = True
+    path = path or settings.RESTROOM_CSV
+    if not path:
+        logger.warning("RESTROOM_CSV 설정 없음 - 화장실 검색 비활성화")
+        return None
+    try:
+        restroom_index = RestroomIndex.from_csv(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"화장실 데이터 로드 실패: {e}")
+        restroom_index = None
+    return restroom_index
+
+
+def get_restroom_index() -> Optional[RestroomIndex]:
+    if not restroom_loaded:
+        return load_restroom_index()
+    return restroom_index
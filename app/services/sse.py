@@ -0,0 +1,183 @@
+# app/services/sse.py
+# SSE 토큰 스트리밍
+# - 첫 토큰은 바로, 이후 토큰은 모았다가 SSE_FLUSH_MS 또는 SSE_FLUSH_CHARS 중 먼저 도달하면 한 프레임으로 보낸다
+# - 보낼 게 없으면 SSE_HEARTBEAT_SEC마다 주석 프레임(": ping")으로 연결 유지
+# - 마지막은 항상 done 이벤트 (status, 사용량, 시간). 오류면 error 이벤트 다음에 done
+# 프레임 형식은 기존과 같이 data: {"type": ...} 한 줄
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+HEARTBEAT_FRAME = ": ping\n\n"
+ERROR_MESSAGE = "답변 생성 중 오류가 발생했습니다."
+
+
+def sse_frame(data: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class StreamStats:
+    """done 이벤트에 실을 사용량/시간. 토큰을 만드는 쪽이 usage를 채운다."""
+
+    def __init__(self, queue_ms: float = 0.0):
+        self.started = time.perf_counter()
+        self.queue_ms = queue_ms
+        self.first_token_ms: Optional[float] = None
+        self.usage: Dict[str, int] = {}
+        self.chunks = 0
+        self.chars = 0
+        self.frames = 0
+        self.status: Optional[str] = None    # done 이벤트를 보낸 뒤 채워짐
+        self.trace = None                     # 시간 분해를 요청했으면 app.core.tracing.Trace
+
+    def add_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """LLM 청크의 usage_metadata 누적 (input/output/total_tokens)"""
+        for key in ("input_tokens", "output_tokens", "total_tokens"):
+            value = (usage or {}).get(key)
+            if isinstance(value, int):
+                self.usage[key] = self.usage.get(key, 0) + value
+
+    def done(self, status: str) -> Dict[str, Any]:
+        self.status = status
+        event = {
+            "type": "done",
+            "status": status,
+            "usage": self.usage,
+            "stats": {"chunks": self.chunks, "chars": self.chars, "frames": self.frames + 1},
+            "timing": {
+                "queue_ms": round(self.queue_ms, 1),
+                "first_token_ms": round(self.first_token_ms, 1) if self.first_token_ms is not None else None,
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            },
+        }
+        if self.trace is not None:
+            event["trace"] = self.trace.summary()
+        return event
+
+
+async def sse_events(
+    tokens: AsyncIterator[str],
+    stats: Optional[StreamStats] = None,
+    *,
+    flush_ms: Optional[float] = None,
+    flush_chars: Optional[int] = None,
+    heartbeat_sec: Optional[float] = None,
+    error_codes: Optional[Dict[type, str]] = None,
+) -> AsyncIterator[str]:
+    """
+    토큰 이터레이터 → SSE 프레임.
+    토큰은 pump 태스크가 버퍼에 쌓고, 여기서는 프레임을 보낼 때만 깨어난다 (토큰마다 깨어나지 않음).
+    깨우기는 future 하나 + call_later 타이머로 한다 (wait_for는 기다릴 때마다 태스크를 하나 더 만든다).
+    버퍼가 flush_chars를 넘으면 pump는 비워질 때까지 기다린다.
+    error_codes: 예외 타입별 error 이벤트 code (없으면 "internal")
+    """
+    stats = stats or StreamStats()
+    flush_sec = (settings.SSE_FLUSH_MS if flush_ms is None else flush_ms) / 1000.0
+    flush_chars = settings.SSE_FLUSH_CHARS if flush_chars is None else flush_chars
+    heartbeat_sec = settings.SSE_HEARTBEAT_SEC if heartbeat_sec is None else heartbeat_sec
+
+    buffer: List[str] = []
+    buffered = 0
+    buffer_started = 0.0
+    finished = False
+    error: Optional[BaseException] = None
+    loop = asyncio.get_running_loop()
+    waiter: Optional[asyncio.Future] = None    # 버퍼가 처음 채워짐 / 가득 참 / 끝남 / 타임아웃
+    room = asyncio.Event()    # 버퍼에 자리 있음
+    room.set()
+
+    def wake(reason: str = "data") -> None:
+        if waiter is not None and not waiter.done():
+            waiter.set_result(reason)
+
+    async def pump():
+        nonlocal buffered, buffer_started, finished, error
+        try:
+            async for token in tokens:
+                if not token:
+                    continue
+                if stats.first_token_ms is None:
+                    stats.first_token_ms = (time.perf_counter() - stats.started) * 1000
+                if not buffer:
+                    buffer_started = time.perf_counter()
+                    wake()
+                buffer.append(token)
+                buffered += len(token)
+                stats.chunks += 1
+                stats.chars += len(token)
+                if buffered >= flush_chars:
+                    room.clear()
+                    wake()
+                    await room.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            # 연결 종료 등으로 취소될 때 토큰 쪽(그래프 실행)도 정리
+            aclose = getattr(tokens, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        finished = True
+        wake()
+
+    def flush() -> str:
+        nonlocal buffer, buffered
+        frame = sse_frame({"type": "delta", "content": "".join(buffer)})
+        buffer, buffered = [], 0
+        room.set()
+        stats.frames += 1
+        return frame
+
+    worker = asyncio.ensure_future(pump())
+    last_sent = time.perf_counter()
+    try:
+        while True:
+            now = time.perf_counter()
+            # 첫 토큰은 바로 보냄 (체감 첫 응답 시간 유지), 이후부터 묶음
+            first = stats.frames == 0
+            if buffer and (first or finished or buffered >= flush_chars or now - buffer_started >= flush_sec):
+                yield flush()
+                last_sent = time.perf_counter()
+                continue
+            if finished:
+                break
+            if buffer:
+                timeout: Optional[float] = buffer_started + flush_sec - now
+            else:
+                timeout = last_sent + heartbeat_sec - now if heartbeat_sec > 0 else None
+            waiter = loop.create_future()
+            timer = loop.call_later(max(0.0, timeout), wake, "timeout") if timeout is not None else None
+            try:
+                reason = await waiter
+            finally:
+                waiter = None
+                if timer is not None:
+                    timer.cancel()
+            if reason == "timeout" and not buffer:
+                last_sent = time.perf_counter()
+                yield HEARTBEAT_FRAME
+    finally:
+        if not worker.done():
+            worker.cancel()
+            await asyncio.wait({worker})
+
+    status = "ok"
+    if error is not None:
+        code = next((c for t, c in (error_codes or {}).items() if isinstance(error, t)), "internal")
+        status = "error" if code == "internal" else code
+        if code == "internal":
+            logger.error(f"스트리밍 오류: {error}")
+            message = ERROR_MESSAGE
+        else:
+            message = str(error) or code
+        stats.frames += 1
+        yield sse_frame({"type": "error", "code": code, "message": message})
+    yield sse_frame(stats.done(status))
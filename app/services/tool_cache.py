@@ -0,0 +1,101 @@
+# app/services/tool_cache.py
+# 배치 안에서 도구 결과 공유 (/v1/chatbot/batch)
+# - 같은 배치의 요청들은 같은 ToolCache를 본다 (contextvar, 배치 밖에서는 캐시 없이 그대로 호출).
+# - 키가 같은 호출이 동시에 들어오면 외부 요청은 한 번만 하고 결과를 나눠 받는다.
+# - 실패/취소된 호출은 남기지 않는다 (다음 호출이 다시 시도).
+# - 호출은 shield로 보호되므로 배치가 끝나면 close()로 아직 진행 중인 호출을 취소한다 (기다리는 쪽이 없어도 남지 않게).
+import asyncio
+import copy
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.core.metrics import TOOL_CACHE_COALESCED, TOOL_CACHE_ERROR, TOOL_CACHE_HIT, TOOL_CACHE_MISS
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+def cache_key(name: str, *args, **kwargs) -> Tuple[str, str]:
+    return name, json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ToolCache:
+    def __init__(self):
+        self.entries: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0    # 같은 호출이 진행 중이라 기다려서 받은 수
+        self.misses = 0
+        self.errors = 0
+        self.abandoned = 0    # close() 때 아직 진행 중이라 취소한 호출 수
+        self.closed = False
+
+    async def get_or_call(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.entries.get(key)
+        if task is None:
+            self.misses += 1
+            TOOL_CACHE_MISS.inc()
+            task = asyncio.ensure_future(factory())
+            self.entries[key] = task
+            task.add_done_callback(lambda t: self.forget_failed(key, t))
+        elif task.done():
+            self.hits += 1
+            TOOL_CACHE_HIT.inc()
+        else:
+            self.coalesced += 1
+            TOOL_CACHE_COALESCED.inc()
+        # 먼저 부른 요청이 취소돼도 기다리는 다른 요청을 위해 호출은 계속 진행
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def forget_failed(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.closed:
+            return
+        if task.cancelled() or task.exception() is not None:
+            self.errors += 1
+            TOOL_CACHE_ERROR.inc()
+            if self.entries.get(key) is task:
+                del self.entries[key]
+
+    async def close(self) -> None:
+        """진행 중인 호출 취소 (배치 종료 시). 이후 캐시는 쓰지 않는다."""
+        self.closed = True
+        pending = [t for t in self.entries.values() if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.abandoned += len(pending)
+            logger.info(f"도구 캐시 종료 - 진행 중인 호출 {len(pending)}건 취소")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "errors": self.errors,
+            "abandoned": self.abandoned,
+        }
+
+
+TOOL_CACHE: ContextVar[Optional[ToolCache]] = ContextVar("tool_cache", default=None)
+
+
+@contextmanager
+def tool_cache_scope(cache: ToolCache) -> Iterator[ToolCache]:
+    """이 안에서 시작한 태스크(그래프 실행, 도구 호출)는 cache를 공유한다."""
+    token = TOOL_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        TOOL_CACHE.reset(token)
+
+
+async def cached_call(key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+    cache = TOOL_CACHE.get()
+    if cache is None:
+        return await factory()
+    return await cache.get_or_call(key, factory)
@@ -1,30 +1,35 @@
 # 필요한 라이브러리 로드
-import os
-import requests
 from bs4 import BeautifulSoup
+import httpx
 import re
 import random
+import threading
+from typing import Optional
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.geo import parse_coordinates
+from app.core.http import get_http_client
+from app.services.restroom_module import get_restroom_index
+from app.services.tool_cache import cache_key, cached_call
+from app.services.tool_registry import TOOL_REGISTRY, declare_tool
+from app.spots.executor import EmbeddingExecutor
+from app.spots.geo_index import get_spot_geo_index, reset_spot_geo_index
+from app.spots.manifest import index_version
+from app.spots.retriever import (
+    DEFAULT_K,
+    DEFAULT_SCORE_THRESHOLD,
+    build_spot_retriever,
+    load_embeddings,
+    search_by_vector,
+)
 
-from langchain.agents import Tool
-from langchain_core.tools import tool
-from langchain_chroma import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_tavily import TavilySearch
-from langchain_community.utilities import OpenWeatherMapAPIWrapper
+from langchain_core.tools import Tool
 
 # 로거 설정
 logger = get_logger(__name__)
 
-# 환경 변수 설정
-os.environ["HF_TOKEN"] = settings.HUGGINGFACE_API_KEY
-os.environ["TAVILY_API_KEY"] = settings.TAVILY_API_KEY
-os.environ["OPENWEATHERMAP_API_KEY"] = settings.OPENWEATHERMAP_API_KEY
-os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
-os.environ["USER_AGENT"] = settings.USER_AGENT
+# API 키는 os.environ에 쓰지 않고 settings에서 읽어 각 클라이언트에 넘긴다
 KAKAO_REST_API_KEY = settings.KAKAO_REST_API_KEY
 
 # URL, DATA PATH 설정
@@ -36,38 +41,81 @@ EMBEDDING_MODEL = settings.EMBEDDING_MODEL
 # Lazy Singletone 설정
 embeddings = None
 spot_retriever = None
+spot_retriever_version = None    # 리트리버를 만들 당시의 spots 인덱스 버전
+spot_executor = None
+embeddings_lock = threading.Lock()    # 실행 풀의 여러 스레드가 동시에 모델을 올리지 않도록
 
 def get_embeddings():
     global embeddings
     if embeddings is None:
-        embeddings = SentenceTransformerEmbeddings(
-            model_name=EMBEDDING_MODEL,
-            model_kwargs={"device": "cpu"},
-            encode_kwargs={"normalize_embeddings": True},
-        )
+        with embeddings_lock:
+            if embeddings is None:
+                embeddings = load_embeddings(EMBEDDING_MODEL)
     return embeddings
 
-def get_spot_retriever():
+def get_spot_executor() -> EmbeddingExecutor:
+    """임베딩/검색용 실행 풀 (이벤트 루프 밖에서 CPU 작업 수행)"""
+    global spot_executor
+    if spot_executor is None:
+        spot_executor = EmbeddingExecutor(
+            lambda texts: get_embeddings().embed_documents(texts),
+            workers=settings.SPOT_EXECUTOR_WORKERS or None,
+            window_ms=settings.SPOT_BATCH_WINDOW_MS,
+            max_batch=settings.SPOT_MAX_BATCH,
+        )
+    return spot_executor
+
+def shutdown_spot_executor():
+    global spot_executor
+    if spot_executor is not None:
+        spot_executor.shutdown()
+        spot_executor = None
+
+def invalidate_spot_caches():
+    """spots 인덱스에 의존하는 캐시를 비운다. (적재 CLI가 인덱스를 갱신한 경우)"""
     global spot_retriever
+    spot_retriever = None
+    reset_spot_geo_index()
+    # Chroma는 경로별 클라이언트(HNSW 인덱스 포함)를 프로세스 전역에 캐시한다.
+    from chromadb.api.client import SharedSystemClient
+    SharedSystemClient.clear_system_cache()
+    logger.info("spots 인덱스 캐시 무효화")
+
+def get_spot_retriever():
+    global spot_retriever, spot_retriever_version
+    version = index_version(DB_PATH)
+    if spot_retriever is not None and version != spot_retriever_version:
+        invalidate_spot_caches()
     if spot_retriever is None:
-        emb = get_embeddings()
-        store = Chroma(
-            collection_name="spots_db",
-            embedding_function=emb,
-            persist_directory=DB_PATH,
-        )
-        spot_retriever = store.as_retriever(
-            search_type="similarity_score_threshold",
-            search_kwargs={"score_threshold": 0.5, "k": 1},
-            )
+        spot_retriever_version = version
+        spot_retriever = build_spot_retriever(get_embeddings())
     return spot_retriever
 
 
 # ===============[Tool]============================
 
+# 질문/입력 분석용 패턴 (임포트 때 한 번 컴파일, prefork 모드에서는 마스터가 만들어 워커들이 공유)
+NEARBY_PATTERNS = [
+    re.compile(r"([가-힣]+역)\s*근처"),
+    re.compile(r"([가-힣]+동)\s*근처"),
+    re.compile(r"([가-힣]+구)\s*근처"),
+    re.compile(r"([가-힣]+)\s*근처"),
+]
+NEARBY_PLACE_PATTERNS = NEARBY_PATTERNS + [re.compile(r"([가-힣]+)\s*주변")]
+WEATHER_LOCATION_PATTERN = re.compile(r"([가-힣]+)\s*날씨")
+REVIEW_PLACE_PATTERNS = [
+    re.compile(r"([가-힣a-zA-Z0-9\s]+)\s*후기"),
+    re.compile(r"([가-힣a-zA-Z0-9\s]+)\s*리뷰"),
+    re.compile(r"([가-힣a-zA-Z0-9\s]+)\s*어떤가"),
+    re.compile(r"([가-힣a-zA-Z0-9\s]+)\s*평가"),
+]
+GPS_LABELED_PATTERN = re.compile(r"위도:\s*([0-9.-]+).*?경도:\s*([0-9.-]+)")
+GPS_PAIR_PATTERN = re.compile(r"([0-9.-]+),\s*([0-9.-]+)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 # 1. 질문 분리 및 분석 tool
-@tool
-def analyze_user_question(user_question: str, user_lat: str = None, user_lon: str = None) -> dict:
+@declare_tool()
+def analyze_user_question(user_question: str, user_lat: Optional[str] = None, user_lon: Optional[str] = None) -> dict:
     """사용자의 질문을 분석하여 어떤 종류의 질문인지 분류하고 필요한 정보를 추출합니다."""
     
     question_types = {
@@ -78,6 +126,7 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
         "weather": False,      # 날씨 관련
         "blog_review": False,  # 블로그 후기 관련
         "route": False,        # 길찾기 관련
+        "restroom": False,     # 화장실 찾기 관련
         "clarification_needed": False  # 질문 명확화 필요
     }
     
@@ -113,6 +162,13 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
     if any(keyword in question_lower for keyword in ["관광", "여행", "명소", "볼거리", "인천", "스팟"]):
         question_types["tourism"] = True
         extracted_info["query"] = user_question
+
+        # "근처 볼거리"처럼 현재 위치 기준 질문
+        if any(keyword in question_lower for keyword in ["근처", "가까운", "주변", "여기"]):
+            question_types["location"] = True
+            extracted_info["location"] = "current_location"
+            extracted_info["location_type"] = "current_location"
+            extracted_info["needs_current_location"] = not extracted_info["has_coordinates"]
     
     # 맛집 관련 질문 확인
     if any(keyword in question_lower for keyword in ["맛집", "음식점", "식당", "밥", "먹을곳"]):
@@ -124,16 +180,9 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
             question_types["location"] = True
             
             # 1단계: 구체적인 위치명이 있는지 먼저 확인
-            location_patterns = [
-                r"([가-힣]+역)\s*근처",
-                r"([가-힣]+동)\s*근처", 
-                r"([가-힣]+구)\s*근처",
-                r"([가-힣]+)\s*근처"
-            ]
-            
             location_found = False
-            for pattern in location_patterns:
-                match = re.search(pattern, user_question)
+            for pattern in NEARBY_PATTERNS:
+                match = pattern.search(user_question)
                 if match:
                     # 구체적인 장소명이 있으면 query를 해당 장소명으로, location은 None으로 설정
                     extracted_info["query"] = match.group(1)
@@ -173,16 +222,9 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
             question_types["location"] = True
             
             # 1단계: 구체적인 위치명이 있는지 먼저 확인
-            location_patterns = [
-                r"([가-힣]+역)\s*근처",
-                r"([가-힣]+동)\s*근처", 
-                r"([가-힣]+구)\s*근처",
-                r"([가-힣]+)\s*근처"
-            ]
-            
             location_found = False
-            for pattern in location_patterns:
-                match = re.search(pattern, user_question)
+            for pattern in NEARBY_PATTERNS:
+                match = pattern.search(user_question)
                 if match:
                     # 구체적인 장소명이 있으면 query를 해당 장소명으로, location은 None으로 설정
                     extracted_info["query"] = match.group(1)
@@ -216,7 +258,7 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
     if any(keyword in question_lower for keyword in ["날씨", "기온", "비", "맑음"]):
         question_types["weather"] = True
         # 위치 정보 추출
-        location_match = re.search(r"([가-힣]+)\s*날씨", user_question)
+        location_match = WEATHER_LOCATION_PATTERN.search(user_question)
         if location_match:
             extracted_info["location"] = location_match.group(1)
 
@@ -225,14 +267,8 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
     if any(keyword in question_lower for keyword in ["후기", "리뷰", "블로그", "평가", "어떤가"]):
         question_types["blog_review"] = True
         # 장소명 추출
-        place_patterns = [
-            r"([가-힣a-zA-Z0-9\s]+)\s*후기",
-            r"([가-힣a-zA-Z0-9\s]+)\s*리뷰",
-            r"([가-힣a-zA-Z0-9\s]+)\s*어떤가",
-            r"([가-힣a-zA-Z0-9\s]+)\s*평가"
-        ]
-        for pattern in place_patterns:
-            match = re.search(pattern, user_question)
+        for pattern in REVIEW_PLACE_PATTERNS:
+            match = pattern.search(user_question)
             if match:
                 extracted_info["place_name"] = match.group(1).strip()
                 break
@@ -252,6 +288,15 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
         elif any(keyword in question_lower for keyword in ["차", "자동차", "운전", "드라이브"]):
             extracted_info["transport_mode"] = "car"
 
+    # 화장실 찾기 관련 질문 확인
+    if any(keyword in question_lower for keyword in ["화장실", "공중화장실", "restroom", "toilet"]):
+        question_types["restroom"] = True
+        question_types["location"] = True
+        extracted_info["query"] = user_question
+        extracted_info["location"] = "current_location"
+        extracted_info["location_type"] = "current_location"
+        extracted_info["needs_current_location"] = not extracted_info["has_coordinates"]
+
     # 질문이 명확하지 않은 경우 확인
     if not any(question_types.values()):
         question_types["clarification_needed"] = True
@@ -267,11 +312,41 @@ def analyze_user_question(user_question: str, user_lat: str = None, user_lon: st
     }
 
 # vectordb tool
-@tool("vectordb_search")
-def search_spot_tool_in_db(query: str) -> list:
-    """Use this tool to search information about Incheon's tour spots from the vector database"""
-    retriever = get_spot_retriever()
-    docs = retriever.get_relevant_documents(query)
+@declare_tool("vectordb_search")
+async def search_spot_tool_in_db(query: str, latitude: str = None, longitude: str = None) -> list:
+    """Use this tool to search information about Incheon's tour spots from the vector database.
+    If the user's GPS latitude/longitude is known, pass them to get nearby spots first."""
+    return await cached_call(
+        cache_key("vectordb_search", query, latitude, longitude),
+        lambda: search_spots(query, latitude, longitude),
+    )
+
+
+async def search_spots(query: str, latitude: str = None, longitude: str = None) -> list:
+    # 임베딩과 검색은 실행 풀에서 (동시 질의는 한 번의 encode로 묶임)
+    executor = get_spot_executor()
+    query_vector = await executor.aembed_query(query)
+
+    coords = parse_coordinates(latitude, longitude) if latitude and longitude else None
+    if coords:
+        # 반경 안 관광지만 벡터 점수를 매기고, 유사도와 거리를 섞어서 정렬
+        geo_index = await executor.run(get_spot_geo_index, DB_PATH)
+        nearby = geo_index.search(
+            query_vector,
+            coords[0],
+            coords[1],
+            k=settings.SPOT_GEO_K,
+            radius_km=settings.SPOT_GEO_RADIUS_KM,
+            distance_weight=settings.SPOT_GEO_DISTANCE_WEIGHT,
+        )
+        if nearby:
+            return nearby
+        logger.info(f"반경 {settings.SPOT_GEO_RADIUS_KM}km 안에 관광지 없음 - 전체 검색으로 대체")
+
+    retriever = await executor.run(get_spot_retriever)
+    docs = await executor.run(
+        search_by_vector, retriever.vectorstore, query_vector, DEFAULT_K, DEFAULT_SCORE_THRESHOLD
+    )
     return [
         {
             "content": d.page_content,
@@ -280,212 +355,194 @@ def search_spot_tool_in_db(query: str) -> list:
         for d in docs
     ]
 
-# 2. tavily search tool
-search_tool_in_web = TavilySearch(
-    max_results=5,
-    search_depth="advanced",
-    include_answer=True,
-    include_images=True,
-)
+# 2. tavily search tool (langchain_tavily는 도구를 처음 쓸 때 임포트)
+def build_web_search():
+    from langchain_tavily import TavilySearch
 
-# 3. 날씨 tool
-weather = OpenWeatherMapAPIWrapper()
-open_weather_map = Tool(
-    name="weather",
-    func=weather.run,
-    description="Use this tool to search weather information for a given location."
-)
+    class CachedTavilySearch(TavilySearch):
+        """배치 안에서 같은 검색은 한 번만 (tool_cache)"""
 
+        async def _arun(self, query: str, run_manager=None, **kwargs):
+            search = super()._arun
+            return await cached_call(
+                cache_key("tavily", query, **kwargs),
+                lambda: search(query, run_manager=run_manager, **kwargs),
+            )
 
+    return CachedTavilySearch(
+        max_results=5,
+        search_depth="advanced",
+        include_answer=True,
+        include_images=True,
+        # 키/주소를 넘기면 래퍼를 새로 만들므로 설정했을 때만 (없으면 TAVILY_API_KEY 환경 변수)
+        **({"tavily_api_key": settings.TAVILY_API_KEY} if settings.TAVILY_API_KEY else {}),
+        **({"api_base_url": settings.TAVILY_URL} if settings.TAVILY_URL else {}),
+    )
 
-# 5. 카페 추천 tool
-@tool
-def get_near_cafe_in_kakao(query: str, location: str = None, latitude: str = None, longitude: str = None) -> list:
-    """사용자에게 카페를 추천합니다. 위치 정보가 있으면 해당 지역 근처의 카페를 검색합니다."""
-    # KAKAO local 사용
-    url = KAKAO_URL + "/local/search/keyword.json"
-    headers = {
-        "Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"
-    }
-    
-    # 검색어 설정
-    search_query = query
-    if location:
-        search_query = f"{location} {query}"
-    else:
-        # location이 없으면 인천으로 고정
-        search_query = f"인천 {query}"
-    
-    params = {
-        "query": search_query,
-        "category_group_code": "CE7",
-        "size": "5",
-        "radius": "1000",
-    }
-    
-    # GPS 좌표가 있으면 추가
-    if latitude and longitude:
-        params["x"] = str(longitude)  # 카카오 API는 경도가 x, 위도가 y
-        params["y"] = str(latitude)
-        params["radius"] = "2000"  # GPS 좌표 기반이면 검색 반경을 늘림
 
-    response = requests.get(url=url, headers=headers, params=params)
+TOOL_REGISTRY.declare("tavily_search", build_web_search)
 
-    spots = []
+# 3. 날씨 tool
+# OpenWeatherMap current weather API를 httpx로 직접 호출 (pyowm은 동기 + 주소 고정이라 대체 서버를 못 씀)
+# 결과 문자열은 기존 OpenWeatherMapAPIWrapper와 같은 형식
+OPENWEATHERMAP_URL = settings.OPENWEATHERMAP_URL or "https://api.openweathermap.org"
+
+
+def format_weather(location: str, data: dict) -> str:
+    weather_info = (data.get("weather") or [{}])[0]
+    wind = data.get("wind", {})
+    main = data.get("main", {})
+    return (
+        f"In {location}, the current weather is as follows:\n"
+        f"Detailed status: {weather_info.get('description')}\n"
+        f"Wind speed: {wind.get('speed')} m/s, direction: {wind.get('deg')}°\n"
+        f"Humidity: {main.get('humidity')}%\n"
+        f"Temperature: \n"
+        f"  - Current: {main.get('temp')}°C\n"
+        f"  - High: {main.get('temp_max')}°C\n"
+        f"  - Low: {main.get('temp_min')}°C\n"
+        f"  - Feels like: {main.get('feels_like')}°C\n"
+        f"Rain: {data.get('rain', {})}\n"
+        f"Heat index: None\n"
+        f"Cloud cover: {data.get('clouds', {}).get('all')}%"
+    )
+
+
+async def aweather(location: str) -> str:
+    async def fetch():
+        response = await get_http_client().get(
+            OPENWEATHERMAP_URL + "/data/2.5/weather",
+            params={"q": location, "appid": settings.OPENWEATHERMAP_API_KEY, "units": "metric"},
+        )
+        if response.status_code != 200:
+            logger.error(f"날씨 API 요청 실패. 응답 코드: {response.status_code}")
+            raise Exception(f"날씨 API 요청 실패. 응답 코드: {response.status_code}")
+        return format_weather(location, response.json())
+
+    return await cached_call(cache_key("weather", location), fetch)
+
+
+TOOL_REGISTRY.declare(
+    "weather",
+    lambda: Tool(
+        name="weather",
+        func=None,
+        coroutine=aweather,
+        description="Use this tool to search weather information for a given location."
+    ),
+)
 
-    # 요청 성공 확인
-    if response.status_code == 200:
-        response = response.json()
-        spots_info = response["documents"]
-        for spot_info in spots_info:
-            name = spot_info["place_name"]
-            spot_url = spot_info["place_url"]
-            address = spot_info["road_address_name"]
-            phone = spot_info["phone"]
-            latitude = spot_info["y"]
-            longitude = spot_info["x"]
-            info = {
-                "name": name,
-                "address": address,
-                "latitude": latitude,
-                "longitude": longitude,
-                "place_url": spot_url,
-                "phone_number": phone
-            }
-            spots.append(info)
-    else:
-        logger.error(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        # print(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        raise Exception(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
 
-    if len(spots) > 3:
-        spots = random.sample(spots, 3)
 
-    return spots
+# Kakao API 호출 (httpx 비동기: 그래프 실행이 취소되면 요청도 같이 끊김)
+async def kakao_get(path: str, params: dict) -> dict:
+    async def fetch():
+        response = await get_http_client().get(
+            KAKAO_URL + path,
+            headers={"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"},
+            params=params,
+        )
+        if response.status_code != 200:
+            logger.error(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
+            raise Exception(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
+        return response.json()
 
-# 6. 맛집 추천 tool
-@tool
-def get_near_restaurant_in_kakao(query: str, location: str = None, latitude: str = None, longitude: str = None) -> list:
-    """사용자에게 음식점이나 식당을 추천합니다. 위치 정보가 있으면 해당 지역 근처의 맛집을 검색합니다."""
-    # KAKAO local 사용
-    url = KAKAO_URL + "/local/search/keyword.json"
-    headers = {
-        "Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"
-    }
-    
+    return await cached_call(cache_key("kakao", path, **params), fetch)
+
+
+async def search_kakao_places(
+    category: str, query: str, location: str = None, latitude: str = None, longitude: str = None
+) -> list:
+    """카카오 로컬 키워드 검색 (category: CE7 카페, FD6 음식점), 최대 3곳"""
     # 검색어 설정
-    search_query = query
     if location:
         search_query = f"{location} {query}"
     else:
         # location이 없으면 인천으로 고정
         search_query = f"인천 {query}"
-    
+
     params = {
         "query": search_query,
-        "category_group_code": "FD6",
+        "category_group_code": category,
         "size": "5",
         "radius": "1000",
     }
-    
+
     # GPS 좌표가 있으면 추가
     if latitude and longitude:
         params["x"] = str(longitude)  # 카카오 API는 경도가 x, 위도가 y
         params["y"] = str(latitude)
         params["radius"] = "2000"  # GPS 좌표 기반이면 검색 반경을 늘림
 
-    response = requests.get(url=url, headers=headers, params=params)
+    response = await kakao_get("/local/search/keyword.json", params)
 
     spots = []
-
-    # 요청 성공 확인
-    if response.status_code == 200:
-        response = response.json()
-        spots_info = response["documents"]
-        for spot_info in spots_info:
-            name = spot_info["place_name"]
-            spot_url = spot_info["place_url"]
-            address = spot_info["road_address_name"]
-            phone = spot_info["phone"]
-            latitude = spot_info["y"]
-            longitude = spot_info["x"]
-            info = {
-                "name": name,
-                "address": address,
-                "latitude": latitude,
-                "longitude": longitude,
-                "place_url": spot_url,
-                "phone_number": phone
-            }
-            spots.append(info)
-    else:
-        # print(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        logger.error(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        raise Exception(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
+    for spot_info in response["documents"]:
+        spots.append({
+            "name": spot_info["place_name"],
+            "address": spot_info["road_address_name"],
+            "latitude": spot_info["y"],
+            "longitude": spot_info["x"],
+            "place_url": spot_info["place_url"],
+            "phone_number": spot_info["phone"],
+        })
 
     if len(spots) > 3:
         spots = random.sample(spots, 3)
 
     return spots
 
+
+# 5. 카페 추천 tool
+@declare_tool()
+async def get_near_cafe_in_kakao(query: str, location: str = None, latitude: str = None, longitude: str = None) -> list:
+    """사용자에게 카페를 추천합니다. 위치 정보가 있으면 해당 지역 근처의 카페를 검색합니다."""
+    return await search_kakao_places("CE7", query, location, latitude, longitude)
+
+# 6. 맛집 추천 tool
+@declare_tool()
+async def get_near_restaurant_in_kakao(query: str, location: str = None, latitude: str = None, longitude: str = None) -> list:
+    """사용자에게 음식점이나 식당을 추천합니다. 위치 정보가 있으면 해당 지역 근처의 맛집을 검색합니다."""
+    return await search_kakao_places("FD6", query, location, latitude, longitude)
+
 # 7. 블로그 서치 tool
-@tool
-def search_blog(query: str) -> list:
+@declare_tool()
+async def search_blog(query: str) -> list:
     """특정 장소(place_name)에 대한 추가적인 정보인 블로그 후기를 위한 블로그 리스트를 반환합니다."""
     # 블로그 찾기
-    url = KAKAO_URL + "/search/blog"
-    headers = {
-        "Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"
-    }
-    params = {
-        "query": query,
-        "size": "10"
-    }
-    response = requests.get(url=url, headers=headers, params=params)
+    response = await kakao_get("/search/blog", {"query": query, "size": "10"})
 
     blog_list = []
-
-    if response.status_code == 200:
-        response = response.json()
-        for document in response["documents"]:
-            title = document.get("title")
-            contents = document.get("contents")
-            blog_name = document.get("blogname")
-            blog_url = document.get("url")
-            info = {
-                "title": title,
-                "contents": contents,
-                "blog_name": blog_name,
-                "blog_url": blog_url,
-            }
-            blog_list.append(info)
-
-    else:
-        # print(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        logger.error(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
-        raise Exception(f"HTTP 요청 실패. 응답 코드: {response.status_code}")
+    for document in response["documents"]:
+        blog_list.append({
+            "title": document.get("title"),
+            "contents": document.get("contents"),
+            "blog_name": document.get("blogname"),
+            "blog_url": document.get("url"),
+        })
 
     return blog_list
 
 # 8. 블로그 내용 크롤링 및 요약 tool
-@tool
-def get_detail_info(url: str) -> str:
+@declare_tool()
+async def get_detail_info(url: str) -> str:
     """주어진 블로그 URL(blog_url)에서 주요 본문을 추출하고, 3문장으로 요약합니다."""
+    async def fetch():
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        return response.text
+
     try:
-        loader = WebBaseLoader(url)
-        data = loader.load()
-        
-        if not data:
-            return "블로그 내용을 가져올 수 없습니다."
-        
-        content = data[0].page_content
-        
+        html = await cached_call(cache_key("page", url), fetch)
+
         # HTML 태그 제거
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
         text_content = soup.get_text()
+        if not text_content.strip():
+            return "블로그 내용을 가져올 수 없습니다."
         
         # 불필요한 공백 제거
-        text_content = re.sub(r'\s+', ' ', text_content).strip()
+        text_content = WHITESPACE_PATTERN.sub(' ', text_content).strip()
         
         # 내용이 너무 길면 앞부분만 반환
         if len(text_content) > 1000:
@@ -497,7 +554,7 @@ def get_detail_info(url: str) -> str:
         return f"블로그 내용을 가져오는 중 오류가 발생했습니다: {str(e)}"
 
 # 9. 질문 명확화 요청 tool
-@tool
+@declare_tool()
 def ask_for_clarification(question: str) -> str:
     """사용자의 질문이 명확하지 않을 때 구체적으로 물어봅니다."""
     clarification_questions = [
@@ -510,11 +567,9 @@ def ask_for_clarification(question: str) -> str:
     return f"아직 정확히 이해하지 못했어요. {question}에 대해 좀 더 자세히 설명해주세요!"
 
 # 10. GPS 좌표 파싱 tool
-@tool
+@declare_tool()
 def parse_gps_coordinates(user_input: str) -> dict:
     """사용자 입력에서 GPS 좌표를 파싱합니다."""
-    import re
-    
     result = {
         "latitude": None,
         "longitude": None,
@@ -523,8 +578,7 @@ def parse_gps_coordinates(user_input: str) -> dict:
     }
     
     # 패턴 1: "위도: X, 경도: Y" 형식
-    pattern1 = r"위도:\s*([0-9.-]+).*?경도:\s*([0-9.-]+)"
-    match1 = re.search(pattern1, user_input)
+    match1 = GPS_LABELED_PATTERN.search(user_input)
     
     if match1:
         result["latitude"] = float(match1.group(1))
@@ -533,8 +587,7 @@ def parse_gps_coordinates(user_input: str) -> dict:
         return result
     
     # 패턴 2: "X, Y" 형식 (위도, 경도 순서)
-    pattern2 = r"([0-9.-]+),\s*([0-9.-]+)"
-    match2 = re.search(pattern2, user_input)
+    match2 = GPS_PAIR_PATTERN.search(user_input)
     
     if match2:
         # 위도는 -90~90, 경도는 -180~180 범위로 판단
@@ -555,8 +608,8 @@ def parse_gps_coordinates(user_input: str) -> dict:
     return result
 
 # 11. 위치 기반 맛집 검색 통합 tool
-@tool
-def search_restaurants_by_location(user_input: str) -> dict:
+@declare_tool()
+async def search_restaurants_by_location(user_input: str) -> dict:
     """사용자 입력을 분석하여 위치 기반으로 맛집을 검색합니다."""
     # GPS 좌표 파싱
     gps_info = parse_gps_coordinates(user_input)
@@ -578,7 +631,8 @@ def search_restaurants_by_location(user_input: str) -> dict:
     
     if gps_info["has_coordinates"]:
         # GPS 좌표 기반 검색
-        restaurants = get_near_restaurant_in_kakao(
+        restaurants = await search_kakao_places(
+            "FD6",
             query=query,
             latitude=str(gps_info["latitude"]),
             longitude=str(gps_info["longitude"])
@@ -588,23 +642,16 @@ def search_restaurants_by_location(user_input: str) -> dict:
         
     elif "근처" in user_input or "주변" in user_input:
         # 위치명 기반 검색
-        location_patterns = [
-            r"([가-힣]+역)\s*근처",
-            r"([가-힣]+동)\s*근처", 
-            r"([가-힣]+구)\s*근처",
-            r"([가-힣]+)\s*근처",
-            r"([가-힣]+)\s*주변"
-        ]
-        
         location = None
-        for pattern in location_patterns:
-            match = re.search(pattern, user_input)
+        for pattern in NEARBY_PLACE_PATTERNS:
+            match = pattern.search(user_input)
             if match:
                 location = match.group(1)
                 break
         
         if location:
-            restaurants = get_near_restaurant_in_kakao(
+            restaurants = await search_kakao_places(
+                "FD6",
                 query=query,
                 location=location
             )
@@ -624,8 +671,8 @@ def search_restaurants_by_location(user_input: str) -> dict:
     return result
 
 # 12. 위치 기반 카페 검색 통합 tool
-@tool
-def search_cafes_by_location(user_input: str) -> dict:
+@declare_tool()
+async def search_cafes_by_location(user_input: str) -> dict:
     """사용자 입력을 분석하여 위치 기반으로 카페를 검색합니다."""
     # GPS 좌표 파싱
     gps_info = parse_gps_coordinates(user_input)
@@ -647,7 +694,8 @@ def search_cafes_by_location(user_input: str) -> dict:
     
     if gps_info["has_coordinates"]:
         # GPS 좌표 기반 검색
-        cafes = get_near_cafe_in_kakao(
+        cafes = await search_kakao_places(
+            "CE7",
             query=query,
             latitude=str(gps_info["latitude"]),
             longitude=str(gps_info["longitude"])
@@ -657,23 +705,16 @@ def search_cafes_by_location(user_input: str) -> dict:
         
     elif "근처" in user_input or "주변" in user_input:
         # 위치명 기반 검색
-        location_patterns = [
-            r"([가-힣]+역)\s*근처",
-            r"([가-힣]+동)\s*근처", 
-            r"([가-힣]+구)\s*근처",
-            r"([가-힣]+)\s*근처",
-            r"([가-힣]+)\s*주변"
-        ]
-        
         location = None
-        for pattern in location_patterns:
-            match = re.search(pattern, user_input)
+        for pattern in NEARBY_PLACE_PATTERNS:
+            match = pattern.search(user_input)
             if match:
                 location = match.group(1)
                 break
         
         if location:
-            cafes = get_near_cafe_in_kakao(
+            cafes = await search_kakao_places(
+                "CE7",
                 query=query,
                 location=location
             )
@@ -694,8 +735,8 @@ def search_cafes_by_location(user_input: str) -> dict:
 
 
 # 13. Kakao 맵 장소 검색 tool
-@tool
-def resolve_place(query: str) -> dict:
+@declare_tool()
+async def resolve_place(query: str) -> dict:
     """장소명을 kakao local API로 검색해 좌표를 반환한다."""
     url = KAKAO_URL + "/local/search/keyword.json"
     headers = {
@@ -706,13 +747,17 @@ def resolve_place(query: str) -> dict:
         "size": "3"
     }
 
-    try:
-        response = requests.get(url=url, headers=headers, params=params)
+    async def fetch():
+        response = await get_http_client().get(url, headers=headers, params=params)
         response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+        return response.json()
+
+    try:
+        data = await cached_call(cache_key("kakao", "/local/search/keyword.json", **params), fetch)
+    except httpx.HTTPError as e:
         return {"error": f"Kakao API 요청 실패: {e}"}
 
-    docs = response.json().get("documents", [])
+    docs = data.get("documents", [])
     if not docs:
         return {"error": "검색 결과 없음"}
 
@@ -729,7 +774,7 @@ def resolve_place(query: str) -> dict:
     }
 
 # 14. Kakao 맵 길찾기 링크 생성 tool
-@tool
+@declare_tool()
 def build_kakaomap_route(start_lat: str, start_lon: str, end_lat: str, end_lon: str, by: str = "car") -> dict:
     """출발지, 도착지, 이동수단으로 카카오맵 길찾기 앱/웹 링크를 생성합니다."""
     # 이동수단별 카카오맵 파라미터 매핑
@@ -761,3 +806,31 @@ def build_kakaomap_route(start_lat: str, start_lon: str, end_lat: str, end_lon:
         "transport_type": transport_descriptions.get(transport_type, "자동차"),
         "message": f"카카오맵 {transport_descriptions.get(transport_type, '자동차')} 길찾기 링크를 생성했습니다."
     }
+
+# 15. 가까운 공중화장실 tool
+@declare_tool()
+def find_nearest_restroom(
+    latitude: str,
+    longitude: str,
+    k: int = 3,
+    open_now: bool = False,
+    open_24h: bool = False,
+    accessible: bool = False,
+) -> dict:
+    """사용자 GPS 위치에서 가장 가까운 공중화장실을 찾습니다.
+    open_now=True면 지금 열려있는 곳, open_24h=True면 24시간 개방, accessible=True면 장애인용 화장실만 찾습니다."""
+    coords = parse_coordinates(latitude, longitude)
+    if coords is None:
+        return {"restrooms": [], "message": "현재 위치 정보가 필요합니다. GPS 좌표를 입력해주세요."}
+
+    index = get_restroom_index()
+    if index is None:
+        return {"restrooms": [], "message": "화장실 데이터를 사용할 수 없습니다."}
+
+    restrooms = index.nearest(
+        coords[0], coords[1], k=max(1, min(int(k), 10)),
+        open_now=open_now, open_24h=open_24h, accessible=accessible,
+    )
+    if not restrooms:
+        return {"restrooms": [], "message": "조건에 맞는 화장실을 찾지 못했습니다."}
+    return {"restrooms": restrooms, "message": f"가장 가까운 화장실 {len(restrooms)}곳을 찾았습니다."}
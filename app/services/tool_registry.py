@@ -0,0 +1,80 @@
+# app/services/tool_registry.py
+# 도구 레지스트리 (임포트 시점에는 선언만, 실제 도구 객체는 처음 쓸 때 또는 워밍업 때 생성)
+# - declare_tool: 함수에 붙이면 이름과 빌더만 등록하고 함수는 그대로 돌려준다 (모듈 안에서 일반 함수로 호출 가능).
+# - 무거운 의존성(langchain_tavily 등)은 빌더 안에서 임포트한다.
+# - get_tool(name): 처음 호출 때 한 번만 만든다 (스레드 안전).
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, tool
+
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+class ToolRegistry:
+    def __init__(self):
+        self.builders: Dict[str, Callable[[], BaseTool]] = {}
+        self.built: Dict[str, BaseTool] = {}
+        self.lock = threading.Lock()
+
+    def declare(self, name: str, build: Callable[[], BaseTool]) -> None:
+        if name in self.builders:
+            raise ValueError(f"이미 등록된 도구: {name}")
+        self.builders[name] = build
+
+    def get(self, name: str) -> BaseTool:
+        found = self.built.get(name)
+        if found is None:
+            if name not in self.builders:
+                raise KeyError(f"등록되지 않은 도구: {name}")
+            with self.lock:
+                found = self.built.get(name)
+                if found is None:
+                    found = self.builders[name]()
+                    self.built[name] = found
+        return found
+
+    def names(self) -> List[str]:
+        return list(self.builders)
+
+    def tools(self, names: Optional[List[str]] = None) -> List[BaseTool]:
+        return [self.get(name) for name in (names or self.names())]
+
+    def warmup(self, names: Optional[List[str]] = None) -> Dict[str, float]:
+        """아직 안 만든 도구를 만들고 도구별 생성 시간(ms)을 돌려준다"""
+        timings = {}
+        for name in names or self.names():
+            if name in self.built:
+                continue
+            started = time.perf_counter()
+            self.get(name)
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"도구 워밍업: {len(timings)}개, {round(sum(timings.values()), 1)}ms")
+        return timings
+
+    def reset(self) -> None:
+        """만든 도구만 버린다 (선언은 유지)"""
+        with self.lock:
+            self.built.clear()
+
+
+TOOL_REGISTRY = ToolRegistry()
+
+
+def declare_tool(name: Optional[str] = None):
+    """@tool 대신 붙인다: 도구(StructuredTool)는 get_tool로 처음 꺼낼 때 만든다"""
+
+    def register(fn):
+        tool_name = name or fn.__name__
+        TOOL_REGISTRY.declare(tool_name, lambda: tool(tool_name)(fn))
+        return fn
+
+    return register
+
+
+def get_tool(name: str) -> BaseTool:
+    return TOOL_REGISTRY.get(name)
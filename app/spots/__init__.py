@@ -0,0 +1 @@
+# 관광지 벡터DB(spots_db) 적재 및 관리
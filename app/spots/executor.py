@@ -0,0 +1,119 @@
+# 임베딩/검색 실행 서비스
+# SentenceTransformer encode와 벡터 검색은 CPU 작업이라 이벤트 루프에서 돌리면
+# 다른 사용자의 스트리밍 응답까지 멈춘다. 전용 스레드 풀에서 실행하고,
+# 짧은 시간 창(window) 안에 들어온 질의들을 모아서 한 번의 encode로 처리한다.
+#
+# 프로세스 풀 대신 스레드 풀을 쓰는 이유:
+# - torch/numpy 연산은 GIL을 놓고 돌기 때문에 스레드로도 코어를 활용할 수 있다.
+# - 프로세스마다 모델(수백 MB)을 따로 올릴 필요가 없다.
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set, Tuple
+
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+class EmbeddingExecutor:
+    """
+    비동기 API:
+        vector = await executor.aembed_query("월미도 볼거리")
+        result = await executor.run(cpu_bound_fn, arg1, arg2)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        workers: Optional[int] = None,
+        window_ms: float = 5.0,
+        max_batch: int = 32,
+    ):
+        self.embed_fn = embed_fn
+        self.workers = workers or os.cpu_count() or 1
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="spots-embed")
+
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # 실행 중인 배치 태스크 (참조를 잡아 두지 않으면 GC될 수 있다)
+        self.tasks: Set[asyncio.Task] = set()
+
+        # 통계
+        self.stats = {"queries": 0, "batches": 0, "max_batch_seen": 0, "encode_seconds": 0.0}
+
+    async def run(self, fn: Callable, *args):
+        """CPU 작업을 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, fn, *args)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """질의 1개 임베딩. 동시에 들어온 질의들과 묶여서 한 번에 encode된다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((text, future))
+        self.stats["queries"] += 1
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending[: self.max_batch], self.pending[self.max_batch:]
+        task = asyncio.get_running_loop().create_task(self.encode_batch(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+        # 남은 질의가 있으면 다음 창을 예약
+        if self.pending:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    async def encode_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        started = time.perf_counter()
+        try:
+            vectors = await self.run(self.embed_fn, texts)
+        except asyncio.CancelledError:
+            # shutdown으로 취소되면 기다리던 요청도 함께 취소
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"임베딩 배치 실패 ({len(texts)}건): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(texts))
+        self.stats["encode_seconds"] += time.perf_counter() - started
+
+        for (_, future), vector in zip(batch, vectors):
+            # 기다리던 요청이 취소됐을 수 있음
+            if not future.done():
+                future.set_result(vector)
+
+    def shutdown(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        for task in list(self.tasks):
+            task.cancel()
+        for _, future in self.pending:
+            future.cancel()
+        self.pending = []
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,137 @@
+# 위치 기반 관광지 검색 인덱스
+# spots_db의 좌표/임베딩을 NumPy 배열로 들고 있다가,
+# 반경 필터(haversine) -> 벡터 유사도 -> 거리 가중 합산 순서로 순위를 매긴다.
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.geo import bounding_box, haversine_km
+from app.core.logging import get_logger
+from app.spots.ingest import COLLECTION_NAME, LAT_FIELDS, LON_FIELDS, first_value, to_float
+from app.spots.manifest import index_version
+
+# 로거 생성
+logger = get_logger(__name__)
+
+
+class SpotGeoIndex:
+    """좌표가 있는 관광지만 모아 둔 column-oriented 인덱스"""
+
+    def __init__(self, ids: List[str], lats, lons, vectors, documents: List[str], metadatas: List[dict]):
+        self.ids = ids
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        self.documents = documents
+        self.metadatas = metadatas
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 1000) -> "SpotGeoIndex":
+        ids, lats, lons, vectors, documents, metadatas = [], [], [], [], [], []
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=page_size,
+                offset=offset,
+            )
+            page_ids = page["ids"]
+            if not page_ids:
+                break
+            for i, doc_id in enumerate(page_ids):
+                meta = page["metadatas"][i] or {}
+                lat = to_float(first_value(meta, LAT_FIELDS))
+                lon = to_float(first_value(meta, LON_FIELDS))
+                if lat is None or lon is None:
+                    continue
+                ids.append(doc_id)
+                lats.append(lat)
+                lons.append(lon)
+                vectors.append(page["embeddings"][i])
+                documents.append(page["documents"][i])
+                metadatas.append(meta)
+            offset += len(page_ids)
+
+        logger.info(f"위치 인덱스 로드: 좌표 보유 관광지 {len(ids)}개")
+        return cls(ids, lats, lons, vectors, documents, metadatas)
+
+    def search(
+        self,
+        query_vector,
+        lat: float,
+        lon: float,
+        k: int = 3,
+        radius_km: float = 3.0,
+        distance_weight: float = 0.3,
+        min_similarity: float = 0.0,
+    ) -> List[dict]:
+        """
+        반경 안의 관광지만 벡터 유사도를 계산하고,
+        (1 - w) * 유사도 + w * (1 - 거리/반경) 점수로 정렬한다.
+        """
+        if not self.ids:
+            return []
+
+        # 1차: 위경도 박스로 후보를 좁힌 뒤 2차: 정확한 haversine 거리
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        candidates = np.flatnonzero(
+            (self.lats >= min_lat) & (self.lats <= max_lat) & (self.lons >= min_lon) & (self.lons <= max_lon)
+        )
+        if candidates.size == 0:
+            return []
+
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        in_radius = distances <= radius_km
+        candidates = candidates[in_radius]
+        distances = distances[in_radius]
+        if candidates.size == 0:
+            return []
+
+        # 임베딩은 정규화되어 있으므로 내적 = 코사인 유사도
+        query = np.asarray(query_vector, dtype=np.float32)
+        similarities = self.vectors[candidates] @ query
+
+        keep = similarities >= min_similarity
+        candidates, distances, similarities = candidates[keep], distances[keep], similarities[keep]
+        if candidates.size == 0:
+            return []
+
+        scores = (1.0 - distance_weight) * similarities + distance_weight * (1.0 - distances / radius_km)
+        top = np.argsort(-scores)[:k]
+
+        return [
+            {
+                "content": self.documents[candidates[i]],
+                "metadata": self.metadatas[candidates[i]],
+                "distance_km": round(float(distances[i]), 3),
+                "similarity": round(float(similarities[i]), 4),
+                "score": round(float(scores[i]), 4),
+            }
+            for i in top
+        ]
+
+
+# Lazy Singleton: spots 인덱스 버전이 바뀌면 다시 로드
+geo_index: Optional[SpotGeoIndex] = None
+geo_index_version = None
+
+
+def reset_spot_geo_index() -> None:
+    global geo_index, geo_index_version
+    geo_index = None
+    geo_index_version = None
+
+
+def get_spot_geo_index(db_path: str) -> SpotGeoIndex:
+    global geo_index, geo_index_version
+    version = index_version(db_path)
+    if geo_index is None or version != geo_index_version:
+        import chromadb
+
+        client = chromadb.PersistentClient(path=db_path)
+        geo_index = SpotGeoIndex.from_collection(client.get_or_create_collection(COLLECTION_NAME))
+        geo_index_version = version
+    return geo_index
@@ -0,0 +1,262 @@
+# spots_db 증분 적재 CLI
+# 사용 예:
+#   python -m app.spots.ingest data/spots.csv
+#   python -m app.spots.ingest data/spots.jsonl --batch-size 128 --prune
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.spots.manifest import load_manifest, save_manifest
+
+# 로거 생성
+logger = get_logger(__name__)
+
+COLLECTION_NAME = "spots_db"
+
+# 원천 데이터마다 컬럼명이 달라서 흔히 쓰이는 이름을 순서대로 찾는다.
+ID_FIELDS = ["id", "spot_id", "contentid", "관광지ID"]
+NAME_FIELDS = ["name", "title", "관광지명", "명칭"]
+TEXT_FIELDS = ["name", "title", "관광지명", "address", "addr1", "주소", "description", "overview", "설명", "개요"]
+LAT_FIELDS = ["latitude", "lat", "mapy", "위도"]
+LON_FIELDS = ["longitude", "lon", "lng", "mapx", "경도"]
+
+
+def read_records(path: str, encoding: str = "utf-8-sig") -> Iterator[dict]:
+    """CSV/JSONL 원천 파일을 한 줄씩 스트리밍으로 읽는다."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding=encoding, newline="") as f:
+        if ext == ".csv":
+            for row in csv.DictReader(f):
+                yield row
+        elif ext in (".jsonl", ".ndjson"):
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    logger.warning(f"JSONL 파싱 실패 (line {line_no}): {e}")
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식: {path}")
+
+
+def first_value(record: dict, fields: List[str]):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_document(record: dict) -> Optional[dict]:
+    """
+    원천 레코드를 {id, text, metadata, hash} 형태로 변환.
+    본문이 비어있는 레코드는 None.
+    """
+    texts = []
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value and value not in texts:
+            texts.append(value)
+    text = "\n".join(texts)
+    if not text:
+        return None
+
+    name = first_value(record, NAME_FIELDS)
+    doc_id = first_value(record, ID_FIELDS)
+    if doc_id is None:
+        # id가 없으면 이름+본문으로 안정적인 id를 만든다.
+        doc_id = hashlib.sha1(f"{name}|{text}".encode("utf-8")).hexdigest()[:16]
+    doc_id = str(doc_id)
+
+    # Chroma 메타데이터는 str/int/float/bool만 허용
+    metadata = {}
+    for key, value in record.items():
+        if value in (None, "") or key is None:
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            metadata[str(key)] = value
+    metadata["spot_id"] = doc_id
+    if name is not None:
+        metadata["name"] = str(name)
+
+    lat = to_float(first_value(record, LAT_FIELDS))
+    lon = to_float(first_value(record, LON_FIELDS))
+    if lat is not None and lon is not None:
+        metadata["latitude"] = lat
+        metadata["longitude"] = lon
+
+    payload = json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False, sort_keys=True)
+    content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    metadata["content_hash"] = content_hash
+
+    return {"id": doc_id, "text": text, "metadata": metadata, "hash": content_hash}
+
+
+def batched(items: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_collection(db_path: str):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=db_path)
+    # langchain_chroma.Chroma와 같은 기본 설정으로 열어야 기존 컬렉션과 호환된다.
+    return client.get_or_create_collection(COLLECTION_NAME)
+
+
+def ingest(
+    source: str,
+    db_path: str,
+    embedding_model: str,
+    batch_size: int = 64,
+    prune: bool = False,
+    force: bool = False,
+    encoding: str = "utf-8-sig",
+    embeddings=None,
+    collection=None,
+) -> dict:
+    """
+    원천 파일을 배치 단위로 임베딩해서 spots_db에 upsert.
+    - 매니페스트의 content hash와 같으면 임베딩/쓰기를 건너뛴다.
+    - prune=True면 원천에 없는 문서를 삭제한다.
+    반환: 처리 통계(리포트)
+    """
+    if embeddings is None:
+        from app.spots.retriever import load_embeddings
+
+        embeddings = load_embeddings(embedding_model)
+    if collection is None:
+        collection = get_collection(db_path)
+
+    manifest = load_manifest(db_path)
+    known: Dict[str, str] = manifest.get("documents", {})
+    # 임베딩 모델이 바뀌면 모든 벡터를 다시 만들어야 한다.
+    if manifest.get("embedding_model") != embedding_model:
+        if known:
+            logger.info(f"임베딩 모델 변경 감지: {manifest.get('embedding_model')} -> {embedding_model}")
+        force = True
+
+    stats = {"read": 0, "skipped": 0, "upserted": 0, "invalid": 0, "deleted": 0, "batches": 0}
+    seen = set()
+    documents: Dict[str, str] = dict(known)
+
+    started = time.perf_counter()
+    embed_seconds = 0.0
+
+    def documents_stream() -> Iterator[dict]:
+        for record in read_records(source, encoding=encoding):
+            stats["read"] += 1
+            doc = build_document(record)
+            if doc is None:
+                stats["invalid"] += 1
+                continue
+            if doc["id"] in seen:
+                logger.warning(f"중복 id 건너뜀: {doc['id']}")
+                continue
+            seen.add(doc["id"])
+            if not force and known.get(doc["id"]) == doc["hash"]:
+                stats["skipped"] += 1
+                continue
+            yield doc
+
+    try:
+        for batch in batched(documents_stream(), batch_size):
+            t0 = time.perf_counter()
+            vectors = embeddings.embed_documents([d["text"] for d in batch])
+            embed_seconds += time.perf_counter() - t0
+
+            collection.upsert(
+                ids=[d["id"] for d in batch],
+                embeddings=vectors,
+                documents=[d["text"] for d in batch],
+                metadatas=[d["metadata"] for d in batch],
+            )
+            for d in batch:
+                documents[d["id"]] = d["hash"]
+            stats["upserted"] += len(batch)
+            stats["batches"] += 1
+            logger.info(f"배치 {stats['batches']} 적재 완료: {len(batch)}건 (누적 {stats['upserted']}건)")
+
+        if prune:
+            stale = [doc_id for doc_id in documents if doc_id not in seen]
+            for chunk in batched(stale, batch_size):
+                collection.delete(ids=chunk)
+            for doc_id in stale:
+                documents.pop(doc_id, None)
+            stats["deleted"] = len(stale)
+    finally:
+        elapsed = time.perf_counter() - started
+        changed = stats["upserted"] > 0 or stats["deleted"] > 0 or force
+        # 변경이 있을 때만 버전을 올려서, 의존 캐시가 불필요하게 무효화되지 않게 한다.
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ") if changed else manifest.get("version")
+        save_manifest(db_path, {
+            "version": version,
+            "collection": COLLECTION_NAME,
+            "embedding_model": embedding_model,
+            "source": os.path.abspath(source),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "count": len(documents),
+            "documents": documents,
+        })
+
+    stats["version"] = version
+    stats["elapsed_sec"] = round(elapsed, 3)
+    stats["docs_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed > 0 else 0.0
+    stats["embedded_docs_per_sec"] = round(stats["upserted"] / embed_seconds, 1) if embed_seconds > 0 else 0.0
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="spots_db 증분 적재")
+    parser.add_argument("source", help="관광지 원천 데이터 (CSV/JSONL)")
+    parser.add_argument("--db-path", default=settings.DB_PATH, help="Chroma 저장 경로 (기본: DB_PATH)")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL, help="임베딩 모델 (기본: EMBEDDING_MODEL)")
+    parser.add_argument("--batch-size", type=int, default=settings.SPOT_INGEST_BATCH_SIZE)
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV 인코딩 (공공데이터는 cp949인 경우가 많음)")
+    parser.add_argument("--prune", action="store_true", help="원천에 없는 문서 삭제")
+    parser.add_argument("--force", action="store_true", help="해시와 무관하게 전체 재임베딩")
+    args = parser.parse_args(argv)
+
+    if not args.db_path or not args.model:
+        parser.error("DB_PATH, EMBEDDING_MODEL 설정이 필요합니다.")
+
+    stats = ingest(
+        source=args.source,
+        db_path=args.db_path,
+        embedding_model=args.model,
+        batch_size=args.batch_size,
+        prune=args.prune,
+        force=args.force,
+        encoding=args.encoding,
+    )
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
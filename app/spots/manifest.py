@@ -0,0 +1,68 @@
+# spots_db 매니페스트 관리
+# 적재 CLI가 기록하고, 벡터DB에 의존하는 캐시들이 버전 비교에 사용한다.
+import json
+import os
+from typing import Dict, Optional
+
+from app.core.logging import get_logger
+
+# 로거 생성
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "spots_manifest.json"
+
+# 매니페스트 버전 캐시: {경로: (mtime_ns, version)}
+version_cache: Dict[str, tuple] = {}
+
+
+def manifest_path(db_path: str) -> str:
+    """DB_PATH 안에 저장되는 매니페스트 파일 경로"""
+    return os.path.join(db_path, MANIFEST_NAME)
+
+
+def load_manifest(db_path: str) -> dict:
+    """매니페스트를 읽어서 반환(없으면 빈 매니페스트)."""
+    path = manifest_path(db_path)
+    if not os.path.exists(path):
+        return {"version": None, "documents": {}}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(db_path: str, manifest: dict) -> None:
+    """임시 파일에 먼저 쓰고 교체해서, 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 한다."""
+    os.makedirs(db_path, exist_ok=True)
+    path = manifest_path(db_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def index_version(db_path: Optional[str]) -> Optional[str]:
+    """
+    현재 spots 인덱스 버전을 반환.
+    파일 mtime이 바뀌었을 때만 다시 읽으므로 요청마다 호출해도 stat 1번 비용이다.
+    """
+    if not db_path:
+        return None
+
+    path = manifest_path(db_path)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = version_cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    try:
+        version = load_manifest(db_path).get("version")
+    except (OSError, ValueError) as e:
+        logger.warning(f"매니페스트 읽기 실패: {path}, error: {e}")
+        return cached[1] if cached else None
+
+    version_cache[path] = (mtime_ns, version)
+    return version
@@ -0,0 +1,88 @@
+# spots 리트리버 생성
+# 서비스(tool_module)와 벤치마크가 같은 설정 경로로 리트리버를 만든다.
+import os
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.spots.ingest import COLLECTION_NAME
+
+# 로거 생성
+logger = get_logger(__name__)
+
+# 서비스 기본값
+DEFAULT_K = 1
+DEFAULT_SCORE_THRESHOLD = 0.5
+DEFAULT_SEARCH_TYPE = "similarity_score_threshold"
+BACKENDS = ("chroma", "faiss")
+
+
+def load_embeddings(model_name: Optional[str] = None):
+    from langchain_community.embeddings import SentenceTransformerEmbeddings
+
+    # 허깅페이스 토큰은 모델을 받을 때만 필요하다 (이미 설정된 환경 변수가 우선)
+    if settings.HUGGINGFACE_API_KEY:
+        os.environ.setdefault("HF_TOKEN", settings.HUGGINGFACE_API_KEY)
+    return SentenceTransformerEmbeddings(
+        model_name=model_name or settings.EMBEDDING_MODEL,
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
+
+def load_vectorstore(embeddings, backend: str = "chroma"):
+    """backend: chroma(DB_PATH) 또는 faiss(FAISS_DIR)"""
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+
+        return Chroma(
+            collection_name=COLLECTION_NAME,
+            embedding_function=embeddings,
+            persist_directory=settings.DB_PATH,
+        )
+    if backend == "faiss":
+        from langchain_community.vectorstores import FAISS
+
+        if not settings.FAISS_DIR:
+            raise ValueError("FAISS_DIR 설정이 필요합니다.")
+        # 직접 만든 인덱스만 읽으므로 pickle 역직렬화 허용
+        return FAISS.load_local(settings.FAISS_DIR, embeddings, allow_dangerous_deserialization=True)
+    raise ValueError(f"지원하지 않는 backend: {backend} (가능: {', '.join(BACKENDS)})")
+
+
+def build_spot_retriever(
+    embeddings,
+    k: int = DEFAULT_K,
+    score_threshold: float = DEFAULT_SCORE_THRESHOLD,
+    search_type: str = DEFAULT_SEARCH_TYPE,
+    backend: str = "chroma",
+):
+    """
+    search_type: similarity | similarity_score_threshold | mmr
+    score_threshold는 similarity_score_threshold일 때만 사용된다.
+    """
+    store = load_vectorstore(embeddings, backend)
+    search_kwargs = {"k": k}
+    if search_type == "similarity_score_threshold":
+        search_kwargs["score_threshold"] = score_threshold
+    logger.debug(f"spots 리트리버 생성: backend={backend}, search_type={search_type}, kwargs={search_kwargs}")
+    return store.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+
+
+def search_by_vector(store, vector, k: int = DEFAULT_K, score_threshold: Optional[float] = DEFAULT_SCORE_THRESHOLD):
+    """
+    미리 계산한 질의 벡터로 검색 (임베딩을 다른 곳에서 배치로 처리할 때 사용).
+    similarity_score_threshold 리트리버와 같은 관련도 기준으로 거른다.
+    """
+    if hasattr(store, "similarity_search_by_vector_with_relevance_scores"):
+        docs_and_distances = store.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+    else:
+        docs_and_distances = store.similarity_search_with_score_by_vector(vector, k=k)
+
+    # 두 백엔드 모두 거리(낮을수록 유사)를 돌려주므로 관련도 점수로 변환
+    relevance_fn = store._select_relevance_score_fn()
+    return [
+        doc
+        for doc, distance in docs_and_distances
+        if score_threshold is None or relevance_fn(distance) >= score_threshold
+    ]
@@ -0,0 +1 @@
+# 성능/품질 벤치마크 모음
@@ -0,0 +1,290 @@
+# /v1/chat(SSE), /v1/chatbot 부하 생성기: 한국어 질문 묶음으로 동시 사용자를 흉내 낸다
+# 사용 예:
+#   python -m benchmarks.chat_load --local --concurrency 8,32 --duration 30
+#   python -m benchmarks.chat_load --target http://127.0.0.1:8000 --endpoint chat --requests 500
+#
+# --local: 외부 API 대역 서버(benchmarks.fake_upstreams)와 앱(uvicorn app.main:app)을 임시 디렉토리(MEMORY_DB, 로그)로
+#   띄우고 OPENAI_BASE_URL/KAKAO_URL/TAVILY_URL/OPENWEATHERMAP_URL을 대역 서버로 맞춘다. 외부 API 키/요금 없이 돈다.
+#   대역 서버 지연은 --ttft-ms, --token-ms 등으로 조절 (--target을 쓰면 앱은 직접 띄운다).
+# 동시 사용자(--concurrency) 각각이 질문 묶음(QUESTION_MIX)에서 가중치대로 대화 하나를 골라 --turns 턴까지 이어서 묻고,
+# 끝나면 새 user_id로 다음 대화를 시작한다 (같은 thread에 동시 요청은 없음).
+#
+# 지표
+#   throughput_rps  : 성공 요청 수 / 경과 시간
+#   latency_ms_*    : 요청 시작 → 응답 끝 (chat: done 이벤트까지) p50/p95/p99
+#   ttft_ms_*       : (chat만) 요청 시작 → 첫 delta 프레임
+#   error_rate      : (HTTP 오류 + done.status != ok + 연결 오류) / 요청 수, 종류별 건수는 errors
+#   upstream_calls  : (--local) 요청당 대역 서버 호출 수 (경로별)
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "chat_load.jsonl")
+ENDPOINTS = ("chat", "chatbot")
+
+# (가중치, 첫 질문, 이어지는 질문들)
+QUESTION_MIX: List[Tuple[int, str, List[str]]] = [
+    (25, "차이나타운 근처 맛집 추천해줘", ["거기 가격대는 어때?", "웨이팅 길어?"]),
+    (20, "월미도 근처 분위기 좋은 카페 알려줘", ["주차도 돼?", "디저트 맛있는 곳은?"]),
+    (15, "오늘 인천 날씨 어때?", ["그럼 뭐 입고 나가면 좋을까?", "저녁에는 추워?"]),
+    (15, "송도 센트럴파크 블로그 후기 찾아줘", ["사진 찍기 좋은 곳도 있어?", "아이랑 가도 괜찮아?"]),
+    (15, "인천 가볼만한 관광 명소 추천해줘", ["하루 코스로 짜줘", "대중교통으로 갈 수 있어?"]),
+    (10, "안녕! 넌 누구야?", ["인천 토박이라며?", "고마워!"]),
+]
+
+
+def pick_conversation(rng: random.Random) -> List[str]:
+    weights = [w for w, _, _ in QUESTION_MIX]
+    _, first, follow_ups = rng.choices(QUESTION_MIX, weights=weights)[0]
+    return [first] + follow_ups
+
+
+async def call_chat(client: httpx.AsyncClient, body: dict) -> Tuple[str, Optional[float]]:
+    """SSE를 끝까지 읽고 (결과, 첫 delta까지 ms). 결과는 ok 또는 오류 종류"""
+    started = time.perf_counter()
+    ttft_ms = None
+    async with client.stream("POST", "/v1/chat", json=body) as response:
+        if response.status_code != 200:
+            return f"http_{response.status_code}", None
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            if event.get("type") == "delta" and ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            elif event.get("type") == "done":
+                status = event.get("status")
+                return ("ok" if status == "ok" else f"done_{status}"), ttft_ms
+    return "no_done", ttft_ms
+
+
+async def call_chatbot(client: httpx.AsyncClient, body: dict) -> Tuple[str, Optional[float]]:
+    response = await client.post("/v1/chatbot", json=body)
+    if response.status_code != 200:
+        return f"http_{response.status_code}", None
+    return "ok", None
+
+
+async def run_load(
+    target: str,
+    endpoint: str,
+    concurrency: int,
+    duration: float,
+    requests: Optional[int],
+    turns: int,
+    seed: int,
+    timeout: float,
+) -> dict:
+    call = call_chat if endpoint == "chat" else call_chatbot
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    outcomes: Counter = Counter()
+    issued = 0
+    run_id = f"{int(time.time())}-{seed}"
+    deadline = time.perf_counter() + duration
+
+    def more() -> bool:
+        if requests is not None:
+            return issued < requests
+        return time.perf_counter() < deadline
+
+    async def user(worker: int, client: httpx.AsyncClient):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + worker)
+        session = 0
+        while more():
+            session += 1
+            user_id = f"load-{endpoint}-{run_id}-{worker}-{session}"
+            for question in pick_conversation(rng)[:turns]:
+                if not more():
+                    return
+                issued += 1
+                body = {"user_question": question, "user_id": user_id}
+                started = time.perf_counter()
+                try:
+                    outcome, ttft_ms = await call(client, body)
+                except httpx.HTTPError as e:
+                    outcome, ttft_ms = type(e).__name__, None
+                outcomes[outcome] += 1
+                if outcome != "ok":
+                    break    # 대화가 깨지면 새 사용자로
+                latencies.append((time.perf_counter() - started) * 1000)
+                if ttft_ms is not None:
+                    ttfts.append(ttft_ms)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(i, client) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, ttfts, outcomes, elapsed)
+
+
+def summarize(latencies: List[float], ttfts: List[float], outcomes: Counter, elapsed: float) -> dict:
+    total = sum(outcomes.values())
+    metrics = {
+        "requests": total,
+        "elapsed_sec": round(elapsed, 2),
+        "throughput_rps": round(outcomes["ok"] / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round((total - outcomes["ok"]) / total, 4) if total else 0.0,
+        "errors": {k: v for k, v in outcomes.items() if k != "ok"},
+    }
+    for name, values in (("latency_ms", latencies), ("ttft_ms", ttfts)):
+        if values:
+            for p in (50, 95, 99):
+                metrics[f"{name}_p{p}"] = round(percentile(values, p), 1)
+    return metrics
+
+
+# ===============[--local: 대역 서버 + 앱 띄우기]============================
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} 프로세스가 종료됨 (code {proc.returncode})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} 준비 시간 초과")
+
+
+def start_local(args, tmp: str) -> Tuple[str, str, List[subprocess.Popen]]:
+    """대역 서버와 앱을 띄우고 (앱 주소, 대역 서버 주소, 프로세스들)"""
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    fake = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_upstreams", "--port", str(args.fake_port),
+            "--ttft-ms", str(args.ttft_ms), "--token-ms", str(args.token_ms),
+            "--answer-tokens", str(args.answer_tokens), "--error-rate", str(args.upstream_error_rate),
+        ]
+    )
+    procs = [fake]
+    wait_ready(f"{fake_url}/_stats", fake)
+
+    env = dict(os.environ)
+    # 대역 서버는 키를 보지 않지만 앱은 시작할 때 키가 있어야 한다
+    for key in ("OPENAI_API_KEY", "UPSTAGE_API_KEY", "HUGGINGFACE_API_KEY", "TAVILY_API_KEY",
+                "OPENWEATHERMAP_API_KEY", "KAKAO_REST_API_KEY", "USER_AGENT"):
+        env.setdefault(key, "load-test")
+    env.update(
+        {
+            "OPENAI_BASE_URL": f"{fake_url}/v1",
+            "KAKAO_URL": fake_url,
+            "TAVILY_URL": fake_url,
+            "OPENWEATHERMAP_URL": fake_url,
+            "MEMORY_DB": os.path.join(tmp, "memory.db"),
+            "LOG_FILE": os.path.join(tmp, "app.log"),
+            "LOG_LEVEL": "WARNING",
+            "TRACE_FILE": os.path.join(tmp, "traces.jsonl"),
+        }
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning",
+         "--workers", str(args.workers)],
+        env=env,
+    )
+    procs.append(app)
+    wait_ready(f"{app_url}/ready", app)
+    while httpx.get(f"{app_url}/ready").json().get("status") != "ready":
+        time.sleep(0.2)
+    return app_url, fake_url, procs
+
+
+def stop_local(procs: List[subprocess.Popen]) -> None:
+    for proc in reversed(procs):
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def upstream_calls(fake_url: Optional[str]) -> Dict[str, int]:
+    if not fake_url:
+        return {}
+    return httpx.get(f"{fake_url}/_stats").json()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="/v1/chat, /v1/chatbot 부하 생성기")
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="앱 주소 (--local이면 무시)")
+    parser.add_argument("--endpoint", default=",".join(ENDPOINTS), help="쉼표 구분 (chat,chatbot)")
+    parser.add_argument("--concurrency", default="8,32", help="쉼표 구분 동시 사용자 수")
+    parser.add_argument("--duration", type=float, default=20.0, help="단계별 실행 시간(초)")
+    parser.add_argument("--requests", type=int, default=None, help="단계별 요청 수 (주면 --duration 대신)")
+    parser.add_argument("--turns", type=int, default=3, help="대화당 최대 턴 수")
+    parser.add_argument("--warmup", type=int, default=3, help="측정 전 요청 수 (지연 로딩 제외)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="대역 서버 + 앱을 직접 띄움")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--workers", type=int, default=1, help="(--local) uvicorn 워커 수")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="(--local) 대역 LLM 첫 청크 지연")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="(--local) 대역 LLM 토큰 간격")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="(--local) 대역 LLM 답변 토큰 수")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="(--local) 대역 서버 500 비율")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    with tempfile.TemporaryDirectory() as tmp:
+        procs: List[subprocess.Popen] = []
+        fake_url = None
+        target = args.target
+        try:
+            if args.local:
+                target, fake_url, procs = start_local(args, tmp)
+            for endpoint in args.endpoint.split(","):
+                if args.warmup:
+                    asyncio.run(run_load(target, endpoint, 1, 0, args.warmup, args.turns, args.seed + 999, args.timeout))
+                for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                    before = upstream_calls(fake_url)
+                    metrics = asyncio.run(
+                        run_load(target, endpoint, concurrency, args.duration, args.requests, args.turns, args.seed,
+                                 args.timeout)
+                    )
+                    after = upstream_calls(fake_url)
+                    if fake_url and metrics["requests"]:
+                        metrics["upstream_calls"] = {
+                            path: round((count - before.get(path, 0)) / metrics["requests"], 2)
+                            for path, count in after.items()
+                            if path != "/_stats" and count > before.get(path, 0)
+                        }
+                    record = {
+                        "benchmark": "chat_load",
+                        **info,
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "turns": args.turns,
+                        "local": args.local,
+                        "fake": {"ttft_ms": args.ttft_ms, "token_ms": args.token_ms, "workers": args.workers}
+                        if args.local else None,
+                        "metrics": metrics,
+                    }
+                    append_jsonl(args.output, record)
+                    print(json.dumps(record, ensure_ascii=False))
+        finally:
+            stop_local(procs)
+
+
+if __name__ == "__main__":
+    main()
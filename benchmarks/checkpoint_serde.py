@@ -0,0 +1,172 @@
+# 체크포인트 직렬화 벤치마크: 기존 serde vs zstd 압축 vs zstd + 학습 사전
+# 사용 예:
+#   python -m benchmarks.checkpoint_serde --threads 64 --steps 20
+#
+# 합성 대화: 스텝마다 사용자 질문 + 도구 결과(관광지/화장실 JSON) + 답변이 메시지 목록에 쌓인다.
+# 사전은 측정과 다른 seed로 만든 대화에서 학습한다 (같은 데이터로 학습/측정하면 압축률이 부풀려짐).
+#
+# 지표
+#   ratio          : 직렬화 원본 bytes / 저장 bytes
+#   dumps/loads_us : 체크포인트 1개 직렬화/역직렬화 시간
+#   write/read_ms  : aput + aput_writes / aget_tuple 지연
+#   bytes_per_step : 스텝당 DB 파일 증가량 (WAL 반영 후)
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.serde import CompressedSerializer, train_dictionary
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "checkpoint_serde.jsonl")
+MODES = ("default", "zstd", "zstd-dict")
+
+SPOTS = ["차이나타운", "월미도", "송도 센트럴파크", "개항장 거리", "신포국제시장", "소래포구", "을왕리 해수욕장", "강화 고인돌"]
+PLACES = ["공중화장실", "관광안내소", "주차장", "카페", "박물관", "전망대"]
+QUESTIONS = ["근처 화장실 알려줘", "가볼 만한 곳 추천해줘", "오늘 날씨 어때?", "여기서 가는 길 알려줘", "역사 이야기 해줘"]
+
+
+def tool_output(rng: random.Random) -> str:
+    spot = rng.choice(SPOTS)
+    items = [
+        {
+            "name": f"{spot} {rng.choice(PLACES)}",
+            "address": f"인천광역시 중구 {spot}로 {rng.randint(1, 300)}",
+            "lat": round(37.4 + rng.random() * 0.2, 6),
+            "lng": round(126.5 + rng.random() * 0.2, 6),
+            "distance_km": round(rng.random() * 3, 2),
+            "description": f"{spot}은(는) 개항기 인천의 모습을 간직한 곳으로, 주변에 {rng.choice(PLACES)}이(가) 있습니다.",
+        }
+        for _ in range(rng.randint(3, 8))
+    ]
+    return json.dumps(items, ensure_ascii=False)
+
+
+def make_step(rng: random.Random, step: int) -> list:
+    spot = rng.choice(SPOTS)
+    return [
+        HumanMessage(content=f"{spot} {rng.choice(QUESTIONS)}"),
+        AIMessage(content="", tool_calls=[{"name": "search_spots", "args": {"query": spot}, "id": f"call-{step}"}]),
+        ToolMessage(content=tool_output(rng), tool_call_id=f"call-{step}"),
+        AIMessage(content=f"{spot} 주변을 안내해 드릴게요. 가장 가까운 곳은 {rng.randint(1, 9)}00m 거리에 있어요."),
+    ]
+
+
+def training_samples(count: int, steps: int) -> List[bytes]:
+    inner = JsonPlusSerializer()
+    rng = random.Random(1234)
+    samples = []
+    for _ in range(count):
+        history: list = []
+        for step in range(steps):
+            history += make_step(rng, step)
+            samples.append(inner.dumps_typed({"messages": history[-40:]})[1])
+    return samples
+
+
+async def measure(mode: str, threads: int, steps: int, history: int, dictionary: bytes) -> dict:
+    serde = None
+    if mode == "zstd":
+        serde = CompressedSerializer()
+    elif mode == "zstd-dict":
+        serde = CompressedSerializer(dictionaries=[dictionary])
+    codec = serde or JsonPlusSerializer()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        saver = await open_checkpointer(db_path, readers=4, serde=serde)
+        writes: List[float] = []
+        reads: List[float] = []
+        dumps_us: List[float] = []
+        loads_us: List[float] = []
+        raw_bytes = stored_bytes = 0
+
+        async def conversation(i: int):
+            nonlocal raw_bytes, stored_bytes
+            rng = random.Random(i)
+            config = {"configurable": {"thread_id": f"thread-{i}", "checkpoint_ns": ""}}
+            messages: list = []
+            for step in range(steps):
+                new = make_step(rng, step)
+                messages = (messages + new)[-history:]
+                checkpoint = empty_checkpoint()
+                checkpoint["channel_values"] = {"messages": messages}
+
+                started = time.perf_counter()
+                typed = codec.dumps_typed(checkpoint)
+                dumps_us.append((time.perf_counter() - started) * 1e6)
+                started = time.perf_counter()
+                codec.loads_typed(typed)
+                loads_us.append((time.perf_counter() - started) * 1e6)
+                raw_bytes += len(JsonPlusSerializer().dumps_typed(checkpoint)[1])
+                stored_bytes += len(typed[1])
+
+                started = time.perf_counter()
+                config = await saver.aput(config, checkpoint, {"step": step}, {})
+                await saver.aput_writes(config, [("messages", new)], task_id=f"task-{step}")
+                writes.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                await saver.aget_tuple(config)
+                reads.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(conversation(i) for i in range(threads)))
+        async with saver.lock:
+            await saver.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        await close_checkpointer(saver)
+        db_bytes = os.path.getsize(db_path)
+
+    total = threads * steps
+    return {
+        "mode": mode,
+        "threads": threads,
+        "steps": steps,
+        "ratio": round(raw_bytes / stored_bytes, 2),
+        "checkpoint_bytes_avg": round(stored_bytes / total),
+        "dumps_us_p50": round(percentile(dumps_us, 50), 1),
+        "loads_us_p50": round(percentile(loads_us, 50), 1),
+        "write_ms_p50": round(percentile(writes, 50), 2),
+        "write_ms_p95": round(percentile(writes, 95), 2),
+        "read_ms_p50": round(percentile(reads, 50), 2),
+        "read_ms_p95": round(percentile(reads, 95), 2),
+        "db_bytes": db_bytes,
+        "bytes_per_step": round(db_bytes / total),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="체크포인트 직렬화 벤치마크")
+    parser.add_argument("--threads", type=int, default=64, help="동시 대화 스레드 수")
+    parser.add_argument("--steps", type=int, default=20, help="스레드당 스텝 수")
+    parser.add_argument("--history", type=int, default=40, help="체크포인트에 유지할 메시지 수")
+    parser.add_argument("--dict-size", type=int, default=110 * 1024)
+    parser.add_argument("--mode", default=",".join(MODES), help="쉼표 구분 (default,zstd,zstd-dict)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    dictionary = train_dictionary(training_samples(64, args.steps), args.dict_size)
+    info = run_info()
+    for mode in args.mode.split(","):
+        metrics = asyncio.run(measure(mode, args.threads, args.steps, args.history, dictionary))
+        record = {
+            "benchmark": "checkpoint_serde",
+            **info,
+            "history": args.history,
+            "dict_size": args.dict_size,
+            "metrics": metrics,
+        }
+        append_jsonl(args.output, record)
+        print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
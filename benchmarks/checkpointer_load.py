@@ -0,0 +1,108 @@
+# 체크포인터 부하 벤치마크: 많은 대화 스레드가 동시에 체크포인트를 쓰고 읽을 때
+# 사용 예:
+#   python -m benchmarks.checkpointer_load --threads 16,64,256 --steps 20
+#
+# 비교 대상
+#   default : 기존 방식. AsyncSqliteSaver 연결 1개 (기본 pragma, 읽기/쓰기 모두 같은 락)
+#   pooled  : PooledSqliteSaver (WAL + synchronous=NORMAL + mmap/cache, writer 1 + 읽기 전용 풀)
+#
+# 스레드 한 스텝 = 그래프 1회 실행 흉내: aget_tuple → aput → aput_writes
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+import aiosqlite
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.memory.checkpointer import TimedLock
+from app.memory.manager import close_checkpointer, open_checkpointer
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "checkpointer_load.jsonl")
+
+
+async def open_default(db_path: str) -> AsyncSqliteSaver:
+    conn = await aiosqlite.connect(db_path)
+    saver = AsyncSqliteSaver(conn)
+    saver.lock = TimedLock(saver.lock)    # 같은 지표로 비교하기 위해 락만 계측
+    await saver.setup()
+    return saver
+
+
+async def measure(mode: str, threads: int, steps: int, payload_bytes: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        saver = await open_checkpointer(db_path, readers) if mode == "pooled" else await open_default(db_path)
+        message = "가" * (payload_bytes // 3)
+        latencies: List[float] = []
+
+        async def conversation(thread_id: str):
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            history: List[str] = []
+            for step in range(steps):
+                started = time.perf_counter()
+                await saver.aget_tuple(config)
+                history.append(message)
+                checkpoint = empty_checkpoint()
+                checkpoint["channel_values"] = {"messages": history[-10:]}
+                config = await saver.aput(config, checkpoint, {"step": step}, {})
+                await saver.aput_writes(config, [("messages", message)], task_id=f"task-{step}")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation(f"thread-{i}") for i in range(threads)))
+        elapsed = time.perf_counter() - started
+
+        lock_stats = saver.lock.snapshot()
+        if mode == "pooled":
+            await close_checkpointer(saver)
+        else:
+            await saver.conn.close()
+
+    total = threads * steps
+    return {
+        "mode": mode,
+        "threads": threads,
+        "steps": steps,
+        "steps_per_sec": round(total / elapsed, 1),
+        "step_ms_p50": round(percentile(latencies, 50), 2),
+        "step_ms_p95": round(percentile(latencies, 95), 2),
+        "step_ms_p99": round(percentile(latencies, 99), 2),
+        "commit_ms_p50": lock_stats["commit_ms_p50"],
+        "commit_ms_p95": lock_stats["commit_ms_p95"],
+        "queue_wait_ms_p95": lock_stats["wait_ms_p95"],
+        "queue_depth_max": lock_stats["queue_depth_max"],
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="체크포인터 부하 벤치마크")
+    parser.add_argument("--threads", default="16,64,256", help="동시 대화 스레드 수 (쉼표 구분)")
+    parser.add_argument("--steps", type=int, default=20, help="스레드당 스텝 수")
+    parser.add_argument("--payload-bytes", type=int, default=2048, help="스텝당 메시지 크기")
+    parser.add_argument("--readers", type=int, default=4, help="pooled 모드 읽기 전용 연결 수")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    for threads in [int(t) for t in args.threads.split(",")]:
+        for mode in ("default", "pooled"):
+            metrics = asyncio.run(measure(mode, threads, args.steps, args.payload_bytes, args.readers))
+            record = {
+                "benchmark": "checkpointer_load",
+                **info,
+                "payload_bytes": args.payload_bytes,
+                "readers": args.readers,
+                "metrics": metrics,
+            }
+            append_jsonl(args.output, record)
+            print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# 샤드 수별 체크포인트 쓰기 처리량 벤치마크
+# 사용 예:
+#   python -m benchmarks.checkpointer_shards --shards 1,4,8 --threads 256 --steps 20
+#
+# 스레드 한 스텝 = 쓰기만: aput → aput_writes (읽기는 읽기 전용 풀이라 샤딩과 무관)
+# 샤드별 writer 대기열 최대 길이를 같이 기록해서 해시 분산이 고른지 확인한다.
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_sharded_checkpointer, open_sharded_checkpointer
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "checkpointer_shards.jsonl")
+
+
+async def measure(shards: int, threads: int, steps: int, payload_bytes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        saver = await open_sharded_checkpointer(db_path, shards, readers=0)
+        message = "가" * (payload_bytes // 3)
+        latencies: List[float] = []
+
+        async def conversation(thread_id: str):
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            for step in range(steps):
+                started = time.perf_counter()
+                checkpoint = empty_checkpoint()
+                checkpoint["channel_values"] = {"messages": [message]}
+                config = await saver.aput(config, checkpoint, {"step": step}, {})
+                await saver.aput_writes(config, [("messages", message)], task_id=f"task-{step}")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation(f"thread-{i}") for i in range(threads)))
+        elapsed = time.perf_counter() - started
+
+        stats = saver.stats()
+        await close_sharded_checkpointer(saver)
+
+    total = threads * steps
+    return {
+        "shards": shards,
+        "threads": threads,
+        "steps": steps,
+        "steps_per_sec": round(total / elapsed, 1),
+        "step_ms_p50": round(percentile(latencies, 50), 2),
+        "step_ms_p95": round(percentile(latencies, 95), 2),
+        "step_ms_p99": round(percentile(latencies, 99), 2),
+        "commit_ms_p95": stats["commit_ms_p95"],
+        "queue_wait_ms_p95": stats["wait_ms_p95"],
+        "queue_depth_max_per_shard": [s["queue_depth_max"] for s in stats["per_shard"]],
+        "writes_per_shard": [s["writes"] for s in stats["per_shard"]],
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="샤드 수별 체크포인트 쓰기 처리량 벤치마크")
+    parser.add_argument("--shards", default="1,4,8", help="샤드 수 (쉼표 구분)")
+    parser.add_argument("--threads", type=int, default=256, help="동시 대화 스레드 수")
+    parser.add_argument("--steps", type=int, default=20, help="스레드당 스텝 수")
+    parser.add_argument("--payload-bytes", type=int, default=2048, help="스텝당 메시지 크기")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    for shards in [int(s) for s in args.shards.split(",")]:
+        metrics = asyncio.run(measure(shards, args.threads, args.steps, args.payload_bytes))
+        record = {
+            "benchmark": "checkpointer_shards",
+            **info,
+            "payload_bytes": args.payload_bytes,
+            "metrics": metrics,
+        }
+        append_jsonl(args.output, record)
+        print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# 벤치마크 공용 유틸리티
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import List
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """선형 보간 백분위수 (p: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_info() -> dict:
+    """결과 비교용 실행 환경 정보"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def append_jsonl(path: str, record: dict) -> None:
+    """실행 결과를 한 줄씩 누적 (시간에 따른 비교용)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
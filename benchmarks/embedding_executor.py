@@ -0,0 +1,133 @@
+# 임베딩 실행 풀 벤치마크: 이벤트 루프 지연(lag)과 처리량 비교
+# 사용 예:
+#   python -m benchmarks.embedding_executor                  # NumPy 합성 인코더
+#   python -m benchmarks.embedding_executor --model dragonkue/multilingual-e5-small-ko-v2
+#
+# 비교 대상
+#   inline   : 기존 방식. 이벤트 루프에서 질의마다 동기 encode
+#   executor : EmbeddingExecutor (스레드 풀 + micro-batching)
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.spots.executor import EmbeddingExecutor
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "embedding_executor.jsonl")
+QUESTIONS = ["월미도 볼거리", "차이나타운 역사", "송도 센트럴파크 산책", "소래포구 어시장", "강화도 전등사"]
+
+
+def synthetic_encoder(dim: int = 384, hidden: int = 1536, layers: int = 6) -> Callable[[List[str]], List[List[float]]]:
+    """작은 트랜스포머 encode 비용을 흉내내는 행렬곱 인코더 (NumPy는 GIL을 놓고 계산)"""
+    rng = np.random.default_rng(0)
+    weights = [rng.standard_normal((hidden, hidden), dtype=np.float32) / np.sqrt(hidden) for _ in range(layers)]
+    proj = rng.standard_normal((hidden, dim), dtype=np.float32)
+
+    def encode(texts: List[str]) -> List[List[float]]:
+        # 토큰 64개짜리 시퀀스라고 가정 (Generator는 스레드 안전하지 않아 고정 입력 사용)
+        x = np.full((len(texts) * 64, hidden), 0.01, dtype=np.float32)
+        for w in weights:
+            x = np.tanh(x @ w)
+        pooled = x.reshape(len(texts), 64, hidden).mean(axis=1) @ proj
+        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled.tolist()
+
+    return encode
+
+
+def model_encoder(model_name: str) -> Callable[[List[str]], List[List[float]]]:
+    from app.spots.retriever import load_embeddings
+
+    emb = load_embeddings(model_name)
+    return emb.embed_documents
+
+
+async def measure(mode: str, encode, concurrency: int, requests: int, tick_ms: float = 5.0) -> dict:
+    """동시 요청을 흘려보내면서, 별도 태스크로 루프 지연을 샘플링"""
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = tick_ms / 1000.0
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - started - interval) * 1000)
+
+    executor = EmbeddingExecutor(encode) if mode == "executor" else None
+
+    async def one(i: int):
+        text = QUESTIONS[i % len(QUESTIONS)]
+        started = time.perf_counter()
+        if executor is not None:
+            await executor.aembed_query(text)
+        else:
+            encode([text])
+            await asyncio.sleep(0)
+        return (time.perf_counter() - started) * 1000
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def bounded(i: int):
+        async with semaphore:
+            latencies.append(await one(i))
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+
+    result = {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_qps": round(requests / elapsed, 1),
+        "latency_ms_p50": round(percentile(latencies, 50), 2),
+        "latency_ms_p95": round(percentile(latencies, 95), 2),
+        "loop_lag_ms_p50": round(percentile(lags, 50), 2),
+        "loop_lag_ms_p95": round(percentile(lags, 95), 2),
+        "loop_lag_ms_max": round(max(lags) if lags else 0.0, 2),
+    }
+    if executor is not None:
+        result["batches"] = executor.stats["batches"]
+        result["avg_batch"] = round(executor.stats["queries"] / max(executor.stats["batches"], 1), 1)
+        executor.shutdown()
+    return result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="임베딩 실행 풀 벤치마크")
+    parser.add_argument("--model", default=None, help="SentenceTransformer 모델 (없으면 합성 인코더)")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    encode = model_encoder(args.model) if args.model else synthetic_encoder()
+    encode(["warmup"])
+    info = run_info()
+
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        for mode in ("inline", "executor"):
+            metrics = asyncio.run(measure(mode, encode, concurrency, args.requests))
+            record = {
+                "benchmark": "embedding_executor",
+                **info,
+                "encoder": args.model or "synthetic",
+                "metrics": metrics,
+            }
+            append_jsonl(args.output, record)
+            print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
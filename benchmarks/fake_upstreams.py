@@ -0,0 +1,303 @@
+# 부하 테스트용 외부 API 대역 서버: OpenAI(chat completions), Kakao(로컬/블로그), Tavily, OpenWeatherMap
+# 사용 예:
+#   python -m benchmarks.fake_upstreams --port 9100 --ttft-ms 300 --token-ms 20
+#   OPENAI_BASE_URL=http://127.0.0.1:9100/v1 KAKAO_URL=http://127.0.0.1:9100 TAVILY_URL=http://127.0.0.1:9100 \
+#   OPENWEATHERMAP_URL=http://127.0.0.1:9100 uvicorn app.main:app
+#
+# 실제 API와 같은 경로/응답 형식을 돌려주고, 지연만 옵션으로 흉내 낸다 (모든 지연은 평균값, ±50% 지터).
+# LLM 규칙 (도구 호출 한 번 → 답변):
+#   마지막 메시지가 도구 결과면 한국어 답변을 --answer-tokens개 토큰으로 (스트리밍이면 --token-ms 간격)
+#   아니면 마지막 사용자 질문의 키워드로 도구 하나를 호출 (요청에 실린 도구만, 없으면 바로 답변)
+#     맛집/식당 → get_near_restaurant_in_kakao, 카페 → get_near_cafe_in_kakao, 날씨 → weather,
+#     블로그/후기 → search_blog, 관광/명소/가볼 → tavily_search
+# --error-rate 비율만큼 500을 돌려준다 (재시도/오류 경로 확인용).
+# GET /_stats 는 경로별 호출 수.
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+PLACES = ["차이나타운", "월미도", "송도", "부평", "개항장", "소래포구", "을왕리"]
+ANSWER_WORDS = [
+    "인천", " ", "차이나타운", "은", " ", "개항", " 이후", " 형성된", " 거리", "예요", ".", " ", "짜장면", "의",
+    " 발상지", "라서", " ", "한번", " 가볼", "만해", "!", " ", "월미도", "까지", " 걸어서", " 20분", " 정도", "야", ".",
+]
+TOOL_KEYWORDS = [
+    (("맛집", "식당", "밥집", "먹을"), "get_near_restaurant_in_kakao"),
+    (("카페", "커피"), "get_near_cafe_in_kakao"),
+    (("날씨", "비 와", "기온"), "weather"),
+    (("블로그", "후기"), "search_blog"),
+    (("관광", "명소", "가볼", "놀거리"), "tavily_search"),
+]
+
+
+class FakeConfig:
+    def __init__(
+        self,
+        ttft_ms: float = 300.0,
+        token_ms: float = 20.0,
+        answer_tokens: int = 60,
+        kakao_ms: float = 80.0,
+        tavily_ms: float = 600.0,
+        weather_ms: float = 100.0,
+        blog_page_ms: float = 150.0,
+        error_rate: float = 0.0,
+    ):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.answer_tokens = answer_tokens
+        self.kakao_ms = kakao_ms
+        self.tavily_ms = tavily_ms
+        self.weather_ms = weather_ms
+        self.blog_page_ms = blog_page_ms
+        self.error_rate = error_rate
+
+
+async def delay(ms: float) -> None:
+    if ms > 0:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * ms / 1000.0)
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def find_place(text: str) -> str:
+    return next((place for place in PLACES if place in text), "인천")
+
+
+def choose_tool_call(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """도구 결과 다음이면 None(답변), 아니면 질문 키워드에 맞는 도구 호출"""
+    if not messages or messages[-1].get("role") == "tool":
+        return None
+    question = next((message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+    available = {t.get("function", {}).get("name") for t in tools or []}
+    for keywords, name in TOOL_KEYWORDS:
+        if name in available and any(keyword in question for keyword in keywords):
+            place = find_place(question)
+            if name == "weather":
+                args: Dict[str, Any] = {"__arg1": "Incheon"}
+            elif name in ("get_near_restaurant_in_kakao", "get_near_cafe_in_kakao"):
+                args = {"query": "맛집" if "restaurant" in name else "카페", "location": place}
+            else:
+                args = {"query": f"{place} {question}"[:50]}
+            return {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)},
+            }
+    return None
+
+
+def answer_tokens(messages: List[Dict[str, Any]], count: int) -> List[str]:
+    rng = random.Random(len(messages))
+    return [rng.choice(ANSWER_WORDS) for _ in range(count)]
+
+
+def usage_of(messages: List[Dict[str, Any]], completion_tokens: int) -> Dict[str, int]:
+    prompt_tokens = sum(len(message_text(m)) for m in messages) // 2 + 1
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(config: Optional[FakeConfig] = None) -> FastAPI:
+    config = config or FakeConfig()
+    app = FastAPI(title="fake upstreams")
+    calls: Counter = Counter()
+
+    @app.middleware("http")
+    async def count_and_fail(request: Request, call_next):
+        path = "/blog" if request.url.path.startswith("/blog/") else request.url.path
+        calls[path] += 1
+        if path != "/_stats" and config.error_rate and random.random() < config.error_rate:
+            return JSONResponse({"error": {"message": "injected failure"}}, status_code=500)
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def stats():
+        return dict(calls)
+
+    # ===============[OpenAI]============================
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "gpt-4o-mini")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+        created = int(time.time())
+        tool_call = choose_tool_call(messages, body.get("tools"))
+        tokens = [] if tool_call else answer_tokens(messages, config.answer_tokens)
+        usage = usage_of(messages, len(tokens) or 20)
+        finish_reason = "tool_calls" if tool_call else "stop"
+
+        if not body.get("stream"):
+            await delay(config.ttft_ms + config.token_ms * len(tokens))
+            message: Dict[str, Any] = {"role": "assistant", "content": "".join(tokens) or None}
+            if tool_call:
+                message["tool_calls"] = [tool_call]
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            await delay(config.ttft_ms)
+            yield chunk({"role": "assistant", "content": ""})
+            if tool_call:
+                yield chunk({"tool_calls": [{"index": 0, **tool_call}]})
+            for token in tokens:
+                await delay(config.token_ms)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(data)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    # ===============[Kakao]============================
+    @app.get("/local/search/keyword.json")
+    async def kakao_keyword(query: str, size: int = 15, x: Optional[str] = None, y: Optional[str] = None):
+        await delay(config.kakao_ms)
+        base_x, base_y = float(x or 126.6176), float(y or 37.4757)
+        documents = [
+            {
+                "place_name": f"{query.split()[-1]} {i + 1}호점",
+                "road_address_name": f"인천 중구 차이나타운로 {10 + i}",
+                "address_name": f"인천 중구 북성동 {i + 1}",
+                "x": f"{base_x + 0.001 * i:.6f}",
+                "y": f"{base_y + 0.001 * i:.6f}",
+                "place_url": f"http://place.map.kakao.com/{1000 + i}",
+                "phone": f"032-000-{1000 + i}",
+            }
+            for i in range(min(size, 15))
+        ]
+        return {"documents": documents, "meta": {"total_count": len(documents), "is_end": True}}
+
+    @app.get("/search/blog")
+    async def kakao_blog(request: Request, query: str, size: int = 10):
+        await delay(config.kakao_ms)
+        base = str(request.base_url).rstrip("/")
+        documents = [
+            {
+                "title": f"{query} 다녀온 후기 {i + 1}",
+                "contents": f"{query} 주말에 다녀왔어요. 분위기도 좋고 사람도 많았어요.",
+                "blogname": f"인천여행자{i + 1}",
+                "url": f"{base}/blog/{i + 1}",
+                "datetime": "2024-05-01T12:00:00.000+09:00",
+            }
+            for i in range(min(size, 50))
+        ]
+        return {"documents": documents, "meta": {"total_count": len(documents), "is_end": True}}
+
+    @app.get("/blog/{n}", response_class=HTMLResponse)
+    async def blog_page(n: int):
+        await delay(config.blog_page_ms)
+        body = " ".join(["인천 차이나타운에 다녀왔습니다. 짜장면이 정말 맛있었어요."] * 20)
+        return f"<html><body><h1>인천 여행 후기 {n}</h1><p>{body}</p></body></html>"
+
+    # ===============[Tavily]============================
+    @app.post("/search")
+    async def tavily_search(request: Request):
+        body = await request.json()
+        await delay(config.tavily_ms)
+        query = body.get("query", "")
+        results = [
+            {
+                "title": f"{query} - 인천 관광 {i + 1}",
+                "url": f"https://example.com/incheon/{i + 1}",
+                "content": f"{query}: 인천의 대표 관광지로 개항장 거리와 월미도가 인기입니다.",
+                "score": round(0.9 - 0.1 * i, 2),
+                "raw_content": None,
+            }
+            for i in range(body.get("max_results") or 5)
+        ]
+        return {
+            "query": query,
+            "answer": "인천에서는 차이나타운, 월미도, 송도 센트럴파크가 인기 있는 관광지입니다." if body.get("include_answer") else None,
+            "images": [],
+            "results": results,
+            "response_time": round(config.tavily_ms / 1000.0, 2),
+        }
+
+    # ===============[OpenWeatherMap]============================
+    @app.get("/data/2.5/weather")
+    async def weather(q: str):
+        await delay(config.weather_ms)
+        return {
+            "name": q,
+            "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+            "main": {"temp": 18.2, "feels_like": 17.9, "temp_min": 16.5, "temp_max": 19.8, "humidity": 62},
+            "wind": {"speed": 3.4, "deg": 250},
+            "clouds": {"all": 40},
+        }
+
+    return app
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="외부 API 대역 서버 (OpenAI, Kakao, Tavily, OpenWeatherMap)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="LLM 첫 청크까지 지연")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="LLM 토큰 간격")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="답변 토큰 수")
+    parser.add_argument("--kakao-ms", type=float, default=80.0)
+    parser.add_argument("--tavily-ms", type=float, default=600.0)
+    parser.add_argument("--weather-ms", type=float, default=100.0)
+    parser.add_argument("--blog-page-ms", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500을 돌려줄 요청 비율")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = FakeConfig(
+        ttft_ms=args.ttft_ms,
+        token_ms=args.token_ms,
+        answer_tokens=args.answer_tokens,
+        kakao_ms=args.kakao_ms,
+        tavily_ms=args.tavily_ms,
+        weather_ms=args.weather_ms,
+        blog_page_ms=args.blog_page_ms,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
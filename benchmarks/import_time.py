@@ -0,0 +1,136 @@
+# 임포트 시간 벤치마크 + 시작 예산 검사 (python -X importtime)
+# 사용 예:
+#   python -m benchmarks.import_time                                  # graph_module, app.main
+#   python -m benchmarks.import_time --module app.main --budget-ms 2500 --top 20
+#
+# 모듈마다 새 인터프리터에서 `import <module>`만 실행하고 stderr의 importtime 줄을 읽는다
+# (인터프리터 시작 때 이미 올라온 site 등은 빼고, import 문이 불러온 것만 센다).
+# --runs번 재서 중앙값으로 예산을 본다. 첫 실행은 .pyc 생성 때문에 느릴 수 있다.
+# --deferred 모듈(도구/LLM 클라이언트 패키지)은 임포트 시점에 올라오면 안 된다 (tool_registry, get_llm에서 지연 임포트).
+# 예산을 넘거나 --deferred 모듈이 올라오면 종료 코드 1 (CI에서 시작 시간 회귀 검사용).
+#
+# 지표
+#   total_ms_p50 / total_ms_min : import 문이 불러온 모듈들의 누적 시간 (importtime 기준)
+#   modules                     : 새로 올라온 모듈 수
+#   top_cumulative / top_self   : 누적/자체 시간 상위 모듈 (--top개)
+#   deferred_loaded             : 임포트 시점에 올라온 --deferred 모듈
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "import_time.jsonl")
+DEFAULT_MODULES = "app.services.graph_module,app.main"
+DEFAULT_DEFERRED = "langchain_openai,langchain_upstage,langchain_tavily,langchain.agents"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "-- import start --"
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """MARKER 뒤의 `import time: self | cumulative | name` 줄 (시간은 us)"""
+    entries = []
+    started = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue    # 머리글 줄
+        name = fields[2].rstrip()
+        entries.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_us": int(fields[0]),
+                "cumulative_us": int(fields[1]),
+            }
+        )
+    return entries
+
+
+def measure_import(module: str) -> List[Dict]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))}
+    code = f"import sys; sys.stderr.write({MARKER!r} + '\\n'); sys.stderr.flush(); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} 임포트 실패:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(entries: List[Dict]) -> float:
+    # 맨 바깥(depth 0) 줄의 누적 시간 합 = import 문 전체
+    return sum(e["cumulative_us"] for e in entries if e["depth"] == 0) / 1000
+
+
+def deferred_loaded(entries: List[Dict], deferred: List[str]) -> List[str]:
+    names = {e["module"] for e in entries}
+    return sorted(d for d in deferred if d in names)
+
+
+def summarize(runs: List[List[Dict]], deferred: List[str], top: int) -> Dict:
+    totals = [total_ms(entries) for entries in runs]
+    last = runs[-1]
+    by_cumulative = sorted(last, key=lambda e: e["cumulative_us"], reverse=True)[:top]
+    by_self = sorted(last, key=lambda e: e["self_us"], reverse=True)[:top]
+    return {
+        "runs": len(runs),
+        "total_ms_p50": round(percentile(totals, 50), 1),
+        "total_ms_min": round(min(totals), 1),
+        "modules": len(last),
+        "top_cumulative": [[e["module"], round(e["cumulative_us"] / 1000, 1)] for e in by_cumulative],
+        "top_self": [[e["module"], round(e["self_us"] / 1000, 1)] for e in by_self],
+        "deferred_loaded": deferred_loaded(last, deferred),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="임포트 시간 벤치마크 (시작 예산 검사)")
+    parser.add_argument("--module", default=DEFAULT_MODULES, help="쉼표 구분 모듈")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="모듈별 total_ms_p50 상한 (0이면 검사 안 함)")
+    parser.add_argument("--deferred", default=DEFAULT_DEFERRED, help="임포트 시점에 올라오면 안 되는 모듈 (쉼표 구분)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    deferred = [d for d in args.deferred.split(",") if d]
+    failures = []
+    for module in args.module.split(","):
+        metrics = summarize([measure_import(module) for _ in range(args.runs)], deferred, args.top)
+        over_budget = bool(args.budget_ms) and metrics["total_ms_p50"] > args.budget_ms
+        record = {
+            "benchmark": "import_time",
+            **info,
+            "module": module,
+            "budget_ms": args.budget_ms,
+            "passed": not over_budget and not metrics["deferred_loaded"],
+            "metrics": metrics,
+        }
+        append_jsonl(args.output, record)
+        print(json.dumps(record, ensure_ascii=False))
+        if over_budget:
+            failures.append(f"{module}: {metrics['total_ms_p50']}ms > 예산 {args.budget_ms}ms")
+        if metrics["deferred_loaded"]:
+            failures.append(f"{module}: 임포트 시점에 올라온 모듈 {metrics['deferred_loaded']}")
+
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# 요청당 로깅 비용 벤치마크: 기존(동기 핸들러 + 즉시 f-string) vs 큐 핸들러 + 지연 포맷/샘플링 (app.core.logging)
+# 사용 예:
+#   python -m benchmarks.logging_overhead --requests 5000 --history 60
+#   python -m benchmarks.logging_overhead --disk-ms 2    # 디스크가 느릴 때 (쓰기마다 지연)
+#
+# 요청 하나가 남기는 로그를 흉내 낸다 (/v1/chatbot 기준):
+#   챗봇 요청/응답 info 2줄, thread 락 로그 4줄, 라우팅(select_next_node) --routes번 × (ToolMessage 이름 + qa_types)
+# legacy 모드는 기존 코드 그대로: 루트에 FileHandler + StreamHandler, 모든 로그를 f-string으로 즉시 조립,
+# dump_tool_names는 대화 전체를 훑은 뒤 info로 남긴다.
+# queue 모드는 현재 코드: LogQueueHandler → QueueListener 스레드가 파일/스트림에 쓴다.
+# 스트림 출력은 os.devnull로 보낸다. 요청은 --rps 간격으로 보낸다 (0이면 쉬지 않고: 리스너 스레드와 GIL 경합이 최대).
+#
+# 지표
+#   us_per_request_*  : 요청 하나가 로깅에 쓴 호출 스레드(=이벤트 루프) 시간
+#   lines_per_request : 실제로 쓴 줄 수
+#   drain_ms          : 큐 모드에서 마지막 로그가 디스크에 닿을 때까지 추가로 걸린 시간
+import argparse
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.core.config import settings
+from app.core.logging import JsonFormatter, LogQueueHandler, debug_sampled
+from app.services.graph_module import dump_tool_names
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "logging_overhead.jsonl")
+MODES = ("legacy", "queue")
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+api_logger = logging.getLogger("app.api.v1.endpoints.ai")
+lock_logger = logging.getLogger("app.memory.locks")
+graph_logger = logging.getLogger("app.services.graph_module")
+
+
+class SlowFileHandler(logging.FileHandler):
+    """쓰기마다 disk_ms만큼 멈추는 파일 핸들러 (느린 디스크/로그 수집기 흉내)"""
+
+    def __init__(self, path: str, disk_ms: float):
+        super().__init__(path, encoding="utf-8")
+        self.disk_sec = disk_ms / 1000.0
+        self.lines = 0
+
+    def emit(self, record):
+        if self.disk_sec:
+            time.sleep(self.disk_sec)
+        self.lines += 1
+        super().emit(record)
+
+
+def make_history(length: int) -> list:
+    messages = []
+    for i in range(length):
+        if i % 3 == 2:
+            messages.append(ToolMessage(content="결과 " * 50, name=f"tool{i % 7}", tool_call_id=str(i)))
+        elif i % 3 == 1:
+            messages.append(AIMessage(content="", tool_calls=[{"name": f"tool{i % 7}", "args": {}, "id": str(i)}]))
+        else:
+            messages.append(HumanMessage(content="인천 차이나타운 근처 맛집 알려줘"))
+    return messages
+
+
+def legacy_dump_tool_names(messages, last_n: int = 10):
+    names = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            names.append(getattr(message, "name", None) or getattr(message, "tool_name", None))
+    graph_logger.info(f"[DEBUG] ToolMessage names: {names[-last_n:]}")
+
+
+def legacy_request(user_id: str, history: list, qa_types: dict, routes: int) -> None:
+    api_logger.info(f"챗봇 요청 - user_id: {user_id}")
+    lock_logger.debug(f"thread_lock 요청: {user_id}")
+    lock_logger.debug(f"락 획득 시도: {user_id}")
+    lock_logger.info(f"락 획득 성공: {user_id}")
+    for _ in range(routes):
+        legacy_dump_tool_names(history)
+        graph_logger.info(f"[DEBUG] select_next_node - qa_types: {qa_types}")
+    lock_logger.debug(f"락 해제: {user_id}")
+    api_logger.info(f"챗봇 응답 완료 - user_id: {user_id}")
+
+
+def current_request(user_id: str, history: list, qa_types: dict, routes: int) -> None:
+    api_logger.info(f"챗봇 요청 - user_id: {user_id}")
+    debug_sampled(lock_logger, "락 획득 시도: %s", user_id)
+    debug_sampled(lock_logger, "락 획득 성공: %s", user_id)
+    for _ in range(routes):
+        dump_tool_names(history)
+        debug_sampled(graph_logger, "select_next_node - qa_types: %s", qa_types)
+    debug_sampled(lock_logger, "락 해제: %s", user_id)
+    api_logger.info(f"챗봇 응답 완료 - user_id: {user_id}")
+
+
+def measure(
+    mode: str, level: str, fmt: str, requests: int, history_len: int, routes: int, disk_ms: float, rps: float
+) -> dict:
+    history = make_history(history_len)
+    qa_types = {"restaurant": True, "cafe": False, "route": False, "weather": False}
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    durations: List[float] = []
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        file_handler = SlowFileHandler(os.path.join(tmp, "app.log"), disk_ms)
+        handlers = [file_handler, logging.StreamHandler(devnull)]
+        formatter = JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        listener = None
+        root.handlers = []
+        root.setLevel(getattr(logging, level))
+        if mode == "legacy":
+            for handler in handlers:
+                root.addHandler(handler)
+            run = legacy_request
+        else:
+            log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+            root.addHandler(LogQueueHandler(log_queue))
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            run = current_request
+
+        try:
+            interval = 1.0 / rps if rps > 0 else 0.0
+            next_at = time.perf_counter()
+            for i in range(requests):
+                if interval:
+                    next_at += interval
+                started = time.perf_counter()
+                run(f"user{i % 100}", history, qa_types, routes)
+                durations.append((time.perf_counter() - started) * 1e6)
+                if interval and next_at > time.perf_counter():
+                    time.sleep(next_at - time.perf_counter())
+            drain_started = time.perf_counter()
+            if listener is not None:
+                listener.stop()
+            drain_ms = (time.perf_counter() - drain_started) * 1000
+            dropped = root.handlers[0].dropped if listener is not None else 0
+        finally:
+            root.setLevel(saved[0])
+            root.handlers = saved[1]
+            for handler in handlers:
+                handler.close()
+
+    return {
+        "mode": mode,
+        "level": level,
+        "format": fmt,
+        "requests": requests,
+        "rps": rps,
+        "us_per_request_mean": round(sum(durations) / len(durations), 2),
+        "us_per_request_p50": round(percentile(durations, 50), 2),
+        "us_per_request_p99": round(percentile(durations, 99), 2),
+        "us_per_request_max": round(max(durations), 2),
+        "lines_per_request": round(file_handler.lines / requests, 2),
+        "dropped": dropped,
+        "drain_ms": round(drain_ms, 1),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="요청당 로깅 비용 벤치마크")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--history", type=int, default=60, help="대화 메시지 수 (dump_tool_names가 훑는 길이)")
+    parser.add_argument("--routes", type=int, default=3, help="요청당 라우팅 횟수")
+    parser.add_argument("--rps", type=float, default=500.0, help="초당 요청 수 (0이면 쉬지 않음)")
+    parser.add_argument("--disk-ms", type=float, default=0.0, help="파일 쓰기 한 줄마다 추가 지연")
+    parser.add_argument("--levels", default="ERROR,INFO,DEBUG", help="쉼표 구분 LOG_LEVEL")
+    parser.add_argument("--format", default="text", choices=("text", "json"), help="queue 모드 출력 형식")
+    parser.add_argument("--mode", default=",".join(MODES), help="쉼표 구분 (legacy,queue)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    for level in args.levels.split(","):
+        for mode in args.mode.split(","):
+            fmt = "text" if mode == "legacy" else args.format
+            metrics = measure(mode, level.upper(), fmt, args.requests, args.history, args.routes, args.disk_ms, args.rps)
+            record = {
+                "benchmark": "logging_overhead",
+                **info,
+                "history": args.history,
+                "routes": args.routes,
+                "disk_ms": args.disk_ms,
+                "metrics": metrics,
+            }
+            append_jsonl(args.output, record)
+            print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
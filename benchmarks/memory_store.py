@@ -0,0 +1,187 @@
+# 메모리 store 벤치마크: 합성 체크포인트 DB(기본 10만 스레드)에서 조회/목록/삭제 지연 비교
+# 사용 예:
+#   python -m benchmarks.memory_store --threads 100000 --repeat 200
+#
+# 비교 대상
+#   legacy : 이전 store 구현. 호출마다 새 연결 + 스키마 재탐색 + 테이블별 OR 쿼리,
+#            목록은 전 테이블 UNION DISTINCT + OFFSET
+#   cached : 연결 재사용 + schema_version 캐시 + UNION ALL 한 문장, 목록은 thread_registry keyset
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+import aiosqlite
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.registry import list_registry
+from app.memory.store import (
+    CANDIDATE_THREAD_COLS,
+    delete_thread_rows,
+    fetchall,
+    fetchone,
+    tables_with_any_of,
+    thread_counts,
+    thread_exists,
+)
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "memory_store.jsonl")
+
+
+async def build_db(db_path: str, threads: int, checkpoints: int, writes: int, blob_bytes: int) -> float:
+    """스키마/트리거는 실제 체크포인터로 만들고, 데이터는 sqlite3로 빠르게 채운다."""
+    saver = await open_checkpointer(db_path, readers=0)
+    await close_checkpointer(saver)
+
+    started = time.perf_counter()
+    blob = os.urandom(blob_bytes)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=OFF;")
+    for base in range(0, threads, 10000):
+        ids = range(base, min(base + 10000, threads))
+        conn.executemany(
+            "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) "
+            "VALUES (?, '', ?, NULL, 'msgpack', ?, '{}');",
+            [(str(t), f"{c:08d}", blob) for t in ids for c in range(checkpoints)],
+        )
+        conn.executemany(
+            "INSERT INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+            "VALUES (?, '', ?, 'task', ?, 'messages', 'msgpack', ?);",
+            [(str(t), f"{c:08d}", w, blob) for t in ids for c in range(checkpoints) for w in range(writes)],
+        )
+        conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    conn.close()
+    return time.perf_counter() - started
+
+
+# 이전 구현 (비교용)
+
+async def legacy_has(db_path: str, thread_id: str) -> bool:
+    async with aiosqlite.connect(db_path) as db:
+        for table, cols in await tables_with_any_of(db, CANDIDATE_THREAD_COLS):
+            where = " OR ".join([f"{c} = ?" for c in cols])
+            if await fetchone(db, f"SELECT 1 FROM {table} WHERE {where} LIMIT 1;", [thread_id] * len(cols)):
+                return True
+    return False
+
+
+async def legacy_find(db_path: str, thread_id: str) -> list:
+    results = []
+    async with aiosqlite.connect(db_path) as db:
+        for table, cols in await tables_with_any_of(db, CANDIDATE_THREAD_COLS):
+            where = " OR ".join([f"{c} = ?" for c in cols])
+            row = await fetchone(db, f"SELECT COUNT(*) FROM {table} WHERE {where};", [thread_id] * len(cols))
+            if row and row[0]:
+                results.append((table, row[0]))
+    return results
+
+
+async def legacy_list(db_path: str, limit: int, offset: int) -> list:
+    async with aiosqlite.connect(db_path) as db:
+        tables = [t for t, cols in await tables_with_any_of(db, ["thread_id"])]
+        unions = " UNION ".join([f"SELECT thread_id FROM {t}" for t in tables])
+        return await fetchall(
+            db, f"SELECT DISTINCT thread_id FROM ({unions}) ORDER BY thread_id LIMIT ? OFFSET ?;", (limit, offset)
+        )
+
+
+async def legacy_delete(db_path: str, thread_id: str) -> int:
+    total = 0
+    async with aiosqlite.connect(db_path) as db:
+        for table, cols in await tables_with_any_of(db, CANDIDATE_THREAD_COLS):
+            where = " OR ".join([f"{c} = ?" for c in cols])
+            cur = await db.execute(f"DELETE FROM {table} WHERE {where};", [thread_id] * len(cols))
+            total += cur.rowcount
+        await db.commit()
+    return total
+
+
+async def timed(fn: Callable[[int], Awaitable], repeat: int) -> dict:
+    samples: List[float] = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"ms_p50": round(percentile(samples, 50), 3), "ms_p95": round(percentile(samples, 95), 3)}
+
+
+async def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        build_sec = await build_db(db_path, args.threads, args.checkpoints, args.writes, args.blob_bytes)
+        rng = random.Random(0)
+        lookups = [str(rng.randrange(args.threads)) for _ in range(args.repeat)]
+        misses = [f"missing-{i}" for i in range(args.repeat)]
+        # 삭제 대상은 모드별로 겹치지 않게
+        doomed = rng.sample(range(args.threads), args.deletes * 2)
+        deep_offset = args.threads // 2
+
+        results = {"legacy": {}, "cached": {}}
+        legacy = results["legacy"]
+        legacy["has_thread"] = await timed(lambda i: legacy_has(db_path, lookups[i]), args.repeat)
+        legacy["has_thread_miss"] = await timed(lambda i: legacy_has(db_path, misses[i]), args.repeat)
+        legacy["find_thread"] = await timed(lambda i: legacy_find(db_path, lookups[i]), args.repeat)
+        legacy["list_first_page"] = await timed(lambda i: legacy_list(db_path, 50, 0), args.list_repeat)
+        legacy["list_deep_page"] = await timed(lambda i: legacy_list(db_path, 50, deep_offset), args.list_repeat)
+        legacy["delete_thread"] = await timed(lambda i: legacy_delete(db_path, str(doomed[i])), args.deletes)
+
+        saver = await open_checkpointer(db_path, readers=1)
+        try:
+            async with saver.readers.acquire() as db:
+                cached = results["cached"]
+                cached["has_thread"] = await timed(lambda i: thread_exists(db, db_path, lookups[i]), args.repeat)
+                cached["has_thread_miss"] = await timed(lambda i: thread_exists(db, db_path, misses[i]), args.repeat)
+                cached["find_thread"] = await timed(lambda i: thread_counts(db, db_path, lookups[i]), args.repeat)
+                cached["list_first_page"] = await timed(
+                    lambda i: list_registry(db, limit=50, order="thread_id"), args.list_repeat
+                )
+                # keyset은 깊이와 무관: 중간 지점 cursor에서 시작
+                _, cursor = await list_registry(db, limit=deep_offset, order="thread_id")
+                cached["list_deep_page"] = await timed(
+                    lambda i: list_registry(db, limit=50, cursor=cursor, order="thread_id"), args.list_repeat
+                )
+            cached["delete_thread"] = await timed(
+                lambda i: delete_thread_rows(saver.conn, db_path, str(doomed[args.deletes + i])), args.deletes
+            )
+        finally:
+            await close_checkpointer(saver)
+        results["db_mb"] = round(os.path.getsize(db_path) / 1e6, 1)
+    results["build_sec"] = round(build_sec, 1)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="메모리 store 조회/목록/삭제 벤치마크")
+    parser.add_argument("--threads", type=int, default=100000)
+    parser.add_argument("--checkpoints", type=int, default=2, help="스레드당 체크포인트 수")
+    parser.add_argument("--writes", type=int, default=2, help="체크포인트당 writes 수")
+    parser.add_argument("--blob-bytes", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--list-repeat", type=int, default=10, help="목록 조회 반복 (legacy는 느림)")
+    parser.add_argument("--deletes", type=int, default=50)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    record = {
+        "benchmark": "memory_store",
+        **run_info(),
+        "threads": args.threads,
+        "checkpoints": args.checkpoints,
+        "writes": args.writes,
+        "metrics": results,
+    }
+    append_jsonl(args.output, record)
+    print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# pre-fork 워커 메모리 벤치마크: 마스터 preload + fork(copy-on-write 공유) vs 워커마다 로드 (app.prefork)
+# 사용 예:
+#   python -m benchmarks.prefork_memory --workers 1,2,4
+#   EMBEDDING_MODEL=jhgan/ko-sroberta-multitask python -m benchmarks.prefork_memory --spots 50000
+#
+# 임시 디렉토리에 합성 spots DB(Chroma, --spots개 × --dim차원 벡터 + 좌표)와 화장실 CSV(--restrooms개)를 만들고
+# python -m app.prefork를 모드/워커 수별로 띄운다. 모든 워커가 준비되면 --requests번 요청을 보내서 워커를 한 번씩 돌린 뒤
+# /proc/<pid>/smaps_rollup으로 마스터와 워커의 메모리를 잰다. EMBEDDING_MODEL이 있으면 임베딩 모델도 preload 대상.
+#   preload        : 마스터가 로드 후 gc.freeze + fork (기본 배포 모드)
+#   preload_nogc   : 마스터가 로드 후 fork (gc.freeze 없이)
+#   worker         : fork 뒤 워커마다 로드 (uvicorn --workers와 같은 메모리 구조)
+#
+# 지표 (MB)
+#   worker_rss_mean / worker_pss_mean : 워커 하나의 RSS / PSS (PSS는 공유 페이지를 나눠 가진 몫)
+#   worker_private_mean               : 워커 전용 페이지 (Private_Clean + Private_Dirty)
+#   worker_shared_mean                : 다른 프로세스와 공유 중인 페이지 (Shared_Clean + Shared_Dirty)
+#   total_pss                         : 마스터 + 워커 PSS 합 = 서버 전체가 실제로 쓰는 메모리
+#   startup_sec                       : 실행부터 모든 워커 준비까지
+import argparse
+import csv
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.spots.ingest import COLLECTION_NAME
+from benchmarks.chat_load import wait_ready
+from benchmarks.common import RESULTS_DIR, append_jsonl, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "prefork_memory.jsonl")
+MODES = {
+    "preload": [],
+    "preload_nogc": ["--no-gc-freeze"],
+    "worker": ["--no-preload"],
+}
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+RESTROOM_HEADER = ["화장실명", "소재지도로명주소", "개방시간상세", "남성용-장애인용대변기수", "여성용-장애인용대변기수", "비상벨설치여부", "WGS84위도", "WGS84경도"]
+
+
+# ===============[합성 데이터]============================
+
+def build_spots_db(path: str, count: int, dim: int, batch: int = 1000) -> None:
+    import chromadb
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection(COLLECTION_NAME)
+    for start in range(0, count, batch):
+        n = min(batch, count - start)
+        vectors = rng.standard_normal((n, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        collection.add(
+            ids=[f"spot-{start + i}" for i in range(n)],
+            embeddings=vectors.tolist(),
+            documents=[f"인천 관광지 {start + i} 소개" for i in range(n)],
+            metadatas=[
+                {"name": f"관광지 {start + i}", "latitude": 37.3 + rng.random() * 0.3, "longitude": 126.4 + rng.random() * 0.4}
+                for i in range(n)
+            ],
+        )
+
+
+def build_restroom_csv(path: str, count: int) -> None:
+    rand = random.Random(0)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(RESTROOM_HEADER)
+        for i in range(count):
+            writer.writerow(
+                [f"화장실 {i}", f"인천 중구 {i}", rand.choice(["24시간", "09:00~18:00"]), 1, 0, "Y",
+                 round(37.3 + rand.random() * 0.3, 6), round(126.4 + rand.random() * 0.4, 6)]
+            )
+
+
+# ===============[메모리 측정]============================
+
+def smaps_rollup(pid: int) -> Dict[str, float]:
+    """/proc/<pid>/smaps_rollup (MB)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                values[key] = int(rest.split()[0]) / 1024
+    return values
+
+
+def child_pids(parent: int) -> List[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤에서 읽는다
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def summarize(master: Dict[str, float], workers: List[Dict[str, float]], startup_sec: float) -> Dict:
+    def mean(key):
+        return round(sum(w[key] for w in workers) / len(workers), 1) if workers else 0.0
+
+    for w in workers:
+        w["private"] = w["Private_Clean"] + w["Private_Dirty"]
+        w["shared"] = w["Shared_Clean"] + w["Shared_Dirty"]
+    return {
+        "master_rss": round(master["Rss"], 1),
+        "master_pss": round(master["Pss"], 1),
+        "worker_rss_mean": mean("Rss"),
+        "worker_pss_mean": mean("Pss"),
+        "worker_private_mean": mean("private"),
+        "worker_shared_mean": mean("shared"),
+        "worker_pss": [round(w["Pss"], 1) for w in workers],
+        "total_pss": round(master["Pss"] + sum(w["Pss"] for w in workers), 1),
+        "startup_sec": round(startup_sec, 2),
+    }
+
+
+# ===============[실행]============================
+
+def run_server(mode: str, workers: int, port: int, env: Dict[str, str], requests: int, settle_sec: float) -> Dict:
+    started = time.time()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.prefork", "--workers", str(workers), "--port", str(port),
+         "--log-level", "warning", *MODES[mode]],
+        env=env,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_ready(f"{url}/health", proc)
+        # /ready는 요청을 받은 워커의 상태이므로 워커 수만큼 fork됐고 여러 번 연속 ready일 때까지
+        ready_streak = 0
+        while ready_streak < workers * 3:
+            if proc.poll() is not None:
+                raise RuntimeError(f"prefork 종료됨 (code {proc.returncode})")
+            ready = len(child_pids(proc.pid)) == workers and httpx.get(f"{url}/ready").json()["status"] == "ready"
+            ready_streak = ready_streak + 1 if ready else 0
+            time.sleep(0.05)
+        startup_sec = time.time() - started
+
+        with httpx.Client(base_url=url) as client:
+            for i in range(requests):
+                client.get("/metrics" if i % 2 else "/ready", headers={"Connection": "close"})
+        time.sleep(settle_sec)
+        master = smaps_rollup(proc.pid)
+        worker_stats = [smaps_rollup(pid) for pid in child_pids(proc.pid)]
+        return summarize(master, worker_stats, startup_sec)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="pre-fork 워커 메모리 벤치마크 (RSS/PSS)")
+    parser.add_argument("--workers", default="1,2,4", help="쉼표 구분 워커 수")
+    parser.add_argument("--mode", default=",".join(MODES), help=f"쉼표 구분 ({','.join(MODES)})")
+    parser.add_argument("--spots", type=int, default=20000, help="합성 spots 수 (0이면 spots 인덱스 없음)")
+    parser.add_argument("--dim", type=int, default=768, help="합성 벡터 차원")
+    parser.add_argument("--restrooms", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200, help="측정 전에 보낼 요청 수")
+    parser.add_argument("--settle-sec", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        # 도구/LLM 클라이언트는 만들 때 키가 있어야 한다 (요청은 보내지 않음)
+        for key in ("OPENAI_API_KEY", "UPSTAGE_API_KEY", "TAVILY_API_KEY", "OPENWEATHERMAP_API_KEY", "KAKAO_REST_API_KEY"):
+            env.setdefault(key, "bench")
+        env.update(
+            {
+                "MEMORY_DB": os.path.join(tmp, "memory.db"),
+                "LOCK_BACKEND": "sqlite",
+                "LOG_FILE": os.path.join(tmp, "app.log"),
+                "LOG_LEVEL": "WARNING",
+                "TRACE_FILE": os.path.join(tmp, "traces.jsonl"),
+                "RECORD_FILE": os.path.join(tmp, "recordings.jsonl"),
+            }
+        )
+        if args.spots:
+            env["DB_PATH"] = os.path.join(tmp, "spots_db")
+            build_spots_db(env["DB_PATH"], args.spots, args.dim)
+        if args.restrooms:
+            env["RESTROOM_CSV"] = os.path.join(tmp, "restroom.csv")
+            build_restroom_csv(env["RESTROOM_CSV"], args.restrooms)
+
+        for workers in [int(w) for w in args.workers.split(",")]:
+            for mode in args.mode.split(","):
+                metrics = run_server(mode, workers, args.port, env, args.requests, args.settle_sec)
+                record = {
+                    "benchmark": "prefork_memory",
+                    **info,
+                    "mode": mode,
+                    "workers": workers,
+                    "spots": args.spots,
+                    "dim": args.dim,
+                    "restrooms": args.restrooms,
+                    "embedding_model": env.get("EMBEDDING_MODEL"),
+                    "metrics": metrics,
+                }
+                append_jsonl(args.output, record)
+                print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# 녹화한 실제 대화 재생 벤치마크 (입력: app.services.recorder가 남긴 RECORD_FILE)
+# 사용 예:
+#   python -m benchmarks.replay --file logs/recordings.jsonl
+#   python -m benchmarks.replay --file logs/recordings.jsonl --latency recorded --concurrency 8
+#
+# thread별 요청을 시간순으로 현재 graph_module 그래프(임시 체크포인트 DB)에 다시 넣는다.
+# LLM 응답과 도구 결과는 녹화된 것을 그대로 돌려준다 (외부 호출 없음, 몇 번을 돌려도 같은 결과):
+#   LLM: 요청 안에서 녹화 순서대로, 도구: (이름, 인자)가 같은 녹화 결과 → 없으면 같은 이름의 다음 결과
+# 그래프를 바꿔서 LLM 호출 수나 도구 호출이 녹화와 달라지면 diverged로 센다 (이유별 건수는 divergence).
+# 녹화 때 끝까지 가지 못한 요청(error, 취소, 연결 끊김)은 재생하지 않는다 (skipped_turns).
+# --latency recorded면 녹화된 LLM/도구 시간만큼 기다린다 (none: 그래프 자체 비용만 잰다).
+#
+# 지표
+#   turns, llm_calls, tool_calls  : 재생한 요청/LLM/도구 호출 수
+#   tokens_input/output/total     : 재생한 LLM 호출의 녹화된 토큰 사용량 합
+#   prompt_messages_mean/max      : LLM에 넘긴 메시지 수 (대화가 길어지는 영향)
+#   prompt_chars_mean             : LLM에 넘긴 메시지 글자 수
+#   turn_ms_*, node_ms_*          : 요청 / 노드별(analyze, chatbot, tools)·checkpoint 시간 p50/p95
+#   diverged_turns, answer_match  : 녹화와 달라진 요청 수, 마지막 답변이 녹화와 같은 요청 비율
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool, Tool
+
+from app.core.config import settings
+from app.core.tracing import Trace, trace_scope
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.schemas.ai import ChatRequest
+from app.services.ai_service import system_message, user_message
+from app.services.graph_metrics import trace_callbacks
+from app.services.graph_module import get_tools, make_graph
+from app.services.recorder import load_sessions, mask_value
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "replay.jsonl")
+NODES = ("analyze", "chatbot", "tools", "checkpoint")
+
+CURRENT_TURN: ContextVar[Optional["ReplayTurn"]] = ContextVar("replay_turn", default=None)
+
+
+class ReplayMiss(Exception):
+    """녹화에 없는 LLM/도구 호출"""
+
+
+class RecordedToolError(Exception):
+    """녹화 때 도구가 낸 오류를 그대로 다시 낸다"""
+
+
+class ReplayTurn:
+    """요청 하나를 재생하는 동안 남은 녹화 응답과 재생 결과"""
+
+    def __init__(self, record: Dict[str, Any], latency: bool):
+        self.record = record
+        self.latency = latency
+        self.llm: List[Dict[str, Any]] = list(record.get("llm", []))
+        self.tools: List[Dict[str, Any]] = list(record.get("tools", []))
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.prompt_messages: List[int] = []
+        self.prompt_chars: List[int] = []
+        self.usage: Counter = Counter()
+        self.divergence: Counter = Counter()
+
+    async def wait(self, entry: Dict[str, Any]) -> None:
+        if self.latency and entry.get("ms"):
+            await asyncio.sleep(entry["ms"] / 1000.0)
+
+    def next_llm(self, messages) -> Dict[str, Any]:
+        self.llm_calls += 1
+        self.prompt_messages.append(len(messages))
+        self.prompt_chars.append(sum(len(str(m.content)) for m in messages))
+        if not self.llm:
+            self.divergence["llm_exhausted"] += 1
+            raise ReplayMiss("녹화된 LLM 응답이 더 없음")
+        entry = self.llm.pop(0)
+        self.usage.update({k: v for k, v in (entry.get("usage") or {}).items() if isinstance(v, int)})
+        return entry
+
+    def next_tool(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        self.tool_calls += 1
+        exact = next((i for i, e in enumerate(self.tools) if e["name"] == name and e["args"] == args), None)
+        if exact is None:
+            exact = next((i for i, e in enumerate(self.tools) if e["name"] == name), None)
+            if exact is None:
+                self.divergence["tool_missing"] += 1
+                raise ReplayMiss(f"녹화에 없는 도구 호출: {name}")
+            self.divergence["tool_args_changed"] += 1
+        return self.tools.pop(exact)
+
+    def finish(self, status: str) -> None:
+        if self.llm:
+            self.divergence["llm_unused"] += 1
+        if self.tools:
+            self.divergence["tool_unused"] += 1
+        if status != self.record.get("status"):
+            self.divergence["status_changed"] += 1
+
+
+def recorded_message(entry: Dict[str, Any]) -> AIMessage:
+    usage = entry.get("usage") or {}
+    return AIMessage(
+        content=entry.get("content") or "",
+        tool_calls=[
+            {"name": c["name"], "args": c["args"], "id": c.get("id"), "type": "tool_call"}
+            for c in entry.get("tool_calls", [])
+        ],
+        usage_metadata=usage if {"input_tokens", "output_tokens", "total_tokens"} <= set(usage) else None,
+    )
+
+
+class ReplayChatModel(BaseChatModel):
+    """현재 요청(CURRENT_TURN)의 녹화된 LLM 응답을 순서대로 돌려준다."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        entry = CURRENT_TURN.get().next_llm(messages)
+        return ChatResult(generations=[ChatGeneration(message=recorded_message(entry))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        turn = CURRENT_TURN.get()
+        entry = turn.next_llm(messages)
+        await turn.wait(entry)
+        return ChatResult(generations=[ChatGeneration(message=recorded_message(entry))])
+
+
+def replay_tools(tools) -> list:
+    """이름/설명/인자 스키마는 그대로, 실행만 녹화 결과로 바꾼 도구"""
+
+    def make(name: str):
+        async def replay(*args, **kwargs):
+            call_args = kwargs if kwargs or not args else {"__arg1": args[0]}
+            turn = CURRENT_TURN.get()
+            entry = turn.next_tool(name, mask_value(call_args))
+            await turn.wait(entry)
+            if "error" in entry:
+                raise RecordedToolError(entry["error"])
+            return entry["output"]
+
+        return replay
+
+    replayed = []
+    for t in tools:
+        if isinstance(t, Tool):
+            replayed.append(Tool(name=t.name, description=t.description, func=None, coroutine=make(t.name)))
+        else:
+            replayed.append(
+                StructuredTool(name=t.name, description=t.description, args_schema=t.args_schema, coroutine=make(t.name))
+            )
+    return replayed
+
+
+def replay_request(record: Dict[str, Any], thread_id: str) -> ChatRequest:
+    request = record["request"]
+    return ChatRequest(
+        user_id=thread_id,
+        user_question=request["user_question"],
+        user_location=request.get("user_location"),
+        user_info=request.get("user_info"),
+    )
+
+
+async def replay_session(graph, thread: str, turns: List[Dict[str, Any]], latency: bool, results: list) -> None:
+    thread_id = f"replay-{thread}"
+    for record in turns:
+        if record.get("status") != "ok":
+            results.append({"skipped": True})
+            continue
+        req = replay_request(record, thread_id)
+        messages = [user_message(req)] if record.get("endpoint") == "chat" else [system_message(req), user_message(req)]
+        turn = ReplayTurn(record, latency)
+        trace = Trace("replay", {"thread": thread})
+        token = CURRENT_TURN.set(turn)
+        status, answer = "ok", None
+        started = time.perf_counter()
+        try:
+            with trace_scope(trace):
+                config = {"configurable": {"thread_id": thread_id}, "callbacks": trace_callbacks()}
+                result = await graph.ainvoke({"messages": messages}, config)
+            answer = result["messages"][-1].content
+        except Exception:
+            status = "error"
+        finally:
+            CURRENT_TURN.reset(token)
+        turn.finish(status)
+        recorded = record.get("llm") or [{}]
+        results.append(
+            {
+                "skipped": False,
+                "ms": (time.perf_counter() - started) * 1000,
+                "breakdown": trace.breakdown(),
+                "turn": turn,
+                "answer_match": answer is not None and answer == recorded[-1].get("content"),
+            }
+        )
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    played = [r for r in results if not r["skipped"]]
+    turns = [r["turn"] for r in played]
+    usage: Counter = sum((t.usage for t in turns), Counter())
+    divergence: Counter = sum((t.divergence for t in turns), Counter())
+    prompt_messages = [n for t in turns for n in t.prompt_messages]
+    prompt_chars = [n for t in turns for n in t.prompt_chars]
+    metrics: Dict[str, Any] = {
+        "turns": len(played),
+        "skipped_turns": len(results) - len(played),
+        "llm_calls": sum(t.llm_calls for t in turns),
+        "tool_calls": sum(t.tool_calls for t in turns),
+        "tokens_input": usage["input_tokens"],
+        "tokens_output": usage["output_tokens"],
+        "tokens_total": usage["total_tokens"],
+        "prompt_messages_mean": round(sum(prompt_messages) / len(prompt_messages), 2) if prompt_messages else 0,
+        "prompt_messages_max": max(prompt_messages, default=0),
+        "prompt_chars_mean": round(sum(prompt_chars) / len(prompt_chars), 1) if prompt_chars else 0,
+        "diverged_turns": sum(1 for t in turns if t.divergence),
+        "divergence": dict(divergence),
+        "answer_match": round(sum(r["answer_match"] for r in played) / len(played), 4) if played else 0,
+    }
+    durations = [r["ms"] for r in played]
+    metrics["turn_ms_p50"] = round(percentile(durations, 50), 2)
+    metrics["turn_ms_p95"] = round(percentile(durations, 95), 2)
+    for node in NODES:
+        values = [r["breakdown"][node] for r in played if node in r["breakdown"]]
+        if values:
+            metrics[f"node_ms_{node}_p50"] = round(percentile(values, 50), 2)
+            metrics[f"node_ms_{node}_p95"] = round(percentile(values, 95), 2)
+    return metrics
+
+
+async def replay(sessions: Dict[str, List[Dict[str, Any]]], latency: bool, concurrency: int, db_path: str) -> dict:
+    saver = await open_checkpointer(db_path, readers=1)
+    try:
+        graph = await make_graph(llm=ReplayChatModel(), tools=replay_tools(get_tools()), checkpointer=saver)
+        results: list = []
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in sessions.items():
+            queue.put_nowait(item)
+
+        async def worker():
+            while not queue.empty():
+                thread, turns = queue.get_nowait()
+                await replay_session(graph, thread, turns, latency, results)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await close_checkpointer(saver)
+    metrics = summarize(results)
+    metrics["elapsed_sec"] = round(elapsed, 2)
+    return metrics
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="녹화한 대화 재생 벤치마크")
+    parser.add_argument("--file", default=settings.RECORD_FILE, help="녹화 파일 (회전된 .1, .2 ...도 읽음)")
+    parser.add_argument("--threads", type=int, default=None, help="재생할 대화 수 (기본: 전부)")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 재생할 대화 수")
+    parser.add_argument("--latency", default="none", choices=("none", "recorded"), help="녹화된 LLM/도구 시간만큼 대기")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    sessions = load_sessions(args.file)
+    if args.threads is not None:
+        sessions = dict(sorted(sessions.items())[: args.threads])
+    if not sessions:
+        raise SystemExit(f"녹화된 대화가 없습니다: {args.file}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = asyncio.run(
+            replay(sessions, args.latency == "recorded", args.concurrency, os.path.join(tmp, "memory.db"))
+        )
+    record = {
+        "benchmark": "replay",
+        **run_info(),
+        "file": args.file,
+        "sessions": len(sessions),
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "metrics": metrics,
+    }
+    append_jsonl(args.output, record)
+    print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# spots_db 검색 품질/지연 벤치마크
+# 사용 예:
+#   python -m benchmarks.spots_retrieval
+#   python -m benchmarks.spots_retrieval --k 1,3,5 --threshold 0.3,0.5 \
+#       --search-type similarity,similarity_score_threshold,mmr --backend chroma,faiss
+# 결과는 benchmarks/results/spots_retrieval.jsonl에 설정별로 한 줄씩 누적된다.
+import argparse
+import itertools
+import json
+import os
+import time
+from typing import List
+
+from app.core.config import settings
+from app.spots.retriever import (
+    BACKENDS,
+    DEFAULT_K,
+    DEFAULT_SCORE_THRESHOLD,
+    DEFAULT_SEARCH_TYPE,
+    build_spot_retriever,
+    load_embeddings,
+)
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(__file__), "data", "spots_queries.jsonl")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "spots_retrieval.jsonl")
+
+
+def load_queries(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_relevant(doc, relevant: List[str]) -> bool:
+    """라벨은 관광지 이름 목록. 메타데이터 이름/ID 또는 본문 포함 여부로 판정."""
+    meta = getattr(doc, "metadata", {}) or {}
+    keys = {str(meta.get("name", "")), str(meta.get("spot_id", ""))}
+    content = getattr(doc, "page_content", "") or ""
+    return any(label in keys or label in content for label in relevant)
+
+
+def evaluate(retriever, queries: List[dict], k: int, warmup: int = 2) -> dict:
+    """recall@k, MRR, 지연(p50/p95) 측정"""
+    for q in queries[:warmup]:
+        retriever.invoke(q["query"])
+
+    latencies, recalls, reciprocal_ranks = [], [], []
+    hits = 0
+    for q in queries:
+        started = time.perf_counter()
+        docs = retriever.invoke(q["query"])[:k]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        relevant = q["relevant"]
+        flags = [is_relevant(d, relevant) for d in docs]
+        # 라벨은 같은 장소의 별칭 목록이므로, 하나라도 찾으면 recall 1
+        recalls.append(1.0 if any(flags) else 0.0)
+        rank = next((i + 1 for i, f in enumerate(flags) if f), None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        hits += 1 if docs else 0
+
+    n = len(queries)
+    return {
+        "queries": n,
+        f"recall@{k}": round(sum(recalls) / n, 4),
+        "mrr": round(sum(reciprocal_ranks) / n, 4),
+        "coverage": round(hits / n, 4),    # 결과가 하나라도 나온 질의 비율 (threshold 영향)
+        "latency_ms_p50": round(percentile(latencies, 50), 3),
+        "latency_ms_p95": round(percentile(latencies, 95), 3),
+        "latency_ms_mean": round(sum(latencies) / n, 3),
+    }
+
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def iter_grid(ks, thresholds, search_types, backends):
+    seen = set()
+    for backend, search_type, k, threshold in itertools.product(backends, search_types, ks, thresholds):
+        # threshold는 similarity_score_threshold에서만 의미가 있으므로 중복 조합 제거
+        if search_type != "similarity_score_threshold":
+            threshold = None
+        key = (backend, search_type, k, threshold)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield {"backend": backend, "search_type": search_type, "k": k, "score_threshold": threshold}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="spots_db 검색 품질/지연 벤치마크")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="라벨링된 질의 JSONL")
+    parser.add_argument("--k", default=str(DEFAULT_K))
+    parser.add_argument("--threshold", default=str(DEFAULT_SCORE_THRESHOLD))
+    parser.add_argument("--search-type", default=DEFAULT_SEARCH_TYPE)
+    parser.add_argument("--backend", default="chroma", help=f"쉼표로 구분 ({', '.join(BACKENDS)})")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSONL (누적)")
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    embeddings = load_embeddings(args.model)
+    info = run_info()
+
+    grid = iter_grid(
+        parse_list(args.k, int),
+        parse_list(args.threshold, float),
+        parse_list(args.search_type),
+        parse_list(args.backend),
+    )
+    for params in grid:
+        retriever = build_spot_retriever(
+            embeddings,
+            k=params["k"],
+            # 0.0도 유효한 임계값 (None일 때만 기본값)
+            score_threshold=DEFAULT_SCORE_THRESHOLD if params["score_threshold"] is None else params["score_threshold"],
+            search_type=params["search_type"],
+            backend=params["backend"],
+        )
+        metrics = evaluate(retriever, queries, params["k"])
+        record = {
+            "benchmark": "spots_retrieval",
+            **info,
+            "embedding_model": args.model,
+            "params": params,
+            "metrics": metrics,
+        }
+        append_jsonl(args.output, record)
+        print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
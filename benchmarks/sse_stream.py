@@ -0,0 +1,139 @@
+# SSE 스트리밍 벤치마크: 토큰마다 프레임(기존) vs 묶어서 보내기(app.services.sse)
+# 사용 예:
+#   python -m benchmarks.sse_stream --streams 200 --tokens 300
+#
+# 합성 답변: 한국어 단어 토큰이 평균 --token-ms 간격(지터 포함)으로 도착한다.
+# 각 모드의 프레임을 실제 StreamingResponse에 태워 ASGI send까지 돌린다 (소켓 없음).
+# source 모드는 토큰만 읽고 버리는 기준선 (합성 토큰/이벤트 루프 비용).
+#
+# 지표
+#   frames_per_answer : 답변 하나당 send 횟수 (body 프레임)
+#   bytes_per_answer  : 답변 하나당 전송 bytes
+#   cpu_ms_per_stream : 프로세스 CPU 시간 / 스트림 수
+#   stream_cpu_ms     : cpu_ms_per_stream - source 기준선 (스트리밍 자체 비용)
+#   first_frame_ms    : 스트림 시작 → 첫 프레임
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import AsyncIterator, List
+
+from starlette.responses import StreamingResponse
+
+from app.services.sse import StreamStats, sse_events
+from benchmarks.common import RESULTS_DIR, append_jsonl, percentile, run_info
+
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "sse_stream.jsonl")
+MODES = ("source", "legacy", "coalesced")
+
+WORDS = ["인천", "차이나타운", "은", "개항", "이후", "형성된", "거리로", "짜장면", "의", "발상지", "입니다", ".", " ", "월미도", "까지", "걸어서"]
+
+
+async def fake_tokens(rng: random.Random, count: int, token_ms: float) -> AsyncIterator[str]:
+    for _ in range(count):
+        await asyncio.sleep(rng.uniform(0, 2 * token_ms) / 1000.0)
+        yield rng.choice(WORDS)
+
+
+async def legacy_events(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """기존 /v1/chat: 토큰마다 delta 프레임 하나"""
+    async for content in tokens:
+        data = {"type": "delta", "content": content}
+        yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def measure(mode: str, streams: int, tokens: int, token_ms: float, flush_ms: float, flush_chars: int) -> dict:
+    frames: List[int] = []
+    sizes: List[int] = []
+    first_frame_ms: List[float] = []
+    disconnect = asyncio.Event()    # 끝날 때까지 연결 유지
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def one(seed: int) -> None:
+        source = fake_tokens(random.Random(seed), tokens, token_ms)
+        started = time.perf_counter()
+        count = size = 0
+        if mode == "source":
+            async for _ in source:
+                pass
+            frames.append(0)
+            sizes.append(0)
+            return
+
+        async def send(message: dict) -> None:
+            nonlocal count, size
+            body = message.get("body")
+            if message["type"] != "http.response.body" or not body:
+                return
+            if count == 0:
+                first_frame_ms.append((time.perf_counter() - started) * 1000)
+            count += 1
+            size += len(body)
+
+        if mode == "legacy":
+            events = legacy_events(source)
+        else:
+            events = sse_events(source, StreamStats(), flush_ms=flush_ms, flush_chars=flush_chars)
+        response = StreamingResponse(events, media_type="text/event-stream")
+        await response({"type": "http", "asgi": {"spec_version": "2.0"}}, receive, send)
+        frames.append(count)
+        sizes.append(size)
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(streams)))
+    cpu_ms = (time.process_time() - cpu_started) * 1000
+    wall_sec = time.perf_counter() - wall_started
+    disconnect.set()
+
+    return {
+        "mode": mode,
+        "streams": streams,
+        "tokens": tokens,
+        "frames_per_answer": round(sum(frames) / streams, 1),
+        "bytes_per_answer": round(sum(sizes) / streams),
+        "cpu_ms_per_stream": round(cpu_ms / streams, 2),
+        "first_frame_ms_p50": round(percentile(first_frame_ms, 50), 2),
+        "first_frame_ms_p95": round(percentile(first_frame_ms, 95), 2),
+        "wall_sec": round(wall_sec, 2),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="SSE 스트리밍 벤치마크")
+    parser.add_argument("--streams", type=int, default=200, help="동시 스트림 수")
+    parser.add_argument("--tokens", type=int, default=300, help="답변당 토큰 수")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="토큰 간 평균 간격")
+    parser.add_argument("--flush-ms", type=float, default=50.0)
+    parser.add_argument("--flush-chars", type=int, default=64)
+    parser.add_argument("--mode", default=",".join(MODES), help="쉼표 구분 (source,legacy,coalesced)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    info = run_info()
+    baseline = None
+    for mode in args.mode.split(","):
+        metrics = asyncio.run(measure(mode, args.streams, args.tokens, args.token_ms, args.flush_ms, args.flush_chars))
+        if mode == "source":
+            baseline = metrics["cpu_ms_per_stream"]
+        elif baseline is not None:
+            metrics["stream_cpu_ms"] = round(metrics["cpu_ms_per_stream"] - baseline, 2)
+        record = {
+            "benchmark": "sse_stream",
+            **info,
+            "token_ms": args.token_ms,
+            "flush_ms": args.flush_ms,
+            "flush_chars": args.flush_chars,
+            "metrics": metrics,
+        }
+        append_jsonl(args.output, record)
+        print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
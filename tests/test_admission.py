@@ -0,0 +1,296 @@
+# tests/test_admission.py
+import asyncio
+import json
+from typing import Annotated, TypedDict
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app.api.v1.endpoints import ai
+from app.main import app
+from app.memory import locks
+from app.services import admission
+from app.services.admission import AdmissionController, AdmissionRejected, ClientDisconnected, Superseded, run_callbacks
+from app.services.ai_service import CANCELLED_TOOL_MESSAGE, repair_cancelled_run
+
+client = TestClient(app)
+
+
+def test_global_cap_queue_and_shedding():
+    async def main():
+        ctl = AdmissionController(max_running=2, max_queue=1, queue_timeout=0.1)
+        first = await ctl.enter("a")
+        second = await ctl.enter("b")
+        queued = asyncio.create_task(ctl.enter("c"))
+        await asyncio.sleep(0.01)
+        stats_full = ctl.stats()
+
+        # 대기열도 차 있으면 기다리지 않고 바로 503
+        try:
+            await ctl.enter("d")
+            shed = None
+        except AdmissionRejected as e:
+            shed = e.status_code
+
+        # 대기 중이던 요청은 자리가 안 나면 timeout 뒤 503
+        try:
+            await queued
+            timed_out = None
+        except AdmissionRejected as e:
+            timed_out = e.status_code
+
+        first.leave()
+        third = await ctl.enter("c")
+        second.leave()
+        third.leave()
+        third.leave()    # 두 번 반환해도 안전
+        return stats_full, shed, timed_out, ctl.stats()
+
+    stats_full, shed, timed_out, stats = asyncio.run(main())
+    assert stats_full["running"] == 2 and stats_full["queued"] == 1
+    assert shed == 503 and timed_out == 503
+    assert stats["running"] == 0 and stats["queued"] == 0 and stats["threads_active"] == 0
+    assert stats["admitted"] == 3 and stats["rejected_overload"] == 2
+    assert len(locks.lock_registry) == 0
+
+
+def test_same_thread_is_serialized_with_queue_policy():
+    async def main():
+        ctl = AdmissionController(max_running=8, max_queue=8, queue_timeout=1, thread_max_pending=2)
+        active = 0
+        overlap = False
+
+        async def work():
+            nonlocal active, overlap
+            active += 1
+            overlap = overlap or active > 1
+            await asyncio.sleep(0.02)
+            active -= 1
+            return "ok"
+
+        async def request():
+            ticket = await ctl.enter("same")
+            try:
+                return await ticket.run(work())
+            finally:
+                ticket.leave()
+
+        runs = [asyncio.create_task(request()) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            await ctl.enter("same")
+            too_many = None
+        except AdmissionRejected as e:
+            too_many = e.status_code
+        results = await asyncio.gather(*runs)
+        return results, overlap, too_many, ctl.stats()
+
+    results, overlap, too_many, stats = asyncio.run(main())
+    assert results == ["ok", "ok"] and not overlap
+    assert too_many == 429 and stats["rejected_thread"] == 1
+    assert stats["queue_wait_ms_p95"] >= 15
+
+
+def test_cancel_policy_supersedes_previous_stream():
+    async def main():
+        ctl = AdmissionController(max_running=8, max_queue=8, queue_timeout=1, thread_policy="cancel")
+        closed = asyncio.Event()
+
+        async def tokens():
+            try:
+                for i in range(100):
+                    await asyncio.sleep(0.01)
+                    yield i
+            finally:
+                closed.set()
+
+        async def old_request():
+            ticket = await ctl.enter("t")
+            got = []
+            try:
+                async for item in ticket.stream(tokens()):
+                    got.append(item)
+            except Superseded:
+                return got, "superseded"
+            finally:
+                ticket.leave()
+            return got, "finished"
+
+        old = asyncio.create_task(old_request())
+        await asyncio.sleep(0.035)
+        ticket = await ctl.enter("t")
+        try:
+            new = await ticket.run(asyncio.sleep(0, result="new"))
+        finally:
+            ticket.leave()
+        return await old, closed.is_set(), new, ctl.stats()
+
+    (got, outcome), closed, new, stats = asyncio.run(main())
+    assert outcome == "superseded" and 1 <= len(got) < 100
+    assert closed and new == "new"
+    assert stats["superseded"] == 1 and stats["running"] == 0 and stats["threads_active"] == 0
+
+
+def test_chatbot_endpoint_sheds_with_retry_after(monkeypatch):
+    async def fake_ask_ai(req):
+        return "hi!"
+
+    monkeypatch.setattr(ai, "ask_ai", fake_ask_ai)
+    monkeypatch.setattr(admission, "ADMISSION", AdmissionController(max_running=1, max_queue=1, queue_timeout=1))
+    resp = client.post("/v1/chatbot", json={"user_question": "안녕", "user_id": "u1"})
+    assert resp.status_code == 200 and resp.json()["ai_answer"] == "hi!"
+
+    # 자리도 대기열도 없음 → 즉시 503
+    monkeypatch.setattr(admission, "ADMISSION", AdmissionController(max_running=0, max_queue=0, queue_timeout=1))
+    resp = client.post("/v1/chatbot", json={"user_question": "안녕", "user_id": "u1"})
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    assert client.get("/v1/chat/stats").json()["rejected_overload"] == 1
+
+
+def test_disconnect_cancels_inflight_calls_and_releases_after_cleanup():
+    upstream = {"started": 0, "cancelled": 0}
+
+    @tool
+    async def slow_upstream(query: str) -> str:
+        """외부 API 흉내"""
+        upstream["started"] += 1
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            upstream["cancelled"] += 1
+            raise
+        return query
+
+    async def graph_run(sec):
+        await asyncio.sleep(sec)
+        return await slow_upstream.ainvoke({"query": "x"}, config={"callbacks": run_callbacks()})
+
+    async def main():
+        ctl = AdmissionController(max_running=4, max_queue=4, queue_timeout=1)
+        ticket = await ctl.enter("done")
+        await ticket.run(asyncio.sleep(0.1))    # 끝까지 간 요청 (절약량 추정 기준)
+        ticket.leave()
+
+        ticket = await ctl.enter("t")
+        held_during_cleanup = []
+
+        async def on_cancel():
+            held_during_cleanup.append(ctl.stats()["running"])
+
+        ticket.on_cancel = on_cancel
+        asyncio.get_running_loop().call_later(0.05, ticket.cancel, "disconnect")
+        try:
+            await ticket.run(graph_run(0.01))
+            outcome = "finished"
+        except ClientDisconnected:
+            outcome = "disconnected"
+        ticket.leave()
+        await asyncio.gather(*ctl.finishing)
+        return outcome, held_during_cleanup, ctl.stats()
+
+    outcome, held, stats = asyncio.run(main())
+    assert outcome == "disconnected"
+    assert upstream == {"started": 1, "cancelled": 1}
+    assert held == [1]    # 정리가 끝날 때까지 자리를 쥐고 있음
+    assert stats["running"] == 0 and stats["threads_active"] == 0 and stats["finishing"] == 0
+    assert stats["cancelled"] == {"disconnect": 1}
+    assert stats["cancelled_tool_calls"] == 1 and stats["cancelled_llm_calls"] == 0
+    assert 0 < stats["saved_sec_est"] < 0.1 and stats["run_sec_p50"] >= 0.09
+
+
+class ToyState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def test_repair_cancelled_run_answers_dangling_tool_calls():
+    async def chatbot(state):
+        if isinstance(state["messages"][-1], ToolMessage):
+            return {"messages": [AIMessage(content="답변")]}
+        calls = [{"name": "slow", "args": {}, "id": f"call-{i}"} for i in range(2)]
+        return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+    async def tools(state):
+        await asyncio.sleep(5)
+        return {"messages": []}
+
+    builder = StateGraph(ToyState)
+    builder.add_node("chatbot", chatbot)
+    builder.add_node("tools", tools)
+    builder.add_edge(START, "chatbot")
+    builder.add_conditional_edges(
+        "chatbot", lambda s: "tools" if s["messages"][-1].tool_calls else END, {"tools": "tools", END: END}
+    )
+    builder.add_edge("tools", "chatbot")
+    graph = builder.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+
+    async def main():
+        async def consume():
+            async for _ in graph.astream({"messages": [HumanMessage(content="안녕")]}, config):
+                pass
+
+        run = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)    # tools 노드 실행 중
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        repaired = await repair_cancelled_run("t1", graph=graph)
+        again = await repair_cancelled_run("t1", graph=graph)
+        return repaired, again, (await graph.aget_state(config)).values["messages"]
+
+    repaired, again, messages = asyncio.run(main())
+    assert repaired == 2 and again == 0
+    assert [type(m).__name__ for m in messages] == ["HumanMessage", "AIMessage", "ToolMessage", "ToolMessage"]
+    assert all(m.content == CANCELLED_TOOL_MESSAGE and m.status == "error" for m in messages[2:])
+
+
+def test_chatbot_endpoint_cancels_graph_on_client_disconnect(monkeypatch):
+    seen = {"cancelled": False, "repaired": None}
+
+    async def hanging_ask_ai(req):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+
+    async def fake_repair(thread_id):
+        seen["repaired"] = thread_id
+
+    monkeypatch.setattr(ai, "ask_ai", hanging_ask_ai)
+    monkeypatch.setattr(ai, "repair_cancelled_run", fake_repair)
+    ctl = AdmissionController(max_running=1, max_queue=1, queue_timeout=1)
+    monkeypatch.setattr(admission, "ADMISSION", ctl)
+
+    body = json.dumps({"user_question": "안녕", "user_id": "gone"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/v1/chatbot", "raw_path": b"/v1/chatbot",
+        "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+
+    async def main():
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.05)    # 응답 전에 클라이언트가 끊음
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        await asyncio.gather(*ctl.finishing)
+        return sent[0]["status"], ctl.stats()
+
+    status, stats = asyncio.run(main())
+    assert status == 499
+    assert seen == {"cancelled": True, "repaired": "gone"}
+    assert stats["cancelled"] == {"disconnect": 1} and stats["running"] == 0
@@ -0,0 +1,139 @@
+# tests/test_batch.py
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+from langchain_tavily import TavilySearch
+
+from app.core.config import settings
+from app.main import app
+from app.services import admission, batch, tool_module
+from app.services.admission import AdmissionController
+from app.services.tool_cache import ToolCache, cache_key, cached_call, tool_cache_scope
+from app.services.tool_registry import get_tool
+
+client = TestClient(app)
+
+
+def test_batch_streams_items_with_cap_and_shared_tool_cache(monkeypatch):
+    upstream_calls = 0
+    running = 0
+    max_running = 0
+
+    async def weather():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"sky": "맑음"}
+
+    async def fake_ask_ai(req):
+        nonlocal running, max_running
+        if not req.user_question:
+            raise ValueError("user_question, user_id 파라미터가 필요합니다.")
+        running += 1
+        max_running = max(max_running, running)
+        try:
+            result = await cached_call(cache_key("weather", "인천"), weather)
+            await asyncio.sleep(0.01 * int(req.user_id[1:]))
+            return f"{req.user_id}: {result['sky']}"
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(batch, "ask_ai", fake_ask_ai)
+    monkeypatch.setattr(admission, "ADMISSION", AdmissionController(max_running=8, max_queue=8, queue_timeout=1))
+    items = [{"user_question": "오늘 인천 날씨랑 추천 코스", "user_id": f"u{i}"} for i in range(6)]
+    items.append({"user_question": "", "user_id": "u9"})
+
+    resp = client.post("/v1/chatbot/batch", json={"items": items, "concurrency": 2})
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert events[0] == {"event": "start", "total": 7, "concurrency": 2}
+    results = {e["index"]: e for e in events[1:-1]}
+    assert sorted(results) == list(range(7))
+    assert results[3]["status"] == "ok" and results[3]["ai_answer"] == "u3: 맑음"
+    assert results[6]["status"] == "error" and results[6]["code"] == "bad_request"
+    done = events[-1]
+    assert done["event"] == "done" and done["ok"] == 6 and done["failed"] == 1
+    # 같은 배치의 같은 도구 호출은 외부 요청 한 번
+    assert upstream_calls == 1 and done["tool_cache"]["misses"] == 1
+    assert done["tool_cache"]["hits"] + done["tool_cache"]["coalesced"] == 5
+    assert max_running <= 2
+
+    monkeypatch.setattr(settings, "CHAT_BATCH_MAX_ITEMS", 3)
+    resp = client.post("/v1/chatbot/batch", json={"items": items})
+    assert resp.status_code == 400
+
+
+def test_tools_share_results_only_inside_cache_scope(monkeypatch):
+    kakao_requests = []
+    tavily_queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        kakao_requests.append(str(request.url))
+        if len(kakao_requests) == 1:
+            return httpx.Response(500)    # 실패는 캐시에 남지 않음
+        doc = {"place_name": "차이나타운", "place_url": "u", "road_address_name": "중구", "phone": "", "x": "126.6", "y": "37.4"}
+        return httpx.Response(200, json={"documents": [doc]})
+
+    async def fake_tavily(self, query, run_manager=None, **kwargs):
+        tavily_queries.append(query)
+        return {"results": [query]}
+
+    monkeypatch.setattr(tool_module, "get_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(tool_module, "KAKAO_URL", "http://kakao.test")
+    monkeypatch.setattr(TavilySearch, "_arun", fake_tavily)
+    # 도구 객체를 만들 때 키 검증만 통과하면 된다 (검색은 fake_tavily)
+    monkeypatch.setattr(settings, "TAVILY_API_KEY", settings.TAVILY_API_KEY or "test-key")
+
+    async def main():
+        cache = ToolCache()
+        with tool_cache_scope(cache):
+            args = {"query": "맛집", "location": "월미도"}
+            try:
+                await get_tool("get_near_restaurant_in_kakao").ainvoke(args)
+                failed = False
+            except Exception:
+                failed = True
+            first, second = await asyncio.gather(
+                get_tool("get_near_restaurant_in_kakao").ainvoke(args),
+                get_tool("get_near_restaurant_in_kakao").ainvoke(args),
+            )
+            web = [await get_tool("tavily_search").ainvoke({"query": "인천 축제"}) for _ in range(2)]
+        await get_tool("tavily_search").ainvoke({"query": "인천 축제"})    # 범위 밖: 캐시 없음
+        return failed, first, second, web, cache.stats()
+
+    failed, first, second, web, stats = asyncio.run(main())
+    assert failed and first == second and first[0]["name"] == "차이나타운"
+    assert len(kakao_requests) == 2
+    assert web[0] == web[1] == {"results": ["인천 축제"]}
+    assert tavily_queries == ["인천 축제", "인천 축제"]
+    assert stats["errors"] == 1 and stats["coalesced"] + stats["hits"] == 2
+
+
+def test_closing_cache_cancels_calls_without_waiters():
+    upstream = {"started": 0, "cancelled": 0}
+
+    async def slow_upstream():
+        upstream["started"] += 1
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            upstream["cancelled"] += 1
+            raise
+        return "늦은 결과"
+
+    async def main():
+        cache = ToolCache()
+        waiter = asyncio.ensure_future(cache.get_or_call(cache_key("slow"), slow_upstream))
+        await asyncio.sleep(0.01)
+        waiter.cancel()    # 기다리던 요청이 취소돼도 shield 때문에 호출은 남아 있음
+        await asyncio.sleep(0.01)
+        still_running = upstream["cancelled"] == 0
+        await cache.close()
+        return still_running, cache.stats()
+
+    still_running, stats = asyncio.run(main())
+    assert still_running and upstream == {"started": 1, "cancelled": 1}
+    assert stats["abandoned"] == 1 and stats["errors"] == 0
@@ -0,0 +1,50 @@
+# tests/test_checkpointer.py
+import asyncio
+
+import aiosqlite
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+
+
+def put_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def test_writes_visible_to_pooled_readers(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def main():
+        saver = await open_checkpointer(db_path, readers=2)
+        try:
+            async def write(thread_id: str, n: int):
+                config = put_config(thread_id)
+                for i in range(n):
+                    checkpoint = empty_checkpoint()
+                    checkpoint["channel_values"] = {"step": i}
+                    config = await saver.aput(config, checkpoint, {"step": i}, {})
+                    await saver.aput_writes(config, [("messages", f"m{i}")], task_id="t")
+
+            await asyncio.gather(*(write(f"t{i}", 5) for i in range(8)))
+
+            latest = await saver.aget_tuple(put_config("t3"))
+            history = [c async for c in saver.alist(put_config("t3"))]
+            stats = saver.stats()
+
+            # 읽기 전용 연결로는 쓸 수 없음
+            async with saver.readers.acquire() as conn:
+                with pytest.raises(aiosqlite.OperationalError):
+                    await conn.execute("DELETE FROM checkpoints;")
+            return latest, history, stats
+        finally:
+            await close_checkpointer(saver)
+
+    latest, history, stats = asyncio.run(main())
+    assert latest.checkpoint["channel_values"] == {"step": 4}
+    assert latest.pending_writes == [("t", "messages", "m4")]
+    assert len(history) == 5
+    # setup 1회 + aput/aput_writes 80회
+    assert stats["writes"] == 81 and stats["reads"] == 2 and stats["readers"] == 2
+    assert stats["queue_depth"] == 0 and stats["queue_depth_max"] >= 1
+    assert stats["commit_ms_p95"] > 0
@@ -0,0 +1,71 @@
+# tests/test_load_harness.py
+import asyncio
+from collections import Counter
+
+import httpx
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_openai import ChatOpenAI
+
+from app.services import tool_module
+from app.services.tool_module import aweather
+from app.services.tool_registry import get_tool
+from benchmarks.chat_load import summarize
+from benchmarks.fake_upstreams import FakeConfig, create_app
+
+FAST = FakeConfig(ttft_ms=0, token_ms=0, answer_tokens=8, kakao_ms=0, tavily_ms=0, weather_ms=0, blog_page_ms=0)
+
+
+def fake_client(config: FakeConfig = FAST) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(config)), base_url="http://fake")
+
+
+def test_fake_llm_calls_tool_then_streams_answer_with_usage():
+    async def main():
+        async with fake_client() as client:
+            llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                api_key="fake",
+                base_url="http://fake/v1",
+                http_async_client=client,
+                stream_usage=True,
+            ).bind_tools([get_tool("get_near_restaurant_in_kakao"), get_tool("search_blog")])
+
+            question = HumanMessage(content="차이나타운 근처 맛집 추천해줘")
+            first = await llm.ainvoke([question])
+            call = first.tool_calls[0]
+
+            chunks = []
+            async for chunk in llm.astream([question, first, ToolMessage(content="[]", tool_call_id=call["id"])]):
+                chunks.append(chunk)
+            return call, chunks
+
+    call, chunks = asyncio.run(main())
+    assert call["name"] == "get_near_restaurant_in_kakao" and call["args"]["location"] == "차이나타운"
+    answer = sum(chunks[1:], chunks[0])
+    assert answer.content and not answer.tool_calls
+    assert answer.usage_metadata["output_tokens"] == 8
+
+
+def test_tools_run_against_fake_upstreams(monkeypatch):
+    async def main():
+        async with fake_client() as client:
+            monkeypatch.setattr(tool_module, "get_http_client", lambda: client)
+            monkeypatch.setattr(tool_module, "KAKAO_URL", "http://fake")
+            monkeypatch.setattr(tool_module, "OPENWEATHERMAP_URL", "http://fake")
+            weather = await aweather("Incheon")
+            blogs = await get_tool("search_blog").ainvoke({"query": "송도 후기"})
+            return weather, blogs
+
+    weather, blogs = asyncio.run(main())
+    assert weather.startswith("In Incheon, the current weather is as follows:")
+    assert "Detailed status: scattered clouds" in weather and "  - Current: 18.2°C" in weather
+    assert len(blogs) == 10 and blogs[0]["blog_url"] == "http://fake/blog/1"
+
+
+def test_summarize_reports_percentiles_and_error_rate():
+    metrics = summarize(
+        [float(n) for n in range(1, 101)], [10.0, 20.0], Counter({"ok": 100, "http_503": 4, "done_error": 1}), 10.0
+    )
+    assert metrics["throughput_rps"] == 10.0 and metrics["requests"] == 105
+    assert metrics["error_rate"] == round(5 / 105, 4) and metrics["errors"] == {"http_503": 4, "done_error": 1}
+    assert metrics["latency_ms_p50"] == 50.5 and metrics["latency_ms_p99"] == 99.0 and metrics["ttft_ms_p50"] == 15.0
@@ -0,0 +1,139 @@
+# tests/test_logging.py
+import json
+import logging
+import queue
+import threading
+from logging.handlers import RotatingFileHandler
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import (
+    JsonlSink,
+    Lazy,
+    LogQueueHandler,
+    bind_log_context,
+    debug_sampled,
+    setup_logging,
+    shutdown_logging,
+)
+from app.main import app
+from app.services.graph_module import recent_tool_names
+
+client = TestClient(app)
+
+
+def test_queue_listener_writes_json_with_request_context(tmp_path, monkeypatch):
+    log_file = tmp_path / "app.log"
+    monkeypatch.setattr(settings, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    monkeypatch.setattr(settings, "LOG_LEVEL", "INFO")
+    root = logging.getLogger()
+    level = root.level
+    logger = logging.getLogger("tests.logging")
+    try:
+        setup_logging()
+        token = app_logging.LOG_CONTEXT.set({"request_id": "req-1"})
+        try:
+            bind_log_context(thread_id="t-1")
+            items = ["a"]
+            logger.info("요청 처리 %s", items)
+            items.append("b")    # 큐에 넣을 때의 값으로 남아야 함
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("실패")
+        finally:
+            app_logging.LOG_CONTEXT.reset(token)
+        logger.info("컨텍스트 밖")
+    finally:
+        shutdown_logging()
+        root.setLevel(level)
+
+    assert not any(isinstance(h, LogQueueHandler) for h in root.handlers)
+    lines = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    mine = [line for line in lines if line["logger"] == "tests.logging"]
+    assert mine[0]["msg"] == "요청 처리 ['a']" and mine[0]["level"] == "INFO"
+    assert mine[0]["request_id"] == "req-1" and mine[0]["thread_id"] == "t-1"
+    assert mine[1]["msg"] == "실패" and "ValueError: boom" in mine[1]["exc"]
+    assert "request_id" not in mine[2] and "thread_id" not in mine[2]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = LogQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.queue.qsize() == 1 and handler.dropped == 1
+
+
+def test_jsonl_sink_writes_on_listener_thread_and_rotates(tmp_path, monkeypatch):
+    writers = set()
+    emit = RotatingFileHandler.emit
+
+    def tracked_emit(self, record):
+        writers.add(threading.current_thread().name)
+        emit(self, record)
+
+    monkeypatch.setattr(RotatingFileHandler, "emit", tracked_emit)
+    path = str(tmp_path / "sink" / "records.jsonl")
+    sink = JsonlSink(path, max_bytes=200, backups=2)
+    for i in range(10):
+        sink.write({"i": i, "text": "가" * 20})
+    sink.close()
+
+    assert writers and threading.current_thread().name not in writers
+    files = [path + ".2", path + ".1", path]
+    rows = [json.loads(line) for f in files for line in open(f, encoding="utf-8")]
+    assert [r["i"] for r in rows] == list(range(10))[-len(rows):] and rows[-1]["i"] == 9
+    assert sink.dropped == 0
+
+
+def test_debug_sampled_is_lazy(monkeypatch):
+    logger = logging.getLogger("tests.logging.hot")
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "names"
+
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    handler = Collect()
+    logger.addHandler(handler)
+    try:
+        logger.setLevel(logging.INFO)
+        debug_sampled(logger, "hot %s", Lazy(expensive))
+        assert calls == [] and records == []
+
+        logger.setLevel(logging.DEBUG)
+        monkeypatch.setattr(settings, "LOG_DEBUG_SAMPLE_RATE", 0.0)
+        debug_sampled(logger, "hot %s", Lazy(expensive))
+        assert calls == [] and records == []
+
+        monkeypatch.setattr(settings, "LOG_DEBUG_SAMPLE_RATE", 1.0)
+        debug_sampled(logger, "hot %s", Lazy(expensive))
+        assert calls == [1] and records == ["hot names"]
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+
+def test_recent_tool_names_scans_from_end():
+    messages = [HumanMessage(content="q")]
+    messages += [ToolMessage(content="", name=f"tool{i}", tool_call_id=str(i)) for i in range(15)]
+    assert recent_tool_names(messages, last_n=3) == ["tool12", "tool13", "tool14"]
+    assert recent_tool_names(messages[:1]) == []
+
+
+def test_request_id_header():
+    resp = client.get("/health", headers={"X-Request-ID": "abc-123"})
+    assert resp.headers["x-request-id"] == "abc-123"
+    resp = client.get("/health", headers={"X-Request-ID": "bad id\twith spaces"})
+    assert resp.headers["x-request-id"] != "bad id\twith spaces" and len(resp.headers["x-request-id"]) == 16
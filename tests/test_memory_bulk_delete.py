@@ -0,0 +1,56 @@
+# tests/test_memory_bulk_delete.py
+import asyncio
+from datetime import datetime, timezone
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory import manager, store
+from app.memory.locks import release_thread, try_acquire_thread
+
+
+def test_bulk_delete_chunks_and_skips_locked(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "memory.db")
+    monkeypatch.setattr(manager, "MEMORY_DB", db_path)
+    monkeypatch.setattr(store, "MEMORY_DB", db_path)
+    monkeypatch.setattr(manager, "CHECKPOINTER", None)
+
+    async def main():
+        saver = await manager.ensure_checkpointer()
+        try:
+            for i in range(7):
+                config = {"configurable": {"thread_id": f"t{i}", "checkpoint_ns": ""}}
+                config = await saver.aput(config, empty_checkpoint(), {}, {})
+                await saver.aput_writes(config, [("messages", "hi")], task_id="t")
+            await saver.shards[0].conn.execute(
+                "UPDATE thread_registry SET last_active_at = '2000-01-01T00:00:00.000Z' WHERE thread_id IN ('t5', 't6');"
+            )
+            await saver.shards[0].conn.commit()
+
+            # 실행 중인 스레드 흉내
+            assert await try_acquire_thread("t1", timeout=0)
+            by_ids = [e async for e in store.delete_threads_bulk(thread_ids=["t0", "t1", "t2", "t0", "nope"], chunk_size=2)]
+            release_thread("t1")
+
+            cutoff = datetime(2020, 1, 1, tzinfo=timezone.utc)
+            by_age = [e async for e in store.delete_threads_bulk(inactive_since=cutoff, chunk_size=1)]
+            remaining, _ = await store.list_threads(limit=10, order="thread_id")
+            return by_ids, by_age, remaining
+        finally:
+            await manager.aclose_checkpointer()
+
+    by_ids, by_age, remaining = asyncio.run(main())
+
+    assert by_ids[0] == {"event": "start", "total": 4}
+    assert [e["event"] for e in by_ids] == ["start", "chunk", "chunk", "done"]
+    assert by_ids[1]["skipped"] == ["t1"] and by_ids[1]["deleted_threads"] == 1
+    assert by_ids[2]["deleted_threads"] == 1 and by_ids[2]["missing"] == ["nope"]
+    assert by_ids[-1]["deleted_threads"] == 2    # t0, t2 (행이 없는 nope는 missing)
+    assert by_ids[-1]["deleted_rows"] == 4
+    assert by_ids[-1]["skipped"] == ["t1"] and by_ids[-1]["missing"] == ["nope"]
+    assert by_ids[-2]["progress"] == by_ids[0]["total"]
+
+    assert by_age[0]["total"] == 2
+    assert [e["event"] for e in by_age] == ["start", "chunk", "chunk", "done"]
+    assert by_age[-1]["deleted_threads"] == 2 and by_age[-1]["missing"] == []
+
+    assert [t["thread_id"] for t in remaining] == ["t1", "t3", "t4"]
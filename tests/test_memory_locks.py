@@ -0,0 +1,179 @@
+# tests/test_memory_locks.py
+import asyncio
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+
+from app.core.config import settings
+from app.memory import locks
+from app.memory.lease import LeaseStore
+
+
+def worker(lock_db: str, counter_path: str, rounds: int) -> None:
+    """별도 프로세스: 같은 thread_id로 읽고-쉬고-쓰기. 락이 프로세스 간에 안 걸리면 증가분이 사라진다."""
+    settings.LOCK_BACKEND = "sqlite"
+    settings.LOCK_DB = lock_db
+    settings.LOCK_POLL_MS = 5
+
+    async def main():
+        for _ in range(rounds):
+            async with locks.thread_lock("shared"):
+                with open(counter_path) as f:
+                    value = int(f.read())
+                await asyncio.sleep(0.002)
+                with open(counter_path, "w") as f:
+                    f.write(str(value + 1))
+        await locks.close_leases()
+
+    asyncio.run(main())
+
+
+def hold_and_die(lock_db: str) -> None:
+    """lease를 잡은 채로 해제 없이 종료 (워커 크래시 흉내)"""
+    store = LeaseStore(lock_db, lease_sec=60)
+    assert store.try_take("thread:crashed")
+    os._exit(0)
+
+
+def test_sqlite_lease_serializes_across_processes(tmp_path):
+    lock_db = str(tmp_path / "locks.db")
+    counter = tmp_path / "counter.txt"
+    counter.write_text("0")
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=worker, args=(lock_db, str(counter), 15)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    assert counter.read_text() == "60"
+    conn = sqlite3.connect(lock_db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM thread_leases;").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_stale_lease_recovery(tmp_path):
+    lock_db = str(tmp_path / "locks.db")
+
+    # 같은 호스트에서 죽은 프로세스의 lease는 바로 회수
+    ctx = multiprocessing.get_context("spawn")
+    p = ctx.Process(target=hold_and_die, args=(lock_db,))
+    p.start()
+    p.join(timeout=60)
+
+    async def main():
+        store = LeaseStore(lock_db, lease_sec=0.3, poll_ms=10)
+        try:
+            recovered = await store.acquire("thread:crashed", timeout=0)
+
+            # 다른 호스트(확인 불가)의 lease는 만료될 때까지 기다린다
+            conn = sqlite3.connect(lock_db)
+            conn.execute(
+                "INSERT INTO thread_leases VALUES ('thread:remote', 'other:1:x', 'other-host', 1, ?, ?);",
+                (time.time(), time.time() + 0.2),
+            )
+            conn.commit()
+            conn.close()
+            immediate = await store.acquire("thread:remote", timeout=0)
+            started = time.monotonic()
+            after_expiry = await store.acquire("thread:remote", timeout=2)
+            waited = time.monotonic() - started
+
+            # 보유 중인 lease는 lease_sec이 지나도 연장돼서 다른 owner가 못 가져감
+            await asyncio.sleep(0.8)
+            other = LeaseStore(lock_db, lease_sec=0.3)
+            stolen = other.try_take("thread:crashed")
+            other.conn.close()
+            return recovered, immediate, after_expiry, waited, stolen, await store.stats()
+        finally:
+            await store.close()
+
+    recovered, immediate, after_expiry, waited, stolen, stats = asyncio.run(main())
+    assert recovered and stats["recovered"] == 1
+    assert not immediate
+    assert after_expiry and 0.05 < waited < 1.5
+    assert not stolen and stats["lost"] == 0
+    assert socket.gethostname() != "other-host"
+
+
+def test_release_runs_off_loop_and_reacquire_waits_for_it(tmp_path):
+    lock_db = str(tmp_path / "locks.db")
+
+    async def main():
+        store = LeaseStore(lock_db, lease_sec=30, poll_ms=10)
+        try:
+            assert await store.acquire("thread:a", timeout=0)
+            store.release("thread:a")
+            pending = "thread:a" in store.releasing
+            # 반환 DELETE가 아직 안 끝났어도 같은 key를 다시 잡고, 늦은 DELETE가 새 lease를 지우면 안 됨
+            again = await store.acquire("thread:a", timeout=0)
+            await asyncio.sleep(0.05)
+            owner = store.execute("SELECT owner FROM thread_leases WHERE key = 'thread:a';").fetchone()
+            store.release("thread:a")
+            return pending, again, owner, store.owner, await store.stats()
+        finally:
+            await store.close()
+
+    pending, again, owner, me, stats = asyncio.run(main())
+    assert pending and again
+    assert owner == (me,)
+    assert stats["held"] == 0
+
+
+def test_memory_backend_try_acquire(monkeypatch):
+    monkeypatch.setattr(settings, "LOCK_BACKEND", "memory")
+
+    async def main():
+        assert await locks.try_acquire_thread("m1", timeout=0)
+        busy = await locks.try_acquire_thread("m1", timeout=0.05)
+        locks.release_thread("m1")
+        again = await locks.try_acquire_thread("m1")
+        locks.release_thread("m1")
+        return busy, again
+
+    assert asyncio.run(main()) == (False, True)
+    assert locks.LEASES is None
+
+
+def test_lock_registry_evicts_idle_locks_and_records_contention(monkeypatch):
+    monkeypatch.setattr(settings, "LOCK_BACKEND", "memory")
+    monkeypatch.setattr(locks, "lock_registry", locks.LockRegistry(hot_keys=2))
+
+    async def hold(thread_id, sec):
+        async with locks.thread_lock(thread_id):
+            await asyncio.sleep(sec)
+
+    async def main():
+        # 한 번씩만 쓰인 스레드 락은 남지 않음
+        for i in range(1000):
+            async with locks.thread_lock(f"u{i}"):
+                pass
+        assert len(locks.lock_registry) == 0
+
+        # 같은 스레드 동시 요청 3개 → 2번 경합, 대기 중 취소/타임아웃도 정리돼야 함
+        await asyncio.gather(hold("hot", 0.02), hold("hot", 0.02), hold("hot", 0.02))
+        holder = asyncio.create_task(hold("busy", 0.2))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(hold("busy", 0))
+        await asyncio.sleep(0.01)
+        live_while_waiting = await locks.lock_stats()
+        waiter.cancel()
+        timed_out = await locks.try_acquire_thread("busy", timeout=0.01)
+        await holder
+        return live_while_waiting, timed_out, await locks.lock_stats()
+
+    live, timed_out, stats = asyncio.run(main())
+    assert live["live_locks"] == 1 and live["held"] == 1 and live["waiting"] == 1
+    assert timed_out is False
+    assert stats["live_locks"] == 0 and stats["live_locks_max"] == 1
+    assert stats["acquired"] == 1000 + 3 + 1
+    assert stats["contended"] == 2 and stats["timeouts"] == 1
+    assert stats["wait_ms_max"] >= 15
+    assert stats["top_contended"][0]["key"] == "thread:hot"
+    assert stats["top_contended"][0]["contended"] == 2
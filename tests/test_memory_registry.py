@@ -0,0 +1,81 @@
+# tests/test_memory_registry.py
+import asyncio
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.registry import backfill, list_registry
+
+
+async def write_thread(saver, thread_id: str, steps: int) -> None:
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for i in range(steps):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": i}
+        config = await saver.aput(config, checkpoint, {"step": i}, {})
+        await saver.aput_writes(config, [("messages", "x" * 100)], task_id="t")
+
+
+def test_registry_tracks_checkpoints_and_paginates(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def main():
+        saver = await open_checkpointer(db_path, readers=1)
+        try:
+            for i, steps in enumerate([3, 1, 2, 4]):
+                await write_thread(saver, f"t{i}", steps)
+
+            recent, cursor = await list_registry(saver.conn, limit=3)
+            rest, last_cursor = await list_registry(saver.conn, limit=3, cursor=cursor)
+            by_id, _ = await list_registry(saver.conn, limit=10, order="thread_id")
+
+            await saver.adelete_thread("t0")
+            after_delete, _ = await list_registry(saver.conn, limit=10, order="thread_id")
+
+            live = {r["thread_id"]: (r["checkpoint_count"], r["byte_size"]) for r in after_delete}
+            await backfill(saver.conn)
+            rebuilt, _ = await list_registry(saver.conn, limit=10, order="thread_id")
+            rebuilt = {r["thread_id"]: (r["checkpoint_count"], r["byte_size"]) for r in rebuilt}
+            return recent, cursor, rest, last_cursor, by_id, after_delete, live, rebuilt
+        finally:
+            await close_checkpointer(saver)
+
+    recent, cursor, rest, last_cursor, by_id, after_delete, live, rebuilt = asyncio.run(main())
+
+    # 마지막에 쓴 스레드가 먼저
+    assert [r["thread_id"] for r in recent] == ["t3", "t2", "t1"]
+    assert cursor is not None
+    assert [r["thread_id"] for r in rest] == ["t0"] and last_cursor is None
+
+    assert [(r["thread_id"], r["checkpoint_count"]) for r in by_id] == [("t0", 3), ("t1", 1), ("t2", 2), ("t3", 4)]
+    assert all(r["byte_size"] > 100 * r["checkpoint_count"] for r in by_id)
+
+    assert [r["thread_id"] for r in after_delete] == ["t1", "t2", "t3"]
+    # 트리거로 유지한 값과 백필로 다시 계산한 값이 같아야 함
+    assert live == rebuilt
+
+
+def test_replacing_only_checkpoint_keeps_created_at(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def main():
+        saver = await open_checkpointer(db_path, readers=1)
+        try:
+            config = {"configurable": {"thread_id": "solo", "checkpoint_ns": ""}}
+            checkpoint = empty_checkpoint()
+            await saver.aput(config, checkpoint, {"step": 0}, {})
+            before, _ = await list_registry(saver.conn, limit=10)
+            await asyncio.sleep(0.01)
+            # 같은 checkpoint id로 다시 쓰면 INSERT OR REPLACE -> 삭제 트리거가 먼저 돈다
+            checkpoint["channel_values"] = {"step": 1}
+            await saver.aput(config, checkpoint, {"step": 1}, {})
+            after, _ = await list_registry(saver.conn, limit=10)
+            return before, after
+        finally:
+            await close_checkpointer(saver)
+
+    before, after = asyncio.run(main())
+    assert len(before) == len(after) == 1
+    assert after[0]["created_at"] == before[0]["created_at"]
+    assert after[0]["last_active_at"] > before[0]["last_active_at"]
+    assert after[0]["checkpoint_count"] == 1
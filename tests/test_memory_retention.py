@@ -0,0 +1,53 @@
+# tests/test_memory_retention.py
+import asyncio
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.registry import list_registry
+from app.memory.retention import run_retention
+
+
+async def write_thread(saver, thread_id: str, steps: int) -> None:
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for i in range(steps):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": "x" * 4000}
+        config = await saver.aput(config, checkpoint, {"step": i}, {})
+        await saver.aput_writes(config, [("messages", "y" * 4000)], task_id="t")
+
+
+def test_retention_prunes_expires_and_reclaims(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def main():
+        saver = await open_checkpointer(db_path, readers=0)
+        try:
+            for thread_id in ("a", "b", "idle"):
+                await write_thread(saver, thread_id, 10)
+            await saver.conn.execute(
+                "UPDATE thread_registry SET last_active_at = '2000-01-01T00:00:00.000Z' WHERE thread_id = 'idle';"
+            )
+            await saver.conn.commit()
+
+            report = await run_retention(saver, db_path, keep=3, idle_days=1, batch=4, vacuum_pages=0)
+            threads, _ = await list_registry(saver.conn, limit=10, order="thread_id")
+            async with saver.conn.execute("SELECT COUNT(*) FROM writes;") as cur:
+                writes = (await cur.fetchone())[0]
+            latest = await saver.aget_tuple({"configurable": {"thread_id": "a", "checkpoint_ns": ""}})
+            return report, threads, writes, latest
+        finally:
+            await close_checkpointer(saver)
+
+    report, threads, writes, latest = asyncio.run(main())
+    assert report["expired_threads"] == 1
+    assert report["pruned_checkpoints"] == 14
+    assert [(t["thread_id"], t["checkpoint_count"]) for t in threads] == [("a", 3), ("b", 3)]
+    assert writes == 6
+    assert latest.metadata["step"] == 9
+
+    assert report["auto_vacuum"] == 2
+    assert report["after"]["wal_bytes"] == 0
+    assert report["after"]["db_bytes"] < report["before"]["db_bytes"]
+    assert report["reclaimed_bytes"] > 0
+    assert report["after"]["free_bytes"] == 0
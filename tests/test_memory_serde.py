@@ -0,0 +1,128 @@
+# tests/test_memory_serde.py
+import asyncio
+import sqlite3
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.core.config import settings
+from app.memory.serde import COMPRESSED_PREFIX, CompressedSerializer, make_serde, train_dictionary
+
+
+def chat(i: int) -> list:
+    return [
+        HumanMessage(content=f"{i}번째 질문: 인천 차이나타운 근처 화장실 어디 있어요?"),
+        ToolMessage(
+            content='{"name": "차이나타운 공중화장실", "address": "인천광역시 중구 차이나타운로", "distance_km": 0.%d}' % i,
+            tool_call_id=f"call-{i}",
+        ),
+        AIMessage(content=f"차이나타운 공중화장실이 {i}00m 거리에 있어요. 개방 시간은 09:00~18:00입니다."),
+    ]
+
+
+def test_compressed_serde_reads_old_rows_and_uses_dictionary(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+    samples = [CompressedSerializer().inner.dumps_typed(chat(i))[1] for i in range(200)]
+    dictionary = train_dictionary(samples, size=4096)
+    serde = CompressedSerializer(dictionaries=[dictionary], min_bytes=64)
+
+    async def write(saver, thread_id: str, n: int):
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": chat(n)}
+        config = await saver.aput(config, checkpoint, {}, {})
+        await saver.aput_writes(config, [("messages", chat(n)), ("flag", 1)], task_id="t")
+
+    async def main():
+        # 기존 직렬화로 쓴 행
+        saver = await open_checkpointer(db_path, readers=0)
+        try:
+            await write(saver, "old", 1)
+        finally:
+            await close_checkpointer(saver)
+
+        saver = await open_checkpointer(db_path, readers=2, serde=serde)
+        try:
+            await write(saver, "new", 2)
+            old = await saver.aget_tuple({"configurable": {"thread_id": "old", "checkpoint_ns": ""}})
+            new = await saver.aget_tuple({"configurable": {"thread_id": "new", "checkpoint_ns": ""}})
+            return old, new
+        finally:
+            await close_checkpointer(saver)
+
+    old, new = asyncio.run(main())
+    assert old.checkpoint["channel_values"]["messages"] == chat(1)
+    assert new.checkpoint["channel_values"]["messages"] == chat(2)
+    assert new.pending_writes[0][2] == chat(2) and new.pending_writes[1][2] == 1
+
+    conn = sqlite3.connect(db_path)
+    try:
+        types = dict(conn.execute("SELECT thread_id, type FROM checkpoints;").fetchall())
+        write_types = conn.execute("SELECT channel, type FROM writes WHERE thread_id = 'new' ORDER BY idx;").fetchall()
+    finally:
+        conn.close()
+    assert not types["old"].startswith(COMPRESSED_PREFIX)
+    assert types["new"].startswith(COMPRESSED_PREFIX)
+    # 작은 값은 압축하지 않음
+    assert write_types[0][1].startswith(COMPRESSED_PREFIX) and not write_types[1][1].startswith(COMPRESSED_PREFIX)
+    assert serde.stats()["ratio"] > 1.5
+
+    # 사전 없이 열면 사전으로 압축된 행은 명확한 오류
+    stored = serde.dumps_typed(chat(3))
+    try:
+        CompressedSerializer().loads_typed(stored)
+        assert False, "사전 없이 해제되면 안 됨"
+    except ValueError as e:
+        assert str(serde.dict_id) in str(e)
+    # 사전 교체 후에도 예전 사전을 뒤에 두면 옛 행을 읽을 수 있음
+    rotated = CompressedSerializer(dictionaries=[train_dictionary(samples[:100], size=2048), dictionary])
+    assert rotated.loads_typed(stored) == chat(3)
+
+
+def test_compression_off_still_reads_compressed_rows(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "memory.db")
+    dict_path = tmp_path / "memory.zdict"
+    samples = [CompressedSerializer().inner.dumps_typed(chat(i))[1] for i in range(200)]
+    dict_path.write_bytes(train_dictionary(samples, size=4096))
+    monkeypatch.setattr(settings, "MEMORY_SERDE_DICT_PATH", str(dict_path))
+    monkeypatch.setattr(settings, "MEMORY_SERDE_MIN_BYTES", 64)
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+
+    async def write(saver, n: int):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": chat(n)}
+        await saver.aput(config, checkpoint, {}, {})
+
+    async def main():
+        monkeypatch.setattr(settings, "MEMORY_SERDE_COMPRESSION", True)
+        saver = await open_checkpointer(db_path, readers=0, serde=make_serde())
+        try:
+            await write(saver, 1)
+        finally:
+            await close_checkpointer(saver)
+
+        # 압축을 끄고 다시 열기 (롤백)
+        monkeypatch.setattr(settings, "MEMORY_SERDE_COMPRESSION", False)
+        saver = await open_checkpointer(db_path, readers=1, serde=make_serde())
+        try:
+            compressed = await saver.aget_tuple(config)
+            await write(saver, 2)
+            plain = await saver.aget_tuple(config)
+            history = [t async for t in saver.alist(config)]
+            return compressed, plain, history
+        finally:
+            await close_checkpointer(saver)
+
+    compressed, plain, history = asyncio.run(main())
+    assert compressed.checkpoint["channel_values"]["messages"] == chat(1)
+    assert plain.checkpoint["channel_values"]["messages"] == chat(2)
+    assert [t.checkpoint["channel_values"]["messages"] for t in history] == [chat(2), chat(1)]
+
+    conn = sqlite3.connect(db_path)
+    try:
+        types = [t for (t,) in conn.execute("SELECT type FROM checkpoints ORDER BY checkpoint_id;")]
+    finally:
+        conn.close()
+    # 압축을 끈 뒤 쓴 행은 비압축
+    assert types[0].startswith(COMPRESSED_PREFIX) and not types[1].startswith(COMPRESSED_PREFIX)
@@ -0,0 +1,106 @@
+# tests/test_memory_sharding.py
+import asyncio
+import os
+import sqlite3
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.core.config import settings
+from app.memory import manager, store
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.sharding import reshard, shard_index, shard_paths
+
+
+def count_rows(path: str, table: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_shard_routing_is_stable():
+    assert shard_paths("/data/memory.db", 1) == ["/data/memory.db"]
+    assert shard_paths("/data/memory.db", 3) == [f"/data/memory.shard{i}.db" for i in range(3)]
+    # 실행마다 같은 값 (PYTHONHASHSEED 무관), int/str thread_id 동일 취급
+    assert [shard_index(f"t{i}", 4) for i in range(8)] == [shard_index(f"t{i}", 4) for i in range(8)]
+    assert shard_index(42, 8) == shard_index("42", 8)
+    assert {shard_index(f"t{i}", 4) for i in range(200)} == {0, 1, 2, 3}
+
+
+def test_sharded_checkpointer_fan_out(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "memory.db")
+    monkeypatch.setattr(manager, "MEMORY_DB", db_path)
+    monkeypatch.setattr(store, "MEMORY_DB", db_path)
+    monkeypatch.setattr(manager, "CHECKPOINTER", None)
+    monkeypatch.setattr(settings, "MEMORY_SHARDS", 4)
+
+    async def main():
+        saver = await manager.ensure_checkpointer()
+        try:
+            for i in range(12):
+                config = {"configurable": {"thread_id": f"t{i}", "checkpoint_ns": ""}}
+                config = await saver.aput(config, empty_checkpoint(), {"step": i}, {})
+                await saver.aput_writes(config, [("messages", "hi")], task_id="t")
+
+            got = await saver.aget_tuple({"configurable": {"thread_id": "t3", "checkpoint_ns": ""}})
+            everything = [t async for t in saver.alist(None)]
+            page1, cursor = await store.list_threads(limit=5, order="thread_id")
+            page2, _ = await store.list_threads(limit=20, cursor=cursor, order="thread_id")
+            found = await store.find_thread("t7")
+            exists = await store.has_thread("t7"), await store.has_thread("nope")
+            deleted = await store.delete_thread("t7")
+            after = await store.has_thread("t7")
+            per_shard = [count_rows(s.db_path, "checkpoints") for s in saver.shards]
+            return got, everything, page1, page2, found, exists, deleted, after, per_shard
+        finally:
+            await manager.aclose_checkpointer()
+
+    got, everything, page1, page2, found, exists, deleted, after, per_shard = asyncio.run(main())
+
+    assert got.metadata["step"] == 3
+    assert len(everything) == 12
+    ids = [t["thread_id"] for t in page1 + page2]
+    assert ids == sorted(f"t{i}" for i in range(12)) and len(page1) == 5
+    assert found == [("checkpoints", 1), ("writes", 1)]
+    assert exists == (True, False)
+    assert deleted == 2 and after is False
+    # 각 샤드 파일에는 해시가 가리키는 스레드만 들어 있음
+    expected = [0] * 4
+    for i in range(12):
+        if i != 7:
+            expected[shard_index(f"t{i}", 4)] += 1
+    assert per_shard == expected
+    assert all(os.path.exists(p) for p in shard_paths(db_path, 4))
+
+
+def test_reshard_one_to_four(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def seed():
+        saver = await open_checkpointer(db_path, readers=0)
+        try:
+            for i in range(20):
+                config = {"configurable": {"thread_id": str(i), "checkpoint_ns": ""}}
+                for _ in range(2):
+                    config = await saver.aput(config, empty_checkpoint(), {}, {})
+                    await saver.aput_writes(config, [("a", 1)], task_id="t")
+        finally:
+            await close_checkpointer(saver)
+
+    asyncio.run(seed())
+    result = asyncio.run(reshard(db_path, 1, 4))
+
+    targets = shard_paths(db_path, 4)
+    assert result["copied"] == {"checkpoints": 40, "writes": 40}
+    assert sum(result["threads_per_shard"]) == 20
+    assert not os.path.exists(db_path) and os.path.exists(f"{db_path}.bak")
+    for i, target in enumerate(targets):
+        conn = sqlite3.connect(target)
+        try:
+            threads = [r[0] for r in conn.execute("SELECT thread_id FROM thread_registry;")]
+            counts = conn.execute("SELECT checkpoint_count FROM thread_registry;").fetchall()
+        finally:
+            conn.close()
+        assert all(shard_index(t, 4) == i for t in threads)
+        assert all(c == (2,) for c in counts)
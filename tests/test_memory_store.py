@@ -0,0 +1,55 @@
+# tests/test_memory_store.py
+import asyncio
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.memory.store import (
+    delete_thread_rows,
+    ensure_thread_indexes,
+    schema_cache,
+    thread_counts,
+    thread_exists,
+)
+
+
+def test_single_query_lookup_with_schema_cache(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+
+    async def main():
+        saver = await open_checkpointer(db_path, readers=0)
+        db = saver.conn
+        try:
+            config = {"configurable": {"thread_id": "7", "checkpoint_ns": ""}}
+            for _ in range(2):
+                config = await saver.aput(config, empty_checkpoint(), {}, {})
+                await saver.aput_writes(config, [("a", 1), ("b", 2)], task_id="t")
+
+            before = await thread_counts(db, db_path, "7")
+            version = schema_cache[db_path][0]
+
+            # 인덱스 없는 thread 컬럼을 가진 테이블 추가 → 캐시 무효화 + 인덱스 생성
+            await db.execute("CREATE TABLE forks (id INTEGER PRIMARY KEY, thread_id TEXT, parent_thread_id TEXT);")
+            await db.executemany(
+                "INSERT INTO forks (thread_id, parent_thread_id) VALUES (?, ?);",
+                [("8", "7"), ("7", "7"), ("9", "1")],
+            )
+            await db.commit()
+            created = await ensure_thread_indexes(db)
+            after = await thread_counts(db, db_path, "7")
+
+            exists = await thread_exists(db, db_path, "8"), await thread_exists(db, db_path, "404")
+            deleted = await delete_thread_rows(db, db_path, "7")
+            remaining = await thread_counts(db, db_path, "7")
+            return before, version, created, after, schema_cache[db_path][0], exists, deleted, remaining
+        finally:
+            await close_checkpointer(saver)
+
+    before, version, created, after, new_version, exists, deleted, remaining = asyncio.run(main())
+    assert sorted(before) == [("checkpoints", 2), ("writes", 4)]
+    assert created == ["ix_forks_thread_id", "ix_forks_parent_thread_id"]
+    assert new_version > version
+    # ("7", "7") 행은 한 번만 센다
+    assert sorted(after) == [("checkpoints", 2), ("forks", 2), ("writes", 4)]
+    assert exists == ("forks", None)
+    assert deleted == 8 and remaining == []
@@ -0,0 +1,120 @@
+# tests/test_metrics.py
+import asyncio
+from typing import TypedDict
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from app.core.metrics import (
+    CHAT_REQUESTS,
+    GRAPH_NODE_SECONDS,
+    LLM_CALLS,
+    LLM_TTFT_SECONDS,
+    TOOL_CALLS,
+    TOOL_SECONDS,
+    Registry,
+)
+from app.main import app
+from app.services import admission, ai_service
+from app.services.admission import AdmissionController
+from app.services.graph_metrics import GraphMetricsCallback, timed_node
+
+client = TestClient(app)
+
+
+def test_render_histogram_counter_gauge_format():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "데모 지연", ("op",), buckets=(0.1, 1.0))
+    calls = registry.counter("demo_total", "데모 호출", ("path",))
+    registry.gauge("demo_running", "실행 중", lambda: 3)
+    registry.gauge("demo_broken", "읽기 실패", lambda: 1 / 0)
+
+    child = latency.labels("get")
+    for value in (0.05, 0.1, 0.5, 2.0):
+        child.observe(value)
+    calls.labels('a"b\\c').inc(2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_seconds histogram" in lines
+    # 버킷은 누적, 경계값은 그 버킷에 포함(le), 마지막은 +Inf = count
+    assert 'demo_seconds_bucket{op="get",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{op="get",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{op="get",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{op="get"} 2.65' in lines
+    assert 'demo_seconds_count{op="get"} 4' in lines
+    assert 'demo_total{path="a\\"b\\\\c"} 2' in lines
+    assert "demo_running 3" in lines and "demo_broken NaN" in lines
+
+
+def test_graph_metrics_callback_tools_llm_and_nodes():
+    @tool
+    async def metrics_probe(query: str) -> str:
+        """지표 테스트용 도구"""
+        if query == "fail":
+            raise RuntimeError("boom")
+        return query
+
+    class State(TypedDict):
+        value: int
+
+    async def step(state: State):
+        await asyncio.sleep(0.01)
+        return {"value": state["value"] + 1}
+
+    callback = GraphMetricsCallback()
+    node_hist = GRAPH_NODE_SECONDS.labels("metrics_step")
+    tool_ok = TOOL_CALLS.labels("metrics_probe", "ok")
+    tool_error = TOOL_CALLS.labels("metrics_probe", "error")
+    llm_ok = LLM_CALLS.labels("ok")
+    before = (node_hist.count, tool_ok.value, tool_error.value, llm_ok.value, LLM_TTFT_SECONDS.labels().count)
+
+    async def main():
+        await metrics_probe.ainvoke({"query": "hi"}, config={"callbacks": [callback]})
+        try:
+            await metrics_probe.ainvoke({"query": "fail"}, config={"callbacks": [callback]})
+        except RuntimeError:
+            pass
+        model = GenericFakeChatModel(messages=iter([AIMessage(content="안녕 하세요")]))
+        async for _ in model.astream("hi", config={"callbacks": [callback]}):
+            pass
+
+        builder = StateGraph(State)
+        builder.add_node("step", timed_node("metrics_step", step))
+        builder.add_edge(START, "step")
+        builder.add_edge("step", END)
+        return await builder.compile().ainvoke({"value": 1})
+
+    assert asyncio.run(main()) == {"value": 2}
+    assert node_hist.count == before[0] + 1 and node_hist.sum >= 0.01
+    assert tool_ok.value == before[1] + 1 and tool_error.value == before[2] + 1
+    assert TOOL_SECONDS.labels("metrics_probe").count >= 2
+    assert llm_ok.value == before[3] + 1
+    assert LLM_TTFT_SECONDS.labels().count == before[4] + 1
+    # 끝난 호출은 들고 있지 않음
+    assert not callback.tools and not callback.llms and not callback.waiting_first_token
+
+
+def test_metrics_endpoint_counts_chat_outcomes(monkeypatch):
+    async def fake_ask_ai(req):
+        return "답변"
+
+    monkeypatch.setattr(ai_service, "ask_ai", fake_ask_ai)
+    monkeypatch.setattr("app.api.v1.endpoints.ai.ask_ai", fake_ask_ai)
+    monkeypatch.setattr(admission, "ADMISSION", AdmissionController(max_running=2, max_queue=2, queue_timeout=1))
+    ok = CHAT_REQUESTS.labels("chatbot", "ok")
+    before = ok.value
+
+    resp = client.post("/v1/chatbot", json={"user_question": "안녕", "user_id": "metrics-user"})
+    assert resp.status_code == 200
+    assert ok.value == before + 1
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+    assert f'chat_requests_total{{endpoint="chatbot",outcome="ok"}} {int(before) + 1}' in body
+    assert "# TYPE graph_node_seconds histogram" in body
+    assert 'graph_node_seconds_bucket{node="chatbot",le="+Inf"}' in body
+    assert "chat_running 0" in body
@@ -0,0 +1,76 @@
+# tests/test_prefork.py
+import os
+import signal
+import socket
+import subprocess
+import sys
+
+import httpx
+
+from app.services import restroom_module
+from app.spots import geo_index
+from benchmarks.chat_load import wait_ready
+from benchmarks.prefork_memory import build_restroom_csv, build_spots_db, child_pids, smaps_rollup
+
+
+# 도구/LLM 클라이언트 객체를 만들 때 키 검증만 통과하면 된다 (외부 호출은 하지 않음)
+DUMMY_KEYS = {"TAVILY_API_KEY": "test-key", "OPENAI_API_KEY": "test-key"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_preload_loads_shared_indexes(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.prefork import preload
+
+    build_spots_db(str(tmp_path / "spots_db"), 50, 8)
+    build_restroom_csv(str(tmp_path / "restroom.csv"), 20)
+    monkeypatch.setattr(settings, "DB_PATH", str(tmp_path / "spots_db"))
+    monkeypatch.setattr(settings, "RESTROOM_CSV", str(tmp_path / "restroom.csv"))
+    monkeypatch.setattr(settings, "EMBEDDING_MODEL", None)
+    for key, value in DUMMY_KEYS.items():
+        monkeypatch.setattr(settings, key, value)
+    try:
+        timings = preload()
+        assert set(timings) == {"restrooms", "tools", "spots"}
+        assert all(isinstance(ms, float) for ms in timings.values())
+        assert len(restroom_module.get_restroom_index()) == 20
+        assert len(geo_index.get_spot_geo_index(settings.DB_PATH)) == 50
+    finally:
+        geo_index.reset_spot_geo_index()
+        restroom_module.restroom_index = None
+        restroom_module.restroom_loaded = False
+
+
+def test_prefork_workers_share_one_socket_and_stop_cleanly(tmp_path):
+    port = free_port()
+    env = {
+        **os.environ,
+        **DUMMY_KEYS,
+        "MEMORY_DB": str(tmp_path / "memory.db"),
+        "LOCK_BACKEND": "sqlite",
+        "LOG_FILE": str(tmp_path / "app.log"),
+        "LOG_LEVEL": "INFO",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.prefork", "--workers", "2", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        wait_ready(f"http://127.0.0.1:{port}/health", proc, timeout=60)
+        workers = child_pids(proc.pid)
+        assert len(workers) == 2
+        assert httpx.get(f"http://127.0.0.1:{port}/health").json() == {"status": "ok"}
+        # fork 뒤 공유 중인 페이지가 있으므로 PSS < RSS
+        stats = smaps_rollup(workers[0])
+        assert stats["Pss"] < stats["Rss"] and stats["Shared_Clean"] + stats["Shared_Dirty"] > 0
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        code = proc.wait(timeout=30)
+    assert code == 0
+    log = (tmp_path / "app.log").read_text(encoding="utf-8")
+    assert "preload 완료" in log and "prefork 마스터 종료" in log
@@ -0,0 +1,101 @@
+# tests/test_replay.py
+import asyncio
+import json
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.schemas.ai import ChatRequest
+from app.services import recorder as recorder_module
+from app.services import tool_module
+from app.services.ai_service import system_message, user_message
+from app.services.graph_module import get_tools, make_graph
+from app.services.recorder import anonymize_request, anonymize_thread, load_sessions, mask_text, sampled, start_recording
+from benchmarks.fake_upstreams import FakeConfig, create_app
+from benchmarks.replay import replay
+
+FAST = FakeConfig(ttft_ms=0, token_ms=0, answer_tokens=12, kakao_ms=0, tavily_ms=0, weather_ms=0, blog_page_ms=0)
+
+
+def test_anonymization(monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_SALT", "s1")
+    assert mask_text("연락처 010-1234-5678, 032 000 1000, a.b@x.com 위치 37.475712,126.617634") == (
+        "연락처 <phone>, <phone>, <email> 위치 37.47,126.61"
+    )
+    req = ChatRequest(
+        user_question="내 번호 01012345678",
+        user_id="kakao-123",
+        user_location={"lat": 37.475712, "lng": 126.617634},
+        user_info={"nickname": "홍길동", "gender": "F", "age_group": "20대"},
+    )
+    assert anonymize_request(req) == {
+        "user_question": "내 번호 <phone>",
+        "user_location": {"lat": 37.47, "lng": 126.61},
+        "user_info": {"gender": "F", "age_group": "20대"},
+    }
+    thread = anonymize_thread("kakao-123")
+    assert thread != "kakao-123" and len(thread) == 16 and thread == anonymize_thread("kakao-123")
+    monkeypatch.setattr(settings, "RECORD_SALT", "s2")
+    assert anonymize_thread("kakao-123") != thread
+
+    monkeypatch.setattr(settings, "RECORD_SAMPLE_RATE", 0.0)
+    assert start_recording(req, "chatbot") is None
+    monkeypatch.setattr(settings, "RECORD_SAMPLE_RATE", 0.5)
+    picked = [sampled(f"user{i}") for i in range(400)]
+    assert picked == [sampled(f"user{i}") for i in range(400)] and 120 < sum(picked) < 280
+
+
+def test_record_then_replay_is_deterministic(tmp_path, monkeypatch):
+    path = str(tmp_path / "recordings.jsonl")
+    monkeypatch.setattr(settings, "RECORD_FILE", path)
+    monkeypatch.setattr(settings, "RECORD_SAMPLE_RATE", 1.0)
+    # 실제 도구 객체를 만들 때 키 검증만 통과하면 된다 (요청은 대역 서버로)
+    monkeypatch.setattr(settings, "TAVILY_API_KEY", settings.TAVILY_API_KEY or "test-key")
+    recorder_module.close_record_log()
+    questions = ["송도 센트럴파크 블로그 후기 찾아줘 (010-1111-2222)", "아이랑 가도 괜찮아?"]
+
+    async def record():
+        saver = await open_checkpointer(str(tmp_path / "memory.db"), readers=1)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(FAST)), base_url="http://fake") as client:
+            monkeypatch.setattr(tool_module, "get_http_client", lambda: client)
+            monkeypatch.setattr(tool_module, "KAKAO_URL", "http://fake")
+            llm = ChatOpenAI(model="gpt-4o-mini", api_key="fake", base_url="http://fake/v1", http_async_client=client)
+            try:
+                graph = await make_graph(llm=llm.bind_tools(get_tools()), checkpointer=saver)
+                for question in questions:
+                    req = ChatRequest(user_question=question, user_id="real-user")
+                    recorder = start_recording(req, "chatbot")
+                    config = {"configurable": {"thread_id": req.user_id}, "callbacks": [recorder]}
+                    await graph.ainvoke({"messages": [system_message(req), user_message(req)]}, config)
+                    recorder.finish("ok")
+            finally:
+                await close_checkpointer(saver)
+
+    asyncio.run(record())
+    recorder_module.close_record_log()
+
+    raw = open(path, encoding="utf-8").read()
+    assert "real-user" not in raw and "010-1111-2222" not in raw
+    sessions = load_sessions(path)
+    (turns,) = sessions.values()
+    first = turns[0]
+    assert [c["name"] for c in first["llm"][0]["tool_calls"]] == ["search_blog"]
+    assert first["tools"][0]["name"] == "search_blog" and "blog_url" in first["tools"][0]["output"]
+    recorded_output = sum(entry["usage"]["output_tokens"] for turn in turns for entry in turn["llm"])
+
+    runs = [asyncio.run(replay(sessions, False, 1, str(tmp_path / f"replay{i}.db"))) for i in range(2)]
+    for metrics in runs:
+        assert metrics["turns"] == 2 and metrics["diverged_turns"] == 0 and metrics["answer_match"] == 1.0
+        assert metrics["llm_calls"] == 3 and metrics["tool_calls"] == 1
+        assert metrics["tokens_output"] == recorded_output
+    assert runs[0]["prompt_chars_mean"] == runs[1]["prompt_chars_mean"]
+    # 두 번째 턴은 첫 턴의 대화(질문, 도구 호출/결과, 답변)가 붙어서 LLM에 간다
+    assert runs[0]["prompt_messages_max"] > first["llm"][0]["messages"]
+
+    # 그래프가 녹화에 없는 도구를 부르면 diverged
+    changed = {thread: [{**turns[0], "tools": []}, *turns[1:]] for thread, turns in sessions.items()}
+    metrics = asyncio.run(replay(changed, False, 1, str(tmp_path / "replay_changed.db")))
+    assert metrics["diverged_turns"] == 1 and metrics["divergence"]["tool_missing"] == 1
+    assert json.dumps(metrics)
@@ -0,0 +1,42 @@
+# tests/test_restroom.py
+from datetime import datetime
+
+from app.services.restroom_module import RestroomIndex, parse_hours
+
+CSV_TEXT = """화장실명,소재지도로명주소,개방시간상세,남성용-장애인용대변기수,여성용-장애인용대변기수,비상벨설치여부,WGS84위도,WGS84경도
+인천역 화장실,인천 중구 제물량로 269,24시간,1,1,Y,37.4765,126.6169
+차이나타운 공중화장실,인천 중구 차이나타운로 59,09:00~18:00,0,0,N,37.4757,126.6178
+월미도 화장실,인천 중구 월미문화로 36,06:00~22:00,1,0,Y,37.4755,126.5976
+좌표없음 화장실,인천 중구,24시간,0,0,N,,
+"""
+
+
+def make_index(tmp_path):
+    path = tmp_path / "restroom.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return RestroomIndex.from_csv(str(path))
+
+
+def test_parse_hours():
+    assert parse_hours("24시간") == (True, 0, 1440)
+    assert parse_hours("09:00~18:00") == (False, 540, 1080)
+    assert parse_hours("정보없음") == (False, -1, -1)
+
+
+def test_nearest_and_filters(tmp_path):
+    index = make_index(tmp_path)
+    assert len(index) == 3
+
+    # 차이나타운 앞에서 검색
+    results = index.nearest(37.4758, 126.6177, k=2)
+    assert [r["name"] for r in results] == ["차이나타운 공중화장실", "인천역 화장실"]
+    assert results[0]["distance_m"] < 50
+
+    accessible = index.nearest(37.4758, 126.6177, k=3, accessible=True)
+    assert "차이나타운 공중화장실" not in [r["name"] for r in accessible]
+
+    night = datetime(2025, 1, 1, 23, 30)
+    open_now = index.nearest(37.4758, 126.6177, k=3, open_now=True, now=night)
+    assert [r["name"] for r in open_now] == ["인천역 화장실"]
+
+    assert [r["name"] for r in index.nearest(37.4758, 126.6177, open_24h=True)] == ["인천역 화장실"]
@@ -0,0 +1,69 @@
+# tests/test_spots_executor.py
+import asyncio
+import threading
+
+from app.spots.executor import EmbeddingExecutor
+
+
+def test_concurrent_queries_share_one_encode():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    async def main():
+        executor = EmbeddingExecutor(embed, workers=2, window_ms=20, max_batch=8)
+        try:
+            return await asyncio.gather(*(executor.aembed_query("q" * i) for i in range(1, 6)))
+        finally:
+            executor.shutdown()
+
+    vectors = asyncio.run(main())
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert len(calls) == 1 and len(calls[0]) == 5
+
+
+def test_max_batch_splits_and_errors_propagate():
+    def embed(texts):
+        if "bad" in texts:
+            raise RuntimeError("boom")
+        return [[0.0] for _ in texts]
+
+    async def main():
+        executor = EmbeddingExecutor(embed, workers=2, window_ms=5, max_batch=2)
+        try:
+            ok = await asyncio.gather(*(executor.aembed_query(str(i)) for i in range(5)))
+            assert executor.stats["batches"] == 3
+            try:
+                await executor.aembed_query("bad")
+            except RuntimeError:
+                return ok, True
+            return ok, False
+        finally:
+            executor.shutdown()
+
+    ok, raised = asyncio.run(main())
+    assert len(ok) == 5 and raised
+
+
+def test_shutdown_cancels_running_batches():
+    release = threading.Event()
+
+    def embed(texts):
+        release.wait(5)
+        return [[0.0] for _ in texts]
+
+    async def main():
+        executor = EmbeddingExecutor(embed, workers=1, window_ms=1, max_batch=1)
+        waiters = [asyncio.ensure_future(executor.aembed_query(str(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert len(executor.tasks) == 3
+        executor.shutdown()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        release.set()
+        return executor, results
+
+    executor, results = asyncio.run(main())
+    assert not executor.tasks
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
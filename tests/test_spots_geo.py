@@ -0,0 +1,52 @@
+# tests/test_spots_geo.py
+import asyncio
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from app.core.geo import haversine_km
+from app.services.graph_module import analyze_question_node
+from app.spots.geo_index import SpotGeoIndex
+
+
+def test_haversine_known_distance():
+    # 인천역 -> 서울역 직선거리 약 32km
+    d = haversine_km(37.4765, 126.6169, np.array([37.5547, 37.4765]), np.array([126.9707, 126.6169]))
+    assert 32.0 < d[0] < 33.0
+    assert d[1] == 0.0
+
+
+def test_geo_index_prefilters_and_blends():
+    vectors = np.eye(3, dtype=np.float32)
+    index = SpotGeoIndex(
+        ids=["wolmido", "chinatown", "songdo"],
+        lats=[37.4755, 37.4757, 37.3925],
+        lons=[126.5976, 126.6178, 126.6390],
+        vectors=vectors,
+        documents=["월미도", "차이나타운", "송도 센트럴파크"],
+        metadatas=[{"name": "월미도"}, {"name": "차이나타운"}, {"name": "송도"}],
+    )
+
+    # 인천역 앞, 쿼리는 송도와 가장 유사하지만 반경 밖이라 제외되어야 함
+    query = np.array([0.1, 0.2, 0.97], dtype=np.float32)
+    results = index.search(query, 37.4765, 126.6169, k=3, radius_km=3.0)
+    names = [r["metadata"]["name"] for r in results]
+    assert "송도" not in names
+    assert names[0] == "차이나타운"
+    assert all(r["distance_km"] <= 3.0 for r in results)
+
+    assert index.search(query, 35.1, 129.0, radius_km=3.0) == []
+
+
+def test_analyze_node_with_and_without_coordinates():
+    # 위치 정보 없이 온 질문도 분석되어야 함 (user_lat/user_lon=None)
+    result = asyncio.run(analyze_question_node({"messages": [HumanMessage(content="차이나타운 근처 볼거리 알려줘")]}))
+    info = result["question_analysis"]["extracted_info"]
+    assert result["current_step"] == "analysis_complete"
+    assert result["question_analysis"]["question_types"]["tourism"]
+    assert not info["has_coordinates"] and info["needs_current_location"]
+
+    message = HumanMessage(content="근처 볼거리 알려줘", additional_kwargs={"user_lat": 37.4765, "user_lon": 126.6169})
+    info = asyncio.run(analyze_question_node({"messages": [message]}))["question_analysis"]["extracted_info"]
+    assert info["has_coordinates"] and (info["latitude"], info["longitude"]) == (37.4765, 126.6169)
+    assert not info["needs_current_location"]
@@ -0,0 +1,76 @@
+# tests/test_spots_ingest.py
+import json
+
+from app.spots.ingest import build_document, ingest
+from app.spots.manifest import index_version, load_manifest
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for i, d, m in zip(ids, documents, metadatas):
+            self.docs[i] = (d, m)
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+def write_jsonl(path, rows):
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows), encoding="utf-8")
+
+
+def test_ingest_skips_unchanged(tmp_path):
+    src = tmp_path / "spots.jsonl"
+    db = tmp_path / "db"
+    rows = [
+        {"id": "1", "name": "월미도", "description": "바다 열차", "lat": "37.47", "lon": "126.59"},
+        {"id": "2", "name": "차이나타운", "description": "짜장면 발상지"},
+        {"id": "3", "name": "송도 센트럴파크", "description": "수상 택시"},
+    ]
+    write_jsonl(src, rows)
+    emb, col = FakeEmbeddings(), FakeCollection()
+
+    stats = ingest(str(src), str(db), "m", batch_size=2, embeddings=emb, collection=col)
+    assert stats["upserted"] == 3 and stats["batches"] == 2
+    assert col.docs["1"][1]["latitude"] == 37.47
+    version = index_version(str(db))
+    assert version is not None
+
+    # 한 건만 바뀌면 그 한 건만 다시 임베딩
+    rows[1]["description"] = "짜장면 박물관"
+    write_jsonl(src, rows)
+    stats = ingest(str(src), str(db), "m", batch_size=2, embeddings=emb, collection=col)
+    assert stats["skipped"] == 2 and stats["upserted"] == 1
+    assert emb.calls == [2, 1, 1]
+    assert index_version(str(db)) != version
+
+
+def test_ingest_prune(tmp_path):
+    src = tmp_path / "spots.jsonl"
+    db = tmp_path / "db"
+    write_jsonl(src, [{"id": "1", "name": "월미도"}, {"id": "2", "name": "소래포구"}])
+    col = FakeCollection()
+    ingest(str(src), str(db), "m", embeddings=FakeEmbeddings(), collection=col)
+
+    write_jsonl(src, [{"id": "1", "name": "월미도"}])
+    stats = ingest(str(src), str(db), "m", prune=True, embeddings=FakeEmbeddings(), collection=col)
+    assert stats["deleted"] == 1
+    assert set(col.docs) == {"1"}
+    assert set(load_manifest(str(db))["documents"]) == {"1"}
+
+
+def test_build_document_dedupes_after_strip():
+    doc = build_document({"id": "1", "name": "월미도", "title": "월미도 ", "description": " 바다 전망 ", "overview": ""})
+    assert doc["text"] == "월미도\n바다 전망"
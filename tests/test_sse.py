@@ -0,0 +1,84 @@
+# tests/test_sse.py
+import asyncio
+import json
+
+from app.services.admission import Superseded
+from app.services.sse import HEARTBEAT_FRAME, StreamStats, sse_events
+
+
+def parse(frames):
+    return [json.loads(f[len("data: "):]) for f in frames if f.startswith("data: ")]
+
+
+def collect(tokens, **kwargs):
+    async def main():
+        return [f async for f in sse_events(tokens, **kwargs)]
+
+    return asyncio.run(main())
+
+
+def test_tokens_are_coalesced_and_stream_ends_with_done():
+    async def tokens():
+        for i in range(200):
+            if i % 50 == 0:
+                await asyncio.sleep(0.03)    # 창(20ms)이 닫혀서 나눠 보내져야 함
+            yield "가나"
+
+    stats = StreamStats(queue_ms=3)
+    stats.add_usage({"input_tokens": 10, "output_tokens": 200, "total_tokens": 210})
+    frames = collect(tokens(), stats=stats, flush_ms=20, flush_chars=100, heartbeat_sec=0)
+    events = parse(frames)
+
+    deltas = [e for e in events if e["type"] == "delta"]
+    assert "".join(e["content"] for e in deltas) == "가나" * 200
+    assert 4 <= len(deltas) <= 12    # 토큰 200개 → 프레임 수 개
+    assert all(len(e["content"]) <= 100 for e in deltas)
+    done = events[-1]
+    assert done["type"] == "done" and done["status"] == "ok"
+    assert done["usage"] == {"input_tokens": 10, "output_tokens": 200, "total_tokens": 210}
+    assert done["stats"]["chunks"] == 200 and done["stats"]["frames"] == len(deltas) + 1
+    assert done["timing"]["queue_ms"] == 3 and done["timing"]["first_token_ms"] >= 25
+
+
+def test_heartbeat_while_idle_and_typed_errors():
+    async def slow_then_fail():
+        yield "안녕"
+        await asyncio.sleep(0.12)
+        raise RuntimeError("upstream exploded")
+
+    frames = collect(slow_then_fail(), flush_ms=10, flush_chars=100, heartbeat_sec=0.03)
+    assert frames.count(HEARTBEAT_FRAME) >= 2
+    events = parse(frames)
+    assert events[0] == {"type": "delta", "content": "안녕"}
+    # 내부 예외 문구는 내보내지 않음
+    assert events[1] == {"type": "error", "code": "internal", "message": "답변 생성 중 오류가 발생했습니다."}
+    assert events[2]["type"] == "done" and events[2]["status"] == "error"
+
+    async def superseded():
+        yield "a"
+        raise Superseded()
+
+    events = parse(collect(superseded(), flush_ms=10, heartbeat_sec=0, error_codes={Superseded: "superseded"}))
+    assert [e["type"] for e in events] == ["delta", "error", "done"]
+    assert events[1]["code"] == "superseded" and events[2]["status"] == "superseded"
+
+
+def test_closing_stream_closes_token_source():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.005)
+                yield "x"
+        finally:
+            closed.set()
+
+    async def main():
+        stream = sse_events(endless(), flush_ms=10, flush_chars=1000, heartbeat_sec=0)
+        first = await stream.__anext__()
+        await stream.aclose()    # 클라이언트 연결 끊김
+        return first, closed.is_set()
+
+    first, was_closed = asyncio.run(main())
+    assert first.startswith("data: ") and was_closed
@@ -0,0 +1,62 @@
+# tests/test_startup.py
+import pytest
+from langchain_core.tools import BaseTool
+
+from app.services import tool_registry
+from app.services.graph_module import TOOL_NAMES
+from app.services.tool_registry import TOOL_REGISTRY, ToolRegistry, declare_tool, get_tool
+from benchmarks.import_time import DEFAULT_DEFERRED, measure_import, summarize, total_ms
+
+
+def test_graph_import_defers_tool_and_llm_packages():
+    entries = measure_import("app.services.graph_module")
+    metrics = summarize([entries], DEFAULT_DEFERRED.split(","), top=5)
+    assert metrics["deferred_loaded"] == []
+    assert metrics["top_cumulative"][0][0] == "app.services.graph_module"
+    assert total_ms(entries) > 0
+
+
+class StubTool(BaseTool):
+    name: str = "spots"
+    description: str = "테스트용 도구"
+
+    def _run(self, query: str) -> str:
+        return query
+
+
+def test_registry_builds_on_first_use():
+    registry = ToolRegistry()
+    declared_tool = StubTool()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return declared_tool
+
+    registry.declare("spots", build)
+    with pytest.raises(ValueError):
+        registry.declare("spots", build)
+    assert builds == [] and registry.names() == ["spots"]
+    assert registry.get("spots") is registry.get("spots") is declared_tool and builds == [1]
+    assert registry.warmup() == {}
+    registry.reset()
+    assert set(registry.warmup()) == {"spots"} and builds == [1, 1]
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_declare_tool_keeps_plain_function(monkeypatch):
+    # 전역 레지스트리를 건드리지 않도록 새 레지스트리에 선언 (여러 번 실행해도 중복 선언 오류 없음)
+    monkeypatch.setattr(tool_registry, "TOOL_REGISTRY", ToolRegistry())
+
+    @declare_tool("startup_echo")
+    def echo(text: str) -> str:
+        """입력을 그대로 돌려준다"""
+        return text
+
+    assert echo("안녕") == "안녕"
+    built = get_tool("startup_echo")
+    assert isinstance(built, BaseTool) and built.invoke({"text": "안녕"}) == "안녕"
+    assert tool_registry.TOOL_REGISTRY.names() == ["startup_echo"]
+    # 앱 도구 선언은 그대로 (선언만 확인하고 만들지는 않음: 만들려면 API 키가 필요한 도구도 있음)
+    assert "startup_echo" not in TOOL_REGISTRY.names() and set(TOOL_NAMES) <= set(TOOL_REGISTRY.names())
@@ -0,0 +1,152 @@
+# tests/test_tracing.py
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.logging import jsonl_files
+from app.core.tracing import Trace, span, start_trace, trace_scope
+from app.main import app
+from app.memory.manager import close_checkpointer, open_checkpointer
+from app.services import admission
+from app.services.admission import AdmissionController
+from app.services.graph_metrics import timed_node, trace_callbacks
+
+client = TestClient(app)
+
+
+def use_trace_file(monkeypatch, tmp_path, **overrides) -> str:
+    path = str(tmp_path / "traces.jsonl")
+    monkeypatch.setattr(settings, "TRACE_FILE", path)
+    for key, value in overrides.items():
+        monkeypatch.setattr(settings, key, value)
+    tracing.close_trace_log()
+    return path
+
+
+def test_trace_spans_nodes_llm_tools_and_checkpoints(tmp_path, monkeypatch):
+    path = use_trace_file(monkeypatch, tmp_path)
+
+    @tool
+    async def probe(query: str) -> str:
+        """트레이스 테스트용 도구"""
+        await asyncio.sleep(0.01)
+        return f"{query} 결과"
+
+    async def chatbot(state: MessagesState):
+        model = GenericFakeChatModel(messages=iter([AIMessage(content="인천 추천")]))
+        answer = await model.ainvoke(state["messages"])
+        if not isinstance(state["messages"][-1], ToolMessage):
+            return {"messages": [AIMessage(content="", tool_calls=[{"name": "probe", "args": {"query": "인천"}, "id": "c1"}])]}
+        return {"messages": [answer]}
+
+    async def main():
+        saver = await open_checkpointer(str(tmp_path / "memory.db"), readers=1)
+        try:
+            builder = StateGraph(MessagesState)
+            builder.add_node("chatbot", timed_node("chatbot", chatbot))
+            builder.add_node("tools", timed_node("tools", ToolNode([probe])))
+            builder.add_edge(START, "chatbot")
+            builder.add_conditional_edges("chatbot", tools_condition)
+            builder.add_edge("tools", "chatbot")
+            graph = builder.compile(checkpointer=saver)
+
+            trace = start_trace("chatbot", forced=True, user_id="u1")
+            with trace_scope(trace):
+                config = {"configurable": {"thread_id": "u1"}, "callbacks": trace_callbacks()}
+                await graph.ainvoke({"messages": [("user", "추천해줘")]}, config)
+            trace.finish("ok")
+            return trace
+        finally:
+            await close_checkpointer(saver)
+
+    trace = asyncio.run(main())
+    names = [s.name for s in trace.spans]
+    # ToolNode 안쪽의 같은 이름 실행은 노드 스팬을 하나 더 만들지 않는다
+    assert names.count("chatbot") == 2 and names.count("tools") == 1
+    assert names.count("llm") == 2 and names.count("tool:probe") == 1
+    assert "checkpoint:get" in names and "checkpoint:put" in names and "checkpoint:put_writes" in names
+
+    by_id = {s.id: s for s in trace.spans}
+    tool_span = next(s for s in trace.spans if s.name == "tool:probe")
+    assert by_id[tool_span.parent].name == "tools" and json.loads(tool_span.attrs["args"]) == {"query": "인천"}
+    llm_span = next(s for s in trace.spans if s.kind == "llm")
+    assert by_id[llm_span.parent].name == "chatbot"
+    assert all(s.end is not None and s.status == "ok" for s in trace.spans)
+
+    breakdown = trace.breakdown()
+    assert {"chatbot", "tools", "llm", "tool", "checkpoint", "total"} <= set(breakdown)
+    assert breakdown["tool"] >= 10 and breakdown["total"] >= breakdown["tools"]
+
+    with open(path, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["trace_id"] == trace.trace_id and record["status"] == "ok" and record["attrs"] == {"user_id": "u1"}
+    assert len(record["spans"]) == len(trace.spans)
+
+
+def test_sampling_rotation_and_cli(tmp_path, monkeypatch, capsys):
+    path = use_trace_file(monkeypatch, tmp_path, TRACE_SAMPLE_RATE=0.0, TRACE_MAX_BYTES=2000, TRACE_BACKUPS=2)
+    assert start_trace("chat") is None
+    assert isinstance(start_trace("chat", forced=True), Trace)
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+
+    async def one(n: int):
+        trace = start_trace("chat", n=n)
+        with trace_scope(trace):
+            with span("checkpoint:get", "checkpoint"):
+                await asyncio.sleep(0.001 * n)
+            # 끝나지 않은 스팬은 cancelled로 닫힌다
+            trace.start_span("tool:slow", "tool")
+        trace.finish("ok")
+
+    async def main():
+        for n in range(1, 13):
+            await one(n)
+
+    asyncio.run(main())
+    tracing.close_trace_log()
+    files = jsonl_files(path)
+    assert files == [f"{path}.2", f"{path}.1", path]
+    traces = tracing.load_traces(path)
+    assert traces and traces[-1]["attrs"] == {"n": 12}
+    assert traces[-1]["spans"][1]["status"] == "cancelled"
+
+    tracing.main(["slowest", "--file", path, "--top", "1"])
+    out = capsys.readouterr().out
+    slowest = max(traces, key=lambda t: t["duration_ms"])
+    assert slowest["trace_id"] in out and "checkpoint:get" in out and "tool:slow [cancelled]" in out
+
+    tracing.main(["flame", "--file", path, "--folded"])
+    folded = dict(line.rsplit(" ", 1) for line in capsys.readouterr().out.splitlines())
+    assert set(folded) == {"chat", "chat;checkpoint:get", "chat;tool:slow"}
+
+
+def test_chatbot_timing_header(tmp_path, monkeypatch):
+    use_trace_file(monkeypatch, tmp_path)
+
+    async def fake_ask_ai(req):
+        with span("checkpoint:get", "checkpoint"):
+            await asyncio.sleep(0.005)
+        return "답변"
+
+    monkeypatch.setattr("app.api.v1.endpoints.ai.ask_ai", fake_ask_ai)
+    monkeypatch.setattr(admission, "ADMISSION", AdmissionController(max_running=2, max_queue=2, queue_timeout=1))
+    body = {"user_question": "안녕", "user_id": "trace-user"}
+
+    resp = client.post("/v1/chatbot", json=body)
+    assert resp.status_code == 200 and "server-timing" not in resp.headers
+
+    resp = client.post("/v1/chatbot", json=body, headers={"X-Trace-Timing": "1"})
+    assert resp.status_code == 200
+    timing = dict(part.split(";dur=") for part in resp.headers["server-timing"].split(", "))
+    assert float(timing["checkpoint"]) >= 5 and float(timing["total"]) >= float(timing["checkpoint"])
+    tracing.close_trace_log()
+    traces = tracing.load_traces(settings.TRACE_FILE)
+    assert [t["trace_id"] for t in traces] == [resp.headers["x-trace-id"]]